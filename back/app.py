@@ -21,6 +21,7 @@ free and open-source options.
 # Standard library imports
 import os
 import sys
+import time
 import eventlet
 eventlet.monkey_patch()  # Required for WebSocket support
 
@@ -28,7 +29,7 @@ eventlet.monkey_patch()  # Required for WebSocket support
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Third-party imports
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, g
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 from dotenv import load_dotenv
@@ -40,8 +41,9 @@ from langchain_core.prompts import ChatPromptTemplate
 from config import config
 
 # Local application imports
-from service.helper import download_hugging_face_embeddings
+from service.helper import get_shared_embeddings
 from service.prompt import system_prompt, prompt
+from service.rag_chain import build_rag_chain
 from service.google_search import execute_google_search
 from service.agent_service import agent_service
 from service.metrics_service import metrics_service
@@ -53,6 +55,7 @@ from routes.weather_routes import weather_bp
 from routes.recommendations_routes import recommendations_bp
 from routes.metrics_routes import init_metrics_routes
 from routes.article_routes import article_bp
+from routes.admin_routes import admin_bp
 
 # -------------------------------------------------------------------------
 # Disease and Remedy Tracking System
@@ -139,7 +142,7 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     
     # Initialize extensions
-    from extensions import init_extensions, db, socketio, login_manager
+    from extensions import init_extensions, db, socketio, login_manager, scheduler
     init_extensions(app)
     
     # Register teardown handler
@@ -150,6 +153,61 @@ def create_app(config_name=None):
     # Initialize metrics service
     from service.metrics_service import metrics_service
     metrics_service.initialize(app)  # Pass app for any route registration
+    
+    # Evaluate rolling-window alert rules every 10 seconds
+    metrics_service.start_alerting(scheduler, seconds=10)
+    
+    # Run article discovery in the background (RQ worker if available)
+    from service.article_ingestion import article_ingestion
+    article_ingestion.init_app(
+        scheduler=scheduler,
+        queue=getattr(app, 'task_queue', None) if app.config.get('ARTICLE_DISCOVERY_USE_RQ') else None,
+        interval_hours=app.config.get('ARTICLE_DISCOVERY_INTERVAL_HOURS'),
+        queries=app.config.get('ARTICLE_DISCOVERY_QUERIES')
+    )
+    
+    # Buffer article view/like/share counts and write them in batches
+    from service.article_counters import article_counters
+    article_counters.init_app(
+        redis_client=getattr(app, 'redis', None) if app.config.get('ARTICLE_COUNTERS_USE_REDIS') else None,
+        flush_interval=app.config.get('ARTICLE_COUNTERS_FLUSH_SECONDS')
+    )
+    
+    # Cache user preference/interaction snapshots for recommendations
+    from service.user_profile_cache import user_profile_cache
+    user_profile_cache.init_app(
+        redis_client=getattr(app, 'redis', None) if app.config.get('USER_PROFILE_CACHE_USE_REDIS') else None,
+        ttl=app.config.get('USER_PROFILE_CACHE_TTL')
+    )
+    
+    # Cache weather lookups by location
+    from service.weather_cache import weather_cache
+    weather_cache.init_app(
+        redis_client=getattr(app, 'redis', None) if app.config.get('WEATHER_CACHE_USE_REDIS') else None,
+        ttl=app.config.get('WEATHER_CACHE_TTL'),
+        stale_ttl=app.config.get('WEATHER_CACHE_STALE_TTL')
+    )
+    
+    # Feed per-endpoint latency and errors into the alert windows
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+    
+    @app.after_request
+    def record_request_latency(response):
+        start = g.get('request_start')
+        if start is not None and request.endpoint:
+            metrics_service.observe_latency(
+                f"endpoint:{request.endpoint}",
+                time.perf_counter() - start,
+                error=response.status_code >= 500
+            )
+        return response
+
+    # Start the always-on sampling profiler if enabled
+    if app.config.get('PROFILER_CONTINUOUS'):
+        from service.profiler import continuous_profiler
+        continuous_profiler.start(app.config.get('PROFILER_INTERVAL'))
 
     # Register blueprints for the API endpoints
     # Each blueprint encapsulates a specific domain of functionality
@@ -158,6 +216,7 @@ def create_app(config_name=None):
     app.register_blueprint(recommendations_bp, url_prefix='/api/recommendations')
     app.register_blueprint(health_bp, url_prefix='/api/health')
     app.register_blueprint(article_bp, url_prefix='')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
     
     # Initialize metrics routes with socketio
     metrics_bp = init_metrics_routes(socketio)
@@ -175,8 +234,8 @@ def create_app(config_name=None):
     os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
     os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
-    # Download and initialize embeddings model
-    embeddings = download_hugging_face_embeddings()
+    # Embeddings model (shared with the recommendation and agent services)
+    embeddings = get_shared_embeddings()
 
     # Connect to existing Pinecone vector store index
     index_name = "herbbot"
@@ -197,28 +256,8 @@ def create_app(config_name=None):
         max_tokens=1024
     )
 
-    # Create a prompt template with system and user messages
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", "{input}"),
-    ])
-
     # Set up the RAG pipeline
-    from langchain.chains import create_retrieval_chain
-    from langchain.chains.combine_documents import create_stuff_documents_chain
-
-    # Create the document chain
-    combine_docs_chain = create_stuff_documents_chain(
-        llm=llm,
-        prompt=prompt,
-        document_variable_name="context"
-    )
-
-    # Create the RAG chain
-    rag_chain = create_retrieval_chain(
-        retriever=retriever,
-        combine_docs_chain=combine_docs_chain
-    )
+    rag_chain = build_rag_chain(retriever=retriever, llm=llm)
 
     return app, socketio, rag_chain
 
@@ -266,7 +305,7 @@ def chat():
         start_time = time.time()
         
         # Get response from RAG chain
-        response = rag_chain.invoke({"input": msg})
+        response = rag_chain.invoke({"input": msg, "question": msg})
         response_time = time.time() - start_time
         
         # Track metrics if metrics_service is available
@@ -411,8 +450,8 @@ def get_comparison_metrics():
         JSON response with performance comparison metrics
     """
     try:
-        if hasattr(metrics_service, 'get_comparison_metrics'):
-            return jsonify(metrics_service.get_comparison_metrics())
+        if hasattr(metrics_service, 'get_aggregated_comparison'):
+            return jsonify(metrics_service.get_aggregated_comparison())
         return jsonify({"error": "Metrics service not available"}), 503
     except Exception as e:
         print(f'Error getting comparison metrics: {str(e)}')
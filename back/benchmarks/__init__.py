@@ -0,0 +1,6 @@
+"""
+Benchmarks Package
+
+Offline benchmarking harnesses for the backend services. Each module can be
+run from the ``back`` directory, e.g. ``python -m benchmarks.rag_vs_agent``.
+"""
@@ -0,0 +1,136 @@
+"""
+Dosha Scoring Benchmark
+
+Measures batch dosha scoring with ``DoshaCalculator.calculate_many`` against
+the per-response ``calculate_dosha`` loop, reporting throughput
+(responses/s) for:
+1. ``calculate_dosha`` on a sample of the responses (the loop is too slow to
+   run on the whole cohort)
+2. Encoding response dicts into option-index arrays
+3. Vectorized scoring of the encoded arrays
+4. ``calculate_many`` end to end on response dicts
+
+Responses are random answers to the shared questionnaire, with some
+questions unanswered or answered with unknown options. Run from ``back/``:
+
+    python -m benchmarks.dosha_scoring --responses 1000000
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from service.dosha_calculator import DoshaCalculator
+
+
+def synthetic_responses(calculator: DoshaCalculator, count: int, seed: int = 0,
+                        skip_rate: float = 0.1, invalid_rate: float = 0.02) -> List[Dict[str, str]]:
+    """Random response dicts over the calculator's question set."""
+    rng = np.random.default_rng(seed)
+    responses: List[Dict[str, str]] = [{} for _ in range(count)]
+    for question in calculator.questions:
+        options = list(question.weights) + ['not-an-option']
+        picks = rng.integers(0, len(options) - 1, size=count)
+        roll = rng.random(count)
+        picks[roll < invalid_rate] = len(options) - 1
+        answered = roll >= skip_rate
+        for response, pick, keep in zip(responses, picks.tolist(), answered.tolist()):
+            if keep:
+                response[question.id] = options[pick]
+    return responses
+
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else float('inf')
+
+
+def run(responses: int = 1_000_000, loop_sample: int = 20_000, seed: int = 0) -> Dict[str, Any]:
+    calculator = DoshaCalculator()
+    data = synthetic_responses(calculator, responses, seed)
+    sample = data[:min(loop_sample, responses)]
+
+    start = time.perf_counter()
+    for response in sample:
+        calculator.calculate_dosha(response)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes = calculator.scoring_table.encode(data)
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = calculator.calculate_many(codes)
+    score_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculator.calculate_many(data)
+    end_to_end_seconds = time.perf_counter() - start
+
+    # The batch results must agree with the loop
+    mismatches = sum(
+        1 for i, response in enumerate(sample[:1000])
+        if _comparable(calculator.calculate_dosha(response)) != _comparable(batch.result(i))
+    )
+
+    loop_rate = _rate(len(sample), loop_seconds)
+    return {
+        'settings': {'responses': responses, 'loop_sample': len(sample), 'seed': seed,
+                     'questions': len(calculator.questions)},
+        'calculate_dosha': {'seconds': loop_seconds, 'responses_per_s': loop_rate},
+        'encode': {'seconds': encode_seconds, 'responses_per_s': _rate(responses, encode_seconds)},
+        'score_encoded': {'seconds': score_seconds, 'responses_per_s': _rate(responses, score_seconds)},
+        'calculate_many': {'seconds': end_to_end_seconds, 'responses_per_s': _rate(responses, end_to_end_seconds)},
+        'speedup': {
+            'score_encoded': _rate(responses, score_seconds) / loop_rate,
+            'calculate_many': _rate(responses, end_to_end_seconds) / loop_rate,
+        },
+        'mismatches': mismatches,
+    }
+
+
+def _comparable(result: Dict[str, Any]) -> tuple:
+    return (str(result['primary_dosha']), result['secondary_dosha'],
+            tuple(sorted(result['scores'].items())), round(result['confidence'], 12))
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    settings = report['settings']
+    lines = [
+        f"{settings['responses']:,} responses, {settings['questions']} questions "
+        f"(calculate_dosha timed on {settings['loop_sample']:,})",
+        '',
+        '| stage | seconds | responses/s |',
+        '|---|---|---|',
+    ]
+    for stage in ('calculate_dosha', 'encode', 'score_encoded', 'calculate_many'):
+        lines.append(f"| {stage} | {report[stage]['seconds']:.3f} | {report[stage]['responses_per_s']:,.0f} |")
+    lines.append('')
+    lines.append(f"calculate_many vs calculate_dosha: x{report['speedup']['calculate_many']:.1f} "
+                 f"(x{report['speedup']['score_encoded']:.0f} on pre-encoded responses); "
+                 f"{report['mismatches']} mismatches in 1,000 checked")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark batch dosha scoring")
+    parser.add_argument('--responses', type=int, default=1_000_000, help="Response sets to score")
+    parser.add_argument('--loop-sample', type=int, default=20_000, help="Response sets timed with calculate_dosha")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic responses")
+    parser.add_argument('--output', help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = run(args.responses, args.loop_sample, args.seed)
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Deterministic Local Fakes
+
+Stand-ins for the Groq-hosted LLM, the Pinecone index and the embedding model
+used by the benchmark harness. Responses depend only on the input text (never
+on wall-clock time or Python's salted ``hash``), and the LLM and retriever
+sleep for a configurable latency so the harness measures orchestration
+overhead plus a controlled model/network cost.
+"""
+
+import json
+import re
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForLLMRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, FunctionMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+CORPUS_PATH = Path(__file__).parent / 'data' / 'ayurveda_questions.json'
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (about 0.75 words per token)."""
+    words = len(text.split())
+    return max(1, round(words * 4 / 3)) if words else 0
+
+
+def _jittered(latency: float, jitter: float, text: str) -> float:
+    """Latency plus a deterministic jitter in [0, jitter) derived from the text."""
+    if not jitter:
+        return latency
+    return latency + (zlib.crc32(text.encode('utf-8')) % 1000) / 1000.0 * jitter
+
+
+def load_corpus(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the benchmark corpus of questions and knowledge-base passages."""
+    with open(path or CORPUS_PATH, 'r') as f:
+        return json.load(f)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that returns a deterministic answer after a fixed latency.
+
+    When called with OpenAI-style ``functions`` (as the agent does), it first
+    calls up to ``max_tool_calls`` of them, chosen by keywords in the user's
+    question, and answers once their results are in the conversation.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    answer_words: int = 60
+    # Keyword routing for function calls, in priority order
+    tool_routes: List[Tuple[str, Tuple[str, ...]]] = [
+        ('dosha', ('my dosha', 'thin frame', 'body frame', 'which dosha')),
+        ('symptom_analyzer', ('constipation', 'anxiety', 'heartburn', 'insomnia', 'imbalanced')),
+        ('vector_store_search', ('herb', 'remed', 'benefit', 'eat', 'diet', 'routine', 'season')),
+    ]
+    fallback_tool: str = 'vector_store_search'
+    max_tool_calls: int = 2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-ayurveda-chat"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt_text = "\n".join(str(m.content) for m in messages)
+        time.sleep(_jittered(self.latency, self.jitter, prompt_text))
+
+        function_call = self.function_call_for(messages, kwargs.get('functions') or [])
+        if function_call:
+            message = AIMessage(content='', additional_kwargs={'function_call': function_call})
+            answer = json.dumps(function_call)
+        else:
+            answer = self.answer_for(prompt_text)
+            message = AIMessage(content=answer)
+        usage = {
+            'prompt_tokens': count_tokens(prompt_text),
+            'completion_tokens': count_tokens(answer),
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={'token_usage': usage, 'model_name': self._llm_type},
+        )
+
+    def _combine_llm_outputs(self, llm_outputs: List[Optional[dict]]) -> dict:
+        # Sum usage across a batch, as the hosted chat models do
+        usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        for output in llm_outputs:
+            for key, value in (output or {}).get('token_usage', {}).items():
+                usage[key] = usage.get(key, 0) + value
+        return {'token_usage': usage, 'model_name': self._llm_type}
+
+    def function_call_for(self, messages: List[BaseMessage], functions: List[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        """The next function to call, or None once the model should answer."""
+        available = {function['name'] for function in functions}
+        called = [m.name for m in messages if isinstance(m, FunctionMessage)]
+        questions = [m for m in messages if isinstance(m, HumanMessage)]
+        if not available or not questions or len(called) >= self.max_tool_calls:
+            return None
+
+        question = str(questions[-1].content)
+        text = question.lower()
+        routed = [
+            name for name, keywords in self.tool_routes
+            if name in available and any(keyword in text for keyword in keywords)
+        ]
+        if not routed and not called and self.fallback_tool in available:
+            routed = [self.fallback_tool]
+        remaining = [name for name in routed if name not in called]
+        if not remaining:
+            return None
+
+        name = remaining[0]
+        if name == 'symptom_analyzer':
+            tool_input = json.dumps({'symptoms': [question]})
+        elif name == 'dosha':
+            tool_input = json.dumps({})
+        else:
+            tool_input = question
+        return {'name': name, 'arguments': json.dumps({'__arg1': tool_input})}
+
+    def answer_for(self, prompt_text: str) -> str:
+        """Build a deterministic answer whose length is ``answer_words``."""
+        seed = zlib.crc32(prompt_text.encode('utf-8'))
+        vocabulary = sorted(set(_WORD_RE.findall(prompt_text.lower()))) or ['ayurveda']
+        words = [vocabulary[(seed + i * 7919) % len(vocabulary)] for i in range(self.answer_words)]
+        return "According to Ayurveda, " + " ".join(words) + "."
+
+
+class FakeRetriever(BaseRetriever):
+    """Retriever that ranks a fixed passage list by word overlap with the query."""
+
+    documents: List[Document]
+    k: int = 3
+    latency: float = 0.0
+    jitter: float = 0.0
+
+    @classmethod
+    def from_corpus(cls, corpus: Dict[str, Any], **kwargs) -> 'FakeRetriever':
+        documents = [
+            Document(page_content=doc['text'], metadata={'source': doc['source'], 'id': str(i)})
+            for i, doc in enumerate(corpus.get('documents', []))
+        ]
+        return cls(documents=documents, **kwargs)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun, k: Optional[int] = None
+    ) -> List[Document]:
+        time.sleep(_jittered(self.latency, self.jitter, query))
+        terms = set(_WORD_RE.findall(query.lower()))
+        scored = [
+            (len(terms & set(_WORD_RE.findall(doc.page_content.lower()))), -i, doc)
+            for i, doc in enumerate(self.documents)
+        ]
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [doc for _, _, doc in scored[:k or self.k]]
+
+
+class FakeEncoding:
+    """Stands in for a tiktoken encoding (which is downloaded on first use)."""
+
+    name = 'fake-words'
+
+    def encode(self, text: str, **kwargs) -> List[int]:
+        return [zlib.crc32(word.encode('utf-8')) for word in text.split()]
+
+
+class FakeEmbeddings:
+    """Bag-of-words embeddings hashed into ``size`` dimensions."""
+
+    def __init__(self, size: int = 384):
+        self.size = size
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for word in _WORD_RE.findall(text.lower()):
+            vector[zlib.crc32(word.encode('utf-8')) % self.size] += 1.0
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+class FakeVectorStore:
+    """Stands in for ``PineconeVectorStore``, searching through a FakeRetriever."""
+
+    def __init__(self, retriever: FakeRetriever):
+        self.retriever = retriever
+
+    def as_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None, **kwargs) -> FakeRetriever:
+        k = (search_kwargs or {}).get('k')
+        return self.retriever if k is None else self.retriever.model_copy(update={'k': k})
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return self.retriever.model_copy(update={'k': k}).invoke(query)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> List[Tuple[Document, float]]:
+        return [(doc, 1.0 - i * 0.1) for i, doc in enumerate(self.similarity_search(query, k))]
@@ -0,0 +1,239 @@
+"""
+HTML Extraction Benchmark
+
+Compares the lxml/readability extractor in ``service.html_extractor`` with the
+previous BeautifulSoup container heuristics on a corpus of pages with known
+main text, reporting per extractor:
+1. Throughput (pages/s and MB/s of HTML)
+2. Per-page latency (mean, p50, p95, max)
+3. Token precision, recall and F1 against the gold text
+
+By default a deterministic synthetic corpus of news-style pages is generated
+(navigation, sidebars, comments, related-link lists and ads around the
+article, in several layouts). A directory of real pages can be used instead:
+each ``name.html`` is paired with a ``name.txt`` holding its gold text. Run
+from ``back/``:
+
+    python -m benchmarks.html_extraction --pages 300 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from service.html_extractor import extract_main_text, extract_main_text_bs4
+
+from .rag_vs_agent import percentile
+
+_WORD = re.compile(r'\w+')
+
+WORDS = (
+    'ayurveda dosha vata pitta kapha digestion agni herbs turmeric ashwagandha triphala '
+    'balance season diet sleep routine practitioner remedy tea ginger massage oil yoga '
+    'breath morning evening warm cooling heavy light study research patients clinic '
+    'tradition ancient modern body mind energy metabolism immunity stress spices meal'
+).split()
+
+LAYOUTS = ('article', 'post_body', 'div_soup', 'content_wrapper')
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    if rng.random() < 0.6:
+        words[rng.randint(2, len(words) - 2)] += ','
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng: random.Random) -> str:
+    return ' '.join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+
+
+def _links(rng: random.Random, count: int, css: str) -> str:
+    items = ''.join(
+        f'<li><a href="/p/{rng.randint(1, 9999)}">{" ".join(rng.choice(WORDS) for _ in range(4))}</a></li>'
+        for _ in range(count)
+    )
+    return f'<ul class="{css}">{items}</ul>'
+
+
+def synthetic_page(seed: int) -> Tuple[str, str]:
+    """One page and its gold main text."""
+    rng = random.Random(seed)
+    layout = LAYOUTS[seed % len(LAYOUTS)]
+    title = ' '.join(rng.choice(WORDS) for _ in range(6)).title()
+    paragraphs = [_paragraph(rng) for _ in range(rng.randint(4, 12))]
+
+    body = [f'<h1>{title}</h1>']
+    for i, paragraph in enumerate(paragraphs):
+        body.append(f'<p>{paragraph}</p>')
+        if i == 1:
+            body.append('<div class="ad-slot"><p>Advertisement: buy herbal supplements today</p></div>')
+        if i == 2 and layout != 'div_soup':
+            body.append('<div class="share-tools"><a href="#">Share</a> <a href="#">Tweet</a></div>')
+    body.append('<div class="related-posts"><h3>Related</h3>' + _links(rng, 6, 'related') + '</div>')
+
+    comments = '<div class="comments">' + ''.join(
+        f'<div class="comment"><p>{_sentence(rng)} {_sentence(rng)}</p></div>' for _ in range(rng.randint(2, 8))
+    ) + '</div>'
+    sidebar = '<div class="sidebar widget"><h3>Popular</h3>' + _links(rng, 10, 'popular') + '</div>'
+    menu = _links(rng, 8, 'menu')
+
+    if layout == 'article':
+        main = f'<article>{"".join(body)}</article>{comments}'
+    elif layout == 'post_body':
+        main = f'<div class="post-body">{"".join(body)}</div>{comments}'
+    elif layout == 'div_soup':
+        main = f'<div id="c1"><div id="c2">{"".join(body)}</div></div>{comments}'
+    else:
+        # A generic wrapper whose class says "content" around everything
+        main = f'<div class="site-content">{"".join(body)}{comments}</div>'
+
+    page = (
+        f'<!DOCTYPE html><html><head><title>{title}</title>'
+        '<script>var tracking = {"id": 1};</script><style>p {margin: 0}</style></head><body>'
+        f'<div class="header">{menu}</div><div class="layout">{main}{sidebar}</div>'
+        '<div class="footer-links"><p>Copyright, all rights reserved, contact us.</p></div>'
+        '</body></html>'
+    )
+    return page, ' '.join([title] + paragraphs)
+
+
+def synthetic_corpus(pages: int, seed: int = 0) -> List[Tuple[str, str]]:
+    return [synthetic_page(seed + n) for n in range(pages)]
+
+
+def load_corpus_dir(path: str) -> List[Tuple[str, str]]:
+    """Pairs of (html, gold text) from ``name.html``/``name.txt`` files."""
+    corpus = []
+    for name in sorted(os.listdir(path)):
+        if not name.endswith('.html'):
+            continue
+        gold_path = os.path.join(path, name[:-len('.html')] + '.txt')
+        if not os.path.exists(gold_path):
+            continue
+        with open(os.path.join(path, name), encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        with open(gold_path, encoding='utf-8', errors='replace') as f:
+            gold = f.read()
+        corpus.append((html, gold))
+    return corpus
+
+
+def token_scores(extracted: str, gold: str) -> Dict[str, float]:
+    """Bag-of-tokens precision, recall and F1."""
+    got = Counter(_WORD.findall(extracted.lower()))
+    want = Counter(_WORD.findall(gold.lower()))
+    overlap = sum((got & want).values())
+    precision = overlap / sum(got.values()) if got else 0.0
+    recall = overlap / sum(want.values()) if want else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def run_extractor(extract: Callable[[str], str], corpus: List[Tuple[str, str]], repeat: int = 1) -> Dict[str, Any]:
+    latencies = []
+    scores = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html, gold in corpus:
+            page_started = time.perf_counter()
+            text = extract(html)
+            latencies.append((time.perf_counter() - page_started) * 1000)
+            if len(scores) < len(corpus):
+                scores.append(token_scores(text, gold))
+    elapsed = time.perf_counter() - started
+
+    html_bytes = sum(len(html.encode('utf-8')) for html, _ in corpus) * repeat
+    return {
+        'pages': len(latencies),
+        'pages_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'mb_per_second': html_bytes / 1e6 / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'max': max(latencies, default=0.0),
+        },
+        'quality': {
+            key: sum(score[key] for score in scores) / len(scores) if scores else 0.0
+            for key in ('precision', 'recall', 'f1')
+        },
+    }
+
+
+def build_report(corpus: List[Tuple[str, str]], repeat: int = 1,
+                 settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    extractors = {'legacy': extract_main_text_bs4, 'readability': extract_main_text}
+    results = {name: run_extractor(extract, corpus, repeat) for name, extract in extractors.items()}
+    legacy, current = results['legacy'], results['readability']
+    return {
+        'settings': settings or {},
+        'extractors': results,
+        'comparison': {
+            'speedup': current['pages_per_second'] / legacy['pages_per_second']
+            if legacy['pages_per_second'] else None,
+            'f1_delta': current['quality']['f1'] - legacy['quality']['f1'],
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a markdown table."""
+    names = list(report['extractors'])
+    rows = [
+        ('pages', lambda r: str(r['pages'])),
+        ('pages / s', lambda r: f"{r['pages_per_second']:.1f}"),
+        ('MB / s', lambda r: f"{r['mb_per_second']:.2f}"),
+    ]
+    for key in ('mean', 'p50', 'p95', 'max'):
+        rows.append((f'latency {key} (ms)', lambda r, key=key: f"{r['latency_ms'][key]:.2f}"))
+    for key in ('precision', 'recall', 'f1'):
+        rows.append((key, lambda r, key=key: f"{r['quality'][key]:.3f}"))
+
+    lines = [
+        '| metric | ' + ' | '.join(names) + ' |',
+        '|---' * (len(names) + 1) + '|',
+    ]
+    for label, render in rows:
+        lines.append(f'| {label} | ' + ' | '.join(render(report['extractors'][name]) for name in names) + ' |')
+
+    comparison = report['comparison']
+    lines.append('')
+    lines.append('readability vs legacy: '
+                 + (f"x{comparison['speedup']:.2f} pages/s, " if comparison['speedup'] else '')
+                 + f"F1 {comparison['f1_delta']:+.3f}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark main-content extraction")
+    parser.add_argument('--corpus', help="Directory of name.html/name.txt page and gold-text pairs")
+    parser.add_argument('--pages', type=int, default=200, help="Synthetic pages to generate")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic corpus")
+    parser.add_argument('--repeat', type=int, default=1, help="Passes over the corpus")
+    parser.add_argument('--output', help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus_dir(args.corpus) if args.corpus else synthetic_corpus(args.pages, args.seed)
+    settings = {
+        'corpus': args.corpus or 'synthetic',
+        'pages': len(corpus),
+        'repeat': args.repeat,
+    }
+    report = build_report(corpus, args.repeat, settings)
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+"""
+RAG vs Agent Benchmark
+
+Replays a corpus of Ayurveda questions through the RAG chain and the agent
+and reports, per implementation:
+1. Latency distribution (mean, p50, p90, p95, p99, min, max)
+2. Tool calls per request (total, mean and per tool)
+3. Token usage per request
+
+Both run for real: the RAG chain from ``service.rag_chain`` and
+``AgentService`` from ``service.agent_service`` (see
+``benchmarks.stubbed_agent``). Only their external services are replaced:
+the LLM, Pinecone retriever and embeddings by the deterministic fakes in
+``benchmarks.fakes``, so runs are reproducible offline. Run from ``back/``:
+
+    python -m benchmarks.rag_vs_agent --llm-latency 0.2 --repeat 3
+
+To feed the results to ``MetricsService.track_comparison``, call
+``run_benchmark`` with ``record_to`` from inside the application process.
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from service.rag_chain import build_rag_chain
+
+from .fakes import FakeChatModel, FakeRetriever, load_corpus
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile with linear interpolation between closest ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+@dataclass
+class RequestSample:
+    """Measurements for a single benchmarked request."""
+    question: str
+    latency_ms: float
+    tool_usage: Dict[str, int] = field(default_factory=dict)
+    tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def tool_calls(self) -> int:
+        return sum(self.tool_usage.values())
+
+
+@dataclass
+class BenchmarkResult:
+    """All samples collected for one implementation."""
+    name: str
+    samples: List[RequestSample] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate the samples into latency, tool and token statistics."""
+        ok = [s for s in self.samples if s.error is None]
+        latencies = [s.latency_ms for s in ok]
+        per_tool: Dict[str, int] = {}
+        for sample in ok:
+            for tool_name, count in sample.tool_usage.items():
+                per_tool[tool_name] = per_tool.get(tool_name, 0) + count
+
+        latency = {
+            'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+            'min': min(latencies) if latencies else 0.0,
+            'max': max(latencies) if latencies else 0.0,
+        }
+        for pct in PERCENTILES:
+            latency[f'p{pct}'] = percentile(latencies, pct)
+
+        total_calls = sum(s.tool_calls for s in ok)
+        total_tokens = sum(s.tokens for s in ok)
+        return {
+            'requests': len(self.samples),
+            'errors': len(self.samples) - len(ok),
+            'latency_ms': latency,
+            'tool_calls': {
+                'total': total_calls,
+                'mean': total_calls / len(ok) if ok else 0.0,
+                'by_tool': dict(sorted(per_tool.items())),
+            },
+            'tokens': {
+                'total': total_tokens,
+                'mean': total_tokens / len(ok) if ok else 0.0,
+            },
+        }
+
+
+class _TokenCounter(BaseCallbackHandler):
+    """Callback that sums ``token_usage`` reported by the LLM."""
+
+    def __init__(self):
+        self.total_tokens = 0
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        usage = (response.llm_output or {}).get('token_usage', {})
+        self.total_tokens += usage.get('total_tokens', 0)
+
+
+class RagChainTarget:
+    """Benchmark target wrapping the RAG chain."""
+
+    name = 'rag'
+
+    def __init__(self, chain):
+        self.chain = chain
+
+    def run(self, question: str) -> RequestSample:
+        counter = _TokenCounter()
+        start_time = time.perf_counter()
+        self.chain.invoke(
+            {"input": question, "question": question},
+            config={'callbacks': [counter]}
+        )
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        # The chain always performs exactly one retrieval
+        return RequestSample(
+            question=question,
+            latency_ms=latency_ms,
+            tool_usage={'vector_store_search': 1},
+            tokens=counter.total_tokens,
+        )
+
+
+class AgentTarget:
+    """
+    Benchmark target wrapping an object with ``AgentService.invoke``'s contract.
+
+    ``AgentService`` does not report token usage, so tokens are counted by a
+    ``_TokenCounter`` registered on the agent's LLM when one is given.
+    """
+
+    name = 'agent'
+
+    def __init__(self, service, token_counter: Optional[_TokenCounter] = None):
+        self.service = service
+        self.token_counter = token_counter
+
+    def run(self, question: str) -> RequestSample:
+        tokens_before = self.token_counter.total_tokens if self.token_counter else 0
+        start_time = time.perf_counter()
+        result = self.service.invoke({"message": question})
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        # AgentService reports failures in the result instead of raising
+        if result.get('error'):
+            raise RuntimeError(result['error'])
+        metrics = result.get('metrics', {})
+        tokens = metrics.get('token_usage', {}).get('total_tokens', 0)
+        if self.token_counter:
+            tokens = tokens or self.token_counter.total_tokens - tokens_before
+        return RequestSample(
+            question=question,
+            latency_ms=latency_ms,
+            tool_usage=dict(metrics.get('tool_usage', {})),
+            tokens=tokens,
+        )
+
+
+def run_benchmark(
+    questions: List[str],
+    targets: List[Any],
+    repeat: int = 1,
+    record_to=None
+) -> Dict[str, BenchmarkResult]:
+    """
+    Run every question through every target.
+
+    Targets are interleaved per question so slow drift on the host affects
+    all implementations equally.
+
+    Args:
+        questions: Questions to replay
+        targets: Objects with a ``name`` and a ``run(question)`` method
+        repeat: Number of passes over the corpus
+        record_to: Optional MetricsService; receives a ``track_comparison``
+            call per question when both 'rag' and 'agent' targets succeed
+
+    Returns:
+        Dictionary mapping target name to its BenchmarkResult
+    """
+    results = {target.name: BenchmarkResult(name=target.name) for target in targets}
+
+    for _ in range(repeat):
+        for question in questions:
+            samples = {}
+            for target in targets:
+                try:
+                    sample = target.run(question)
+                except Exception as e:
+                    logger.error(f"{target.name} failed on {question!r}: {str(e)}")
+                    sample = RequestSample(question=question, latency_ms=0.0, error=str(e))
+                results[target.name].samples.append(sample)
+                samples[target.name] = sample
+
+            rag, agent = samples.get('rag'), samples.get('agent')
+            if record_to is not None and rag and agent and not (rag.error or agent.error):
+                record_to.track_comparison(
+                    rag.latency_ms / 1000, agent.latency_ms / 1000,
+                    rag.tool_usage, agent.tool_usage
+                )
+
+    return results
+
+
+def build_report(results: Dict[str, BenchmarkResult], settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build a JSON-serialisable report, with a comparison section for rag vs agent."""
+    report = {
+        'settings': settings or {},
+        'implementations': {name: result.summary() for name, result in results.items()},
+    }
+
+    if 'rag' in report['implementations'] and 'agent' in report['implementations']:
+        rag = report['implementations']['rag']
+        agent = report['implementations']['agent']
+
+        def ratio(a: float, b: float) -> Optional[float]:
+            return a / b if b else None
+
+        report['comparison'] = {
+            'latency_ms': {
+                key: {
+                    'delta': agent['latency_ms'][key] - rag['latency_ms'][key],
+                    'ratio': ratio(agent['latency_ms'][key], rag['latency_ms'][key]),
+                }
+                for key in ['mean'] + [f'p{pct}' for pct in PERCENTILES]
+            },
+            'tool_calls_mean': {
+                'delta': agent['tool_calls']['mean'] - rag['tool_calls']['mean'],
+                'ratio': ratio(agent['tool_calls']['mean'], rag['tool_calls']['mean']),
+            },
+            'tokens_mean': {
+                'delta': agent['tokens']['mean'] - rag['tokens']['mean'],
+                'ratio': ratio(agent['tokens']['mean'], rag['tokens']['mean']),
+            },
+        }
+
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a markdown table."""
+    names = list(report['implementations'])
+    rows = [('requests', lambda s: str(s['requests'])),
+            ('errors', lambda s: str(s['errors']))]
+    for key in ['mean', 'p50', 'p90', 'p95', 'p99', 'min', 'max']:
+        rows.append((f'latency {key} (ms)', lambda s, key=key: f"{s['latency_ms'][key]:.1f}"))
+    rows.append(('tool calls / request', lambda s: f"{s['tool_calls']['mean']:.2f}"))
+    rows.append(('tokens / request', lambda s: f"{s['tokens']['mean']:.0f}"))
+
+    lines = [
+        '| metric | ' + ' | '.join(names) + ' |',
+        '|---' * (len(names) + 1) + '|',
+    ]
+    for label, render in rows:
+        cells = [render(report['implementations'][name]) for name in names]
+        lines.append(f'| {label} | ' + ' | '.join(cells) + ' |')
+
+    lines.append('')
+    lines.append('Tool calls by tool:')
+    for name in names:
+        by_tool = report['implementations'][name]['tool_calls']['by_tool']
+        lines.append(f'- {name}: ' + (', '.join(f'{k}={v}' for k, v in by_tool.items()) or 'none'))
+
+    comparison = report.get('comparison')
+    if comparison:
+        lines.append('')
+        mean = comparison['latency_ms']['mean']
+        p95 = comparison['latency_ms']['p95']
+        lines.append(f"agent vs rag: mean latency {mean['delta']:+.1f} ms"
+                     + (f" (x{mean['ratio']:.2f})" if mean['ratio'] else '')
+                     + f", p95 {p95['delta']:+.1f} ms"
+                     + f", tokens/request {comparison['tokens_mean']['delta']:+.0f}")
+
+    return '\n'.join(lines)
+
+
+def build_targets(
+    corpus: Dict[str, Any],
+    llm_latency: float = 0.0,
+    retriever_latency: float = 0.0,
+    jitter: float = 0.0,
+    agent_service=None
+) -> List[Any]:
+    """
+    Build the RAG and agent targets against the local fakes.
+
+    Args:
+        agent_service: Object to benchmark as the agent (default: the real
+            ``AgentService``, loaded by ``load_agent_service``)
+    """
+    llm = FakeChatModel(latency=llm_latency, jitter=jitter)
+    retriever = FakeRetriever.from_corpus(corpus, latency=retriever_latency, jitter=jitter)
+
+    token_counter = None
+    if agent_service is None:
+        from .stubbed_agent import load_agent_service
+        token_counter = _TokenCounter()
+        agent_llm = FakeChatModel(latency=llm_latency, jitter=jitter, callbacks=[token_counter])
+        agent_service = load_agent_service(agent_llm, retriever)
+    return [
+        RagChainTarget(build_rag_chain(retriever=retriever, llm=llm)),
+        AgentTarget(agent_service, token_counter),
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark the RAG chain against the agent")
+    parser.add_argument('--corpus', help="Path to a corpus JSON file")
+    parser.add_argument('--llm-latency', type=float, default=0.05, help="Seconds per LLM call")
+    parser.add_argument('--retriever-latency', type=float, default=0.02, help="Seconds per retrieval")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Max extra seconds of deterministic jitter")
+    parser.add_argument('--repeat', type=int, default=1, help="Passes over the corpus")
+    parser.add_argument('--output', help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    settings = {
+        'llm_latency': args.llm_latency,
+        'retriever_latency': args.retriever_latency,
+        'jitter': args.jitter,
+        'repeat': args.repeat,
+        'questions': len(corpus['questions']),
+    }
+    targets = build_targets(corpus, args.llm_latency, args.retriever_latency, args.jitter)
+
+    results = run_benchmark(corpus['questions'], targets, repeat=args.repeat)
+    report = build_report(results, settings)
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Stubbed Agent Loader
+
+Builds the real ``AgentService`` with its external services replaced at
+import time, so the benchmark measures the agent's own orchestration (the
+LangChain executor, tools, memory and usage tracking) offline:
+- ``ChatOpenAI`` (the Groq-hosted LLM) returns the given chat model
+- Pinecone returns a vector store over the given retriever
+- The HuggingFace embeddings are replaced by ``FakeEmbeddings``
+- Google search returns no results
+- tiktoken encodings, which are downloaded on first use, count words
+
+The application's Python dependencies must be installed; no network access
+or API keys are needed. Run from ``back/`` so the ``service`` package imports
+the same way as in the app.
+"""
+
+import importlib
+import os
+import sys
+from contextlib import ExitStack, contextmanager
+from typing import Any, Optional
+from unittest import mock
+
+from .fakes import FakeChatModel, FakeEmbeddings, FakeEncoding, FakeRetriever, FakeVectorStore
+
+# Modules that bind the stubbed names at import time
+_AGENT_MODULES = (
+    'service.agent_service', 'service.article_service', 'service.conversation_summarizer',
+    'service.recommendation_service',
+)
+
+
+@contextmanager
+def stubbed_externals(llm: FakeChatModel, retriever: FakeRetriever, embeddings: Optional[Any] = None):
+    """
+    Patch the agent's external services for the duration of the block.
+
+    Modules that bind the stubbed names at import time must be imported
+    inside the block.
+    """
+    embeddings = embeddings or FakeEmbeddings()
+    vector_store = FakeVectorStore(retriever)
+
+    def chat_model(*args, **kwargs):
+        return llm
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(os.environ, {
+            'PINECONE_API_KEY': os.environ.get('PINECONE_API_KEY') or 'benchmark',
+            'OPENAI_API_KEY': os.environ.get('OPENAI_API_KEY') or 'benchmark',
+        }))
+        stack.enter_context(mock.patch('langchain_openai.ChatOpenAI', chat_model))
+        stack.enter_context(mock.patch('pinecone.grpc.PineconeGRPC', mock.MagicMock()))
+        stack.enter_context(mock.patch(
+            'langchain_pinecone.PineconeVectorStore.from_existing_index', lambda *args, **kwargs: vector_store
+        ))
+        stack.enter_context(mock.patch('service.helper.get_shared_embeddings', lambda: embeddings))
+        stack.enter_context(mock.patch('service.helper.download_hugging_face_embeddings', lambda: embeddings))
+        stack.enter_context(mock.patch('service.google_search.execute_google_search', lambda *args, **kwargs: []))
+        stack.enter_context(mock.patch('tiktoken.encoding_for_model', lambda *args, **kwargs: FakeEncoding()))
+        yield
+
+
+def load_agent_service(
+    llm: FakeChatModel,
+    retriever: FakeRetriever,
+    embeddings: Optional[Any] = None,
+    user_id: str = 'benchmark'
+):
+    """
+    Import ``service.agent_service`` with stubbed externals and build an
+    ``AgentService`` for ``user_id``.
+
+    Raises:
+        RuntimeError: If the agent module was already imported with the real
+            services bound
+    """
+    loaded = [name for name in _AGENT_MODULES if name in sys.modules]
+    if loaded:
+        raise RuntimeError(f"Load the stubbed agent before importing {', '.join(loaded)}")
+
+    with stubbed_externals(llm, retriever, embeddings):
+        module = importlib.import_module('service.agent_service')
+        return module.AgentService(user_id=user_id)
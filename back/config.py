@@ -22,6 +22,9 @@ class Config:
     }
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Redis (task queue and shared caches)
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 3600))  # 1 hour
@@ -40,6 +43,31 @@ class Config:
     APP_URL = os.getenv('APP_URL', 'http://localhost:3000')
     DEBUG = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
     TESTING = False
+    
+    # Article discovery
+    ARTICLE_DISCOVERY_INTERVAL_HOURS = float(os.getenv('ARTICLE_DISCOVERY_INTERVAL_HOURS', 6))  # 0 disables
+    ARTICLE_DISCOVERY_USE_RQ = os.getenv('ARTICLE_DISCOVERY_USE_RQ', 'false').lower() == 'true'
+    ARTICLE_DISCOVERY_QUERIES = [q.strip() for q in os.getenv('ARTICLE_DISCOVERY_QUERIES', 'Ayurveda').split(',') if q.strip()]
+    
+    # Article view/like/share counters (write-behind)
+    ARTICLE_COUNTERS_FLUSH_SECONDS = float(os.getenv('ARTICLE_COUNTERS_FLUSH_SECONDS', 5))
+    ARTICLE_COUNTERS_USE_REDIS = os.getenv('ARTICLE_COUNTERS_USE_REDIS', 'false').lower() == 'true'
+    
+    # Article search: rank only the newest N matches of a query; 0 ranks them all
+    ARTICLE_SEARCH_CANDIDATES = int(os.getenv('ARTICLE_SEARCH_CANDIDATES', 0))
+    
+    # User preference/interaction snapshots for recommendations
+    USER_PROFILE_CACHE_TTL = float(os.getenv('USER_PROFILE_CACHE_TTL', 60))  # 0 disables
+    USER_PROFILE_CACHE_USE_REDIS = os.getenv('USER_PROFILE_CACHE_USE_REDIS', 'false').lower() == 'true'
+    
+    # Weather lookups shared by users in the same city
+    WEATHER_CACHE_TTL = float(os.getenv('WEATHER_CACHE_TTL', 600))  # 0 disables
+    WEATHER_CACHE_STALE_TTL = float(os.getenv('WEATHER_CACHE_STALE_TTL', 3600))  # served while refreshing
+    WEATHER_CACHE_USE_REDIS = os.getenv('WEATHER_CACHE_USE_REDIS', 'false').lower() == 'true'
+    
+    # Profiling
+    PROFILER_CONTINUOUS = os.getenv('PROFILER_CONTINUOUS', 'false').lower() == 'true'
+    PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', 0.1))  # seconds between samples
 
 
 class DevelopmentConfig(Config):
@@ -52,6 +80,10 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_BINDS = {
+        'users': 'sqlite:///:memory:',
+        'articles': 'sqlite:///:memory:'
+    }
     WTF_CSRF_ENABLED = False
 
 
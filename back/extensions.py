@@ -77,7 +77,7 @@ def init_extensions(app):
     limiter.init_app(app)
     
     # Setup user_loader
-    from .models.user import User
+    from models.user import User
     
     @login_manager.user_loader
     def load_user(user_id):
@@ -31,6 +31,46 @@ def init_db():
         db.create_all()
         print("Database initialized successfully.")
 
+@manager.option('--full', dest='full', action='store_true', help='Rebuild the whole index')
+def rebuild_search_index(full=False):
+    """Index articles missing from the full-text search index."""
+    import sqlite3
+    from service.article_store import ArticleStore
+    db_path = os.path.join(os.path.dirname(__file__), 'data', 'ayurveda.db')
+    store = ArticleStore(sqlite3.connect(db_path))
+    count = store.rebuild_search_index(full=full)
+    print(f"Indexed {count} articles.")
+
+@manager.option('--full', dest='full', action='store_true', help='Recompute every neighbor list')
+def refresh_related_articles(full=False):
+    """Embed new articles and update the precomputed related-article lists."""
+    import sqlite3
+    from service.article_neighbors import ArticleNeighborIndex
+    from service.helper import download_hugging_face_embeddings
+    db_path = os.path.join(os.path.dirname(__file__), 'data', 'ayurveda.db')
+    index = ArticleNeighborIndex(sqlite3.connect(db_path), download_hugging_face_embeddings().embed_documents)
+    result = index.refresh(full=full)
+    print(f"Embedded {result['embedded']} articles, updated {result['updated']} neighbor lists.")
+
+@manager.command
+def materialize_recommendations():
+    """Precompute recommendations for every dosha/season/time/weather cell."""
+    from service.recommendation_grid import RecommendationGrid
+    from service.recommendation_service import get_recommendation_service
+    db_path = os.path.join(os.path.dirname(__file__), 'data', 'ayurveda.db')
+    count = RecommendationGrid(db_path).build(get_recommendation_service())
+    print(f"Materialized recommendations for {count} cells.")
+
+@manager.command
+def build_collaborative_filter():
+    """Recompute collaborative-filtering candidates from logged interactions."""
+    from service.collaborative_filter import CollaborativeStore, read_interactions
+    from service.database import user_engine
+    db_path = os.path.join(os.path.dirname(__file__), 'data', 'ayurveda.db')
+    with user_engine.connect() as connection:
+        model = CollaborativeStore(db_path).rebuild(read_interactions(connection))
+    print(f"Built candidates for {len(model.candidates)} users over {len(model.items)} items.")
+
 @manager.command
 def dev():
     """Run the development server with Socket.IO."""
@@ -10,7 +10,7 @@ from flask import current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 import jwt
-from ..extensions import db
+from extensions import db
 
 # Import models to avoid circular imports
 # from .health_profile import HealthProfile  # Uncomment when HealthProfile is implemented
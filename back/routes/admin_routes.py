@@ -0,0 +1,111 @@
+"""
+Admin Routes
+
+This module handles admin-only operational endpoints including:
+- On-demand CPU profile capture of the live process
+- Aggregated stacks from the always-on sampler
+"""
+
+from datetime import datetime
+from flask import Blueprint, request, jsonify, Response
+from service.profiler import (
+    capture, continuous_profiler, to_collapsed,
+    ProfilerBusyError, DEFAULT_INTERVAL, MAX_CAPTURE_SECONDS
+)
+from utils.tokens import admin_required
+from functools import wraps
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Create a blueprint for admin routes (mounted at /api/admin)
+admin_bp = Blueprint('admin', __name__)
+
+def handle_errors(f):
+    """Decorator to handle errors in API endpoints."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Error in {f.__name__}: {str(e)}", exc_info=True)
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 500
+    return wrapper
+
+def _collapsed_response(counter, prefix):
+    """Return aggregated stacks as a downloadable collapsed-stack file."""
+    filename = f"{prefix}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.collapsed"
+    return Response(
+        to_collapsed(counter),
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@admin_bp.route('/profile', methods=['POST'])
+@admin_required
+@handle_errors
+def capture_profile():
+    """
+    Sample the running process for N seconds and return the stacks.
+
+    Request Body:
+        {
+            "seconds": 10,          // default 10, max MAX_CAPTURE_SECONDS
+            "interval": 0.005,      // seconds between samples
+            "include_idle": false   // keep threads blocked in waits/selects
+        }
+
+    Returns:
+        Collapsed-stack file (feed to flamegraph.pl or speedscope)
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        seconds = float(data.get('seconds', 10))
+        interval = float(data.get('interval', DEFAULT_INTERVAL))
+    except (TypeError, ValueError):
+        return jsonify({
+            'status': 'error',
+            'message': 'seconds and interval must be numbers'
+        }), 400
+
+    if seconds <= 0 or seconds > MAX_CAPTURE_SECONDS:
+        return jsonify({
+            'status': 'error',
+            'message': f'seconds must be between 0 and {MAX_CAPTURE_SECONDS}'
+        }), 400
+
+    try:
+        counter, passes = capture(seconds, interval, bool(data.get('include_idle', False)))
+    except ProfilerBusyError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 409
+
+    logger.info(f"Profile captured by user {request.user_id}: {seconds}s, {passes} passes")
+    return _collapsed_response(counter, 'profile')
+
+@admin_bp.route('/profile/continuous', methods=['GET'])
+@admin_required
+@handle_errors
+def get_continuous_profile():
+    """
+    Get aggregated stacks from the always-on sampler.
+
+    Query Parameters:
+        minutes: Window to aggregate (default: everything kept, up to 60)
+
+    Returns:
+        Collapsed-stack file, or 404 if the sampler is not running
+    """
+    if not continuous_profiler.running and not continuous_profiler.buckets:
+        return jsonify({
+            'status': 'error',
+            'message': 'Continuous profiler is not enabled (set PROFILER_CONTINUOUS=true)'
+        }), 404
+
+    minutes = request.args.get('minutes', type=int)
+    return _collapsed_response(continuous_profiler.snapshot(minutes), 'continuous')
@@ -3,52 +3,75 @@ Article Routes
 
 This module defines the API endpoints for article management and discovery.
 """
-from flask import Blueprint, jsonify, request
-from service.article_service import ArticleManager, ArticleAgent
+from flask import Blueprint, current_app, jsonify, request, url_for
+from service.article_ingestion import article_ingestion
+from service.article_store import ArticleStore, LISTING_SORT_KEYS
+from service.article_neighbors import ArticleNeighborIndex
+from service.sqlite_pool import SQLitePool
+from service.article_counters import article_counters
 import os
-import sqlite3
 
 # Initialize Blueprint
 article_bp = Blueprint('articles', __name__)
 
-# Initialize database connection
-def get_db_connection():
-    """Create and return a database connection."""
-    db_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'ayurveda.db')
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    return sqlite3.connect(db_path)
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ayurveda.db')
 
-# Initialize services
-def get_article_manager():
-    """Initialize and return the article manager."""
-    conn = get_db_connection()
-    return ArticleManager(conn)
+def _setup_schema(conn):
+    """Create the article tables once, when the pool opens its first connection."""
+    ArticleStore(conn)
+    ArticleNeighborIndex(conn)
 
-def get_article_agent():
-    """Initialize and return the article agent."""
-    return ArticleAgent(get_article_manager())
+# Shared connections for the listing endpoints; no DDL runs per request
+os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+db_pool = SQLitePool(DB_PATH, setup=_setup_schema)
+
+def _related_articles(conn, article_id, limit):
+    """Embedding neighbors of an article, or its keyword matches if it isn't embedded yet."""
+    articles = ArticleNeighborIndex(conn, setup=False).related(article_id, limit=limit)
+    if not articles:
+        articles = ArticleStore(conn, setup=False).related_articles(article_id, limit=limit)
+    return articles
 
 # Routes
-@article_bp.route('/api/articles/discover', methods=['GET'])
+@article_bp.route('/api/articles/discover', methods=['GET', 'POST'])
 def discover_articles():
     """
-    Discover new articles from various sources.
+    Enqueue a background job that discovers new articles.
+    
+    Discovery runs on the scheduler/worker; poll the returned status URL.
     
     Query Parameters:
         query (str): Search query (default: 'Ayurveda')
-        limit (int): Maximum number of articles to return (default: 10)
     """
     try:
         query = request.args.get('query', 'Ayurveda')
-        limit = int(request.args.get('limit', 10))
+        job = article_ingestion.enqueue(query)
         
-        agent = get_article_agent()
-        articles = agent.discover_articles(query)[:limit]
+        return jsonify({
+            'success': True,
+            'job': job,
+            'status_url': url_for('articles.discovery_status', job_id=job['id'])
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@article_bp.route('/api/articles/discover/<job_id>', methods=['GET'])
+def discovery_status(job_id):
+    """Get the status of an article discovery job."""
+    try:
+        job = article_ingestion.get_job(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
         
         return jsonify({
             'success': True,
-            'count': len(articles),
-            'articles': articles
+            'job': job
         })
     except Exception as e:
         return jsonify({
@@ -61,50 +84,90 @@ def get_articles():
     """
     Get published articles with optional filtering.
     
+    Listings sorted by ``published_at`` or ``id`` are paginated with
+    ``cursor``: pass the ``next_cursor`` of one page to get the next. Every
+    page costs the same, however deep.
+    
     Query Parameters:
         limit (int): Maximum number of articles to return (default: 10)
-        offset (int): Number of articles to skip (default: 0)
+        cursor (str): ``next_cursor`` from the previous page
+        offset (int): Number of articles to skip (default: 0); slower on deep
+            pages, prefer ``cursor``
         sort (str): Sort field (default: 'published_at')
         order (str): Sort order ('asc' or 'desc', default: 'desc')
+        search (str): Full-text query; results are ranked by relevance and
+            include a highlighted ``snippet``. ``word*`` matches prefixes
+        prefix (bool): Treat the last search word as a prefix (default: false)
+    
+    Search ranks every match and ``total`` counts them all, unless the
+    ARTICLE_SEARCH_CANDIDATES setting is N > 0: then only the newest N
+    matches are ranked and paged, and ``total`` stops at N.
     """
     try:
         limit = int(request.args.get('limit', 10))
         offset = int(request.args.get('offset', 0))
-        sort = request.args.get('sort', 'published_at')
-        order = 'DESC' if request.args.get('order', 'desc').lower() == 'desc' else 'ASC'
-        
-        # Validate sort field to prevent SQL injection
-        valid_sort_fields = ['id', 'title', 'source', 'published_at', 'created_at', 'view_count']
-        sort = sort if sort in valid_sort_fields else 'published_at'
-        
-        manager = get_article_manager()
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get total count
-        cursor.execute('SELECT COUNT(*) FROM articles WHERE is_published = 1')
-        total = cursor.fetchone()[0]
-        
-        # Get paginated articles
-        query = f'''
-            SELECT a.*, am.view_count, am.share_count, am.like_count
-            FROM articles a
-            LEFT JOIN article_metrics am ON a.id = am.article_id
-            WHERE a.is_published = 1
-            ORDER BY {sort} {order}
-            LIMIT ? OFFSET ?
-        '''
-        
-        cursor.execute(query, (limit, offset))
-        columns = [column[0] for column in cursor.description]
-        articles = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        cursor = request.args.get('cursor')
+        search = request.args.get('search', '').strip()
         
-        return jsonify({
-            'success': True,
-            'count': len(articles),
-            'total': total,
-            'articles': articles
-        })
+        with db_pool.connection() as conn:
+            store = ArticleStore(conn, setup=False)
+            
+            if search:
+                prefix = request.args.get('prefix', 'false').lower() == 'true'
+                candidates = current_app.config.get('ARTICLE_SEARCH_CANDIDATES') or None
+                articles = article_counters.merge(store.search(
+                    search, limit=limit, offset=offset, prefix=prefix, candidates=candidates
+                ))
+                return jsonify({
+                    'success': True,
+                    'count': len(articles),
+                    'total': store.count(search, prefix=prefix, cap=candidates),
+                    'articles': articles
+                })
+            
+            sort = request.args.get('sort', 'published_at')
+            order = 'DESC' if request.args.get('order', 'desc').lower() == 'desc' else 'ASC'
+            
+            # Validate sort field to prevent SQL injection
+            valid_sort_fields = ['id', 'title', 'source', 'published_at', 'created_at', 'view_count']
+            sort = sort if sort in valid_sort_fields else 'published_at'
+            
+            next_cursor = None
+            if sort in LISTING_SORT_KEYS and not offset:
+                try:
+                    articles, next_cursor = store.list_published(
+                        limit, cursor=cursor, sort=sort, descending=order == 'DESC'
+                    )
+                except ValueError as e:
+                    return jsonify({
+                        'success': False,
+                        'error': str(e)
+                    }), 400
+            elif cursor:
+                return jsonify({
+                    'success': False,
+                    'error': f"cursor is only supported when sorting by {', '.join(LISTING_SORT_KEYS)} without offset"
+                }), 400
+            else:
+                cur = conn.execute(f'''
+                    SELECT a.*, am.view_count, am.share_count, am.like_count
+                    FROM articles a
+                    LEFT JOIN article_metrics am ON a.id = am.article_id
+                    WHERE a.is_published = 1
+                    ORDER BY {sort} {order}
+                    LIMIT ? OFFSET ?
+                ''', (limit, offset))
+                columns = [column[0] for column in cur.description]
+                articles = [dict(zip(columns, row)) for row in cur.fetchall()]
+            
+            article_counters.merge(articles)
+            return jsonify({
+                'success': True,
+                'count': len(articles),
+                'total': store.published_count(),
+                'next_cursor': next_cursor,
+                'articles': articles
+            })
         
     except Exception as e:
         return jsonify({
@@ -116,40 +179,29 @@ def get_articles():
 def get_article(article_id):
     """Get a single article by ID."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get article
-        cursor.execute('''
-            SELECT a.*, am.view_count, am.share_count, am.like_count
-            FROM articles a
-            LEFT JOIN article_metrics am ON a.id = am.article_id
-            WHERE a.id = ?
-        ''', (article_id,))
-        
-        article = cursor.fetchone()
-        if not article:
-            return jsonify({
-                'success': False,
-                'error': 'Article not found'
-            }), 404
-        
-        # Convert to dict
-        columns = [column[0] for column in cursor.description]
-        article_dict = dict(zip(columns, article))
-        
-        # Update view count
-        cursor.execute('''
-            INSERT OR IGNORE INTO article_metrics (article_id, view_count, share_count, like_count)
-            VALUES (?, 1, 0, 0)
-            ON CONFLICT(article_id) DO UPDATE 
-            SET view_count = view_count + 1
-        ''', (article_id,))
-        conn.commit()
+        with db_pool.connection() as conn:
+            cursor = conn.execute('''
+                SELECT a.*, am.view_count, am.share_count, am.like_count
+                FROM articles a
+                LEFT JOIN article_metrics am ON a.id = am.article_id
+                WHERE a.id = ?
+            ''', (article_id,))
+            article = cursor.fetchone()
+            if not article:
+                return jsonify({
+                    'success': False,
+                    'error': 'Article not found'
+                }), 404
+            
+            # Convert to dict
+            columns = [column[0] for column in cursor.description]
+            article_dict = dict(zip(columns, article))
+            
+            recommendations = _related_articles(conn, article_id, limit=3)
         
-        # Get recommendations
-        agent = get_article_agent()
-        recommendations = agent.get_article_recommendations(article_id)
+        # Count the view; it is written with the next counter flush
+        article_counters.increment(article_id, 'view_count')
+        article_counters.merge([article_dict] + recommendations)
         
         return jsonify({
             'success': True,
@@ -163,27 +215,48 @@ def get_article(article_id):
             'error': str(e)
         }), 500
 
+@article_bp.route('/api/articles/<int:article_id>/related', methods=['GET'])
+def get_related_articles(article_id):
+    """
+    Get published articles related to an article.
+    
+    Uses the precomputed embedding neighbors, falling back to a full-text
+    keyword match for articles that haven't been embedded yet.
+    
+    Query Parameters:
+        limit (int): Maximum number of articles to return (default: 5)
+    """
+    try:
+        limit = min(int(request.args.get('limit', 5)), 20)
+        
+        with db_pool.connection() as conn:
+            articles = _related_articles(conn, article_id, limit)
+        article_counters.merge(articles)
+        
+        return jsonify({
+            'success': True,
+            'count': len(articles),
+            'articles': articles
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @article_bp.route('/api/articles/<int:article_id>/like', methods=['POST'])
 def like_article(article_id):
     """Increment the like count for an article."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        article_counters.increment(article_id, 'like_count')
         
-        # Update like count
-        cursor.execute('''
-            INSERT OR IGNORE INTO article_metrics (article_id, view_count, share_count, like_count)
-            VALUES (?, 0, 0, 1)
-            ON CONFLICT(article_id) DO UPDATE 
-            SET like_count = like_count + 1
-        ''', (article_id,))
-        
-        # Get updated count
-        cursor.execute('SELECT like_count FROM article_metrics WHERE article_id = ?', (article_id,))
-        result = cursor.fetchone()
-        like_count = result[0] if result else 0
-        
-        conn.commit()
+        # Stored count plus the deltas still waiting for a flush
+        with db_pool.connection() as conn:
+            row = conn.execute(
+                'SELECT like_count FROM article_metrics WHERE article_id = ?', (article_id,)
+            ).fetchone()
+        like_count = (row[0] if row and row[0] else 0) + article_counters.pending(article_id).get('like_count', 0)
         
         return jsonify({
             'success': True,
@@ -200,23 +273,14 @@ def like_article(article_id):
 def share_article(article_id):
     """Increment the share count for an article."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Update share count
-        cursor.execute('''
-            INSERT OR IGNORE INTO article_metrics (article_id, view_count, share_count, like_count)
-            VALUES (?, 0, 1, 0)
-            ON CONFLICT(article_id) DO UPDATE 
-            SET share_count = share_count + 1
-        ''', (article_id,))
-        
-        # Get updated count
-        cursor.execute('SELECT share_count FROM article_metrics WHERE article_id = ?', (article_id,))
-        result = cursor.fetchone()
-        share_count = result[0] if result else 0
-        
-        conn.commit()
+        article_counters.increment(article_id, 'share_count')
+        
+        # Stored count plus the deltas still waiting for a flush
+        with db_pool.connection() as conn:
+            row = conn.execute(
+                'SELECT share_count FROM article_metrics WHERE article_id = ?', (article_id,)
+            ).fetchone()
+        share_count = (row[0] if row and row[0] else 0) + article_counters.pending(article_id).get('share_count', 0)
         
         return jsonify({
             'success': True,
@@ -191,4 +191,21 @@ def get_system_health():
         "api_response_times": metrics_service.system_health["api_response_times"],
         "error_count": metrics_service.system_health["error_count"],
         "uptime": metrics_service.system_health["uptime"]
-    })
\ No newline at end of file
+    })
+
+@metrics_bp.route('/alerts', methods=['GET'])
+def get_alerts():
+    """
+    Get active alerts and recent alert history.
+    
+    Query Parameters:
+        limit: Number of history entries to return (default: 100)
+    
+    Returns:
+        JSON response with active alerts and history
+    """
+    limit = request.args.get('limit', 100, type=int)
+    return jsonify({
+        "active": metrics_service.alert_manager.get_active_alerts(),
+        "history": metrics_service.alert_manager.get_alert_history(limit)
+    })
@@ -4,17 +4,21 @@ Recommendations Routes Module
 This module defines the API endpoints for retrieving Ayurvedic recommendations
 based on user queries or dosha profiles using Pinecone vector similarity search.
 It includes both separate and unified endpoints for recommendations that can
-integrate dosha determination and weather data.
+integrate dosha determination and weather data. Requests without a free-text
+query or health concern are served from the precomputed recommendation grid.
 """
 
 from flask import Blueprint, request, jsonify
-from service.recommendation_service import get_recommendations
+from service.recommendation_service import get_recommendations, get_recommendation_service
 from service.weather_service import get_weather_data, determine_season
 from service.dosha_service import determine_dosha
 
 # Create a Blueprint for recommendations routes
 recommendations_bp = Blueprint('recommendations', __name__)
 
+# Maximum number of requests accepted by the batch endpoint
+MAX_BATCH_SIZE = 50
+
 
 @recommendations_bp.route('/api/recommendations', methods=['GET'])
 def get_ayurvedic_recommendations():
@@ -244,3 +248,71 @@ def get_unified_recommendations():
             'error': 'Failed to retrieve unified recommendations',
             'message': str(e)
         }), 500
+
+
+@recommendations_bp.route('/api/recommendations/batch', methods=['POST'])
+def get_batch_recommendations():
+    """
+    Retrieve recommendations for several parameter sets in one call.
+    
+    The query texts of the whole batch are embedded together and the vector
+    searches run concurrently, so a batch costs far less than the same number
+    of single requests.
+    
+    Request Body (JSON):
+        requests (list): Up to MAX_BATCH_SIZE objects, each with dosha
+            (required), query, season, time_of_day, health_concern and limit
+            as for GET /api/recommendations
+            
+    Returns:
+        JSON response with one ``recommendations`` list per request, in order
+        
+    The blueprint is mounted at /api/recommendations, so this is served at
+    /api/recommendations/api/recommendations/batch, like the GET routes.
+    
+    Example:
+        POST /api/recommendations/api/recommendations/batch
+        {"requests": [{"dosha": "vata", "query": "sleep"}, {"dosha": "kapha", "season": "winter"}]}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('requests')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'requests must be a non-empty list'}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} requests per batch'}), 400
+        
+        contexts = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get('dosha'):
+                return jsonify({'error': f'requests[{i}]: the dosha parameter is required'}), 400
+            try:
+                limit = int(item.get('limit', 5))
+                if limit < 1:
+                    limit = 5  # Ensure positive value
+            except (ValueError, TypeError):
+                limit = 5  # Default if conversion fails
+            contexts.append({
+                'query': item.get('query', ''),
+                'dosha': item['dosha'],
+                'season': item.get('season', ''),
+                'time_of_day': item.get('time_of_day', ''),
+                'health_concern': item.get('health_concern', ''),
+                'top_k': limit
+            })
+        
+        results = get_recommendation_service().get_many(contexts)
+        
+        return jsonify({
+            'results': [
+                {'recommendations': recommendations, 'query_params': context}
+                for recommendations, context in zip(results, contexts)
+            ]
+        })
+        
+    except Exception as e:
+        # Handle any errors that occur during processing
+        return jsonify({
+            'error': 'Failed to retrieve batch recommendations',
+            'message': str(e)
+        }), 500
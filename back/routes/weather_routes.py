@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from service.weather_service import get_weather_data
+from service.weather_service import get_weather_by_coordinates, get_weather_data
 
 # Create a blueprint for weather routes
 weather_bp = Blueprint('weather', __name__)
@@ -10,8 +10,9 @@ def get_weather():
     Retrieve real-time weather data based on location parameters.
     
     Query Parameters:
-        city (str, required): The name of the city
+        city (str, required unless lat/lon are given): The name of the city
         country (str, optional): The country code (e.g., 'US', 'IN')
+        lat, lon (float, optional): Coordinates, used when no city is given
     
     Returns:
         JSON response with the following structure:
@@ -32,15 +33,21 @@ def get_weather():
     city = request.args.get('city')
     country = request.args.get('country')
     
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    
     # Validate required parameters
-    if not city:
+    if not city and (lat is None or lon is None):
         return jsonify({
             'error': 'Missing required parameter: city'
         }), 400
     
     try:
         # Call the weather service to get weather data
-        weather_data = get_weather_data(city, country)
+        if city:
+            weather_data = get_weather_data(city, country)
+        else:
+            weather_data = get_weather_by_coordinates(lat, lon)
         
         # Return the weather data as JSON
         return jsonify(weather_data), 200
@@ -0,0 +1,459 @@
+"""
+Alert Rule Evaluation Engine
+
+This module evaluates alert rules against rolling metric windows:
+1. Streaming windows that keep running totals and a log-bucketed histogram,
+   updated incrementally as samples arrive and as old buckets expire
+2. Rules such as ``p99(latency) over 5m > 5s`` or
+   ``error_rate(latency) over 1m > 5%``, applied to every matching series
+   (e.g. every endpoint or tool)
+3. Per-series alert state with consecutive-breach hysteresis and dedup, so
+   each alert notifies once when it fires and once when it resolves
+4. Pluggable sinks: any callable taking an alert event dictionary
+
+Evaluation cost is O(rules x series x histogram bins) and independent of the
+number of samples, so running it every 10 seconds is cheap.
+"""
+
+import fnmatch
+import logging
+import math
+import operator
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AlertSink = Callable[[Dict[str, Any]], None]
+
+# Histogram bins grow by 10% from 1 ms, covering values up to about 1000
+HISTOGRAM_MIN = 0.001
+HISTOGRAM_GROWTH = 1.1
+HISTOGRAM_BINS = 146
+
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+
+def _bin_index(value: float) -> int:
+    if value <= HISTOGRAM_MIN:
+        return 0
+    return min(HISTOGRAM_BINS - 1, int(math.log(value / HISTOGRAM_MIN) / _LOG_GROWTH) + 1)
+
+
+def _bin_upper(index: int) -> float:
+    return HISTOGRAM_MIN * HISTOGRAM_GROWTH ** index
+
+
+class RollingWindow:
+    """
+    Sliding window of ``window`` seconds made of ``step``-second buckets.
+
+    Running totals (count, errors, sum and histogram) are adjusted when a
+    sample is added and when a bucket expires, so queries never rescan
+    samples.
+    """
+
+    def __init__(self, window: float, step: float = 10.0):
+        self.window = window
+        self.step = step
+        self.size = max(1, int(math.ceil(window / step)))
+        self._counts = [0] * self.size
+        self._errors = [0] * self.size
+        self._sums = [0.0] * self.size
+        self._hists: List[Dict[int, int]] = [dict() for _ in range(self.size)]
+        self._head = -1
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.histogram = [0] * HISTOGRAM_BINS
+
+    def _expire(self, slot: int) -> None:
+        self.count -= self._counts[slot]
+        self.errors -= self._errors[slot]
+        self.total -= self._sums[slot]
+        for index, n in self._hists[slot].items():
+            self.histogram[index] -= n
+        self._counts[slot] = 0
+        self._errors[slot] = 0
+        self._sums[slot] = 0.0
+        self._hists[slot] = {}
+
+    def advance(self, now: float) -> None:
+        """Expire buckets that have fallen out of the window."""
+        epoch = int(now // self.step)
+        if epoch <= self._head:
+            return
+        if epoch - self._head >= self.size:
+            # Everything currently held is older than the window
+            for slot in range(self.size):
+                self._expire(slot)
+        else:
+            for e in range(self._head + 1, epoch + 1):
+                self._expire(e % self.size)
+        self._head = epoch
+
+    def add(self, value: float, error: bool = False, now: Optional[float] = None) -> None:
+        """Add a sample at ``now``."""
+        now = time.time() if now is None else now
+        self.advance(now)
+        epoch = int(now // self.step)
+        if epoch <= self._head - self.size:
+            return  # Older than the window
+        slot = epoch % self.size
+        index = _bin_index(value)
+
+        self._counts[slot] += 1
+        self._sums[slot] += value
+        self._hists[slot][index] = self._hists[slot].get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.histogram[index] += 1
+        if error:
+            self._errors[slot] += 1
+            self.errors += 1
+
+    def percentile(self, pct: float) -> float:
+        """Approximate percentile (upper edge of the bin holding the rank)."""
+        if self.count <= 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * pct / 100.0)))
+        seen = 0
+        for index, n in enumerate(self.histogram):
+            seen += n
+            if seen >= rank:
+                return _bin_upper(index)
+        return _bin_upper(HISTOGRAM_BINS - 1)
+
+    def aggregate(self, name: str) -> float:
+        """Compute an aggregation over the current window contents."""
+        if name == 'count':
+            return float(self.count)
+        if name == 'rate':
+            return self.count / self.window
+        if name == 'mean':
+            return self.total / self.count if self.count else 0.0
+        if name == 'error_rate':
+            return self.errors / self.count if self.count else 0.0
+        if name == 'error_count':
+            return float(self.errors)
+        if name.startswith('p') and name[1:].replace('.', '', 1).isdigit():
+            return self.percentile(float(name[1:]))
+        raise ValueError(f"Unknown aggregation: {name}")
+
+
+class StreamRegistry:
+    """
+    Named metric series, each with one RollingWindow per registered length.
+
+    Series names are free-form; the convention is ``<metric>:<key>``, for
+    example ``latency:endpoint:/api/general`` or ``latency:tool:weather``.
+    """
+
+    def __init__(self, step: float = 10.0):
+        self.step = step
+        self.window_lengths: set = set()
+        self.series: Dict[str, Dict[float, RollingWindow]] = {}
+        self._lock = threading.Lock()
+
+    def ensure_window(self, seconds: float) -> None:
+        """Make every series (current and future) keep a window of this length."""
+        with self._lock:
+            if seconds in self.window_lengths:
+                return
+            self.window_lengths.add(seconds)
+            for windows in self.series.values():
+                windows[seconds] = RollingWindow(seconds, self.step)
+
+    def observe(self, name: str, value: float, error: bool = False, now: Optional[float] = None) -> None:
+        """Add a sample to every window of a series."""
+        now = time.time() if now is None else now
+        with self._lock:
+            windows = self.series.get(name)
+            if windows is None:
+                windows = self.series[name] = {
+                    seconds: RollingWindow(seconds, self.step) for seconds in self.window_lengths
+                }
+            for window in windows.values():
+                window.add(value, error, now)
+
+    def matching(self, pattern: str, seconds: float, now: Optional[float] = None) -> List[Tuple[str, RollingWindow]]:
+        """Get (series name, window) pairs for series matching a glob pattern."""
+        now = time.time() if now is None else now
+        with self._lock:
+            matches = []
+            for name, windows in self.series.items():
+                if fnmatch.fnmatchcase(name, pattern) and seconds in windows:
+                    windows[seconds].advance(now)
+                    matches.append((name, windows[seconds]))
+            return matches
+
+
+_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+_RULE_RE = re.compile(
+    r"^\s*(?P<agg>[a-z_0-9.]+)\((?P<series>[^)]+)\)\s+over\s+(?P<window>\d+(?:\.\d+)?(?:ms|s|m|h))"
+    r"\s*(?P<op>>=|<=|>|<)\s*(?P<value>\d+(?:\.\d+)?)(?P<unit>ms|s|m|h|%)?\s*$"
+)
+
+
+def parse_duration(text: str) -> float:
+    """Parse a duration such as '500ms', '10s', '5m' or '1h' into seconds."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)(ms|s|m|h)", text.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {text}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+@dataclass
+class AlertRule:
+    """
+    A threshold rule over a rolling window.
+
+    The rule fires after ``for_count`` consecutive breaching evaluations and
+    resolves after ``clear_count`` consecutive evaluations on the healthy side
+    of ``clear_threshold`` (defaults to ``threshold``). Windows with fewer
+    than ``min_samples`` samples count as healthy.
+    """
+    name: str
+    series: str
+    aggregation: str
+    window: float
+    op: str
+    threshold: float
+    clear_threshold: Optional[float] = None
+    for_count: int = 1
+    clear_count: int = 1
+    min_samples: int = 1
+    severity: str = 'warning'
+    repeat_interval: Optional[float] = None
+
+    def __post_init__(self):
+        if self.op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {self.op}")
+        if self.clear_threshold is None:
+            self.clear_threshold = self.threshold
+
+    @classmethod
+    def parse(cls, name: str, expression: str, **kwargs) -> 'AlertRule':
+        """
+        Build a rule from an expression like ``p99(latency:*) over 5m > 5s``.
+
+        Values may carry a duration unit (ms, s, m, h) or a percent sign;
+        ``5%`` becomes 0.05.
+        """
+        match = _RULE_RE.match(expression)
+        if not match:
+            raise ValueError(f"Invalid alert rule expression: {expression}")
+        value = float(match.group('value'))
+        unit = match.group('unit')
+        if unit == '%':
+            value /= 100.0
+        elif unit:
+            value *= _DURATION_UNITS[unit]
+        return cls(
+            name=name,
+            series=match.group('series').strip(),
+            aggregation=match.group('agg'),
+            window=parse_duration(match.group('window')),
+            op=match.group('op'),
+            threshold=value,
+            **kwargs
+        )
+
+    def breaches(self, value: float) -> bool:
+        return _OPERATORS[self.op](value, self.threshold)
+
+    def clears(self, value: float) -> bool:
+        return not _OPERATORS[self.op](value, self.clear_threshold)
+
+
+@dataclass
+class _AlertState:
+    breaches: int = 0
+    clears: int = 0
+    firing: bool = False
+    started_at: Optional[float] = None
+    last_notified: Optional[float] = None
+
+
+class AlertEngine:
+    """Evaluates rules over a StreamRegistry and notifies sinks on state changes."""
+
+    def __init__(
+        self,
+        registry: StreamRegistry,
+        rules: Optional[List[AlertRule]] = None,
+        sinks: Optional[List[AlertSink]] = None
+    ):
+        self.registry = registry
+        self.rules: List[AlertRule] = []
+        self.sinks: List[AlertSink] = list(sinks or [])
+        self.collectors: List[Callable[[float], None]] = []
+        self._states: Dict[Tuple[str, str], _AlertState] = {}
+        self._lock = threading.Lock()
+        for rule in rules or []:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: AlertRule) -> None:
+        self.registry.ensure_window(rule.window)
+        self.rules.append(rule)
+
+    def add_sink(self, sink: AlertSink) -> None:
+        self.sinks.append(sink)
+
+    def add_collector(self, collector: Callable[[float], None]) -> None:
+        """Register a callable run before each evaluation (e.g. to sample gauges)."""
+        self.collectors.append(collector)
+
+    def evaluate(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate all rules once.
+
+        Returns:
+            The alert events (fired, resolved or repeated) sent to sinks
+        """
+        now = time.time() if now is None else now
+        for collector in self.collectors:
+            try:
+                collector(now)
+            except Exception as e:
+                logger.error(f"Alert collector failed: {str(e)}")
+
+        events = []
+        with self._lock:
+            for rule in self.rules:
+                for series_name, window in self.registry.matching(rule.series, rule.window, now):
+                    event = self._evaluate_series(rule, series_name, window, now)
+                    if event:
+                        events.append(event)
+
+        for event in events:
+            self._notify(event)
+        return events
+
+    def _evaluate_series(
+        self,
+        rule: AlertRule,
+        series_name: str,
+        window: RollingWindow,
+        now: float
+    ) -> Optional[Dict[str, Any]]:
+        key = (rule.name, series_name)
+        state = self._states.setdefault(key, _AlertState())
+        has_data = window.count >= rule.min_samples
+        value = window.aggregate(rule.aggregation) if has_data else 0.0
+
+        if has_data and rule.breaches(value):
+            state.breaches += 1
+            state.clears = 0
+        elif not has_data or rule.clears(value):
+            state.clears += 1
+            state.breaches = 0
+        else:
+            # Between threshold and clear_threshold: hold the current state
+            state.breaches = 0
+            state.clears = 0
+
+        event_type = None
+        if not state.firing and state.breaches >= rule.for_count:
+            state.firing = True
+            state.started_at = now
+            event_type = 'fired'
+        elif state.firing and state.clears >= rule.clear_count:
+            state.firing = False
+            event_type = 'resolved'
+        elif (state.firing and rule.repeat_interval
+              and now - (state.last_notified or now) >= rule.repeat_interval):
+            event_type = 'repeat'
+
+        if event_type is None:
+            if not state.firing and state.clears and not state.breaches:
+                # Drop idle state so memory follows the number of live series
+                self._states.pop(key, None)
+            return None
+
+        state.last_notified = now
+        event = {
+            'id': f"{rule.name}:{series_name}",
+            'rule': rule.name,
+            'series': series_name,
+            'metric': f"{rule.aggregation}({series_name})",
+            'aggregation': rule.aggregation,
+            'window_seconds': rule.window,
+            'value': value,
+            'threshold': rule.threshold,
+            'severity': rule.severity,
+            'status': 'resolved' if event_type == 'resolved' else 'firing',
+            'type': event_type,
+            'start_time': datetime.utcfromtimestamp(state.started_at).isoformat() if state.started_at else None,
+            'timestamp': datetime.utcfromtimestamp(now).isoformat(),
+        }
+        if event_type == 'resolved':
+            event['duration'] = now - state.started_at
+            self._states.pop(key, None)
+        return event
+
+    def _notify(self, event: Dict[str, Any]) -> None:
+        for sink in self.sinks:
+            try:
+                sink(event)
+            except Exception as e:
+                logger.error(f"Alert sink {sink!r} failed: {str(e)}")
+
+    def get_firing(self) -> List[Tuple[str, str]]:
+        """(rule name, series) pairs currently firing."""
+        with self._lock:
+            return [key for key, state in self._states.items() if state.firing]
+
+    def schedule(self, scheduler, seconds: int = 10, job_id: str = 'alert_evaluation') -> None:
+        """Run ``evaluate`` on an APScheduler instance every ``seconds``."""
+        scheduler.add_job(
+            id=job_id,
+            func=self.evaluate,
+            trigger='interval',
+            seconds=seconds,
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True
+        )
+        logger.info(f"Alert evaluation scheduled every {seconds}s ({len(self.rules)} rules)")
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------
+
+def logging_sink(event: Dict[str, Any]) -> None:
+    """Write alert events to the application log."""
+    level = logging.WARNING if event['status'] == 'firing' else logging.INFO
+    logger.log(
+        level,
+        f"Alert {event['type']}: {event['metric']} over {event['window_seconds']:.0f}s "
+        f"= {event['value']:.4g} (threshold {event['threshold']:.4g}, {event['severity']})"
+    )
+
+
+class WebhookSink:
+    """POSTs alert events as JSON to a URL (e.g. a chat or paging webhook)."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        import requests
+        requests.post(self.url, json=event, timeout=self.timeout)
+
+    def __repr__(self) -> str:
+        return f"WebhookSink({self.url!r})"
@@ -0,0 +1,273 @@
+"""
+Article Counters
+
+Write-behind buffering for article view, like and share counts:
+1. Endpoints add increments to a pending buffer (process memory, or a Redis
+   hash with ``HINCRBY`` when several workers share the counts) instead of
+   updating ``article_metrics`` and committing per click
+2. A background thread flushes the summed deltas every few seconds in a
+   single transaction, so a hot article costs one UPDATE per flush rather
+   than one write lock per request
+3. Reads add the pending deltas to the stored counts, so clients see their
+   own clicks before the flush
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ayurveda.db')
+
+COUNTER_FIELDS = ('view_count', 'like_count', 'share_count')
+
+Deltas = Dict[int, Dict[str, int]]
+
+
+def _merge_into(target: Deltas, deltas: Deltas) -> None:
+    for article_id, fields in deltas.items():
+        entry = target.setdefault(article_id, {})
+        for field, amount in fields.items():
+            entry[field] = entry.get(field, 0) + amount
+
+
+class SQLiteCounterBackend:
+    """Applies summed deltas to ``article_metrics`` in one transaction."""
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+
+    def write(self, deltas: Deltas) -> None:
+        rows = [
+            tuple(fields.get(field, 0) for field in COUNTER_FIELDS) + (article_id,)
+            for article_id, fields in deltas.items()
+        ]
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        try:
+            with conn:
+                # Articles saved by ArticleStore already have a metrics row
+                conn.executemany('''
+                    INSERT INTO article_metrics (article_id)
+                    SELECT ? WHERE NOT EXISTS (SELECT 1 FROM article_metrics WHERE article_id = ?)
+                ''', [(article_id, article_id) for article_id in deltas])
+                conn.executemany('''
+                    UPDATE article_metrics
+                    SET view_count = IFNULL(view_count, 0) + ?,
+                        like_count = IFNULL(like_count, 0) + ?,
+                        share_count = IFNULL(share_count, 0) + ?
+                    WHERE article_id = ?
+                ''', rows)
+        finally:
+            conn.close()
+
+
+class MemoryCounterBuffer:
+    """Pending deltas in process memory."""
+
+    def __init__(self):
+        self._pending: Deltas = {}
+        self._in_flight: Deltas = {}
+        self._lock = threading.Lock()
+
+    def increment(self, article_id: int, field: str, amount: int = 1) -> None:
+        with self._lock:
+            entry = self._pending.setdefault(article_id, {})
+            entry[field] = entry.get(field, 0) + amount
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def take(self) -> Deltas:
+        """Move pending deltas to in-flight; they stay visible to reads until acknowledged."""
+        with self._lock:
+            _merge_into(self._in_flight, self._pending)
+            self._pending = {}
+            return {article_id: dict(fields) for article_id, fields in self._in_flight.items()}
+
+    def acknowledge(self, deltas: Deltas) -> None:
+        with self._lock:
+            self._in_flight = {}
+
+    def restore(self, deltas: Deltas) -> None:
+        """Keep in-flight deltas for the next flush after a failed write."""
+
+    def pending(self, article_ids: Iterable[int]) -> Deltas:
+        result = {}
+        with self._lock:
+            for article_id in article_ids:
+                merged: Dict[str, int] = {}
+                for source in (self._pending, self._in_flight):
+                    for field, amount in source.get(article_id, {}).items():
+                        merged[field] = merged.get(field, 0) + amount
+                if merged:
+                    result[article_id] = merged
+        return result
+
+
+class RedisCounterBuffer:
+    """
+    Pending deltas in a Redis hash shared by all workers.
+
+    Fields are ``"<article_id>:<counter>"``. A flush renames the hash to a
+    key private to the flusher, so concurrent flushes never apply the same
+    deltas twice; a failed write adds them back with ``HINCRBY``.
+    """
+
+    def __init__(self, redis_client, key: str = 'article_counters:pending'):
+        self.redis = redis_client
+        self.key = key
+        self._taken_key: Optional[str] = None
+
+    def increment(self, article_id: int, field: str, amount: int = 1) -> None:
+        self.redis.hincrby(self.key, f"{article_id}:{field}", amount)
+
+    def size(self) -> int:
+        return self.redis.hlen(self.key)
+
+    def take(self) -> Deltas:
+        from redis.exceptions import ResponseError
+
+        taken_key = f"{self.key}:flushing:{uuid.uuid4().hex}"
+        try:
+            self.redis.rename(self.key, taken_key)
+        except ResponseError:
+            # No such key: nothing is pending
+            return {}
+        deltas: Deltas = defaultdict(dict)
+        for name, value in self.redis.hgetall(taken_key).items():
+            article_id, field = (name.decode() if isinstance(name, bytes) else name).split(':', 1)
+            deltas[int(article_id)][field] = int(value)
+        self._taken_key = taken_key
+        return dict(deltas)
+
+    def acknowledge(self, deltas: Deltas) -> None:
+        self.redis.delete(self._taken_key)
+
+    def restore(self, deltas: Deltas) -> None:
+        pipe = self.redis.pipeline()
+        for article_id, fields in deltas.items():
+            for field, amount in fields.items():
+                pipe.hincrby(self.key, f"{article_id}:{field}", amount)
+        pipe.delete(self._taken_key)
+        pipe.execute()
+
+    def pending(self, article_ids: Iterable[int]) -> Deltas:
+        article_ids = list(article_ids)
+        names = [f"{article_id}:{field}" for article_id in article_ids for field in COUNTER_FIELDS]
+        if not names:
+            return {}
+        values = self.redis.hmget(self.key, names)
+        result: Deltas = {}
+        for name, value in zip(names, values):
+            if value is not None:
+                article_id, field = name.split(':', 1)
+                result.setdefault(int(article_id), {})[field] = int(value)
+        return result
+
+
+class ArticleCounters:
+    """
+    Buffers counter increments and flushes them to the database in batches.
+
+    A flush runs every ``flush_interval`` seconds from a background thread,
+    and early when more than ``max_pending`` articles have pending deltas.
+    Deltas still pending at interpreter exit are flushed.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, buffer=None, backend=None,
+                 flush_interval: float = 5.0, max_pending: int = 10000):
+        self.backend = backend or (SQLiteCounterBackend(db_path) if db_path else None)
+        self.buffer = buffer or MemoryCounterBuffer()
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def init_app(self, db_path: Optional[str] = None, redis_client=None,
+                 flush_interval: Optional[float] = None) -> None:
+        """
+        Configure the database and, optionally, a shared Redis buffer.
+
+        Args:
+            db_path: SQLite database holding ``article_metrics``
+            redis_client: Buffer increments in Redis instead of process memory
+            flush_interval: Seconds between flushes
+        """
+        self.flush()
+        if db_path:
+            self.backend = SQLiteCounterBackend(db_path)
+        if redis_client is not None:
+            self.buffer = RedisCounterBuffer(redis_client)
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+
+    def increment(self, article_id: int, field: str, amount: int = 1) -> None:
+        """Add ``amount`` to an article's counter (one of ``COUNTER_FIELDS``)."""
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter: {field}")
+        self.buffer.increment(article_id, field, amount)
+        self._ensure_thread()
+        if isinstance(self.buffer, MemoryCounterBuffer) and self.buffer.size() > self.max_pending:
+            self.flush()
+
+    def pending(self, article_id: int) -> Dict[str, int]:
+        """Deltas not yet written for one article."""
+        return self.buffer.pending([article_id]).get(article_id, {})
+
+    def merge(self, articles: List[Dict]) -> List[Dict]:
+        """Add pending deltas to the counters of article rows (in place)."""
+        deltas = self.buffer.pending([article['id'] for article in articles if article.get('id') is not None])
+        for article in articles:
+            for field, amount in deltas.get(article.get('id'), {}).items():
+                article[field] = (article.get(field) or 0) + amount
+        return articles
+
+    def flush(self) -> int:
+        """Write pending deltas. Returns the number of articles updated."""
+        if self.backend is None:
+            return 0
+        with self._flush_lock:
+            deltas = self.buffer.take()
+            if not deltas:
+                return 0
+            try:
+                self.backend.write(deltas)
+            except Exception as e:
+                logger.error(f"Could not write counters for {len(deltas)} articles: {str(e)}")
+                self.buffer.restore(deltas)
+                return 0
+            self.buffer.acknowledge(deltas)
+            return len(deltas)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None or not self.flush_interval:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='article-counters', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background thread and flush remaining deltas."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+article_counters = ArticleCounters(DEFAULT_DB_PATH)
@@ -0,0 +1,402 @@
+"""
+Article Discovery Crawler
+
+This module fetches article sources concurrently for ``ArticleAgent``:
+1. One pooled aiohttp session per run (keep-alive, DNS cache)
+2. Bounded global concurrency and per-host concurrency with a minimum delay
+   between requests to the same host
+3. Conditional GETs using cached ETag/Last-Modified validators
+4. Retries with exponential backoff on timeouts, 429 and 5xx responses
+
+Pages are read up to a byte cap and their main text is extracted off the
+event loop (see ``html_extractor``). Page parsing helpers are shared with the
+synchronous ``ArticleFetcher``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .html_extractor import MAX_PAGE_BYTES, CHUNK_SIZE, decode_body, extract_main_text, is_html
+
+logger = logging.getLogger(__name__)
+
+NEWS_API_URL = 'https://newsapi.org/v2/everything'
+GOOGLE_SEARCH_URL = 'https://www.googleapis.com/customsearch/v1'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+GOOGLE_PAGE_SIZE = 10  # Custom Search API maximum per request
+
+
+# ---------------------------------------------------------------------------
+# Parsing helpers
+# ---------------------------------------------------------------------------
+
+def parse_newsapi_articles(data: Dict[str, Any], query: str, language: str = 'en') -> List[Dict]:
+    """Convert a NewsAPI ``everything`` response into article dictionaries."""
+    articles = []
+    for article in data.get('articles', []):
+        articles.append({
+            'title': (article.get('title') or '').strip(),
+            'url': article.get('url', ''),
+            'source': ((article.get('source') or {}).get('name') or 'Unknown').strip(),
+            'published_at': article.get('publishedAt', ''),
+            'description': (article.get('description') or '').strip(),
+            'content': (article.get('content') or '').strip(),
+            'image_url': article.get('urlToImage', ''),
+            'author': (article.get('author') or '').strip(),
+            'source_type': 'news_api',
+            'language': language,
+            'metadata': {
+                'query_used': query,
+                'retrieved_at': datetime.utcnow().isoformat()
+            }
+        })
+    return articles
+
+
+def parse_search_item(item: Dict[str, Any], content: str) -> Dict:
+    """Convert a Google Custom Search result plus scraped content into an article."""
+    images = item.get('pagemap', {}).get('cse_image')
+    return {
+        'title': item.get('title', ''),
+        'url': item.get('link', ''),
+        'source': item.get('displayLink', 'Unknown'),
+        'published_at': item.get('snippet', ''),
+        'description': item.get('snippet', ''),
+        'content': content,
+        'image_url': images[0].get('src', '') if images else ''
+    }
+
+
+# ---------------------------------------------------------------------------
+# Crawler
+# ---------------------------------------------------------------------------
+
+@dataclass
+class FetchResult:
+    """Outcome of a single fetch."""
+    url: str
+    status: int
+    text: str = ''
+    from_cache: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and (200 <= self.status < 300 or self.from_cache)
+
+
+class ValidatorCache:
+    """LRU cache of response validators (ETag/Last-Modified) and bodies."""
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+
+    def get(self, url: str) -> Optional[Dict[str, str]]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], text: str) -> None:
+        if not etag and not last_modified:
+            return
+        self._entries[url] = {'etag': etag, 'last_modified': last_modified, 'text': text}
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ArticleCrawler:
+    """
+    Async HTTP client for article discovery.
+
+    Use as an async context manager so the pooled session is closed:
+
+        async with ArticleCrawler() as crawler:
+            articles = await crawler.discover('Ayurveda')
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        per_host_concurrency: int = 4,
+        host_delay: float = 0.0,
+        timeout: float = 15.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        cache: Optional[ValidatorCache] = None,
+        news_api_url: str = NEWS_API_URL,
+        search_url: str = GOOGLE_SEARCH_URL,
+        news_api_key: Optional[str] = None,
+        search_api_key: Optional[str] = None,
+        search_engine_id: Optional[str] = None,
+        max_page_bytes: int = MAX_PAGE_BYTES
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.host_delay = host_delay
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache if cache is not None else ValidatorCache()
+        self.news_api_url = news_api_url
+        self.search_url = search_url
+        self.news_api_key = news_api_key or os.getenv('NEWS_API_KEY', 'your_newsapi_key')
+        self.search_api_key = search_api_key or os.getenv('GOOGLE_SEARCH_API_KEY', 'your_google_search_key')
+        self.search_engine_id = search_engine_id or os.getenv('SEARCH_ENGINE_ID', 'your_search_engine_id')
+        self.max_page_bytes = max_page_bytes
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._global = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._host_next: Dict[str, float] = {}
+
+    async def __aenter__(self) -> 'ArticleCrawler':
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_concurrency,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={'User-Agent': USER_AGENT}
+        )
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _polite(self, host: str) -> None:
+        """Wait until ``host_delay`` has passed since the last request to host."""
+        if not self.host_delay:
+            return
+        now = time.monotonic()
+        start = max(now, self._host_next.get(host, now))
+        self._host_next[host] = start + self.host_delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 30.0)
+            except ValueError:
+                pass
+        # Exponential backoff with jitter
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    @staticmethod
+    async def _read_capped(response: aiohttp.ClientResponse, max_bytes: int) -> str:
+        """Read at most ``max_bytes`` of the body; the rest is never downloaded."""
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                logger.debug(f"Truncated {response.url} at {max_bytes} bytes")
+                break
+        return decode_body(b''.join(chunks)[:max_bytes], response.charset)
+
+    async def fetch(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        conditional: bool = True,
+        max_bytes: Optional[int] = None
+    ) -> FetchResult:
+        """
+        GET a URL with concurrency limits, conditional headers and retries.
+
+        Args:
+            url: URL to fetch
+            params: Optional query parameters
+            conditional: Send cached ETag/Last-Modified validators
+            max_bytes: Read at most this much of the body, and only for HTML
+                responses (pages); None reads the whole body (API responses)
+
+        Returns:
+            FetchResult (errors are reported in ``error`` rather than raised)
+        """
+        if self.session is None:
+            raise RuntimeError("ArticleCrawler must be used as an async context manager")
+
+        host = urlparse(url).netloc
+        host_limit = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        cache_key = url if not params else f"{url}?{sorted(params.items())}"
+        cached = self.cache.get(cache_key) if conditional else None
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        last_error = None
+        status = 0
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            # Take the host slot first so a busy host does not hold global slots
+            async with host_limit, self._global:
+                await self._polite(host)
+                try:
+                    async with self.session.get(url, params=params, headers=headers) as response:
+                        status = response.status
+                        if status == 304 and cached:
+                            return FetchResult(url, status, cached['text'], from_cache=True)
+                        if status not in RETRY_STATUSES:
+                            if max_bytes is None:
+                                text = await response.text(errors='replace')
+                            elif status < 400 and not is_html(response.headers.get('Content-Type')):
+                                return FetchResult(url, status, error=f"Not HTML: {response.headers['Content-Type']}")
+                            else:
+                                text = await self._read_capped(response, max_bytes)
+                            if status >= 400:
+                                return FetchResult(url, status, error=f"HTTP {status}")
+                            if conditional:
+                                self.cache.put(
+                                    cache_key,
+                                    response.headers.get('ETag'),
+                                    response.headers.get('Last-Modified'),
+                                    text
+                                )
+                            return FetchResult(url, status, text)
+                        retry_after = response.headers.get('Retry-After')
+                        last_error = f"HTTP {status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    last_error = str(e) or e.__class__.__name__
+
+            if attempt < self.retries:
+                delay = self._retry_delay(attempt, retry_after)
+                logger.debug(f"Retrying {url} in {delay:.2f}s ({last_error})")
+                await asyncio.sleep(delay)
+
+        logger.warning(f"Giving up on {url}: {last_error}")
+        return FetchResult(url, status, error=last_error)
+
+    async def scrape(self, url: str) -> str:
+        """Fetch a page and extract its main text ('' on failure)."""
+        result = await self.fetch(url, max_bytes=self.max_page_bytes)
+        if not result.ok:
+            return ''
+        try:
+            # Parsing is CPU-bound; keep the event loop free for other fetches
+            return await asyncio.to_thread(extract_main_text, result.text)
+        except Exception as e:
+            logger.error(f"Error parsing {url}: {str(e)}")
+            return ''
+
+    async def _fetch_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self.fetch(url, params=params, conditional=False)
+        if not result.ok:
+            logger.error(f"Error fetching {url}: {result.error}")
+            return {}
+        try:
+            return json.loads(result.text)
+        except ValueError as e:
+            logger.error(f"Invalid JSON from {url}: {str(e)}")
+            return {}
+
+    async def fetch_newsapi(self, query: str, language: str = 'en', page_size: int = 10) -> List[Dict]:
+        """Fetch articles from NewsAPI."""
+        from_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        data = await self._fetch_json(self.news_api_url, {
+            'q': query,
+            'language': language,
+            'sortBy': 'publishedAt',
+            'apiKey': self.news_api_key,
+            'pageSize': min(page_size, 100),
+            'from': from_date,
+            'excludeDomains': 'youtube.com,vimeo.com'
+        })
+        return parse_newsapi_articles(data, query, language)
+
+    async def google_search(
+        self,
+        query: str,
+        num_results: int = 5,
+        skip: Optional[Callable[[str], bool]] = None
+    ) -> List[Dict]:
+        """Search Google and scrape every result page concurrently.
+
+        Results whose URL satisfies ``skip`` are dropped before scraping.
+        """
+        pages = await asyncio.gather(*[
+            self._fetch_json(self.search_url, {
+                'q': query,
+                'key': self.search_api_key,
+                'cx': self.search_engine_id,
+                'num': min(GOOGLE_PAGE_SIZE, num_results - start),
+                'start': start + 1,
+                'lr': 'lang_en',
+                'cr': 'countryIN',
+                'gl': 'in',
+                'dateRestrict': 'm1'
+            })
+            for start in range(0, num_results, GOOGLE_PAGE_SIZE)
+        ])
+        items = [
+            item for page in pages for item in page.get('items', [])
+            if item.get('link') and not (skip and skip(item['link']))
+        ]
+        contents = await asyncio.gather(*[self.scrape(item['link']) for item in items])
+        return [parse_search_item(item, content) for item, content in zip(items, contents)]
+
+    async def discover(
+        self,
+        query: str = 'Ayurveda',
+        news_results: int = 10,
+        search_results: int = 10,
+        skip: Optional[Callable[[str], bool]] = None
+    ) -> List[Dict]:
+        """Fetch NewsAPI and search results (with scraped pages) concurrently.
+
+        Args:
+            query: Search query
+            news_results: Number of NewsAPI articles to request
+            search_results: Number of search results to scrape
+            skip: Optional predicate on URLs already fetched by earlier runs
+        """
+        news, search = await asyncio.gather(
+            self.fetch_newsapi(query, page_size=news_results),
+            self.google_search(f"{query} site:.in OR site:.com", num_results=search_results, skip=skip)
+        )
+        if skip:
+            news = [article for article in news if not skip(article['url'])]
+        return news + search
+
+
+def discover_articles(
+    query: str = 'Ayurveda',
+    cache: Optional[ValidatorCache] = None,
+    skip: Optional[Callable[[str], bool]] = None,
+    search_results: int = 10,
+    **kwargs
+) -> List[Dict]:
+    """Synchronous entry point that runs one discovery crawl."""
+    async def run():
+        async with ArticleCrawler(cache=cache, **kwargs) as crawler:
+            return await crawler.discover(query, search_results=search_results, skip=skip)
+    return asyncio.run(run())
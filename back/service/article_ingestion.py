@@ -0,0 +1,338 @@
+"""
+Article Ingestion Jobs
+
+This module runs article discovery (fetch -> scrape -> filter -> save) as a
+background job instead of inside an HTTP request:
+1. Jobs are recorded in SQLite so any process (web tier, APScheduler thread,
+   RQ worker) can report their status
+2. URLs already fetched are remembered, so repeated runs only scrape new pages
+3. Jobs run on the application's APScheduler instance, or on the RQ queue
+   when one is configured, plus an optional periodic discovery schedule
+
+The web tier only enqueues and looks up status; it never waits on
+third-party sites.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .article_crawler import ValidatorCache, discover_articles
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ayurveda.db')
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_FINISHED = 'finished'
+JOB_FAILED = 'failed'
+
+# Pending jobs older than this no longer block new jobs for the same query
+STALE_JOB_AFTER = timedelta(hours=1)
+
+
+class IngestionStore:
+    """SQLite-backed job status and fetched-URL state."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                    id TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    discovered INTEGER DEFAULT 0,
+                    saved INTEGER DEFAULT 0,
+                    skipped INTEGER DEFAULT 0,
+                    article_ids TEXT,
+                    error TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS fetched_urls (
+                    url TEXT PRIMARY KEY,
+                    article_id INTEGER,
+                    first_fetched TEXT NOT NULL,
+                    last_job_id TEXT
+                )
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create_job(self, query: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Create a queued job, or return the queued/running job for the same query.
+
+        Returns:
+            Tuple of (job, created)
+        """
+        with self._connect() as conn:
+            existing = conn.execute(
+                'SELECT * FROM ingestion_jobs WHERE query = ? AND status IN (?, ?) AND created_at > ? '
+                'ORDER BY created_at DESC LIMIT 1',
+                (query, JOB_QUEUED, JOB_RUNNING, (datetime.utcnow() - STALE_JOB_AFTER).isoformat())
+            ).fetchone()
+            if existing:
+                return self._row_to_job(existing), False
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                'INSERT INTO ingestion_jobs (id, query, status, created_at) VALUES (?, ?, ?, ?)',
+                (job_id, query, JOB_QUEUED, datetime.utcnow().isoformat())
+            )
+        return self.get_job(job_id), True
+
+    def update_job(self, job_id: str, **fields) -> None:
+        if 'article_ids' in fields:
+            fields['article_ids'] = ','.join(str(i) for i in fields['article_ids'])
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f'UPDATE ingestion_jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM ingestion_jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def recent_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT * FROM ingestion_jobs ORDER BY created_at DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['article_ids'] = [int(i) for i in job['article_ids'].split(',') if i] if job['article_ids'] else []
+        return job
+
+    def known_urls(self) -> set:
+        """All URLs fetched by earlier jobs."""
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute('SELECT url FROM fetched_urls')}
+
+    def mark_fetched(self, job_id: str, articles: List[Dict[str, Any]]) -> None:
+        now = datetime.utcnow().isoformat()
+        with self._connect() as conn:
+            conn.executemany('''
+                INSERT INTO fetched_urls (url, article_id, first_fetched, last_job_id)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    article_id = COALESCE(excluded.article_id, fetched_urls.article_id),
+                    last_job_id = excluded.last_job_id
+            ''', [(a['url'], a.get('id'), now, job_id) for a in articles if a.get('url')])
+
+
+class DefaultPipeline:
+    """Filters and saves articles with ArticleProcessor/ArticleManager.
+
+    The manager (embeddings model, vector store, DB connection) is built once
+    per worker process rather than per request.
+    """
+
+    _lock = threading.Lock()
+    _save_lock = threading.Lock()
+    _manager = None
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+
+    def _get_manager(self):
+        with self._lock:
+            if DefaultPipeline._manager is None:
+                from .article_service import ArticleManager
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                DefaultPipeline._manager = ArticleManager(conn)
+            return DefaultPipeline._manager
+
+    def is_relevant(self, article: Dict[str, Any]) -> bool:
+        from .article_service import ArticleProcessor
+        return ArticleProcessor.is_ayurveda_related(article)
+
+    def save(self, article: Dict[str, Any]) -> Optional[int]:
+        return self.save_many([article])[0]
+
+    def save_many(self, articles: List[Dict[str, Any]]) -> List[Optional[int]]:
+        manager = self._get_manager()
+        # The shared connection is used by one job thread at a time
+        with self._save_lock:
+            return manager.save_articles(articles)
+
+    def index_related(self) -> None:
+        """Embed new articles and merge them into the related-article lists."""
+        manager = self._get_manager()
+        with self._save_lock:
+            manager.neighbors.refresh()
+
+
+# Validators are reused across runs in the same process
+_crawl_cache = ValidatorCache()
+
+
+def run_ingestion_job(
+    job_id: str,
+    db_path: str = DEFAULT_DB_PATH,
+    pipeline=None,
+    crawl: Callable[..., List[Dict]] = discover_articles,
+    search_results: int = 10,
+    **crawler_kwargs
+) -> Dict[str, Any]:
+    """
+    Run one discovery job. Importable by RQ workers.
+
+    Args:
+        job_id: ID of a job created with IngestionStore.create_job
+        db_path: SQLite database holding jobs and articles
+        pipeline: Object with ``is_relevant(article)`` and ``save(article)``,
+            and optionally a batched ``save_many(articles)`` and
+            ``index_related()`` to run after new articles are saved
+        crawl: Discovery function (defaults to the async crawler)
+        search_results: Number of search results to scrape
+        **crawler_kwargs: Extra ArticleCrawler options
+
+    Returns:
+        The finished job record
+    """
+    store = IngestionStore(db_path)
+    job = store.get_job(job_id)
+    if job is None:
+        raise ValueError(f"Unknown ingestion job: {job_id}")
+
+    pipeline = pipeline or DefaultPipeline(db_path)
+    store.update_job(job_id, status=JOB_RUNNING, started_at=datetime.utcnow().isoformat())
+
+    try:
+        known = store.known_urls()
+        articles = crawl(
+            job['query'],
+            cache=_crawl_cache,
+            skip=known.__contains__,
+            search_results=search_results,
+            **crawler_kwargs
+        )
+
+        relevant = [article for article in articles if pipeline.is_relevant(article)]
+        skipped = len(articles) - len(relevant)
+        if hasattr(pipeline, 'save_many'):
+            article_ids = pipeline.save_many(relevant)
+        else:
+            article_ids = [pipeline.save(article) for article in relevant]
+
+        saved_ids = []
+        for article, article_id in zip(relevant, article_ids):
+            if article_id:
+                article['id'] = article_id
+                saved_ids.append(article_id)
+
+        store.mark_fetched(job_id, articles)
+        if saved_ids and hasattr(pipeline, 'index_related'):
+            try:
+                pipeline.index_related()
+            except Exception as e:
+                # Articles are saved; related lists catch up on the next refresh
+                logger.warning(f"Related-article refresh failed for job {job_id}: {str(e)}")
+        store.update_job(
+            job_id,
+            status=JOB_FINISHED,
+            finished_at=datetime.utcnow().isoformat(),
+            discovered=len(articles),
+            saved=len(saved_ids),
+            skipped=skipped,
+            article_ids=saved_ids
+        )
+        logger.info(f"Ingestion job {job_id} ('{job['query']}'): {len(articles)} new, {len(saved_ids)} saved")
+
+    except Exception as e:
+        logger.error(f"Ingestion job {job_id} failed: {str(e)}", exc_info=True)
+        store.update_job(job_id, status=JOB_FAILED, finished_at=datetime.utcnow().isoformat(), error=str(e))
+
+    return store.get_job(job_id)
+
+
+class ArticleIngestionService:
+    """Enqueues discovery jobs and reports their status."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._store = None
+        self.scheduler = None
+        self.queue = None
+
+    @property
+    def store(self) -> IngestionStore:
+        if self._store is None:
+            self._store = IngestionStore(self.db_path)
+        return self._store
+
+    def init_app(self, scheduler=None, queue=None, interval_hours: Optional[float] = None,
+                 queries: Optional[List[str]] = None) -> None:
+        """
+        Attach the executors and optionally schedule periodic discovery.
+
+        Args:
+            scheduler: APScheduler instance used to run jobs
+            queue: Optional RQ queue; preferred over the scheduler when set
+            interval_hours: Run discovery for ``queries`` every N hours
+            queries: Queries for periodic discovery (default: ['Ayurveda'])
+        """
+        self.scheduler = scheduler
+        self.queue = queue
+        if scheduler is not None and interval_hours:
+            for query in queries or ['Ayurveda']:
+                scheduler.add_job(
+                    id=f"article_discovery:{query}",
+                    func=self.enqueue,
+                    args=[query],
+                    trigger='interval',
+                    hours=interval_hours,
+                    replace_existing=True
+                )
+            logger.info(f"Article discovery scheduled every {interval_hours}h")
+
+    def enqueue(self, query: str = 'Ayurveda') -> Dict[str, Any]:
+        """Create a job (or reuse the pending one for the query) and dispatch it."""
+        job, created = self.store.create_job(query)
+        if not created:
+            return job
+
+        if self.queue is not None:
+            self.queue.enqueue(run_ingestion_job, job['id'], self.db_path, job_timeout=900)
+        elif self.scheduler is not None:
+            self.scheduler.add_job(
+                id=f"article_ingestion:{job['id']}",
+                func=run_ingestion_job,
+                args=[job['id'], self.db_path],
+                trigger='date',
+                run_date=datetime.now(),
+                replace_existing=True
+            )
+        else:
+            # No executor configured: run on a daemon thread
+            threading.Thread(
+                target=run_ingestion_job, args=(job['id'], self.db_path), daemon=True
+            ).start()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get_job(job_id)
+
+    def recent_jobs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.store.recent_jobs(limit)
+
+
+# Shared instance used by the routes and create_app
+article_ingestion = ArticleIngestionService()
@@ -0,0 +1,240 @@
+"""
+Related Articles
+
+This module precomputes related-article lists from content embeddings:
+1. Each article is embedded once (title, description and the start of the
+   content) with the shared MiniLM model and stored as a float32 blob
+2. The top-N nearest neighbors by cosine similarity are computed with NumPy
+   matrix multiplies over blocks of articles
+3. New articles get their own list and are merged into existing lists they
+   rank in, so a refresh after ingestion doesn't recompute everything
+
+Serving related articles is then a single indexed lookup on
+``article_neighbors``.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Characters of content included in the embedded text
+EMBED_CONTENT_CHARS = 2000
+
+
+class ArticleNeighborIndex:
+    """Stores article embeddings and their precomputed nearest neighbors."""
+
+    def __init__(
+        self,
+        db: sqlite3.Connection,
+        embed_documents: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+        top_n: int = 20,
+        block_size: int = 1024,
+        embed_batch_size: int = 64,
+        setup: bool = True
+    ):
+        """
+        Args:
+            db: Connection to the articles database
+            embed_documents: Batch embedding function, e.g. the shared
+                HuggingFaceEmbeddings ``embed_documents``; only needed to refresh
+            top_n: Neighbors stored per article (lookups filter unpublished ones)
+            block_size: Articles per similarity block; bounds memory to
+                ``block_size * article_count`` floats
+            embed_batch_size: Articles per embedding call
+            setup: Create the tables (False on request paths)
+        """
+        self.db = db
+        self.embed_documents = embed_documents
+        self.top_n = top_n
+        self.block_size = block_size
+        self.embed_batch_size = embed_batch_size
+        if setup:
+            self.setup_database()
+
+    def setup_database(self) -> None:
+        """Initialize the embedding and neighbor tables if they don't exist."""
+        cursor = self.db.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_embeddings (
+                article_id INTEGER PRIMARY KEY,
+                vector BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_neighbors (
+                article_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                neighbor_id INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (article_id, rank)
+            ) WITHOUT ROWID
+        ''')
+        self.db.commit()
+
+    def related(self, article_id: int, limit: int = 5, published_only: bool = True) -> List[Dict]:
+        """Precomputed related articles, most similar first."""
+        cursor = self.db.execute(f'''
+            SELECT a.*, am.view_count, am.share_count, am.like_count, n.score AS similarity
+            FROM article_neighbors n
+            JOIN articles a ON a.id = n.neighbor_id
+            LEFT JOIN article_metrics am ON a.id = am.article_id
+            WHERE n.article_id = ? {'AND a.is_published = 1' if published_only else ''}
+            ORDER BY n.rank
+            LIMIT ?
+        ''', (article_id, limit))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def embed_pending(self) -> List[int]:
+        """
+        Embed articles that don't have an embedding yet.
+
+        Returns:
+            IDs of the newly embedded articles
+        """
+        if self.embed_documents is None:
+            raise ValueError("ArticleNeighborIndex needs embed_documents to embed articles")
+
+        rows = self.db.execute('''
+            SELECT a.id, a.title, a.description, a.content
+            FROM articles a
+            LEFT JOIN article_embeddings e ON e.article_id = a.id
+            WHERE e.article_id IS NULL
+            ORDER BY a.id
+        ''').fetchall()
+
+        embedded = []
+        for start in range(0, len(rows), self.embed_batch_size):
+            batch = rows[start:start + self.embed_batch_size]
+            texts = [
+                f"{title or ''}\n{description or ''}\n{(content or '')[:EMBED_CONTENT_CHARS]}"
+                for _, title, description, content in batch
+            ]
+            vectors = self._normalize(np.asarray(self.embed_documents(texts), dtype=np.float32))
+            now = datetime.utcnow().isoformat()
+            with self.db:
+                self.db.executemany(
+                    'INSERT OR REPLACE INTO article_embeddings (article_id, vector, created_at) VALUES (?, ?, ?)',
+                    [(row[0], vector.tobytes(), now) for row, vector in zip(batch, vectors)]
+                )
+            embedded.extend(row[0] for row in batch)
+        return embedded
+
+    def refresh(self, full: bool = False) -> Dict[str, int]:
+        """
+        Embed new articles and update neighbor lists.
+
+        Args:
+            full: Recompute every neighbor list instead of merging new articles
+
+        Returns:
+            Counts of embedded articles and rewritten neighbor lists
+        """
+        new_ids = self.embed_pending()
+        ids, vectors = self._load_embeddings()
+        has_lists = self.db.execute('SELECT 1 FROM article_neighbors LIMIT 1').fetchone() is not None
+
+        if full or not has_lists:
+            lists = self._neighbors_for(np.arange(len(ids)), ids, vectors)
+            with self.db:
+                self.db.execute('DELETE FROM article_neighbors')
+                self._write(lists)
+            updated = len(lists)
+        elif new_ids:
+            updated = self._merge_new(set(new_ids), ids, vectors)
+        else:
+            updated = 0
+
+        logger.info(f"Related articles: {len(new_ids)} embedded, {updated} neighbor lists updated")
+        return {'embedded': len(new_ids), 'updated': updated}
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _load_embeddings(self):
+        rows = self.db.execute('''
+            SELECT e.article_id, e.vector FROM article_embeddings e
+            JOIN articles a ON a.id = e.article_id
+            ORDER BY e.article_id
+        ''').fetchall()
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        if not rows:
+            return ids, np.zeros((0, 0), dtype=np.float32)
+        return ids, np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+
+    def _top_k(self, sims: np.ndarray, k: int):
+        """Column indices and scores of the k largest values per row, best first."""
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+    def _neighbors_for(self, rows: np.ndarray, ids: np.ndarray, vectors: np.ndarray) -> Dict[int, list]:
+        """Top-N neighbor lists for the articles at ``rows``, computed block by block."""
+        k = min(self.top_n, len(ids) - 1)
+        lists = {}
+        if k <= 0:
+            return {int(ids[row]): [] for row in rows}
+
+        for start in range(0, len(rows), self.block_size):
+            block = rows[start:start + self.block_size]
+            sims = vectors[block] @ vectors.T
+            sims[np.arange(len(block)), block] = -np.inf  # exclude self
+            columns, scores = self._top_k(sims, k)
+            for row, cols, row_scores in zip(block, columns, scores):
+                lists[int(ids[row])] = [(int(ids[c]), float(s)) for c, s in zip(cols, row_scores)]
+        return lists
+
+    def _merge_new(self, new_ids: set, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """Give new articles their lists and merge them into existing lists they rank in."""
+        is_new = np.isin(ids, list(new_ids))
+        new_rows = np.flatnonzero(is_new)
+        old_rows = np.flatnonzero(~is_new)
+        lists = self._neighbors_for(new_rows, ids, vectors)
+
+        # Current worst score per existing list; shorter lists accept anything
+        floors = dict(self.db.execute('''
+            SELECT article_id, CASE WHEN COUNT(*) < ? THEN -1e9 ELSE MIN(score) END
+            FROM article_neighbors GROUP BY article_id
+        ''', (self.top_n,)).fetchall())
+
+        new_vectors = vectors[new_rows]
+        for start in range(0, len(old_rows), self.block_size):
+            block = old_rows[start:start + self.block_size]
+            sims = vectors[block] @ new_vectors.T
+            block_floors = np.array([floors.get(int(ids[row]), -1e9) for row in block], dtype=np.float32)
+            for i in np.flatnonzero((sims > block_floors[:, None]).any(axis=1)):
+                article_id = int(ids[block[i]])
+                candidates = [(int(ids[new_rows[j]]), float(sims[i, j])) for j in range(len(new_rows))]
+                current = self.db.execute(
+                    'SELECT neighbor_id, score FROM article_neighbors WHERE article_id = ? ORDER BY rank',
+                    (article_id,)
+                ).fetchall()
+                merged = sorted(current + candidates, key=lambda pair: -pair[1])[:self.top_n]
+                lists[article_id] = merged
+
+        with self.db:
+            self._write(lists, replace=True)
+        return len(lists)
+
+    def _write(self, lists: Dict[int, list], replace: bool = False) -> None:
+        if replace:
+            self.db.executemany('DELETE FROM article_neighbors WHERE article_id = ?', [(i,) for i in lists])
+        self.db.executemany(
+            'INSERT INTO article_neighbors (article_id, rank, neighbor_id, score) VALUES (?, ?, ?, ?)',
+            [
+                (article_id, rank, neighbor_id, score)
+                for article_id, neighbors in lists.items()
+                for rank, (neighbor_id, score) in enumerate(neighbors)
+            ]
+        )
@@ -8,18 +8,14 @@ personalized article recommendations based on user context and preferences.
 
 import os
 import json
+import sqlite3
 import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Union
-from bs4 import BeautifulSoup
 import feedparser
 import logging
 from urllib.parse import urlparse, quote_plus
 
-# Database
-from .database import get_session
-from .models import Article, ArticleInteraction, UserPreference
-
 # Vector store
 from pinecone.grpc import PineconeGRPC as Pinecone
 from langchain_pinecone import PineconeVectorStore
@@ -27,6 +23,16 @@ from langchain_pinecone import PineconeVectorStore
 # Embeddings
 from .helper import download_hugging_face_embeddings
 
+# Crawling
+from .article_crawler import (
+    ValidatorCache, discover_articles as crawl_articles,
+    extract_main_text, parse_newsapi_articles, parse_search_item
+)
+from .html_extractor import MAX_PAGE_BYTES, CHUNK_SIZE, decode_body, is_html, read_limited
+from .article_store import ArticleStore
+from .keyword_extractor import extract_keywords
+from .article_neighbors import ArticleNeighborIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,10 +42,17 @@ NEWS_API_KEY = os.getenv('NEWS_API_KEY', 'your_newsapi_key')
 GOOGLE_SEARCH_API_KEY = os.getenv('GOOGLE_SEARCH_API_KEY', 'your_google_search_key')
 SEARCH_ENGINE_ID = os.getenv('SEARCH_ENGINE_ID', 'your_search_engine_id')
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ayurveda.db')
 
 # Initialize Pinecone
 pc = Pinecone(api_key=PINECONE_API_KEY)
 
+# Shared HTTP session so synchronous fetches reuse connections
+http_session = requests.Session()
+
+# ETag/Last-Modified validators kept across discovery runs
+crawl_cache = ValidatorCache()
+
 class ArticleTool:
     """
     Tool for discovering and recommending Ayurveda articles.
@@ -58,7 +71,6 @@ class ArticleTool:
     def __init__(self):
         self.embeddings = download_hugging_face_embeddings()
         self.vector_store = self._init_vector_store()
-        self.session = get_session()
     
     def _init_vector_store(self):
         """Initialize the vector store for article embeddings."""
@@ -138,31 +150,9 @@ class ArticleFetcher:
                 'excludeDomains': 'youtube.com,vimeo.com'  # Exclude video content
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = http_session.get(url, params=params, timeout=15)
             response.raise_for_status()
-            data = response.json()
-            
-            articles = []
-            for article in data.get('articles', []):
-                article_data = {
-                    'title': article.get('title', '').strip(),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', {}).get('name', 'Unknown').strip(),
-                    'published_at': article.get('publishedAt', ''),
-                    'description': article.get('description', '').strip(),
-                    'content': article.get('content', '').strip(),
-                    'image_url': article.get('urlToImage', ''),
-                    'author': article.get('author', '').strip(),
-                    'source_type': 'news_api',
-                    'language': language,
-                    'metadata': {
-                        'query_used': query,
-                        'retrieved_at': datetime.utcnow().isoformat()
-                    }
-                }
-                articles.append(article_data)
-            
-            return articles
+            return parse_newsapi_articles(response.json(), query, language)
             
         except Exception as e:
             logger.error(f"Error fetching from NewsAPI: {str(e)}")
@@ -202,7 +192,7 @@ class ArticleFetcher:
                 'dateRestrict': 'm1'  # Last month
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = http_session.get(url, params=params, timeout=15)
             response.raise_for_status()
             data = response.json()
             
@@ -211,15 +201,7 @@ class ArticleFetcher:
                 try:
                     # Fetch the full article content
                     article_content = ArticleFetcher.scrape_article(item['link'])
-                    articles.append({
-                        'title': item.get('title', ''),
-                        'url': item.get('link', ''),
-                        'source': item.get('displayLink', 'Unknown'),
-                        'published_at': item.get('snippet', ''),
-                        'description': item.get('snippet', ''),
-                        'content': article_content,
-                        'image_url': item.get('pagemap', {}).get('cse_image', [{}])[0].get('src', '') if item.get('pagemap', {}).get('cse_image') else ''
-                    })
+                    articles.append(parse_search_item(item, article_content))
                 except Exception as e:
                     logger.error(f"Error processing search result {item.get('link')}: {str(e)}")
             
@@ -236,27 +218,16 @@ class ArticleFetcher:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'aside']):
-                element.decompose()
-            
-            # Try to find the main content
-            article = soup.find('article')
-            if not article:
-                article = soup.find('div', class_=lambda x: x and 'content' in x.lower())
-            if not article:
-                article = soup.find('main')
-            if not article:
-                article = soup
-            
-            # Get text with proper spacing
-            text = ' '.join(p.get_text(' ', strip=True) for p in article.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li']))
-            return text.strip()
+            # Stream so oversized pages are cut off instead of buffered whole
+            with http_session.get(url, headers=headers, timeout=15, stream=True) as response:
+                response.raise_for_status()
+                if not is_html(response.headers.get('Content-Type')):
+                    logger.info(f"Skipping {url}: not HTML ({response.headers.get('Content-Type')})")
+                    return ''
+                body, truncated = read_limited(response.iter_content(CHUNK_SIZE), MAX_PAGE_BYTES)
+                if truncated:
+                    logger.debug(f"Truncated {url} at {MAX_PAGE_BYTES} bytes")
+                return extract_main_text(decode_body(body, response.encoding))
             
         except Exception as e:
             logger.error(f"Error scraping {url}: {str(e)}")
@@ -267,18 +238,8 @@ class ArticleProcessor:
     
     @staticmethod
     def extract_keywords(text: str, num_keywords: int = 5) -> List[str]:
-        """Extract keywords from text using a simple algorithm."""
-        # In a real implementation, you might want to use NLP libraries like spaCy
-        # or integrate with an external service
-        words = text.lower().split()
-        word_count = {}
-        
-        for word in words:
-            if len(word) > 3:  # Ignore short words
-                word_count[word] = word_count.get(word, 0) + 1
-        
-        # Sort by frequency and get top keywords
-        return sorted(word_count.items(), key=lambda x: x[1], reverse=True)[:num_keywords]
+        """Extract the most frequent non-stopword terms from text."""
+        return extract_keywords(text, num_keywords)
     
     @staticmethod
     def summarize_text(text: str, max_sentences: int = 3) -> str:
@@ -304,10 +265,14 @@ class ArticleManager:
     """Manages the article database and provides article recommendations."""
     
     def __init__(self, db_connection=None):
-        self.db = db_connection or get_session()
+        if db_connection is None:
+            os.makedirs(os.path.dirname(DEFAULT_DB_PATH), exist_ok=True)
+            db_connection = sqlite3.connect(DEFAULT_DB_PATH, check_same_thread=False)
+        self.db = db_connection
         self.embeddings = download_hugging_face_embeddings()
         self.vector_store = self._init_vector_store()
         self.setup_database()
+        self.neighbors = ArticleNeighborIndex(self.db, self.embeddings.embed_documents)
     
     def _init_vector_store(self):
         """Initialize the vector store for article embeddings."""
@@ -333,98 +298,35 @@ class ArticleManager:
     
     def setup_database(self):
         """Initialize the database tables if they don't exist."""
-        cursor = self.db.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS articles (
+        self.store = ArticleStore(self.db)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS article_interactions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                url TEXT UNIQUE NOT NULL,
-                source TEXT,
-                published_at TEXT,
-                description TEXT,
-                content TEXT,
-                image_url TEXT,
-                is_published BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                user_id TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                interaction_type TEXT NOT NULL,
+                metadata TEXT,
+                timestamp TIMESTAMP NOT NULL
             )
         ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS article_keywords (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                article_id INTEGER,
-                keyword TEXT,
-                score REAL,
-                FOREIGN KEY (article_id) REFERENCES articles (id)
-            )
+        self.db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_interactions_user
+            ON article_interactions(user_id, timestamp)
         ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS article_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                article_id INTEGER,
-                view_count INTEGER DEFAULT 0,
-                share_count INTEGER DEFAULT 0,
-                like_count INTEGER DEFAULT 0,
-                FOREIGN KEY (article_id) REFERENCES articles (id)
-            )
-        ''')
-        
         self.db.commit()
     
     def save_article(self, article: Dict) -> int:
         """Save an article to the database."""
+        return self.save_articles([article])[0]
+    
+    def save_articles(self, articles: List[Dict]) -> List[Optional[int]]:
+        """Save a batch of articles in one transaction; returns IDs in input order."""
         try:
-            cursor = self.db.cursor()
-            
-            # Check if article already exists
-            cursor.execute('SELECT id FROM articles WHERE url = ?', (article['url'],))
-            existing = cursor.fetchone()
-            
-            if existing:
-                return existing[0]
-            
-            # Insert new article
-            cursor.execute('''
-                INSERT INTO articles (
-                    title, url, source, published_at, description, content, image_url
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                article.get('title', ''),
-                article.get('url', ''),
-                article.get('source', 'Unknown'),
-                article.get('published_at', datetime.utcnow().isoformat()),
-                article.get('description', ''),
-                article.get('content', ''),
-                article.get('image_url', '')
-            ))
-            
-            article_id = cursor.lastrowid
-            
-            # Extract and save keywords
-            keywords = ArticleProcessor.extract_keywords(
-                f"{article.get('title', '')} {article.get('description', '')} {article.get('content', '')}"
-            )
-            
-            for keyword, score in keywords:
-                cursor.execute('''
-                    INSERT INTO article_keywords (article_id, keyword, score)
-                    VALUES (?, ?, ?)
-                ''', (article_id, keyword, score))
-            
-            # Initialize metrics
-            cursor.execute('''
-                INSERT INTO article_metrics (article_id) VALUES (?)
-            ''', (article_id,))
-            
-            self.db.commit()
-            return article_id
+            return self.store.save_articles(articles)
             
         except Exception as e:
-            logger.error(f"Error saving article: {str(e)}")
-            self.db.rollback()
-            return None
+            logger.error(f"Error saving articles: {str(e)}")
+            return [None] * len(articles)
     
     def get_recommended_articles(self, limit: int = 5) -> List[Dict]:
         """Get recommended articles for the dashboard."""
@@ -472,7 +374,6 @@ class ArticleAgent:
         self.article_manager = article_manager or ArticleManager()
         self.fetcher = ArticleFetcher()
         self.processor = ArticleProcessor()
-        self.tool = ArticleTool()
     
     def get_article_recommendations(
         self,
@@ -482,35 +383,26 @@ class ArticleAgent:
         user_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Get personalized article recommendations.
+        Get article recommendations for a search query and/or categories.
+        
+        Published articles matching any word of the query or any category
+        are ranked by BM25, so articles matching more of them come first.
+        With neither, the latest published articles are returned.
         
         Args:
             query: Search query
-            categories: List of categories to filter by
+            categories: List of categories (e.g. ['herbs', 'diet'])
             limit: Maximum number of recommendations
-            user_id: Optional user ID for personalization
+            user_id: Optional user ID; not used for ranking yet
             
         Returns:
             List of recommended articles with metadata
         """
         try:
-            # Prepare input for the tool
-            input_data = {
-                'query': query or '',
-                'categories': categories or [],
-                'max_results': limit,
-                'user_id': user_id
-            }
-            
-            # Use the tool to get recommendations
-            result = self.tool._run(json.dumps(input_data))
-            result_data = json.loads(result)
-            
-            if result_data.get('status') == 'success':
-                return result_data.get('articles', [])
-            else:
-                logger.error(f"Error getting recommendations: {result_data.get('message')}")
-                return []
+            text = ' '.join([query or ''] + list(categories or []))
+            if not text.strip():
+                return self.article_manager.get_recommended_articles(limit)
+            return self.article_manager.store.search(text, limit=limit, operator='OR')
                 
         except Exception as e:
             logger.error(f"Error in get_article_recommendations: {e}")
@@ -535,45 +427,40 @@ class ArticleAgent:
         Returns:
             bool: True if the interaction was logged successfully
         """
+        db = self.article_manager.db
         try:
-            interaction = ArticleInteraction(
-                user_id=user_id,
-                article_id=article_id,
-                interaction_type=interaction_type,
-                metadata=metadata or {},
-                timestamp=datetime.utcnow()
-            )
-            
-            self.article_manager.db.add(interaction)
-            self.article_manager.db.commit()
+            db.execute('''
+                INSERT INTO article_interactions
+                (user_id, article_id, interaction_type, metadata, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                str(user_id),
+                int(article_id),
+                interaction_type,
+                json.dumps(metadata or {}),
+                datetime.utcnow().isoformat()
+            ))
+            db.commit()
             return True
             
         except Exception as e:
             logger.error(f"Error logging article interaction: {e}")
-            self.article_manager.db.rollback()
+            db.rollback()
             return False
     
     def discover_articles(self, query: str = 'Ayurveda') -> List[Dict]:
         """Discover new articles from various sources."""
         try:
-            # Fetch from multiple sources
-            articles = []
-            
-            # 1. NewsAPI
-            articles.extend(self.fetcher.fetch_from_newsapi(query))
+            # Fetch NewsAPI and Google results and scrape result pages concurrently
+            articles = crawl_articles(query, cache=crawl_cache)
             
-            # 2. Google Search
-            articles.extend(self.fetcher.google_search(f"{query} site:.in OR site:.com"))
-            
-            # Filter and process articles
+            # Filter, then save the relevant articles in one batch
+            relevant = [a for a in articles if self.processor.is_ayurveda_related(a)]
             processed_articles = []
-            for article in articles:
-                if self.processor.is_ayurveda_related(article):
-                    # Save to database
-                    article_id = self.article_manager.save_article(article)
-                    if article_id:
-                        article['id'] = article_id
-                        processed_articles.append(article)
+            for article, article_id in zip(relevant, self.article_manager.save_articles(relevant)):
+                if article_id:
+                    article['id'] = article_id
+                    processed_articles.append(article)
             
             return processed_articles
             
@@ -598,47 +485,18 @@ class ArticleAgent:
             logger.error(f"Error generating summary for article {article_id}: {str(e)}")
             return ""
     
-    def get_article_recommendations(self, article_id: int, limit: int = 3) -> List[Dict]:
-        """Get recommended articles based on keywords."""
+    def get_related_articles(self, article_id: int, limit: int = 3) -> List[Dict]:
+        """Get related articles, preferring precomputed embedding neighbors."""
         try:
-            cursor = self.article_manager.db.cursor()
-            
-            # Get keywords for the current article
-            cursor.execute('''
-                SELECT keyword, score 
-                FROM article_keywords 
-                WHERE article_id = ?
-                ORDER BY score DESC
-                LIMIT 5
-            ''', (article_id,))
-            
-            keywords = [row[0] for row in cursor.fetchall()]
-            if not keywords:
-                return []
+            related = self.article_manager.neighbors.related(article_id, limit=limit)
+            if related:
+                return related
             
-            # Find similar articles
-            query = '''
-                SELECT DISTINCT a.*, am.view_count
-                FROM articles a
-                JOIN article_keywords ak ON a.id = ak.article_id
-                LEFT JOIN article_metrics am ON a.id = am.article_id
-                WHERE a.id != ? 
-                AND a.is_published = 1
-                AND ak.keyword IN ({})
-                ORDER BY am.view_count DESC
-                LIMIT ?
-            '''.format(','.join(['?'] * len(keywords)))
-            
-            cursor.execute(
-                query, 
-                [article_id] + keywords + [limit]
-            )
-            
-            columns = [column[0] for column in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            # Not embedded yet: full-text match on the article's top keywords
+            return self.article_manager.store.related_articles(article_id, limit=limit)
             
         except Exception as e:
-            logger.error(f"Error getting article recommendations: {str(e)}")
+            logger.error(f"Error getting related articles: {str(e)}")
             return []
 
 # Example usage
@@ -0,0 +1,555 @@
+"""
+Article Store
+
+This module owns the SQLite schema for discovered articles and writes them
+in bulk:
+1. Articles are inserted with multi-row ``INSERT ... ON CONFLICT(url) DO
+   NOTHING RETURNING id``, so existing URLs cost no extra SELECT per article
+2. TF-IDF keyword and metrics rows are written with ``executemany``
+3. Each batch is a single transaction on a WAL-mode database
+4. Near-duplicates (syndicated copies under other URLs) are skipped using a
+   MinHash LSH index before insert
+
+It also maintains ``articles_fts``, an FTS5 index over title, description and
+content that triggers keep in sync with ``articles``, for BM25-ranked search.
+
+Published listings use keyset pagination on ``(published_at, id)`` over a
+partial index, with opaque cursors, so every page costs the same; the total
+is a counter row that triggers update on insert, publish and delete.
+"""
+
+import base64
+import json
+import logging
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .keyword_extractor import KeywordExtractor, tokenize
+from .near_duplicates import NearDuplicateIndex
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_COLUMNS = ('title', 'url', 'source', 'published_at', 'description', 'content', 'image_url')
+
+# Stays well below SQLITE_MAX_VARIABLE_NUMBER for the multi-row INSERT/SELECT
+MAX_ROWS_PER_STATEMENT = 500
+
+# BM25 column weights for (title, description, content)
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0)
+
+_SEARCH_TOKEN = re.compile(r'\w+\*?')
+
+# Keyset sort columns for published listings; NULL dates sort as ''
+LISTING_SORT_KEYS = {
+    'published_at': "IFNULL(a.published_at, '')",
+    'id': 'a.id',
+}
+
+FTS_SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, description, content,
+        content='articles', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts (rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, description, content ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+        INSERT INTO articles_fts (rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    ''',
+]
+
+
+LISTING_SCHEMA = [
+    "CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (IFNULL(published_at, ''), id) WHERE is_published = 1",
+    '''
+    CREATE TABLE IF NOT EXISTS article_counts (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        published INTEGER NOT NULL
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS article_counts_insert AFTER INSERT ON articles
+    WHEN new.is_published = 1 BEGIN
+        UPDATE article_counts SET published = published + 1 WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS article_counts_publish AFTER UPDATE OF is_published ON articles
+    WHEN (old.is_published = 1) != (new.is_published = 1) BEGIN
+        UPDATE article_counts
+        SET published = published + CASE WHEN new.is_published = 1 THEN 1 ELSE -1 END
+        WHERE id = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS article_counts_delete AFTER DELETE ON articles
+    WHEN old.is_published = 1 BEGIN
+        UPDATE article_counts SET published = published - 1 WHERE id = 1;
+    END
+    ''',
+]
+
+
+def encode_cursor(sort: str, key, article_id: int) -> str:
+    """Opaque pagination cursor for the row after which the next page starts."""
+    payload = json.dumps([sort, key, article_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple:
+    """Inverse of ``encode_cursor``; raises ValueError for foreign or malformed cursors."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, key, article_id = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if cursor_sort != sort or not isinstance(article_id, int):
+        raise ValueError(f"Cursor does not match sort '{sort}'")
+    return key, article_id
+
+
+def build_match_query(text: str, prefix: bool = False, operator: str = 'AND') -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word is quoted so FTS5 syntax in user input can't cause errors.
+    Words ending in ``*`` are prefix queries; ``prefix=True`` also treats the
+    last word as a prefix (search-as-you-type).
+
+    Returns:
+        The MATCH expression, or '' if the text has no searchable words
+    """
+    tokens = _SEARCH_TOKEN.findall(text or '')
+    terms = []
+    for i, token in enumerate(tokens):
+        is_prefix = token.endswith('*') or (prefix and i == len(tokens) - 1)
+        word = token.rstrip('*').replace('"', '')
+        terms.append(f'"{word}"' + ('*' if is_prefix else ''))
+    return f' {operator} '.join(terms)
+
+
+def enable_wal(conn: sqlite3.Connection) -> None:
+    """Switch the database to WAL so readers don't block the ingestion writer."""
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ArticleStore:
+    """Schema setup and bulk upserts for the articles tables."""
+
+    def __init__(self, db: sqlite3.Connection, keyword_extractor: Optional[KeywordExtractor] = None,
+                 detect_near_duplicates: bool = True, setup: bool = True):
+        """
+        Args:
+            db: Connection to the articles database
+            keyword_extractor: TF-IDF extractor for saved articles
+            detect_near_duplicates: Skip syndicated copies on save
+            setup: Create the schema; pass False on request paths whose
+                connections were set up when they were opened
+        """
+        self.db = db
+        if setup:
+            enable_wal(db)
+        self.keyword_extractor = keyword_extractor or KeywordExtractor(db, setup=setup)
+        self.near_duplicates = NearDuplicateIndex(db, setup=setup) if detect_near_duplicates else None
+        if setup:
+            self.setup_database()
+
+    def setup_database(self) -> None:
+        """Initialize the database tables if they don't exist."""
+        cursor = self.db.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                url TEXT UNIQUE NOT NULL,
+                source TEXT,
+                published_at TEXT,
+                description TEXT,
+                content TEXT,
+                image_url TEXT,
+                is_published BOOLEAN DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_keywords (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                article_id INTEGER,
+                keyword TEXT,
+                score REAL,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                article_id INTEGER,
+                view_count INTEGER DEFAULT 0,
+                share_count INTEGER DEFAULT 0,
+                like_count INTEGER DEFAULT 0,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_article_keywords_article ON article_keywords (article_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_article_metrics_article ON article_metrics (article_id)')
+
+        # Configure and seed only new tables, so opening an existing
+        # database writes nothing
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        if 'articles_fts' not in existing:
+            cursor.execute(
+                "INSERT INTO articles_fts (articles_fts, rank) VALUES ('rank', ?)",
+                (f"bm25({', '.join(str(w) for w in SEARCH_WEIGHTS)})",)
+            )
+
+        for statement in LISTING_SCHEMA:
+            cursor.execute(statement)
+        if 'article_counts' not in existing:
+            cursor.execute('''
+                INSERT INTO article_counts (id, published)
+                SELECT 1, COUNT(*) FROM articles WHERE is_published = 1
+            ''')
+        if self.db.in_transaction:
+            self.db.commit()
+
+    @staticmethod
+    def _row(article: Dict) -> Tuple:
+        return (
+            article.get('title', ''),
+            article.get('url', ''),
+            article.get('source', 'Unknown'),
+            article.get('published_at', datetime.utcnow().isoformat()),
+            article.get('description', ''),
+            article.get('content', ''),
+            article.get('image_url', '')
+        )
+
+    def save_articles(self, articles: List[Dict]) -> List[Optional[int]]:
+        """
+        Insert a batch of articles in one transaction.
+
+        URLs that already exist are left untouched and their current ID is
+        returned. Near-duplicates of stored articles (or of earlier articles
+        in the batch) are not inserted; their URL is recorded as an alias and
+        the ID of the kept copy is returned. Raises on database errors after
+        rolling the batch back.
+
+        Args:
+            articles: Article dicts with at least a ``url``
+
+        Returns:
+            Article IDs in the same order as ``articles`` (None for entries
+            without a URL)
+        """
+        # Later duplicates within the batch resolve to the first occurrence
+        rows = {}
+        for article in articles:
+            url = article.get('url')
+            if url and url not in rows:
+                rows[url] = self._row(article)
+
+        ids: Dict[str, int] = {}
+        new_ids: Dict[str, int] = {}
+        with self.db:
+            cursor = self.db.cursor()
+            ids.update(self._existing_ids(list(rows)))
+            if self.near_duplicates is not None:
+                ids.update(self.near_duplicates.aliases_for([url for url in rows if url not in ids]))
+
+            candidates = {url: row for url, row in rows.items() if url not in ids}
+            duplicates, signatures, in_batch = {}, {}, {}
+            tokens = {url: tokenize(self._text(row)) for url, row in candidates.items()}
+            if self.near_duplicates is not None:
+                duplicates, signatures, in_batch = self.near_duplicates.deduplicate(tokens)
+
+            to_insert = [row for url, row in candidates.items() if url not in duplicates and url not in in_batch]
+            for chunk in _chunks(to_insert, MAX_ROWS_PER_STATEMENT):
+                placeholders = ', '.join(['(?, ?, ?, ?, ?, ?, ?)'] * len(chunk))
+                cursor.execute(
+                    f"INSERT INTO articles ({', '.join(ARTICLE_COLUMNS)}) VALUES {placeholders} "
+                    "ON CONFLICT(url) DO NOTHING RETURNING id, url",
+                    [value for row in chunk for value in row]
+                )
+                new_ids.update((url, article_id) for article_id, url in cursor.fetchall())
+
+            # Inserted by another writer since the lookup above
+            ids.update(self._existing_ids([row[1] for row in to_insert if row[1] not in new_ids]))
+
+            # TF-IDF keywords for the new articles; also counts them into the DF table
+            keyword_lists = self.keyword_extractor.extract_tokens([tokens[url] for url in new_ids])
+            keyword_rows = [
+                (article_id, keyword, score)
+                for article_id, keywords in zip(new_ids.values(), keyword_lists)
+                for keyword, score in keywords
+            ]
+            cursor.executemany(
+                'INSERT INTO article_keywords (article_id, keyword, score) VALUES (?, ?, ?)', keyword_rows
+            )
+            cursor.executemany(
+                'INSERT INTO article_metrics (article_id) VALUES (?)', [(i,) for i in new_ids.values()]
+            )
+
+            if self.near_duplicates is not None:
+                self.near_duplicates.add(
+                    (new_ids[url], signature) for url, signature in signatures.items() if url in new_ids
+                )
+                duplicates.update(
+                    (url, new_ids[twin]) for url, twin in in_batch.items() if twin in new_ids
+                )
+                self.near_duplicates.add_aliases(duplicates)
+
+        ids.update(new_ids)
+        ids.update(duplicates)
+        logger.debug(
+            f"Saved {len(new_ids)} new articles, skipped {len(duplicates)} near-duplicates "
+            f"({len(ids) - len(new_ids) - len(duplicates)} already stored)"
+        )
+        return [ids.get(article.get('url')) for article in articles]
+
+    def _existing_ids(self, urls: List[str]) -> Dict[str, int]:
+        found = {}
+        for chunk in _chunks(urls, MAX_ROWS_PER_STATEMENT):
+            found.update(
+                (url, article_id) for article_id, url in self.db.execute(
+                    f"SELECT id, url FROM articles WHERE url IN ({', '.join(['?'] * len(chunk))})",
+                    chunk
+                )
+            )
+        return found
+
+    @staticmethod
+    def _text(row: Tuple) -> str:
+        title, _, _, _, description, content, _ = row
+        return f"{title} {description} {content}"
+
+    def save_article(self, article: Dict) -> Optional[int]:
+        """Save a single article; see save_articles."""
+        return self.save_articles([article])[0]
+
+    def published_count(self) -> int:
+        """Number of published articles, read from the trigger-maintained counter."""
+        return self.db.execute('SELECT published FROM article_counts WHERE id = 1').fetchone()[0]
+
+    def list_published(self, limit: int = 10, cursor: Optional[str] = None, sort: str = 'published_at',
+                       descending: bool = True) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of published articles using keyset pagination.
+
+        Each page seeks past the previous page's last ``(sort key, id)`` in
+        the index instead of skipping rows, so deep pages cost the same as
+        the first.
+
+        Args:
+            limit: Page size
+            cursor: ``next_cursor`` of the previous page (None for the first page)
+            sort: A key of ``LISTING_SORT_KEYS``
+            descending: Newest (or highest ID) first
+
+        Returns:
+            Tuple of (article rows with metrics, cursor for the next page or None)
+
+        Raises:
+            ValueError: Unknown sort or a cursor that doesn't belong to it
+        """
+        if sort not in LISTING_SORT_KEYS:
+            raise ValueError(f"Unsupported sort for keyset pagination: {sort}")
+        key = LISTING_SORT_KEYS[sort]
+        direction, comparison = ('DESC', '<') if descending else ('ASC', '>')
+
+        conditions = ['a.is_published = 1']
+        params: List = []
+        if cursor:
+            # Spelled out rather than as a row value so SQLite seeks the index
+            last_key, last_id = decode_cursor(cursor, sort)
+            conditions.append(f'{key} {comparison}= ? AND ({key} {comparison} ? OR a.id {comparison} ?)')
+            params.extend([last_key, last_key, last_id])
+
+        rows = self.db.execute(f'''
+            SELECT a.*, am.view_count, am.share_count, am.like_count, {key} AS _sort_key
+            FROM articles a
+            LEFT JOIN article_metrics am ON a.id = am.article_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {key} {direction}, a.id {direction}
+            LIMIT ?
+        ''', (*params, limit + 1))
+        columns = [column[0] for column in rows.description]
+        articles = [dict(zip(columns, row)) for row in rows.fetchall()]
+
+        next_cursor = None
+        if len(articles) > limit:
+            articles = articles[:limit]
+            next_cursor = encode_cursor(sort, articles[-1]['_sort_key'], articles[-1]['id'])
+        for article in articles:
+            del article['_sort_key']
+        return articles, next_cursor
+
+    def search(self, query: str, limit: int = 10, offset: int = 0,
+               published_only: bool = True, prefix: bool = False,
+               operator: str = 'AND', candidates: Optional[int] = None) -> List[Dict]:
+        """
+        BM25-ranked full-text search over title, description and content.
+
+        Every match is ranked. ``candidates`` opts into ranking only the
+        newest N matching articles (after the published filter), the same set
+        for every page; that keeps terms found in nearly every article fast on
+        large tables, and offsets past it return nothing.
+
+        Args:
+            query: Free-text query; ``word*`` runs a prefix query
+            limit: Maximum number of results
+            offset: Number of results to skip
+            published_only: Only return published articles
+            prefix: Treat the last word as a prefix
+            operator: 'AND' matches articles with every word, 'OR' with any
+            candidates: Rank only the newest N matches (default: all)
+
+        Returns:
+            Article rows with metrics, a ``snippet`` and a ``score`` (lower is better)
+        """
+        match = build_match_query(query, prefix=prefix, operator=operator)
+        if not match:
+            return []
+        return self._match(match, limit, offset, published_only, candidates=candidates)
+
+    def count(self, query: str, published_only: bool = True, prefix: bool = False,
+              operator: str = 'AND', cap: Optional[int] = None) -> int:
+        """Number of articles matching ``query``; counting stops at ``cap`` if given."""
+        match = build_match_query(query, prefix=prefix, operator=operator)
+        if not match:
+            return 0
+        conditions, params = self._filters(match, published_only)
+        cursor = self.db.execute(f'''
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM articles_fts f
+                JOIN articles a ON a.id = f.rowid
+                WHERE {' AND '.join(conditions)}
+                LIMIT ?
+            )
+        ''', (*params, cap if cap else -1))
+        return cursor.fetchone()[0]
+
+    def related_articles(self, article_id: int, limit: int = 3, num_keywords: int = 5) -> List[Dict]:
+        """Published articles matching any of the article's top keywords, best match first."""
+        keywords = [row[0] for row in self.db.execute('''
+            SELECT keyword FROM article_keywords
+            WHERE article_id = ?
+            ORDER BY score DESC
+            LIMIT ?
+        ''', (article_id, num_keywords))]
+        match = build_match_query(' '.join(keywords), operator='OR')
+        if not match:
+            return []
+        return self._match(match, limit, 0, True, exclude_id=article_id)
+
+    @staticmethod
+    def _filters(match: str, published_only: bool, exclude_id: Optional[int] = None) -> Tuple[List[str], List]:
+        """WHERE conditions and parameters over ``articles_fts f`` joined to ``articles a``."""
+        conditions = ['articles_fts MATCH ?']
+        params: List = [match]
+        if published_only:
+            conditions.append('a.is_published = 1')
+        if exclude_id is not None:
+            conditions.append('a.id != ?')
+            params.append(exclude_id)
+        return conditions, params
+
+    def _match(self, match: str, limit: int, offset: int, published_only: bool,
+               exclude_id: Optional[int] = None, candidates: Optional[int] = None) -> List[Dict]:
+        conditions, params = self._filters(match, published_only, exclude_id)
+        if candidates:
+            if offset >= candidates:
+                return []
+            limit = min(limit, candidates - offset)
+
+            # Rowid of the oldest candidate among the filtered matches; FTS5
+            # applies the rowid bound itself
+            floor = self.db.execute(f'''
+                SELECT f.rowid FROM articles_fts f
+                JOIN articles a ON a.id = f.rowid
+                WHERE {' AND '.join(conditions)}
+                ORDER BY f.rowid DESC
+                LIMIT 1 OFFSET ?
+            ''', (*params, candidates - 1)).fetchone()
+            if floor:
+                conditions.append('f.rowid >= ?')
+                params.append(floor[0])
+
+        cursor = self.db.execute(f'''
+            SELECT a.*, am.view_count, am.share_count, am.like_count,
+                   snippet(articles_fts, -1, '<b>', '</b>', '...', 16) AS snippet,
+                   f.rank AS score
+            FROM articles_fts f
+            JOIN articles a ON a.id = f.rowid
+            LEFT JOIN article_metrics am ON a.id = am.article_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY f.rank
+            LIMIT ? OFFSET ?
+        ''', (*params, limit, offset))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def rebuild_search_index(self, full: bool = False, batch_size: int = 5000) -> int:
+        """
+        Bring ``articles_fts`` up to date with ``articles``.
+
+        The incremental mode indexes articles missing from the index (e.g. rows
+        written before the triggers existed) in batches, committing each one so
+        readers aren't blocked. ``full=True`` rebuilds the whole index, which
+        also drops entries for rows deleted outside the triggers.
+
+        Returns:
+            Number of articles indexed
+        """
+        if full:
+            with self.db:
+                self.db.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+                self.db.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+            return self.db.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+        indexed = 0
+        while True:
+            with self.db:
+                cursor = self.db.execute('''
+                    INSERT INTO articles_fts (rowid, title, description, content)
+                    SELECT id, title, description, content FROM articles
+                    WHERE id NOT IN (SELECT id FROM articles_fts_docsize)
+                    ORDER BY id
+                    LIMIT ?
+                ''', (batch_size,))
+            indexed += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+        logger.info(f"Indexed {indexed} articles for full-text search")
+        return indexed
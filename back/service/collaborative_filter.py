@@ -0,0 +1,328 @@
+"""
+Collaborative Filtering
+
+Offline item-item collaborative filtering over logged interactions:
+1. Interactions become a sparse user x item matrix, weighted by type (a
+   save counts more than a view) and damped with log1p
+2. Item-item cosine similarities come from one sparse matrix product; each
+   item keeps its top-N neighbors
+3. Each user's candidates are the neighbors of the items they interacted
+   with, summed and scaled to [0, 1], excluding items already seen
+4. The lists are saved to SQLite and served from memory, so personalizing a
+   request is a dictionary lookup rather than an extra embedding and vector
+   search
+
+Items are recommendation documents, identified by the ``id`` stored in their
+index metadata (or a hash of their content for older entries).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ayurveda.db')
+
+INTERACTION_WEIGHTS = {
+    'view': 1.0,
+    'click': 1.0,
+    'like': 3.0,
+    'save': 4.0,
+    'share': 4.0,
+}
+
+COLLABORATIVE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS cf_items (
+        item_id TEXT PRIMARY KEY,
+        content TEXT NOT NULL,
+        metadata TEXT NOT NULL,
+        neighbors TEXT NOT NULL
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS cf_user_candidates (
+        user_id TEXT PRIMARY KEY,
+        candidates TEXT NOT NULL
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS cf_model (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        built_at TEXT NOT NULL,
+        users INTEGER NOT NULL,
+        items INTEGER NOT NULL
+    );
+'''
+
+# Interactions logged by RecommendationService.log_interaction (UserInteraction)
+INTERACTIONS_QUERY = 'SELECT user_id, content, interaction_type, metadata FROM interactions'
+
+Scored = List[Tuple[str, float]]
+
+
+def interaction_item_id(content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Identity of the document an interaction refers to."""
+    metadata = metadata or {}
+    item_id = metadata.get('id') or metadata.get('doc_id')
+    if item_id:
+        return str(item_id)
+    return hashlib.sha1((content or '').encode('utf-8')).hexdigest()
+
+
+def read_interactions(connection, batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the logged interactions from the user database.
+
+    Args:
+        connection: SQLAlchemy connection to the database holding the
+            ``interactions`` table
+        batch_size: Rows fetched per round trip
+    """
+    result = connection.execution_options(yield_per=batch_size).execute(text(INTERACTIONS_QUERY))
+    for user_id, content, interaction_type, metadata in result:
+        if isinstance(metadata, str):  # JSON columns come back as text from SQLite
+            metadata = json.loads(metadata)
+        yield {
+            'user_id': user_id,
+            'content': content,
+            'interaction_type': interaction_type,
+            'metadata': metadata,
+        }
+
+
+class CollaborativeModel:
+    """Precomputed candidate and neighbor lists held in memory."""
+
+    def __init__(self, candidates: Dict[str, Scored], neighbors: Dict[str, Scored],
+                 items: Dict[str, Tuple[str, Dict[str, Any]]], built_at: Optional[str] = None):
+        self.candidates = candidates
+        self.neighbors = neighbors
+        self.items = items
+        self.built_at = built_at
+
+    def candidates_for(self, user_id: Optional[str], k: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Top-k unseen items for a user as ``(content, metadata, score)``."""
+        if not user_id:
+            return []
+        results = []
+        for item_id, score in self.candidates.get(str(user_id), [])[:k]:
+            content, metadata = self.items[item_id]
+            results.append((content, metadata, score))
+        return results
+
+    def similar_items(self, item_id: str, k: int = 10) -> Scored:
+        return self.neighbors.get(item_id, [])[:k]
+
+    def has_user(self, user_id: Optional[str]) -> bool:
+        return bool(user_id) and str(user_id) in self.candidates
+
+    def save(self, db: sqlite3.Connection) -> None:
+        """Create the tables if needed and replace the stored model in one transaction."""
+        db.executescript(COLLABORATIVE_SCHEMA)
+        with db:
+            db.execute('DELETE FROM cf_items')
+            db.execute('DELETE FROM cf_user_candidates')
+            db.executemany(
+                'INSERT INTO cf_items (item_id, content, metadata, neighbors) VALUES (?, ?, ?, ?)',
+                [
+                    (item_id, content, json.dumps(metadata), json.dumps(self.neighbors.get(item_id, [])))
+                    for item_id, (content, metadata) in self.items.items()
+                ]
+            )
+            db.executemany(
+                'INSERT INTO cf_user_candidates (user_id, candidates) VALUES (?, ?)',
+                [(user_id, json.dumps(candidates)) for user_id, candidates in self.candidates.items()]
+            )
+            db.execute(
+                'INSERT OR REPLACE INTO cf_model (id, built_at, users, items) VALUES (1, ?, ?, ?)',
+                (self.built_at, len(self.candidates), len(self.items))
+            )
+
+    @classmethod
+    def load(cls, db: sqlite3.Connection) -> 'CollaborativeModel':
+        """Read a model stored by ``save``."""
+        row = db.execute('SELECT built_at FROM cf_model WHERE id = 1').fetchone()
+        items, neighbors = {}, {}
+        for item_id, content, metadata, item_neighbors in db.execute(
+            'SELECT item_id, content, metadata, neighbors FROM cf_items'
+        ):
+            items[item_id] = (content, json.loads(metadata))
+            neighbors[item_id] = [tuple(pair) for pair in json.loads(item_neighbors)]
+        candidates = {
+            user_id: [tuple(pair) for pair in json.loads(user_candidates)]
+            for user_id, user_candidates in db.execute('SELECT user_id, candidates FROM cf_user_candidates')
+        }
+        return cls(candidates, neighbors, items, built_at=row[0] if row else None)
+
+
+class CollaborativeFilter:
+    """Builds a CollaborativeModel from interaction records."""
+
+    def __init__(self, top_neighbors: int = 20, top_candidates: int = 50,
+                 weights: Dict[str, float] = INTERACTION_WEIGHTS):
+        """
+        Args:
+            top_neighbors: Similar items kept per item
+            top_candidates: Candidates kept per user
+            weights: Weight per interaction type; other types are ignored
+        """
+        self.top_neighbors = top_neighbors
+        self.top_candidates = top_candidates
+        self.weights = weights
+
+    def fit(self, interactions: Iterable[Dict[str, Any]]) -> CollaborativeModel:
+        """
+        Args:
+            interactions: Dicts with user_id, content, interaction_type and
+                metadata (as logged by ``RecommendationService.log_interaction``)
+        """
+        users: Dict[str, int] = {}
+        item_index: Dict[str, int] = {}
+        items: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        rows, cols, data = [], [], []
+        for interaction in interactions:
+            weight = self.weights.get(interaction.get('interaction_type'))
+            if not weight or not interaction.get('user_id'):
+                continue
+            metadata = interaction.get('metadata') or {}
+            item_id = interaction_item_id(interaction.get('content', ''), metadata)
+            if item_id not in item_index:
+                item_index[item_id] = len(item_index)
+                items[item_id] = (interaction.get('content', ''), dict(metadata, id=item_id))
+            rows.append(users.setdefault(str(interaction['user_id']), len(users)))
+            cols.append(item_index[item_id])
+            data.append(weight)
+
+        built_at = datetime.utcnow().isoformat()
+        if not rows:
+            return CollaborativeModel({}, {}, {}, built_at=built_at)
+
+        # Duplicate (user, item) entries are summed
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), (rows, cols)),
+            shape=(len(users), len(item_index))
+        )
+        matrix.data = np.log1p(matrix.data)
+
+        item_ids = list(item_index)
+        similarity = self._item_similarity(matrix)
+        neighbors = {
+            item_ids[i]: [(item_ids[j], score) for j, score in self._top_row(similarity, i, self.top_neighbors)]
+            for i in range(len(item_ids))
+        }
+
+        # Score unseen items through the pruned neighbor graph
+        pruned = self._pruned(similarity)
+        scores = (matrix @ pruned).tocsr()
+        user_ids = list(users)
+        candidates = {}
+        for u in range(len(user_ids)):
+            seen = set(matrix.indices[matrix.indptr[u]:matrix.indptr[u + 1]])
+            top = [(j, s) for j, s in self._top_row(scores, u, self.top_candidates + len(seen)) if j not in seen]
+            top = top[:self.top_candidates]
+            if top:
+                best = top[0][1]
+                candidates[user_ids[u]] = [(item_ids[j], round(s / best, 6)) for j, s in top]
+
+        logger.info(f"Collaborative filter: {len(users)} users, {len(item_ids)} items, {len(rows)} interactions")
+        return CollaborativeModel(candidates, neighbors, items, built_at=built_at)
+
+    @staticmethod
+    def _item_similarity(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Cosine similarity between item columns, without the diagonal."""
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+        normalized = matrix @ sparse.diags(1.0 / np.maximum(norms, 1e-12))
+        similarity = (normalized.T @ normalized).tocsr()
+        similarity.setdiag(0)
+        similarity.eliminate_zeros()
+        return similarity
+
+    def _pruned(self, similarity: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Similarity matrix keeping only each item's top neighbors."""
+        rows, cols, data = [], [], []
+        for i in range(similarity.shape[0]):
+            for j, score in self._top_row(similarity, i, self.top_neighbors):
+                rows.append(i)
+                cols.append(j)
+                data.append(score)
+        return sparse.csr_matrix((data, (rows, cols)), shape=similarity.shape)
+
+    @staticmethod
+    def _top_row(matrix: sparse.csr_matrix, row: int, k: int) -> List[Tuple[int, float]]:
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        indices, values = matrix.indices[start:end], matrix.data[start:end]
+        if len(values) > k:
+            part = np.argpartition(-values, k - 1)[:k]
+            indices, values = indices[part], values[part]
+        order = np.argsort(-values, kind='stable')
+        return [(int(indices[i]), float(values[i])) for i in order]
+
+
+class CollaborativeStore:
+    """
+    The stored model, loaded into memory and reloaded after a rebuild.
+
+    The build time is checked at most every ``reload_interval`` seconds. The
+    tables are created by the build (``rebuild``, or ``CollaborativeModel.save``),
+    so a check only reads the build time; before the first build there is
+    nothing to load.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, reload_interval: float = 60.0):
+        self.db_path = db_path
+        self.reload_interval = reload_interval
+        self._model = CollaborativeModel({}, {}, {})
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> CollaborativeModel:
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.reload_interval:
+                    self._reload_if_rebuilt()
+                    self._checked_at = time.monotonic()
+        return self._model
+
+    def _reload_if_rebuilt(self) -> None:
+        try:
+            db = sqlite3.connect(self.db_path)
+            try:
+                try:
+                    row = db.execute('SELECT built_at FROM cf_model WHERE id = 1').fetchone()
+                except sqlite3.OperationalError as e:
+                    if 'no such table' not in str(e):
+                        raise
+                    return  # Not built yet
+                if row and row[0] != self._model.built_at:
+                    self._model = CollaborativeModel.load(db)
+                    logger.info(f"Loaded collaborative filter built at {row[0]}")
+            finally:
+                db.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Collaborative filter unavailable: {str(e)}")
+
+    def rebuild(self, interactions: Iterable[Dict[str, Any]], **kwargs) -> CollaborativeModel:
+        """Fit on ``interactions``, save, and serve the new model."""
+        model = CollaborativeFilter(**kwargs).fit(interactions)
+        db = sqlite3.connect(self.db_path)
+        try:
+            model.save(db)
+        finally:
+            db.close()
+        with self._lock:
+            self._model = model
+            self._checked_at = time.monotonic()
+        return model
+
+
+collaborative_store = CollaborativeStore()
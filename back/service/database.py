@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, event
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, UniqueConstraint, event
 from sqlalchemy.orm import relationship, scoped_session, sessionmaker
 from datetime import datetime
 from functools import wraps
@@ -85,6 +85,27 @@ class UserContext(UserBase):
     
     conversation = relationship('UserConversation', back_populates='context')
 
+class UserInteraction(UserBase):
+    __tablename__ = 'interactions'
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False, index=True)
+    content = Column(Text, nullable=False)
+    interaction_type = Column(String(50), nullable=False)  # 'view', 'like', 'save', ...
+    # 'metadata' is reserved on declarative models, so the attribute is renamed
+    interaction_metadata = Column('metadata', JSON)  # Includes the document's index 'id'
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+
+class UserPreference(UserBase):
+    __tablename__ = 'user_preferences'
+    __table_args__ = (UniqueConstraint('user_id', 'key', name='uq_user_preferences_user_key'),)
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False, index=True)
+    key = Column(String(100), nullable=False)  # e.g. 'health_goals', 'diet'
+    value = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Article Database Models (SQLite)
 class Article(ArticleBase):
     __tablename__ = 'articles'
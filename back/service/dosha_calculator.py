@@ -4,17 +4,15 @@ Dosha Calculator Module
 This module provides an advanced dosha calculator that offers detailed analysis
 and personalized recommendations based on Ayurvedic principles.
 """
-from typing import Dict, List, Optional, TypedDict
-from enum import Enum
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, TypedDict, Union
 from datetime import datetime, timezone
 
-class DoshaType(str, Enum):
-    """Enum representing the three dosha types in Ayurveda."""
-    VATA = "Vata"
-    PITTA = "Pitta"
-    KAPHA = "Kapha"
-    UNKNOWN = "Unknown"
+import numpy as np
+
+from .dosha_questionnaire import (
+    DOSHA_KEYS, BatchDoshaScores, DoshaQuestion, DoshaScoringTable, DoshaType, Questionnaire,
+    load_questionnaire
+)
 
 class DoshaScores(TypedDict):
     """Type definition for dosha scores dictionary."""
@@ -32,221 +30,27 @@ class DoshaResult(TypedDict):
     recommendations: List[str]
     timestamp: str
 
-@dataclass
-class DoshaQuestion:
-    """Class representing a question in the dosha assessment."""
-    id: str
-    text: str
-    options: Dict[str, str]  # value: display_text
-    weights: Dict[str, Dict[str, int]]  # option_value: {dosha: weight}
-    category: str  # physical, mental, emotional, lifestyle
-
 class DoshaCalculator:
     """
     A comprehensive dosha calculator that provides detailed analysis and recommendations
     based on Ayurvedic principles.
     """
     
-    def __init__(self):
-        """Initialize the dosha calculator with the question set."""
-        self.questions = self._initialize_questions()
+    def __init__(self, questionnaire: Optional[Questionnaire] = None):
+        """
+        Initialize the dosha calculator with the question set.
+        
+        Args:
+            questionnaire: Question set to score against; defaults to the
+                shared questionnaire loaded from the data file
+        """
+        self.questionnaire = questionnaire or load_questionnaire()
+        self.questions: List[DoshaQuestion] = self.questionnaire.questions
     
-    def _initialize_questions(self) -> List[DoshaQuestion]:
-        """Initialize the set of questions for the dosha assessment."""
-        questions = [
-            # Physical characteristics
-            DoshaQuestion(
-                id="body_frame",
-                text="Which best describes your body frame?",
-                options={
-                    "thin": "Thin, light build, difficulty gaining weight",
-                    "medium": "Medium, well-proportioned build",
-                    "large": "Large, solid, heavy build"
-                },
-                weights={
-                    "thin": {"vata": 3, "pitta": 1, "kapha": 0},
-                    "medium": {"vata": 0, "pitta": 3, "kapha": 1},
-                    "large": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="physical"
-            ),
-            DoshaQuestion(
-                id="skin_type",
-                text="How would you describe your skin type?",
-                options={
-                    "dry": "Dry, rough, or flaky skin",
-                    "sensitive": "Sensitive, prone to rashes or inflammation",
-                    "oily": "Oily, smooth, or moist skin"
-                },
-                weights={
-                    "dry": {"vata": 3, "pitta": 0, "kapha": 0},
-                    "sensitive": {"vata": 1, "pitta": 3, "kapha": 0},
-                    "oily": {"vata": 0, "pitta": 1, "kapha": 3}
-                },
-                category="physical"
-            ),
-            DoshaQuestion(
-                id="hair_type",
-                text="What best describes your hair?",
-                options={
-                    "dry": "Dry, frizzy, or brittle",
-                    "fine": "Fine, straight, or thinning",
-                    "thick": "Thick, oily, or wavy"
-                },
-                weights={
-                    "dry": {"vata": 3, "pitta": 0, "kapha": 0},
-                    "fine": {"vata": 2, "pitta": 2, "kapha": 0},
-                    "thick": {"vata": 0, "pitta": 1, "kapha": 3}
-                },
-                category="physical"
-            ),
-            
-            # Digestion and appetite
-            DoshaQuestion(
-                id="appetite",
-                text="How would you describe your appetite?",
-                options={
-                    "variable": "Variable, sometimes strong, sometimes weak",
-                    "strong": "Strong, can't skip meals",
-                    "steady": "Steady, can easily skip meals"
-                },
-                weights={
-                    "variable": {"vata": 3, "pitta": 0, "kapha": 0},
-                    "strong": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "steady": {"vata": 0, "pitta": 1, "kapha": 3}
-                },
-                category="physical"
-            ),
-            DoshaQuestion(
-                id="digestion",
-                text="How would you describe your digestion?",
-                options={
-                    "irregular": "Irregular, sometimes constipated",
-                    "quick": "Quick, strong digestion, can eat almost anything",
-                    "slow": "Slow, heavy after meals"
-                },
-                weights={
-                    "irregular": {"vata": 3, "pitta": 0, "kapha": 0},
-                    "quick": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "slow": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="physical"
-            ),
-            
-            # Energy and activity
-            DoshaQuestion(
-                id="weight_tendency",
-                text="What is your weight tendency?",
-                options={
-                    "difficult_to_gain": "Difficult to gain weight",
-                    "easy_to_maintain": "Easy to maintain weight",
-                    "difficult_to_lose": "Difficult to lose weight"
-                },
-                weights={
-                    "difficult_to_gain": {"vata": 3, "pitta": 1, "kapha": 0},
-                    "easy_to_maintain": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "difficult_to_lose": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="lifestyle"
-            ),
-            DoshaQuestion(
-                id="temperature_preference",
-                text="What temperature do you prefer?",
-                options={
-                    "warm": "Warm, dislike cold",
-                    "cool": "Cool, dislike heat",
-                    "adaptable": "Adaptable, but dislike dampness"
-                },
-                weights={
-                    "warm": {"vata": 3, "pitta": 0, "kapha": 1},
-                    "cool": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "adaptable": {"vata": 1, "pitta": 1, "kapha": 3}
-                },
-                category="physical"
-            ),
-            
-            # Sleep patterns
-            DoshaQuestion(
-                id="sleep_pattern",
-                text="How would you describe your sleep?",
-                options={
-                    "light": "Light, easily disturbed",
-                    "moderate": "Moderate, wake up easily if needed",
-                    "heavy": "Heavy, difficult to wake up"
-                },
-                weights={
-                    "light": {"vata": 3, "pitta": 1, "kapha": 0},
-                    "moderate": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "heavy": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="lifestyle"
-            ),
-            
-            # Mental and emotional
-            DoshaQuestion(
-                id="energy_level",
-                text="How would you describe your energy levels?",
-                options={
-                    "variable": "Variable, bursts of energy",
-                    "intense": "Intense, high energy",
-                    "steady": "Steady, even energy"
-                },
-                weights={
-                    "variable": {"vata": 3, "pitta": 0, "kapha": 0},
-                    "intense": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "steady": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="mental"
-            ),
-            DoshaQuestion(
-                id="mental_activity",
-                text="How would you describe your mental activity?",
-                options={
-                    "restless": "Restless, active mind",
-                    "focused": "Focused, sharp",
-                    "calm": "Calm, steady"
-                },
-                weights={
-                    "restless": {"vata": 3, "pitta": 0, "kapha": 0},
-                    "focused": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "calm": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="mental"
-            ),
-            DoshaQuestion(
-                id="emotional_tendency",
-                text="What is your emotional tendency?",
-                options={
-                    "anxious": "Anxious, worrisome",
-                    "irritable": "Easily irritated or angry",
-                    "attached": "Attached, sentimental"
-                },
-                weights={
-                    "anxious": {"vata": 3, "pitta": 0, "kapha": 0},
-                    "irritable": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "attached": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="emotional"
-            ),
-            
-            # Speech and communication
-            DoshaQuestion(
-                id="speech_pattern",
-                text="How would you describe your speech pattern?",
-                options={
-                    "fast": "Fast, talkative",
-                    "sharp": "Sharp, precise",
-                    "slow": "Slow, deliberate"
-                },
-                weights={
-                    "fast": {"vata": 3, "pitta": 1, "kapha": 0},
-                    "sharp": {"vata": 0, "pitta": 3, "kapha": 0},
-                    "slow": {"vata": 0, "pitta": 0, "kapha": 3}
-                },
-                category="mental"
-            )
-        ]
-        return questions
+    @property
+    def scoring_table(self) -> DoshaScoringTable:
+        """The question set compiled for ``calculate_many``."""
+        return self.questionnaire.scoring_table
     
     def calculate_dosha(self, responses: Dict[str, str]) -> DoshaResult:
         """
@@ -258,25 +62,13 @@ class DoshaCalculator:
         Returns:
             DoshaResult with detailed analysis
         """
-        scores = {"vata": 0, "pitta": 0, "kapha": 0}
+        totals, by_category = self.questionnaire.score(responses)
+        scores = {dosha: int(totals[d]) for d, dosha in enumerate(DOSHA_KEYS)}
         category_scores = {
-            "physical": {"vata": 0, "pitta": 0, "kapha": 0},
-            "mental": {"vata": 0, "pitta": 0, "kapha": 0},
-            "emotional": {"vata": 0, "pitta": 0, "kapha": 0},
-            "lifestyle": {"vata": 0, "pitta": 0, "kapha": 0}
+            category: {dosha: int(by_category[c, d]) for d, dosha in enumerate(DOSHA_KEYS)}
+            for c, category in enumerate(self.questionnaire.categories)
         }
         
-        # Calculate scores
-        for question in self.questions:
-            if question.id in responses and responses[question.id] in question.weights:
-                selected_option = responses[question.id]
-                weights = question.weights[selected_option]
-                
-                # Update main scores
-                for dosha, weight in weights.items():
-                    scores[dosha] += weight
-                    category_scores[question.category][dosha] += weight
-        
         # Normalize scores
         total = sum(scores.values()) or 1  # Avoid division by zero
         normalized_scores = {k: round((v / total) * 100, 1) for k, v in scores.items()}
@@ -305,6 +97,24 @@ class DoshaCalculator:
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     
+    def calculate_many(self, responses: Union[Sequence[Dict[str, str]], np.ndarray]) -> BatchDoshaScores:
+        """
+        Score many sets of responses in one vectorized pass.
+        
+        Scores, category scores, normalized percentages, primary/secondary
+        dosha and confidence match ``calculate_dosha``; the analysis text and
+        recommendations are not generated.
+        
+        Args:
+            responses: Response dicts, or an array already encoded with
+                ``scoring_table.encode`` (faster for repeated re-scoring)
+            
+        Returns:
+            BatchDoshaScores with one row per set of responses
+        """
+        codes = responses if isinstance(responses, np.ndarray) else self.scoring_table.encode(responses)
+        return self.scoring_table.score(codes)
+    
     def _generate_analysis(self, primary_dosha: str, category_scores: Dict[str, Dict[str, int]]) -> Dict[str, str]:
         """Generate detailed analysis based on dosha scores by category."""
         analysis = {}
@@ -0,0 +1,262 @@
+"""
+Dosha Questionnaire
+
+The dosha assessment question set, loaded once from a versioned data file and
+shared by every scorer (``DoshaCalculator``, ``determine_dosha`` and the agent
+tools):
+1. ``data/dosha_questionnaire.json`` holds the questions, options and per-option
+   weights; its ``schema_version`` is checked on load
+2. Each option's weights are compiled to a (vata, pitta, kapha) vector, so
+   scoring a set of responses is a few array adds
+3. The compiled questionnaire is cached per file, so constructing a scorer
+   does not rebuild the question set
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+DEFAULT_QUESTIONNAIRE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'dosha_questionnaire.json')
+
+# Dosha order of score vectors and batch result columns
+DOSHA_KEYS = ("vata", "pitta", "kapha")
+
+
+class DoshaType(str, Enum):
+    """Enum representing the three dosha types in Ayurveda."""
+    VATA = "Vata"
+    PITTA = "Pitta"
+    KAPHA = "Kapha"
+    UNKNOWN = "Unknown"
+
+
+@dataclass
+class DoshaQuestion:
+    """Class representing a question in the dosha assessment."""
+    id: str
+    text: str
+    options: Dict[str, str]  # value: display_text
+    weights: Dict[str, Dict[str, int]]  # option_value: {dosha: weight}
+    category: str  # physical, mental, emotional, lifestyle
+
+
+@dataclass
+class BatchDoshaScores:
+    """Scores for N sets of responses, as arrays (row i is response set i)."""
+    scores: np.ndarray             # (N, 3) raw weight sums, columns in DOSHA_KEYS order
+    category_scores: np.ndarray    # (N, categories, 3), categories in questionnaire order
+    normalized_scores: np.ndarray  # (N, 3) percentages rounded to 0.1
+    primary: np.ndarray            # (N,) index into DOSHA_KEYS, -1 when nothing scored
+    secondary: np.ndarray          # (N,) index into DOSHA_KEYS, -1 when none
+    confidence: np.ndarray         # (N,) (primary - secondary) / total
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def result(self, i: int) -> Dict[str, Any]:
+        """Row ``i`` in the shape of ``calculate_dosha`` (without analysis text)."""
+        primary, secondary = int(self.primary[i]), int(self.secondary[i])
+        return {
+            "primary_dosha": DOSHA_KEYS[primary].capitalize() if primary >= 0 else DoshaType.UNKNOWN,
+            "secondary_dosha": DOSHA_KEYS[secondary].capitalize() if secondary >= 0 else None,
+            "scores": {dosha: float(self.normalized_scores[i, d]) for d, dosha in enumerate(DOSHA_KEYS)},
+            "confidence": float(self.confidence[i]),
+        }
+
+    def to_results(self) -> List[Dict[str, Any]]:
+        return [self.result(i) for i in range(len(self))]
+
+
+class DoshaScoringTable:
+    """
+    A question set compiled for vectorized scoring.
+
+    ``weights[q, o]`` holds the (vata, pitta, kapha) weights of option ``o``
+    of question ``q``; the last option slot of every question is all zeros
+    and stands for "not answered".
+    """
+
+    def __init__(self, questions: List[DoshaQuestion], categories: Sequence[str]):
+        self.categories = tuple(categories)
+        self.question_ids = [q.id for q in questions]
+        self.option_codes = [{option: o for o, option in enumerate(q.weights)} for q in questions]
+        self.missing = max((len(q.weights) for q in questions), default=0)
+
+        self.weights = np.zeros((len(questions), self.missing + 1, len(DOSHA_KEYS)), dtype=np.int32)
+        for qi, question in enumerate(questions):
+            for option, o in self.option_codes[qi].items():
+                for d, dosha in enumerate(DOSHA_KEYS):
+                    self.weights[qi, o, d] = question.weights[option].get(dosha, 0)
+        # (question, dosha, option) copy so each gather reads a contiguous row
+        self._dosha_weights = np.ascontiguousarray(self.weights.transpose(0, 2, 1))
+        self.question_categories = [self.categories.index(q.category) for q in questions]
+
+    def encode(self, responses: Sequence[Dict[str, str]]) -> np.ndarray:
+        """
+        Option index per (response set, question); unknown answers count as
+        not answered. Column-major, so ``score`` reads each question's
+        column contiguously.
+        """
+        dtype = np.int8 if self.missing < 127 else np.int32
+        codes = np.empty((len(responses), len(self.question_ids)), dtype=dtype, order="F")
+        for qi, (question_id, option_codes) in enumerate(zip(self.question_ids, self.option_codes)):
+            get_code = option_codes.get
+            missing = self.missing
+            codes[:, qi] = np.fromiter(
+                (get_code(r.get(question_id), missing) for r in responses), dtype=dtype, count=len(responses)
+            )
+        return codes
+
+    def score(self, codes: np.ndarray) -> BatchDoshaScores:
+        """Score encoded responses, one question column at a time."""
+        n = len(codes)
+        # (category, dosha, row): each question adds one gathered column per dosha
+        accumulated = np.zeros((len(self.categories), len(DOSHA_KEYS), n), dtype=np.int32)
+        for qi, c in enumerate(self.question_categories):
+            column = codes[:, qi]
+            for d in range(len(DOSHA_KEYS)):
+                accumulated[c, d] += self._dosha_weights[qi, d][column]
+        category_scores = accumulated.transpose(2, 0, 1)
+        scores = np.ascontiguousarray(accumulated.sum(axis=0).T)
+
+        total = scores.sum(axis=1)
+        total = np.where(total == 0, 1, total)  # Avoid division by zero
+        normalized = np.round(scores / total[:, None] * 100, 1)
+
+        # Stable sort keeps vata, pitta, kapha order on ties, as calculate_dosha does
+        order = np.argsort(-scores, axis=1, kind="stable")
+        rows = np.arange(n)
+        first, second = scores[rows, order[:, 0]], scores[rows, order[:, 1]]
+        return BatchDoshaScores(
+            scores=scores,
+            category_scores=category_scores,
+            normalized_scores=normalized,
+            primary=np.where(first > 0, order[:, 0], -1),
+            secondary=np.where(second > 0, order[:, 1], -1),
+            confidence=(first - second) / total,
+        )
+
+
+class Questionnaire:
+    """A validated question set with precomputed per-option weight vectors."""
+
+    def __init__(self, questions: List[DoshaQuestion], categories: Sequence[str],
+                 name: str = '', version: str = ''):
+        self.questions = questions
+        self.categories = tuple(categories)
+        self.name = name
+        self.version = version
+        # question id -> (category index, option value -> weight vector)
+        self._options: Dict[str, Tuple[int, Dict[str, np.ndarray]]] = {
+            q.id: (
+                self.categories.index(q.category),
+                {
+                    option: np.array([weights.get(dosha, 0) for dosha in DOSHA_KEYS], dtype=np.int64)
+                    for option, weights in q.weights.items()
+                },
+            )
+            for q in questions
+        }
+        self._scoring_table = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Questionnaire':
+        """
+        Build a questionnaire from its file contents.
+
+        Raises:
+            ValueError: If the schema version is unsupported or the data is malformed
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Questionnaire must be a JSON object")
+        if data.get('schema_version') != SCHEMA_VERSION:
+            raise ValueError(
+                f"Unsupported questionnaire schema version {data.get('schema_version')!r} "
+                f"(expected {SCHEMA_VERSION})"
+            )
+        if tuple(data.get('doshas', ())) != DOSHA_KEYS:
+            raise ValueError(f"Questionnaire doshas must be {list(DOSHA_KEYS)}")
+        categories = data.get('categories') or []
+
+        questions, seen = [], set()
+        for entry in data.get('questions') or []:
+            question_id = entry.get('id')
+            if not question_id or question_id in seen:
+                raise ValueError(f"Missing or duplicate question id {question_id!r}")
+            if entry.get('category') not in categories:
+                raise ValueError(f"Question {question_id!r} has unknown category {entry.get('category')!r}")
+            options, weights = {}, {}
+            for option in entry.get('options') or []:
+                value = option.get('value')
+                option_weights = option.get('weights') or {}
+                if not value or value in options:
+                    raise ValueError(f"Question {question_id!r} has a missing or duplicate option value")
+                if set(option_weights) - set(DOSHA_KEYS) or not all(
+                    isinstance(w, int) for w in option_weights.values()
+                ):
+                    raise ValueError(f"Option {value!r} of question {question_id!r} has invalid weights")
+                options[value] = option.get('text', value)
+                weights[value] = {dosha: option_weights.get(dosha, 0) for dosha in DOSHA_KEYS}
+            if not options:
+                raise ValueError(f"Question {question_id!r} has no options")
+            seen.add(question_id)
+            questions.append(DoshaQuestion(
+                id=question_id,
+                text=entry.get('text', ''),
+                options=options,
+                weights=weights,
+                category=entry['category'],
+            ))
+        if not questions:
+            raise ValueError("Questionnaire has no questions")
+
+        return cls(questions, categories, name=data.get('name', ''), version=data.get('version', ''))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Questionnaire':
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    @property
+    def scoring_table(self) -> DoshaScoringTable:
+        """The question set compiled for batch scoring."""
+        if self._scoring_table is None:
+            self._scoring_table = DoshaScoringTable(self.questions, self.categories)
+        return self._scoring_table
+
+    def score(self, responses: Dict[str, str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sum the weight vectors of the selected options.
+
+        Unknown questions and options are ignored.
+
+        Returns:
+            ``(scores, category_scores)``: a (3,) vector in DOSHA_KEYS order and
+            a (categories, 3) array
+        """
+        category_scores = np.zeros((len(self.categories), len(DOSHA_KEYS)), dtype=np.int64)
+        for question_id, answer in responses.items():
+            entry = self._options.get(question_id)
+            if entry is None:
+                continue
+            vector = entry[1].get(answer)
+            if vector is not None:
+                category_scores[entry[0]] += vector
+        return category_scores.sum(axis=0), category_scores
+
+
+def load_questionnaire(path: Optional[str] = None) -> Questionnaire:
+    """The questionnaire at ``path`` (the bundled file by default), parsed and compiled once per process."""
+    return _load_questionnaire(os.path.abspath(path or DEFAULT_QUESTIONNAIRE_PATH))
+
+
+@lru_cache(maxsize=None)
+def _load_questionnaire(path: str) -> Questionnaire:
+    return Questionnaire.from_file(path)
@@ -5,12 +5,17 @@ This module provides functionality to determine a user's Ayurvedic dosha type
 based on their responses to a questionnaire or assessment.
 """
 
+from .dosha_calculator import dosha_calculator
+from .dosha_questionnaire import DoshaType
+
 def determine_dosha(user_responses):
     """
     Determines a user's dominant dosha based on their responses to a questionnaire.
     
-    Uses a scoring system to evaluate responses to various questions about physical
-    and mental traits, and calculates the predominant dosha along with a confidence level.
+    Delegates scoring to the shared ``dosha_calculator``, so the dosha and
+    confidence margin are the ones ``DoshaCalculator.calculate_dosha`` returns.
+    Only the scores are needed here, so it uses the batch scorer and skips the
+    calculator's analysis text.
     
     Args:
         user_responses (dict): A dictionary where keys are question IDs and values 
@@ -19,112 +24,27 @@ def determine_dosha(user_responses):
     Returns:
         dict: A dictionary containing:
             - 'dosha': The determined dosha type ('Vata', 'Pitta', 'Kapha', or 'Unknown')
-            - 'confidence': A percentage indicating the confidence in the determination
+            - 'confidence': The primary dosha's share of the total score, as a
+              percentage (0-100) rounded to 2 decimal places
+            - 'confidence_margin': The primary dosha's lead over the secondary,
+              as a fraction (0-1) of the total score
             - 'message': A description of the dosha and its characteristics
     """
-    # Initialize scores for each dosha type
-    vata_score = 0
-    pitta_score = 0
-    kapha_score = 0
-    
-    # Define the scoring system for each question and possible answer
-    scoring_system = {
-        "body_frame": {
-            "thin": {"vata": 3, "pitta": 1, "kapha": 0},
-            "medium": {"vata": 0, "pitta": 3, "kapha": 1},
-            "large": {"vata": 0, "pitta": 0, "kapha": 3}
-        },
-        "skin_type": {
-            "dry": {"vata": 3, "pitta": 0, "kapha": 0},
-            "sensitive": {"vata": 1, "pitta": 3, "kapha": 0},
-            "oily": {"vata": 0, "pitta": 1, "kapha": 3}
-        },
-        "hair_type": {
-            "dry": {"vata": 3, "pitta": 0, "kapha": 0},
-            "fine": {"vata": 2, "pitta": 2, "kapha": 0},
-            "thick": {"vata": 0, "pitta": 1, "kapha": 3}
-        },
-        "appetite": {
-            "variable": {"vata": 3, "pitta": 0, "kapha": 0},
-            "strong": {"vata": 0, "pitta": 3, "kapha": 0},
-            "steady": {"vata": 0, "pitta": 1, "kapha": 3}
-        },
-        "digestion": {
-            "irregular": {"vata": 3, "pitta": 0, "kapha": 0},
-            "quick": {"vata": 0, "pitta": 3, "kapha": 0},
-            "slow": {"vata": 0, "pitta": 0, "kapha": 3}
-        },
-        "weight_tendency": {
-            "difficult_to_gain": {"vata": 3, "pitta": 1, "kapha": 0},
-            "easy_to_maintain": {"vata": 0, "pitta": 3, "kapha": 0},
-            "difficult_to_lose": {"vata": 0, "pitta": 0, "kapha": 3}
-        },
-        "temperature_preference": {
-            "warm": {"vata": 3, "pitta": 0, "kapha": 1},
-            "cool": {"vata": 0, "pitta": 3, "kapha": 0},
-            "adaptable": {"vata": 1, "pitta": 1, "kapha": 3}
-        },
-        "sleep_pattern": {
-            "light": {"vata": 3, "pitta": 1, "kapha": 0},
-            "moderate": {"vata": 0, "pitta": 3, "kapha": 0},
-            "heavy": {"vata": 0, "pitta": 0, "kapha": 3}
-        },
-        "energy_level": {
-            "variable": {"vata": 3, "pitta": 0, "kapha": 0},
-            "intense": {"vata": 0, "pitta": 3, "kapha": 0},
-            "steady": {"vata": 0, "pitta": 0, "kapha": 3}
-        },
-        "mental_activity": {
-            "restless": {"vata": 3, "pitta": 0, "kapha": 0},
-            "focused": {"vata": 0, "pitta": 3, "kapha": 0},
-            "calm": {"vata": 0, "pitta": 0, "kapha": 3}
-        },
-        "emotional_tendency": {
-            "anxious": {"vata": 3, "pitta": 0, "kapha": 0},
-            "irritable": {"vata": 0, "pitta": 3, "kapha": 0},
-            "attached": {"vata": 0, "pitta": 0, "kapha": 3}
-        },
-        "speech_pattern": {
-            "fast": {"vata": 3, "pitta": 1, "kapha": 0},
-            "sharp": {"vata": 0, "pitta": 3, "kapha": 0},
-            "slow": {"vata": 0, "pitta": 0, "kapha": 3}
-        }
-    }
-    
-    # Process each user response
-    for question, answer in user_responses.items():
-        # Check if the question is in our scoring system
-        if question in scoring_system:
-            # Check if the answer is in our scoring system for this question
-            if answer in scoring_system[question]:
-                # Add the scores for each dosha
-                vata_score += scoring_system[question][answer]["vata"]
-                pitta_score += scoring_system[question][answer]["pitta"]
-                kapha_score += scoring_system[question][answer]["kapha"]
-    
-    # Calculate total score
-    total_score = vata_score + pitta_score + kapha_score
+    batch = dosha_calculator.calculate_many([user_responses])
+    result = batch.result(0)
     
     # If no scores were accumulated, return unknown
-    if total_score == 0:
+    if result['primary_dosha'] == DoshaType.UNKNOWN:
         return {
             'dosha': 'Unknown',
             'confidence': 0.0,
+            'confidence_margin': 0.0,
             'message': 'Unable to determine your dosha based on the provided responses. Please ensure you answer all questions in the questionnaire.'
         }
     
-    # Determine the predominant dosha
-    dosha_scores = {
-        'Vata': vata_score,
-        'Pitta': pitta_score,
-        'Kapha': kapha_score
-    }
-    
-    predominant_dosha = max(dosha_scores, key=dosha_scores.get)
-    
-    # Calculate confidence percentage
-    confidence = (dosha_scores[predominant_dosha] / total_score) * 100
-    confidence = round(confidence, 2)  # Round to 2 decimal places
+    predominant_dosha = result['primary_dosha']
+    scores = batch.scores[0]
+    share = round(float(scores[batch.primary[0]]) / float(scores.sum()) * 100, 2)
     
     # Define descriptions for each dosha
     dosha_descriptions = {
@@ -154,7 +74,8 @@ def determine_dosha(user_responses):
     # Return the result
     return {
         'dosha': predominant_dosha,
-        'confidence': confidence,
+        'confidence': share,
+        'confidence_margin': result['confidence'],
         'message': dosha_descriptions[predominant_dosha]
     }
 
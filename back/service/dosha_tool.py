@@ -8,7 +8,7 @@ import json
 from typing import Dict, Any, List, Optional
 
 from langchain.tools import BaseTool
-from .dosha_calculator import DoshaCalculator
+from .dosha_calculator import DoshaCalculator, dosha_calculator
 
 class DoshaTool(BaseTool):
     """Tool for determining a user's Ayurvedic dosha type."""
@@ -32,13 +32,13 @@ class DoshaTool(BaseTool):
     """
     
     def __init__(self, **kwargs):
-        """Initialize the dosha tool with a calculator instance.
+        """Initialize the dosha tool with the shared calculator instance.
         
         Args:
             **kwargs: Additional arguments to pass to the parent class
         """
         super().__init__(**kwargs)
-        self._calculator = DoshaCalculator()
+        self._calculator = dosha_calculator
     
     def _run(self, query: str) -> str:
         """
@@ -1,3 +1,5 @@
+import threading
+
 from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
@@ -26,4 +28,17 @@ def text_split(extracted_data):
 #Download the Embeddings from HuggingFace 
 def download_hugging_face_embeddings():
     embeddings=HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')  #this model return 384 dimensions
-    return embeddings
\ No newline at end of file
+    return embeddings
+
+
+_shared_embeddings = None
+_shared_embeddings_lock = threading.Lock()
+
+
+#Load the embeddings model once per process and share it between services
+def get_shared_embeddings():
+    global _shared_embeddings
+    with _shared_embeddings_lock:
+        if _shared_embeddings is None:
+            _shared_embeddings = download_hugging_face_embeddings()
+        return _shared_embeddings
@@ -0,0 +1,238 @@
+"""
+HTML Main-Content Extraction
+
+Extracts the readable article text from a page while bounding the work done
+per page:
+1. Responses are read in chunks up to ``MAX_PAGE_BYTES``; larger pages are
+   truncated rather than buffered whole
+2. Pages are parsed with lxml when it is installed (falling back to
+   BeautifulSoup's ``html.parser``)
+3. A readability-style pass scores text blocks by length, commas, link
+   density and class/id hints, and keeps the best container and its
+   high-scoring siblings
+4. Scoring stops once ``time_budget`` seconds of CPU have been spent on the
+   page, returning what was found so far. The budget is measured with the
+   extracting thread's CPU clock, so extractions running in parallel (e.g.
+   through ``asyncio.to_thread``) don't use up each other's budget
+"""
+
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per page; the article body is normally near the start
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# CPU seconds of the extracting thread allowed for scoring a single page
+PAGE_TIME_BUDGET = 0.5
+
+# Text blocks shorter than this don't vote for a container
+MIN_BLOCK_CHARS = 25
+
+# Siblings scoring at least this fraction of the best container are kept too
+SIBLING_SCORE_RATIO = 0.2
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'footer', 'aside', 'header', 'form',
+                    'iframe', 'svg', 'button', 'select', 'template']
+BLOCK_TAGS = ('p', 'pre', 'td', 'blockquote', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+TEXT_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'pre', 'blockquote']
+
+_POSITIVE = re.compile(r'article|body|content|entry|main|page|post|story|text|blog', re.I)
+_NEGATIVE = re.compile(
+    r'comment|meta|footer|footnote|sidebar|widget|share|social|related|promo|sponsor|'
+    r'advert|\bad\b|ad-|banner|nav|menu|breadcrumb|subscribe|newsletter|popup|cookie', re.I
+)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def is_html(content_type: Optional[str]) -> bool:
+    """Whether a Content-Type header is worth parsing (missing counts as HTML)."""
+    if not content_type:
+        return True
+    return content_type.split(';')[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def decode_body(body: bytes, encoding: Optional[str]) -> str:
+    try:
+        return body.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+def read_limited(chunks: Iterable[bytes], max_bytes: int = MAX_PAGE_BYTES) -> Tuple[bytes, bool]:
+    """
+    Join chunks until ``max_bytes`` is reached.
+
+    Returns:
+        Tuple of (body, truncated)
+    """
+    parts = []
+    size = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            return b''.join(parts)[:max_bytes], True
+    return b''.join(parts), False
+
+
+def _class_weight(element) -> int:
+    weight = 0
+    for attr in ('class', 'id'):
+        value = element.get(attr)
+        if value:
+            if _NEGATIVE.search(value):
+                weight -= 25
+            if _POSITIVE.search(value):
+                weight += 25
+    return weight
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def _link_density(element) -> float:
+    text_length = len(element.text_content()) or 1
+    link_length = sum(len(a.text_content()) for a in element.iter('a'))
+    return link_length / text_length
+
+
+def _score_candidates(root, deadline: float) -> Dict:
+    """Readability-style scores for the containers of text blocks."""
+    scores: Dict = {}
+    for block in root.iter(*BLOCK_TAGS):
+        if time.thread_time() > deadline:
+            logger.debug("Extraction time budget exhausted; using partial scores")
+            break
+        text = block.text_content()
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        parent = block.getparent()
+        if parent is None:
+            continue
+        block_score = 1 + text.count(',') + min(len(text) // 100, 3)
+        for ancestor, share in ((parent, 1.0), (parent.getparent(), 0.5)):
+            if ancestor is None:
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = _class_weight(ancestor)
+            scores[ancestor] += block_score * share
+    return scores
+
+
+def _block_text(container) -> List[str]:
+    """Text of the text-bearing descendants, skipping boilerplate nested in the container."""
+    parts = []
+    for element in container.iter(*TEXT_TAGS):
+        if _is_boilerplate(element, container):
+            continue
+        text = _clean(element.text_content())
+        if text:
+            parts.append(text)
+    return parts
+
+
+def _is_boilerplate(element, container) -> bool:
+    """Nested text tags (covered by their ancestor), link lists, ads and share widgets."""
+    if element is not container and element.tag == 'li' and _link_density(element) > 0.5:
+        return True
+    for ancestor in element.iterancestors():
+        if ancestor is container:
+            return False
+        if ancestor.tag in TEXT_TAGS or _class_weight(ancestor) < 0:
+            return True
+    return False
+
+
+def _extract_lxml(html: str, time_budget: float) -> str:
+    deadline = time.thread_time() + time_budget
+    root = lxml.html.fromstring(html)
+    etree.strip_elements(root, *BOILERPLATE_TAGS, etree.Comment, with_tail=False)
+
+    scores = _score_candidates(root, deadline)
+    if not scores:
+        return ' '.join(_block_text(root))
+
+    # Penalize link-heavy containers (menus, "related" lists)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:5]
+    best, best_score = max(
+        ((element, score * (1 - _link_density(element))) for element, score in ranked),
+        key=lambda item: item[1]
+    )
+
+    parent = best.getparent()
+    containers = [best]
+    if parent is not None:
+        threshold = max(10.0, best_score * SIBLING_SCORE_RATIO)
+        containers = [
+            sibling for sibling in parent
+            if sibling is best or (sibling in scores and scores[sibling] >= threshold)
+        ]
+
+    parts = []
+    for container in containers:
+        if container.tag in TEXT_TAGS:
+            parts.append(_clean(container.text_content()))
+        else:
+            parts.extend(_block_text(container))
+    return ' '.join(part for part in parts if part)
+
+
+def extract_main_text_bs4(html: str) -> str:
+    """Container heuristics with BeautifulSoup; used when lxml is unavailable."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove unwanted elements
+    for element in soup(['script', 'style', 'nav', 'footer', 'aside']):
+        element.decompose()
+
+    # Try to find the main content
+    article = soup.find('article')
+    if not article:
+        article = soup.find('div', class_=lambda x: x and 'content' in x.lower())
+    if not article:
+        article = soup.find('main')
+    if not article:
+        article = soup
+
+    # Get text with proper spacing
+    text = ' '.join(p.get_text(' ', strip=True) for p in article.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li']))
+    return text.strip()
+
+
+def extract_main_text(html: str, time_budget: float = PAGE_TIME_BUDGET) -> str:
+    """
+    Extract the readable main content of an HTML page.
+
+    Args:
+        html: Page markup (already truncated to the byte cap)
+        time_budget: CPU seconds allowed for scoring this page
+
+    Returns:
+        Main text, or '' if nothing could be extracted
+    """
+    if not html or not html.strip():
+        return ''
+    if not HAS_LXML:
+        return extract_main_text_bs4(html)
+    try:
+        return _extract_lxml(html, time_budget)
+    except (etree.ParserError, ValueError) as e:
+        logger.debug(f"lxml could not parse page ({str(e)}); falling back to html.parser")
+        return extract_main_text_bs4(html)
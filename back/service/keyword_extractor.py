@@ -0,0 +1,152 @@
+"""
+Keyword Extraction
+
+TF-IDF keyword extraction for articles:
+1. Text is tokenized with a compiled pattern (letters only, no punctuation)
+   and filtered against an English stopword list
+2. Document frequencies are kept in SQLite and updated incrementally, in the
+   caller's transaction, as articles are saved
+3. Top keywords are selected with ``heapq.nlargest`` rather than sorting the
+   whole vocabulary, and a batch of articles shares one round of DF lookups
+"""
+
+import heapq
+import math
+import re
+import sqlite3
+from collections import Counter
+from typing import Iterable, List, Sequence, Tuple
+
+# Three or more letters; apostrophes only inside words
+_TOKEN = re.compile(r"[a-z][a-z']+[a-z]")
+
+# Keep below SQLITE_MAX_VARIABLE_NUMBER for the DF lookup
+_LOOKUP_CHUNK = 500
+
+STOPWORDS = frozenset("""
+a about above after again against all almost also although always am among an and another any
+anyone anything are aren't around as at be became because become been before being below between
+both but by came can can't cannot could couldn't did didn't do does doesn't doing don't done down
+during each either else enough even ever every few first for from further get gets getting given
+go goes going got had hadn't has hasn't have haven't having he he'd he'll he's her here here's
+hers herself him himself his how how's however i i'd i'll i'm i've if in into is isn't it it's
+its itself just know last least less let let's like likely made make makes making many may maybe
+me might more most mostly much must mustn't my myself near need never new next no nor not now of
+off often on once one only or other others otherwise our ours ourselves out over own per perhaps
+put rather really said same say says see seen several shall shan't she she'd she'll she's should
+shouldn't since so some something still such take than that that's the their theirs them
+themselves then there there's therefore these they they'd they'll they're they've thing things
+this those though through thus to too took toward two under until up upon us use used using very
+via want was wasn't way we we'd we'll we're we've well were weren't what what's when when's where
+where's whether which while who who's whom whose why why's will with within without won't would
+wouldn't yet you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of at least three letters, without stopwords."""
+    return [token for token in _TOKEN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+def extract_keywords(text: str, num_keywords: int = 5) -> List[Tuple[str, float]]:
+    """Most frequent non-stopword terms of a single text (no corpus statistics)."""
+    counts = Counter(tokenize(text))
+    return heapq.nlargest(num_keywords, counts.items(), key=lambda item: item[1])
+
+
+class KeywordExtractor:
+    """TF-IDF keywords backed by an incrementally updated document-frequency table."""
+
+    def __init__(self, db: sqlite3.Connection, setup: bool = True):
+        self.db = db
+        if setup:
+            self.setup_database()
+
+    def setup_database(self) -> None:
+        """Initialize the document-frequency tables if they don't exist."""
+        cursor = self.db.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_document_frequency (
+                term TEXT PRIMARY KEY,
+                df INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS keyword_corpus (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                documents INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('INSERT OR IGNORE INTO keyword_corpus (id, documents) VALUES (1, 0)')
+        self.db.commit()
+
+    def document_count(self) -> int:
+        return self.db.execute('SELECT documents FROM keyword_corpus WHERE id = 1').fetchone()[0]
+
+    def add_documents(self, token_lists: Sequence[Sequence[str]]) -> None:
+        """
+        Count documents into the DF table.
+
+        Runs in the caller's transaction, so a rolled-back save leaves the
+        statistics untouched.
+        """
+        batch_df = Counter(term for tokens in token_lists for term in set(tokens))
+        self.db.executemany('''
+            INSERT INTO keyword_document_frequency (term, df) VALUES (?, ?)
+            ON CONFLICT(term) DO UPDATE SET df = df + excluded.df
+        ''', batch_df.items())
+        self.db.execute(
+            'UPDATE keyword_corpus SET documents = documents + ? WHERE id = 1', (len(token_lists),)
+        )
+
+    def _document_frequencies(self, terms: Iterable[str]) -> dict:
+        terms = list(terms)
+        df = {}
+        for start in range(0, len(terms), _LOOKUP_CHUNK):
+            chunk = terms[start:start + _LOOKUP_CHUNK]
+            df.update(self.db.execute(
+                f"SELECT term, df FROM keyword_document_frequency WHERE term IN ({', '.join(['?'] * len(chunk))})",
+                chunk
+            ).fetchall())
+        return df
+
+    def extract_batch(self, texts: Sequence[str], num_keywords: int = 5,
+                      update: bool = True) -> List[List[Tuple[str, float]]]:
+        """
+        Top TF-IDF keywords for each text.
+
+        Args:
+            texts: Documents to extract keywords from
+            num_keywords: Keywords per document
+            update: Count the documents into the corpus statistics first
+                (set for newly saved articles)
+
+        Returns:
+            ``(keyword, score)`` lists in the same order as ``texts``
+        """
+        return self.extract_tokens([tokenize(text) for text in texts], num_keywords, update)
+
+    def extract_tokens(self, token_lists: Sequence[Sequence[str]], num_keywords: int = 5,
+                       update: bool = True) -> List[List[Tuple[str, float]]]:
+        """extract_batch for documents already split with ``tokenize``."""
+        if update:
+            self.add_documents(token_lists)
+
+        documents = max(self.document_count(), 1)
+        vocabulary = {term for tokens in token_lists for term in tokens}
+        df = self._document_frequencies(vocabulary)
+        idf = {term: math.log((1 + documents) / (1 + df.get(term, 0))) + 1 for term in vocabulary}
+
+        results = []
+        for tokens in token_lists:
+            if not tokens:
+                results.append([])
+                continue
+            counts = Counter(tokens)
+            top = heapq.nlargest(num_keywords, counts, key=lambda term: counts[term] * idf[term])
+            results.append([(term, counts[term] / len(tokens) * idf[term]) for term in top])
+        return results
+
+    def extract(self, text: str, num_keywords: int = 5) -> List[Tuple[str, float]]:
+        """Top TF-IDF keywords for one text, without updating the corpus."""
+        return self.extract_batch([text], num_keywords, update=False)[0]
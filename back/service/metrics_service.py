@@ -20,6 +20,9 @@ from pathlib import Path
 import psutil
 import threading
 
+from .metrics_store import get_time_series_store, from_epoch
+from .alert_engine import AlertEngine, AlertRule, StreamRegistry, logging_sink
+
 # Type checking imports
 if TYPE_CHECKING:
     from flask import Flask
@@ -96,6 +99,14 @@ class AlertManager:
         
         return alerts
     
+    def notify(self, event: Dict[str, Any]) -> None:
+        """Alert sink for AlertEngine: keep active alerts and history in sync."""
+        if event['status'] == 'firing':
+            self.active_alerts[event['id']] = event
+        else:
+            self.active_alerts.pop(event['id'], None)
+        self.alert_history.append(event)
+    
     def get_active_alerts(self) -> List[Dict[str, Any]]:
         """Get currently active alerts."""
         return list(self.active_alerts.values())
@@ -104,76 +115,99 @@ class AlertManager:
         """Get alert history."""
         return list(self.alert_history)[-limit:]
 
+def default_alert_rules() -> List[AlertRule]:
+    """Rolling-window versions of ALERT_THRESHOLDS, applied to every series."""
+    return [
+        AlertRule(
+            name='response_time_p99', series='latency:*', aggregation='p99', window=300,
+            op='>', threshold=ALERT_THRESHOLDS['response_time_p99'],
+            clear_threshold=ALERT_THRESHOLDS['response_time_p99'] * 0.8,
+            for_count=2, min_samples=20, severity='warning'
+        ),
+        AlertRule(
+            name='error_rate', series='latency:*', aggregation='error_rate', window=60,
+            op='>', threshold=ALERT_THRESHOLDS['error_rate'],
+            clear_threshold=ALERT_THRESHOLDS['error_rate'] * 0.6,
+            for_count=2, min_samples=20, severity='critical'
+        ),
+        AlertRule(
+            name='cpu_usage', series='system:cpu_usage', aggregation='mean', window=60,
+            op='>', threshold=ALERT_THRESHOLDS['cpu_usage'],
+            clear_threshold=ALERT_THRESHOLDS['cpu_usage'] - 0.1,
+            for_count=3, severity='critical'
+        ),
+        AlertRule(
+            name='memory_usage', series='system:memory_usage', aggregation='mean', window=60,
+            op='>', threshold=ALERT_THRESHOLDS['memory_usage'],
+            clear_threshold=ALERT_THRESHOLDS['memory_usage'] - 0.05,
+            for_count=3, severity='critical'
+        ),
+    ]
+
 class MetricsStorage:
-    """Handles storage and retrieval of metrics data."""
+    """Handles storage and retrieval of metrics data.
+    
+    Samples are appended to a binary time-series store (see
+    ``service.metrics_store``) with 1m/1h/1d rollups, so dashboard queries
+    read pre-aggregated buckets instead of parsing JSON day-files. Storages
+    for the same directory share one store and its flush thread.
+    """
     
     def __init__(self, storage_dir: str = "data/metrics"):
         self.storage_dir = Path(storage_dir)
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.store = get_time_series_store(self.storage_dir)
     
-    def _get_metrics_file_path(self, metric_name: str, date: datetime) -> Path:
-        """Get file path for storing metrics data."""
-        date_str = date.strftime("%Y-%m-%d")
-        return self.storage_dir / f"{metric_name}_{date_str}.json"
+    def record(self, metric_name: str, value: float, timestamp: Optional[datetime] = None) -> None:
+        """Record a single numeric sample for a metric."""
+        self.store.append(metric_name, value, timestamp)
     
     def save_metrics(self, metric_name: str, data: Dict[str, Any], timestamp: Optional[datetime] = None) -> None:
-        """Save metrics data to storage."""
+        """Save metrics data to storage.
+        
+        Args:
+            metric_name: Name of the metric
+            data: Mapping of ISO timestamps to numeric values. Keys that are not
+                  timestamps are recorded at ``timestamp``.
+            timestamp: Default timestamp (defaults to now)
+        """
         if timestamp is None:
             timestamp = datetime.utcnow()
-            
-        file_path = self._get_metrics_file_path(metric_name, timestamp)
         
-        # Load existing data
-        existing_data = {}
-        if file_path.exists():
+        for key, value in data.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                logger.warning(f"Skipping non-numeric value for metric {metric_name}: {key}")
+                continue
             try:
-                with open(file_path, 'r') as f:
-                    existing_data = json.load(f)
-            except json.JSONDecodeError:
-                logger.warning(f"Corrupted metrics file: {file_path}")
-        
-        # Update with new data
-        existing_data.update(data)
-        
-        # Save back to file
-        with open(file_path, 'w') as f:
-            json.dump(existing_data, f, indent=2)
+                sample_time = datetime.fromisoformat(key)
+            except (TypeError, ValueError):
+                sample_time = timestamp
+            self.store.append(metric_name, value, sample_time)
+    
+    def flush(self) -> None:
+        """Persist any open rollup buckets."""
+        self.store.flush()
     
     def get_metrics(self, metric_name: str, start_date: datetime, end_date: datetime) -> Dict[datetime, Any]:
-        """Retrieve metrics data for a date range."""
-        results = {}
-        current_date = start_date.date()
-        end_date = end_date.date()
-        
-        while current_date <= end_date:
-            file_path = self._get_metrics_file_path(metric_name, current_date)
-            if file_path.exists():
-                try:
-                    with open(file_path, 'r') as f:
-                        results.update({
-                            datetime.fromisoformat(k): v 
-                            for k, v in json.load(f).items()
-                        })
-                except (json.JSONDecodeError, KeyError) as e:
-                    logger.warning(f"Error reading metrics file {file_path}: {e}")
-            current_date += timedelta(days=1)
-        
-        return results
+        """Retrieve raw metrics samples for a date range."""
+        return {
+            from_epoch(ts): value
+            for ts, value in self.store.query_raw(metric_name, start_date, end_date)
+        }
+    
+    def get_rollup(
+        self,
+        metric_name: str,
+        start_date: datetime,
+        end_date: datetime,
+        resolution: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve downsampled buckets ('1m', '1h' or '1d') for a date range."""
+        return self.store.query(metric_name, start_date, end_date, resolution)
     
     def cleanup_old_metrics(self, retention_days: int = METRICS_RETENTION_DAYS) -> None:
         """Remove metrics data older than retention_days."""
         cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
-        cutoff_date = cutoff_date.date()
-        
-        for file_path in self.storage_dir.glob("*.json"):
-            try:
-                file_date_str = file_path.stem.split('_')[-1]
-                file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
-                if file_date < cutoff_date:
-                    file_path.unlink()
-                    logger.info(f"Removed old metrics file: {file_path}")
-            except (ValueError, IndexError):
-                continue
+        self.store.cleanup(cutoff_date.date())
 
 class MetricsService:
     """Service for tracking and visualizing comprehensive metrics."""
@@ -274,6 +308,36 @@ class MetricsService:
             "tool_usage_patterns": [],  # Store tool usage patterns
             "accuracy_scores": []  # Store accuracy scores if available
         }
+        
+        # Rolling-window alerting over latency/error series and system gauges
+        self.alert_manager = AlertManager()
+        self.alert_streams = StreamRegistry()
+        self.alert_engine = AlertEngine(
+            self.alert_streams,
+            rules=default_alert_rules(),
+            sinks=[logging_sink, self.alert_manager.notify]
+        )
+        self.alert_engine.add_collector(self._collect_system_gauges)
+    
+    def observe_latency(self, name: str, response_time: float, error: bool = False) -> None:
+        """
+        Feed a request or tool latency into the alert windows.
+        
+        Args:
+            name: Series key, e.g. 'endpoint:chat', 'tool:weather', 'rag'
+            response_time: Latency in seconds
+            error: Whether the call failed
+        """
+        self.alert_streams.observe(f"latency:{name}", response_time, error)
+    
+    def _collect_system_gauges(self, now: float) -> None:
+        """Sample CPU and memory usage once per alert evaluation."""
+        self.alert_streams.observe('system:cpu_usage', psutil.cpu_percent(interval=None) / 100.0, now=now)
+        self.alert_streams.observe('system:memory_usage', psutil.virtual_memory().percent / 100.0, now=now)
+    
+    def start_alerting(self, scheduler, seconds: int = 10) -> None:
+        """Evaluate alert rules on the application's APScheduler instance."""
+        self.alert_engine.schedule(scheduler, seconds=seconds)
     
     def track_rag_request(self, response_time: float, tool_usage: Dict[str, int]):
         """
@@ -297,6 +361,7 @@ class MetricsService:
             
             # Track response time for detailed analysis
             self.rag_metrics["response_times"].append(response_time)
+            self.observe_latency('rag', response_time)
             
             # Emit update for real-time dashboard
             metrics_service_manager.emit_update('performance', {
@@ -329,6 +394,7 @@ class MetricsService:
             
             # Track response time for detailed analysis
             self.agent_metrics["response_times"].append(response_time)
+            self.observe_latency('agent', response_time)
             
             # Emit update for real-time dashboard
             metrics_service_manager.emit_update('performance', {
@@ -435,6 +501,7 @@ class MetricsService:
             error_occurred: Whether an error occurred during the request
         """
         self.system_health["api_response_times"].append(response_time)
+        self.observe_latency('api', response_time, error_occurred)
         
         if error_occurred:
             self.system_health["error_count"] += 1
@@ -0,0 +1,395 @@
+"""
+Time-Series Metrics Store
+
+This module provides a compact, append-only storage layer for numeric metrics:
+1. Fixed-width binary files per metric per day (raw samples)
+2. Downsampled rollups at 1 minute, 1 hour and 1 day resolution
+3. Memory-mapped reads with binary search so range queries only touch the
+   records they need
+
+File layout (all files live in a single directory):
+    {metric}_raw_{YYYY-MM-DD}.bin   -> records of (timestamp, value)
+    {metric}_1m_{YYYY-MM-DD}.bin    -> records of (bucket_start, count, sum, min, max)
+    {metric}_1h_{YYYY-MM-DD}.bin
+    {metric}_1d_{YYYY-MM-DD}.bin
+    {metric}_{kind}-late_{YYYY-MM-DD}.bin -> records older than the last record
+                                             of the main file, in arrival order
+
+Every file name ends with the date so retention can be applied by file.
+Main files are kept sorted by timestamp so range scans can binary search
+them: each append checks the file's last record under a file lock (shared
+by all writer processes), and a record that would break the order goes to
+the day's late file instead, which readers scan in full. Open rollup
+buckets are persisted once complete by a background thread, and at exit.
+
+Open buckets live in the memory of the process that appended the samples:
+queries merge them only in that process, so other workers see a bucket once
+it has been persisted. Within a process, ``get_time_series_store`` shares one
+store, and so one flush thread, per directory.
+"""
+
+import atexit
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone, date
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; appends are then only ordered per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RAW_RECORD = struct.Struct('<dd')        # timestamp, value
+ROLLUP_RECORD = struct.Struct('<dQddd')  # bucket_start, count, sum, min, max
+
+# Rollup resolutions in seconds
+RESOLUTIONS = {
+    '1m': 60,
+    '1h': 3600,
+    '1d': 86400,
+}
+
+
+def to_epoch(value: Union[datetime, float, int]) -> float:
+    """Convert a naive-UTC datetime (or epoch seconds) to epoch seconds."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def from_epoch(ts: float) -> datetime:
+    """Convert epoch seconds to a naive-UTC datetime."""
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+
+class _TimestampView:
+    """Sequence view over the leading timestamp of each fixed-width record.
+
+    Lets ``bisect`` search a memory-mapped file without decoding it.
+    """
+
+    def __init__(self, buffer, record: struct.Struct, size: int):
+        self.buffer = buffer
+        self.record = record
+        self.length = size // record.size
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> float:
+        return struct.unpack_from('<d', self.buffer, index * self.record.size)[0]
+
+
+class TimeSeriesStore:
+    """Append-only binary store for numeric metrics with rollups.
+
+    Each instance starts its own flush thread and exit hook, and keeps its
+    own open buckets; use ``get_time_series_store`` for the shared instance
+    of a directory, and ``close()`` (or ``with``) for short-lived ones.
+    """
+
+    def __init__(self, storage_dir: Union[str, Path] = "data/metrics", flush_interval: float = 60.0):
+        """
+        Args:
+            storage_dir: Directory holding the metric files
+            flush_interval: Seconds between persisting completed rollup
+                buckets in the background; 0 disables the thread
+        """
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # (metric, resolution) -> [bucket_start, count, sum, min, max]
+        self._open_buckets: Dict[Tuple[str, str], List[float]] = {}
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if flush_interval:
+            self._thread = threading.Thread(target=self._run, name='metrics-rollup-flush', daemon=True)
+            self._thread.start()
+        atexit.register(self._flush_at_exit)
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    def file_path(self, metric_name: str, kind: str, day: Union[date, datetime]) -> Path:
+        """Get the file holding ``kind`` records for a metric on a given day."""
+        return self.storage_dir / f"{metric_name}_{kind}_{day.strftime('%Y-%m-%d')}.bin"
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, metric_name: str, value: float, timestamp: Optional[datetime] = None) -> None:
+        """Append a single sample and update the rollups."""
+        ts = to_epoch(timestamp if timestamp is not None else datetime.utcnow())
+        value = float(value)
+
+        with self._lock:
+            self._write(self.file_path(metric_name, 'raw', from_epoch(ts)),
+                        RAW_RECORD.pack(ts, value))
+
+            for resolution, step in RESOLUTIONS.items():
+                bucket_start = ts - (ts % step)
+                key = (metric_name, resolution)
+                bucket = self._open_buckets.get(key)
+
+                if bucket is None or bucket[0] < bucket_start:
+                    # The previous bucket is complete; persist it and start a new one
+                    if bucket is not None:
+                        self._write_bucket(metric_name, resolution, bucket)
+                    self._open_buckets[key] = [bucket_start, 1, value, value, value]
+                elif bucket[0] == bucket_start:
+                    bucket[1] += 1
+                    bucket[2] += value
+                    bucket[3] = min(bucket[3], value)
+                    bucket[4] = max(bucket[4], value)
+                else:
+                    # Late sample for an already persisted bucket: append a
+                    # partial record, readers merge records by bucket_start.
+                    self._write_bucket(metric_name, resolution,
+                                       [bucket_start, 1, value, value, value])
+
+    def flush(self) -> None:
+        """Persist all open rollup buckets."""
+        with self._lock:
+            for (metric_name, resolution), bucket in self._open_buckets.items():
+                self._write_bucket(metric_name, resolution, bucket)
+            self._open_buckets.clear()
+
+    def flush_completed(self, now: Optional[float] = None) -> int:
+        """Persist open rollup buckets whose period has ended. Returns the number written."""
+        now = time.time() if now is None else now
+        with self._lock:
+            done = [
+                key for key, bucket in self._open_buckets.items()
+                if bucket[0] + RESOLUTIONS[key[1]] <= now
+            ]
+            for key in done:
+                self._write_bucket(key[0], key[1], self._open_buckets.pop(key))
+        return len(done)
+
+    def _flush_at_exit(self) -> None:
+        try:
+            self.flush()
+        except OSError as e:
+            logger.error(f"Could not persist metric rollups at exit: {str(e)}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush_completed()
+            except Exception as e:
+                logger.error(f"Could not persist metric rollups: {str(e)}")
+
+    def close(self) -> None:
+        """Stop the background thread, persist all open buckets and drop the exit hook."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+        atexit.unregister(self._flush_at_exit)
+
+    def __enter__(self) -> 'TimeSeriesStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _write_bucket(self, metric_name: str, resolution: str, bucket: List[float]) -> None:
+        start, count, total, low, high = bucket
+        self._write(self.file_path(metric_name, resolution, from_epoch(start)),
+                    ROLLUP_RECORD.pack(start, int(count), total, low, high))
+
+    @staticmethod
+    def late_path(path: Path) -> Path:
+        """The late file paired with a main file."""
+        metric_kind, day = path.stem.rsplit('_', 1)
+        return path.with_name(f"{metric_kind}-late_{day}{path.suffix}")
+
+    def _write(self, path: Path, payload: bytes) -> None:
+        """Append a record, or route it to the late file if it is older than the last one."""
+        ts = struct.unpack_from('<d', payload)[0]
+        size = len(payload)
+        with open(path, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                end = f.seek(0, os.SEEK_END)
+                end -= end % size
+                if end >= size:
+                    f.seek(end - size)
+                    if struct.unpack('<d', f.read(8))[0] > ts:
+                        with open(self.late_path(path), 'ab') as late:
+                            late.write(payload)
+                        return
+                # A single write() on an O_APPEND file keeps records intact across workers
+                f.write(payload)
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _scan(self, path: Path, record: struct.Struct, start: float, end: float) -> List[tuple]:
+        """Records of ``path`` and its late file with start <= timestamp <= end."""
+        rows = self._scan_sorted(path, record, start, end)
+        late = self.late_path(path)
+        if late.exists():
+            data = late.read_bytes()
+            data = data[:len(data) - len(data) % record.size]
+            rows.extend(row for row in record.iter_unpack(data) if start <= row[0] <= end)
+            rows.sort(key=lambda row: row[0])
+        return rows
+
+    def _scan_sorted(self, path: Path, record: struct.Struct, start: float, end: float) -> List[tuple]:
+        """Decode only the records of sorted ``path`` with start <= timestamp <= end."""
+        if not path.exists():
+            return []
+        size = path.stat().st_size - path.stat().st_size % record.size
+        if size <= 0:
+            return []
+
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                view = _TimestampView(buffer, record, size)
+                lo = bisect.bisect_left(view, start)
+                hi = bisect.bisect_right(view, end, lo)
+                return [record.unpack_from(buffer, i * record.size) for i in range(lo, hi)]
+
+    @staticmethod
+    def _days(start: float, end: float) -> List[date]:
+        current = from_epoch(start).date()
+        last = from_epoch(end).date()
+        days = []
+        while current <= last:
+            days.append(current)
+            current += timedelta(days=1)
+        return days
+
+    def query_raw(self, metric_name: str, start: datetime, end: datetime) -> List[Tuple[float, float]]:
+        """Return raw (timestamp, value) samples in the range."""
+        start_ts, end_ts = to_epoch(start), to_epoch(end)
+        samples = []
+        for day in self._days(start_ts, end_ts):
+            samples.extend(self._scan(self.file_path(metric_name, 'raw', day),
+                                      RAW_RECORD, start_ts, end_ts))
+        return samples
+
+    def query(
+        self,
+        metric_name: str,
+        start: datetime,
+        end: datetime,
+        resolution: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return rollup buckets for a metric in a time range.
+
+        Args:
+            metric_name: Name of the metric
+            start: Start of the range (naive UTC)
+            end: End of the range (naive UTC)
+            resolution: '1m', '1h' or '1d'. Picked from the range span if omitted.
+
+        Returns:
+            List of bucket dictionaries ordered by time
+        """
+        start_ts, end_ts = to_epoch(start), to_epoch(end)
+        resolution = resolution or self.pick_resolution(end_ts - start_ts)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unsupported resolution: {resolution}")
+
+        # Align to the bucket containing ``start`` so partial buckets are included
+        first_bucket = start_ts - (start_ts % RESOLUTIONS[resolution])
+
+        buckets: Dict[float, List[float]] = {}
+        for day in self._days(first_bucket, end_ts):
+            for row in self._scan(self.file_path(metric_name, resolution, day),
+                                  ROLLUP_RECORD, first_bucket, end_ts):
+                self._merge(buckets, list(row))
+
+        with self._lock:
+            bucket = self._open_buckets.get((metric_name, resolution))
+            if bucket is not None and first_bucket <= bucket[0] <= end_ts:
+                self._merge(buckets, list(bucket))
+
+        return [
+            {
+                'timestamp': from_epoch(bucket_start),
+                'count': int(count),
+                'sum': total,
+                'min': low,
+                'max': high,
+                'avg': total / count if count else 0.0,
+            }
+            for bucket_start, (count, total, low, high) in sorted(
+                (k, v[1:]) for k, v in buckets.items()
+            )
+        ]
+
+    @staticmethod
+    def _merge(buckets: Dict[float, List[float]], row: List[float]) -> None:
+        existing = buckets.get(row[0])
+        if existing is None:
+            buckets[row[0]] = row
+        else:
+            existing[1] += row[1]
+            existing[2] += row[2]
+            existing[3] = min(existing[3], row[3])
+            existing[4] = max(existing[4], row[4])
+
+    @staticmethod
+    def pick_resolution(span_seconds: float) -> str:
+        """Choose the coarsest resolution that still gives a useful chart."""
+        if span_seconds <= 6 * 3600:
+            return '1m'
+        if span_seconds <= 7 * 86400:
+            return '1h'
+        return '1d'
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def cleanup(self, cutoff: date) -> int:
+        """Remove every file dated before ``cutoff``. Returns the number removed."""
+        removed = 0
+        for file_path in self.storage_dir.iterdir():
+            try:
+                file_date_str = file_path.stem.split('_')[-1]
+                file_date = datetime.strptime(file_date_str, "%Y-%m-%d").date()
+            except (ValueError, IndexError):
+                continue
+            if file_date < cutoff:
+                file_path.unlink()
+                removed += 1
+                logger.info(f"Removed old metrics file: {file_path}")
+        return removed
+
+
+_stores: Dict[str, TimeSeriesStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_time_series_store(storage_dir: Union[str, Path], **kwargs) -> TimeSeriesStore:
+    """Get the shared store for a directory, replacing it if it was closed."""
+    key = str(Path(storage_dir).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store._stop.is_set():
+            store = _stores[key] = TimeSeriesStore(storage_dir, **kwargs)
+        return store
@@ -0,0 +1,223 @@
+"""
+Near-Duplicate Detection
+
+MinHash LSH for spotting syndicated copies of the same article that arrive
+under different URLs:
+1. Tokens are reduced to word 3-shingles; a 128-value MinHash signature
+   estimates the Jaccard similarity of two articles' shingle sets
+2. Signatures are cut into 16 bands of 8 values and each band is hashed into
+   an indexed table. Articles sharing a band are candidates, so lookups are
+   index probes rather than a table scan; candidates are then confirmed
+   against ``DUPLICATE_THRESHOLD``
+3. URLs of skipped copies are kept as aliases of the stored article
+"""
+
+import hashlib
+import sqlite3
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .keyword_extractor import tokenize
+
+SHINGLE_SIZE = 3
+
+# Texts with fewer shingles than this are too short to compare reliably
+MIN_SHINGLES = 20
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity at which an article counts as a copy. With 16x8
+# bands a pair at 0.8 becomes a candidate ~95% of the time, at 0.85 ~99%.
+DUPLICATE_THRESHOLD = 0.8
+
+# Multiply-shift hash family; fixed so signatures stay comparable across runs
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+_SHINGLE_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def minhash(tokens: Sequence[str]) -> Optional[np.ndarray]:
+    """MinHash signature of the tokens' 3-shingles, or None for short texts."""
+    if len(tokens) < SHINGLE_SIZE:
+        return None
+    # Hash each token once, then combine neighbours into shingle hashes
+    token_hashes = np.fromiter((zlib.crc32(t.encode('utf-8')) for t in tokens), dtype=np.uint64, count=len(tokens))
+    with np.errstate(over='ignore'):
+        combined = token_hashes[:1 - SHINGLE_SIZE].copy()
+        for offset in range(1, SHINGLE_SIZE):
+            end = len(token_hashes) - SHINGLE_SIZE + 1 + offset
+            combined = combined * _SHINGLE_MIX + token_hashes[offset:end]
+        shingles = np.unique(combined)
+        if len(shingles) < MIN_SHINGLES:
+            return None
+        permuted = (shingles[:, None] * _PERM_A + _PERM_B) >> _SHIFT
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def band_hashes(signature: np.ndarray) -> List[int]:
+    """One signed 64-bit key per band (the band number is part of the key)."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index and URL aliases for stored articles."""
+
+    def __init__(self, db: sqlite3.Connection, threshold: float = DUPLICATE_THRESHOLD, setup: bool = True):
+        self.db = db
+        self.threshold = threshold
+        if setup:
+            self.setup_database()
+
+    def setup_database(self) -> None:
+        """Initialize the signature, band and alias tables if they don't exist."""
+        cursor = self.db.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_minhash (
+                article_id INTEGER PRIMARY KEY,
+                signature BLOB NOT NULL,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_minhash_bands (
+                band_hash INTEGER NOT NULL,
+                article_id INTEGER NOT NULL,
+                PRIMARY KEY (band_hash, article_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_aliases (
+                url TEXT PRIMARY KEY,
+                article_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (article_id) REFERENCES articles (id)
+            )
+        ''')
+        self.db.commit()
+
+    def find(self, signature: np.ndarray, bands: Optional[List[int]] = None) -> Optional[int]:
+        """ID of the most similar stored article at or above the threshold."""
+        bands = bands or band_hashes(signature)
+        rows = self.db.execute(f'''
+            SELECT m.article_id, m.signature FROM article_minhash m
+            WHERE m.article_id IN (
+                SELECT article_id FROM article_minhash_bands WHERE band_hash IN ({', '.join(['?'] * len(bands))})
+            )
+        ''', bands).fetchall()
+        best = None
+        for article_id, stored in rows:
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, article_id)
+        return best[1] if best else None
+
+    def add(self, entries: Iterable[Tuple[int, np.ndarray]]) -> None:
+        """Store ``(article_id, signature)`` pairs; runs in the caller's transaction."""
+        entries = list(entries)
+        self.db.executemany(
+            'INSERT OR REPLACE INTO article_minhash (article_id, signature) VALUES (?, ?)',
+            [(article_id, signature.tobytes()) for article_id, signature in entries]
+        )
+        self.db.executemany(
+            'INSERT OR IGNORE INTO article_minhash_bands (band_hash, article_id) VALUES (?, ?)',
+            [(band, article_id) for article_id, signature in entries for band in band_hashes(signature)]
+        )
+
+    def add_aliases(self, aliases: Dict[str, int]) -> None:
+        """Record URLs of skipped copies; runs in the caller's transaction."""
+        self.db.executemany(
+            'INSERT OR IGNORE INTO article_aliases (url, article_id) VALUES (?, ?)', aliases.items()
+        )
+
+    def aliases_for(self, urls: Sequence[str]) -> Dict[str, int]:
+        """Article IDs for URLs previously skipped as duplicates."""
+        found = {}
+        for start in range(0, len(urls), 500):
+            chunk = list(urls[start:start + 500])
+            found.update(self.db.execute(
+                f"SELECT url, article_id FROM article_aliases WHERE url IN ({', '.join(['?'] * len(chunk))})",
+                chunk
+            ).fetchall())
+        return found
+
+    def deduplicate(self, tokens: Dict[str, Sequence[str]]) -> Tuple[Dict[str, int], Dict[str, np.ndarray], Dict[str, str]]:
+        """
+        Split candidate articles into duplicates and keepers.
+
+        Args:
+            tokens: Tokens (see ``keyword_extractor.tokenize``) per URL for
+                articles about to be inserted
+
+        Returns:
+            Tuple of (duplicates of stored articles as url -> article ID,
+            signatures of the articles to keep as url -> signature,
+            copies within the batch as url -> URL of the kept copy)
+        """
+        duplicates, keep, in_batch = {}, {}, {}
+        batch_bands: Dict[int, List[str]] = {}
+
+        for url, url_tokens in tokens.items():
+            signature = minhash(url_tokens)
+            if signature is None:
+                continue
+
+            bands = band_hashes(signature)
+            existing = self.find(signature, bands)
+            if existing is not None:
+                duplicates[url] = existing
+                continue
+
+            twin = max(
+                {other for band in bands for other in batch_bands.get(band, [])},
+                key=lambda other: similarity(signature, keep[other]),
+                default=None
+            )
+            if twin is not None and similarity(signature, keep[twin]) >= self.threshold:
+                in_batch[url] = twin
+                continue
+
+            keep[url] = signature
+            for band in bands:
+                batch_bands.setdefault(band, []).append(url)
+
+        return duplicates, keep, in_batch
+
+    def backfill(self, batch_size: int = 1000) -> int:
+        """Sign stored articles that don't have a signature yet; returns the number added."""
+        added = 0
+        last_id = 0
+        while True:
+            rows = self.db.execute('''
+                SELECT a.id, a.title, a.description, a.content FROM articles a
+                LEFT JOIN article_minhash m ON m.article_id = a.id
+                WHERE m.article_id IS NULL AND a.id > ?
+                ORDER BY a.id LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                return added
+
+            entries = []
+            for article_id, title, description, content in rows:
+                signature = minhash(tokenize(f"{title} {description} {content}"))
+                if signature is not None:
+                    entries.append((article_id, signature))
+            with self.db:
+                self.add(entries)
+            added += len(entries)
+            last_id = rows[-1][0]
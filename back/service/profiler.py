@@ -0,0 +1,257 @@
+"""
+Sampling Profiler
+
+This module provides low-overhead CPU profiling of the running process:
+1. On-demand capture: sample every thread's stack for N seconds
+2. Optional always-on sampler that keeps the last hour of aggregated stacks
+   in a ring buffer of one-minute buckets
+
+Samples are taken with ``sys._current_frames()`` from a separate thread, so
+profiled code is not instrumented. Results are returned in the collapsed-stack
+format (``frame;frame;frame count`` per line) accepted by flamegraph.pl,
+speedscope and inferno.
+
+The app runs under ``eventlet.monkey_patch()``, which turns threads into
+greenlets sharing one OS thread. ``sys._current_frames()`` only sees OS
+threads, so the samplers run on unpatched OS threads: the OS thread's current
+frame is then whichever greenlet is running.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_CAPTURE_SECONDS = 120
+DEFAULT_INTERVAL = 0.005       # 200 Hz for on-demand captures
+CONTINUOUS_INTERVAL = 0.1      # 10 Hz for the always-on sampler
+BUCKET_SECONDS = 60
+RETENTION_BUCKETS = 60         # one hour of one-minute buckets
+
+# Leaf frames of threads that are blocked rather than using CPU
+IDLE_LEAVES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('socket.py', 'accept'),
+    ('socketserver.py', 'serve_forever'),
+    # eventlet hubs waiting for I/O
+    ('poll.py', 'wait'),
+    ('selects.py', 'wait'),
+    ('kqueue.py', 'wait'),
+}
+
+# Key eventlet's patcher records for each module it monkey-patches
+_PATCH_KEYS = {'threading': 'thread', 'time': 'time'}
+
+
+def _native(module):
+    """``module`` as it was before eventlet monkey-patched it (itself if it wasn't)."""
+    patcher = sys.modules.get('eventlet.patcher')
+    if patcher is None or not patcher.is_monkey_patched(_PATCH_KEYS[module.__name__]):
+        return module
+    return patcher.original(module.__name__)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_frame(frame, include_idle: bool = False) -> Optional[str]:
+    """
+    Collapse a frame and its callers into a root-first ``a;b;c`` string.
+
+    Returns None for threads whose leaf frame is a known blocking call,
+    unless ``include_idle`` is set.
+    """
+    if not include_idle:
+        leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+        if leaf in IDLE_LEAVES:
+            return None
+
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+def sample_stacks(
+    counter: Counter,
+    exclude: Iterable[int] = (),
+    include_idle: bool = False
+) -> None:
+    """Add one sample of every thread's current stack to ``counter``."""
+    excluded = set(exclude)
+    for thread_id, frame in sys._current_frames().items():
+        if thread_id in excluded:
+            continue
+        stack = collapse_frame(frame, include_idle)
+        if stack:
+            counter[stack] += 1
+
+
+def to_collapsed(counter: Counter) -> str:
+    """Render aggregated stacks in collapsed-stack format."""
+    return ''.join(f"{stack} {count}\n" for stack, count in sorted(counter.items()))
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when an on-demand capture is already running."""
+
+
+_capture_lock = _native(threading).Lock()
+
+
+def capture(
+    seconds: float,
+    interval: float = DEFAULT_INTERVAL,
+    include_idle: bool = False
+) -> Tuple[Counter, int]:
+    """
+    Sample all other threads of this process for ``seconds``.
+
+    The calling thread does the sampling and is excluded from the profile.
+    Under eventlet the caller is a greenlet, so an OS thread samples instead
+    while the caller yields to the hub. Only one capture runs at a time.
+
+    Args:
+        seconds: Capture duration, capped at MAX_CAPTURE_SECONDS
+        interval: Seconds between samples
+        include_idle: Keep stacks of threads blocked in waits/selects
+
+    Returns:
+        Tuple of (stack counter, number of sampling passes)
+
+    Raises:
+        ProfilerBusyError: If another capture is in progress
+    """
+    seconds = max(0.0, min(float(seconds), MAX_CAPTURE_SECONDS))
+    interval = max(float(interval), 0.001)
+
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile capture is already running")
+
+    try:
+        native = _native(threading)
+        if native is threading:
+            return _sample_for(seconds, interval, include_idle)
+
+        result = []
+        sampler = native.Thread(
+            target=lambda: result.append(_sample_for(seconds, interval, include_idle)),
+            name='profiler-capture',
+            daemon=True
+        )
+        sampler.start()
+        while sampler.is_alive():
+            time.sleep(interval)  # green sleep: lets the profiled greenlets run
+        if not result:
+            raise RuntimeError("Profile capture failed")
+        return result[0]
+    finally:
+        _capture_lock.release()
+
+
+def _sample_for(seconds: float, interval: float, include_idle: bool) -> Tuple[Counter, int]:
+    """Sample every thread but the current one (and the continuous sampler) for ``seconds``."""
+    counter: Counter = Counter()
+    exclude = {_native(threading).get_ident()}
+    if continuous_profiler.thread_id is not None:
+        exclude.add(continuous_profiler.thread_id)
+
+    sleep = _native(time).sleep
+    passes = 0
+    deadline = time.perf_counter() + seconds
+    next_sample = time.perf_counter()
+    while True:
+        sample_stacks(counter, exclude, include_idle)
+        passes += 1
+        next_sample += interval
+        now = time.perf_counter()
+        if next_sample >= deadline:
+            break
+        if next_sample > now:
+            sleep(next_sample - now)
+    return counter, passes
+
+
+class ContinuousProfiler:
+    """Low-rate background sampler with a ring buffer of per-minute stacks."""
+
+    def __init__(
+        self,
+        interval: float = CONTINUOUS_INTERVAL,
+        retention_buckets: int = RETENTION_BUCKETS
+    ):
+        self.interval = interval
+        self.buckets: Deque[Tuple[int, Counter]] = deque(maxlen=retention_buckets)
+        self.thread_id: Optional[int] = None
+        # Shared with the sampler's OS thread, so never green primitives
+        self._lock = _native(threading).Lock()
+        self._stop = _native(threading).Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Start the background sampler if it is not already running."""
+        if self.running:
+            return
+        if interval:
+            self.interval = interval
+        self._stop.clear()
+        self._thread = _native(threading).Thread(target=self._run, name='continuous-profiler', daemon=True)
+        self._thread.start()
+        logger.info(f"Continuous profiler started ({1 / self.interval:.0f} Hz)")
+
+    def stop(self) -> None:
+        """Stop the background sampler. Collected buckets are kept."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.thread_id = None
+
+    def _run(self) -> None:
+        self.thread_id = _native(threading).get_ident()
+        while not self._stop.wait(self.interval):
+            sample: Counter = Counter()
+            try:
+                sample_stacks(sample, exclude=(self.thread_id,))
+            except Exception as e:
+                logger.error(f"Continuous profiler sample failed: {str(e)}")
+                continue
+            self.record(sample)
+
+    def record(self, sample: Counter, now: Optional[float] = None) -> None:
+        """Add a sample to the bucket for the current minute."""
+        bucket_start = int(now if now is not None else time.time()) // BUCKET_SECONDS * BUCKET_SECONDS
+        with self._lock:
+            if not self.buckets or self.buckets[-1][0] != bucket_start:
+                self.buckets.append((bucket_start, Counter()))
+            self.buckets[-1][1].update(sample)
+
+    def snapshot(self, minutes: Optional[int] = None, now: Optional[float] = None) -> Counter:
+        """Aggregate the stacks of the last ``minutes`` (default: everything kept)."""
+        now = now if now is not None else time.time()
+        since = now - minutes * BUCKET_SECONDS if minutes else float('-inf')
+        total: Counter = Counter()
+        with self._lock:
+            for bucket_start, counter in self.buckets:
+                if bucket_start + BUCKET_SECONDS > since:
+                    total.update(counter)
+        return total
+
+
+# Process-wide sampler, started from create_app when PROFILER_CONTINUOUS is set
+continuous_profiler = ContinuousProfiler()
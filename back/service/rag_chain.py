@@ -0,0 +1,50 @@
+"""
+RAG Chain Builder
+
+This module assembles the retrieval-augmented generation chain used by the
+``/api/general`` endpoint. The retriever and LLM are passed in so the same
+chain can be built against Pinecone and Groq in production or against local
+stand-ins for benchmarking.
+"""
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain.chains import create_retrieval_chain
+from langchain.chains.combine_documents import create_stuff_documents_chain
+
+from .prompt import system_prompt as default_system_prompt
+
+
+def build_rag_chain(retriever, llm, system_prompt: str = default_system_prompt):
+    """
+    Build the RAG chain from a retriever and an LLM.
+
+    The chain expects ``{"input": ..., "question": ...}`` as input (the system
+    prompt references ``{question}``) and returns a dict with ``answer`` and
+    ``context`` keys.
+
+    Args:
+        retriever: A LangChain retriever (or runnable) returning documents
+        llm: A LangChain chat model
+        system_prompt: System prompt template with ``{context}`` and ``{question}``
+
+    Returns:
+        Runnable: The retrieval chain
+    """
+    # Create a prompt template with system and user messages
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("human", "{input}"),
+    ])
+
+    # Create the document chain
+    combine_docs_chain = create_stuff_documents_chain(
+        llm=llm,
+        prompt=prompt,
+        document_variable_name="context"
+    )
+
+    # Create the RAG chain
+    return create_retrieval_chain(
+        retriever=retriever,
+        combine_docs_chain=combine_docs_chain
+    )
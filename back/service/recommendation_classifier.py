@@ -0,0 +1,165 @@
+"""
+Recommendation Classifier
+
+Labels recommendation text as 'food', 'lifestyle' or 'general':
+1. Keyword sets (with plural forms) are compiled into one hash set; a
+   document is split into words once and intersected with it, so it is
+   scanned once and "eat" no longer matches inside "heat" or "great"
+2. Documents with no clear keyword winner can be labelled by the nearest
+   category centroid, using the document vectors computed for the index
+3. Labels are computed when chunks are indexed and stored in their metadata
+   (``classification``), so serving only classifies documents indexed
+   before labels were stored
+"""
+
+import string
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CATEGORY = 'general'
+
+FOOD_KEYWORDS = (
+    'food', 'diet', 'meal', 'eat', 'eating', 'nutrition', 'consume', 'dish', 'recipe',
+    'fruit', 'vegetable', 'spice', 'herb', 'grain', 'dairy', 'ghee', 'oil',
+    'breakfast', 'lunch', 'dinner', 'snack', 'drink', 'beverage', 'tea'
+)
+
+LIFESTYLE_KEYWORDS = (
+    'exercise', 'yoga', 'meditation', 'sleep', 'routine', 'habit', 'practice',
+    'activity', 'rest', 'massage', 'bath', 'oil', 'abhyanga', 'lifestyle',
+    'morning', 'evening', 'ritual', 'cleanse', 'detox', 'breathing', 'pranayama'
+)
+
+CATEGORY_KEYWORDS = {
+    'food': FOOD_KEYWORDS,
+    'lifestyle': LIFESTYLE_KEYWORDS,
+}
+
+# Characters that separate words (str.translate is much faster than a regex split)
+_SEPARATORS = str.maketrans(dict.fromkeys(
+    string.punctuation + string.digits + '\u2018\u2019\u201c\u201d\u2013\u2014\u2026\u2022', ' '
+))
+
+
+class KeywordClassifier:
+    """Counts the distinct keywords of each category found in a document."""
+
+    def __init__(self, category_keywords: Dict[str, Sequence[str]] = CATEGORY_KEYWORDS,
+                 default: str = DEFAULT_CATEGORY):
+        self.categories = list(category_keywords)
+        self.default = default
+        self._keyword_categories: Dict[str, Tuple[str, ...]] = {}
+        for category, keywords in category_keywords.items():
+            for keyword in keywords:
+                self._keyword_categories[keyword] = self._keyword_categories.get(keyword, ()) + (category,)
+        # Word form -> keyword; plurals count as the keyword
+        self._forms: Dict[str, str] = {}
+        for keyword in self._keyword_categories:
+            for suffix in ('es', 's', ''):
+                self._forms[keyword + suffix] = keyword
+        self._form_set = frozenset(self._forms)
+
+    def scores(self, content: str) -> Dict[str, int]:
+        """Number of distinct keywords of each category in the content."""
+        words = content.lower().translate(_SEPARATORS).split()
+        scores = dict.fromkeys(self.categories, 0)
+        for keyword in {self._forms[word] for word in self._form_set.intersection(words)}:
+            for category in self._keyword_categories[keyword]:
+                scores[category] += 1
+        return scores
+
+    def classify(self, content: str) -> str:
+        """The category with the most keywords, or the default on a tie."""
+        best, best_score, tied = self.default, 0, False
+        for category, score in self.scores(content).items():
+            if score > best_score:
+                best, best_score, tied = category, score, False
+            elif score == best_score:
+                tied = True
+        return self.default if tied else best
+
+    def classify_many(self, contents: Sequence[str]) -> List[str]:
+        return [self.classify(content) for content in contents]
+
+
+class CentroidClassifier:
+    """Nearest category centroid by cosine similarity."""
+
+    def __init__(self, centroids: Dict[str, Sequence[float]], margin: float = 0.02):
+        """
+        Args:
+            centroids: Category -> vector in the document embedding space
+            margin: Minimum similarity lead of the nearest centroid over the
+                runner-up; closer calls are left unlabelled
+        """
+        self.categories = list(centroids)
+        self.margin = margin
+        self._centroids = self._normalize(np.asarray([centroids[c] for c in self.categories], dtype=np.float32))
+
+    @classmethod
+    def from_keywords(cls, embed_documents: Callable[[List[str]], List[List[float]]],
+                      category_keywords: Dict[str, Sequence[str]] = CATEGORY_KEYWORDS,
+                      margin: float = 0.02) -> 'CentroidClassifier':
+        """Centroids from embedding each category's keyword list."""
+        categories = list(category_keywords)
+        vectors = embed_documents([', '.join(category_keywords[c]) for c in categories])
+        return cls(dict(zip(categories, vectors)), margin=margin)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def classify_vectors(self, vectors: Sequence[Sequence[float]]) -> List[Optional[str]]:
+        """The nearest category per vector, or None when no centroid is clearly nearest."""
+        if len(vectors) == 0:
+            return []
+        sims = self._normalize(np.asarray(vectors, dtype=np.float32)) @ self._centroids.T
+        if len(self.categories) == 1:
+            return [self.categories[0]] * len(sims)
+        order = np.argsort(-sims, axis=1)
+        rows = np.arange(len(sims))
+        lead = sims[rows, order[:, 0]] - sims[rows, order[:, 1]]
+        return [
+            self.categories[best] if margin >= self.margin else None
+            for best, margin in zip(order[:, 0], lead)
+        ]
+
+
+class RecommendationClassifier:
+    """
+    Keyword classification, with centroids deciding documents the keywords
+    leave at the default category.
+    """
+
+    def __init__(self, keywords: Optional[KeywordClassifier] = None,
+                 centroids: Optional[CentroidClassifier] = None):
+        self.keywords = keywords or KeywordClassifier()
+        self.centroids = centroids
+
+    def classify(self, content: str) -> str:
+        return self.keywords.classify(content)
+
+    def classify_many(self, contents: Sequence[str],
+                      vectors: Optional[Sequence[Sequence[float]]] = None) -> List[str]:
+        """
+        Classify a batch of documents.
+
+        Args:
+            contents: Document texts
+            vectors: Their embeddings, if already computed (enables centroids)
+        """
+        labels = self.keywords.classify_many(contents)
+        if self.centroids is None or vectors is None:
+            return labels
+        undecided = [i for i, label in enumerate(labels) if label == self.keywords.default]
+        if undecided:
+            nearest = self.centroids.classify_vectors([vectors[i] for i in undecided])
+            for i, label in zip(undecided, nearest):
+                if label is not None:
+                    labels[i] = label
+        return labels
+
+
+default_classifier = RecommendationClassifier()
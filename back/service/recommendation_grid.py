@@ -0,0 +1,225 @@
+"""
+Recommendation Grid
+
+Precomputed recommendations for requests without free text. Without a query
+or health concern, the search text depends only on:
+1. The dosha combination (7: each dosha, each pair, all three)
+2. The season (5, or unspecified)
+3. The time of day (4, or unspecified)
+4. The weather bucket: temperature hot/moderate/cold crossed with humidity
+   high/dry/normal (9, or no weather data)
+
+so the ranked results of every cell are materialized into SQLite after each
+index build, and those requests are answered with one primary-key lookup
+instead of an embedding call and a vector search.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+from itertools import combinations, product
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .sqlite_pool import SQLitePool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'ayurveda.db')
+
+# Recommendations stored per cell; requests for more go to the vector store
+MATERIALIZED_TOP_K = 20
+
+DOSHAS = ('Vata', 'Pitta', 'Kapha')
+SEASONS = ('Spring', 'Summer', 'Monsoon', 'Autumn', 'Winter')
+TIMES_OF_DAY = ('Morning', 'Afternoon', 'Evening', 'Night')
+
+SEASON_ALIASES = {'fall': 'Autumn', 'rainy': 'Monsoon'}
+
+# Thresholds used to describe weather in search queries
+HOT_ABOVE = 30
+COLD_BELOW = 15
+HUMID_ABOVE = 70
+DRY_BELOW = 30
+
+# A temperature and humidity inside each bucket, used to build the grid
+WEATHER_SAMPLES = {
+    'temperature': (35, 22, 10),
+    'humidity': (80, 50, 20),
+}
+
+GRID_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS recommendation_grid (
+        cell TEXT PRIMARY KEY,
+        recommendations TEXT NOT NULL,
+        depth INTEGER NOT NULL,
+        built_at TEXT NOT NULL
+    ) WITHOUT ROWID
+'''
+
+_DOSHA_SEPARATORS = re.compile(r'[\s,/+&-]+|\band\b', re.I)
+
+
+def weather_descriptors(weather_data: Optional[Dict[str, Any]]) -> List[str]:
+    """Phrases describing temperature and humidity, as used in search queries."""
+    if not weather_data:
+        return []
+    descriptors = []
+    if 'temperature' in weather_data:
+        temp = weather_data['temperature']
+        if temp > HOT_ABOVE:
+            descriptors.append("hot weather")
+        elif temp < COLD_BELOW:
+            descriptors.append("cold weather")
+        else:
+            descriptors.append("moderate temperature")
+    if 'humidity' in weather_data:
+        humidity = weather_data['humidity']
+        if humidity > HUMID_ABOVE:
+            descriptors.append("high humidity")
+        elif humidity < DRY_BELOW:
+            descriptors.append("dry conditions")
+    return descriptors
+
+
+def normalize_dosha(dosha: Optional[str]) -> Optional[str]:
+    """Canonical spelling of a dosha combination ('pitta/vata' -> 'Vata-Pitta'), or None."""
+    if not dosha:
+        return None
+    parts = {part.lower() for part in _DOSHA_SEPARATORS.split(dosha) if part}
+    known = {name.lower() for name in DOSHAS}
+    if not parts or not parts <= known:
+        return None
+    return '-'.join(name for name in DOSHAS if name.lower() in parts)
+
+
+def _normalize_choice(value: Optional[str], choices: Tuple[str, ...], aliases: Dict[str, str] = None) -> Optional[str]:
+    """'' for unspecified, the canonical choice, or None when outside the grid."""
+    if not value:
+        return ''
+    value = value.strip().lower()
+    value = (aliases or {}).get(value, value)
+    for choice in choices:
+        if choice.lower() == value.lower():
+            return choice
+    return None
+
+
+def cell_key(dosha: Optional[str], season: Optional[str] = None, time_of_day: Optional[str] = None,
+             weather_data: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Grid cell for a request, or None when it falls outside the grid.
+
+    Returns:
+        "<dosha>|<season>|<time of day>|<weather descriptors>", e.g.
+        "Vata-Pitta|Winter||cold weather, dry conditions"
+    """
+    dosha = normalize_dosha(dosha)
+    season = _normalize_choice(season, SEASONS, SEASON_ALIASES)
+    time_of_day = _normalize_choice(time_of_day, TIMES_OF_DAY)
+    if dosha is None or season is None or time_of_day is None:
+        return None
+    return '|'.join((dosha, season, time_of_day, ', '.join(weather_descriptors(weather_data))))
+
+
+def grid_cells() -> Iterator[Dict[str, Any]]:
+    """Request parameters for one representative of every cell."""
+    doshas = [
+        '-'.join(combo) for n in range(1, len(DOSHAS) + 1)
+        for combo in combinations(DOSHAS, n)
+    ]
+    weathers = [None] + [
+        {'temperature': temperature, 'humidity': humidity}
+        for temperature, humidity in product(WEATHER_SAMPLES['temperature'], WEATHER_SAMPLES['humidity'])
+    ]
+    for dosha, season, time_of_day, weather_data in product(
+        doshas, ('',) + SEASONS, ('',) + TIMES_OF_DAY, weathers
+    ):
+        yield {'dosha': dosha, 'season': season, 'time_of_day': time_of_day, 'weather_data': weather_data}
+
+
+class RecommendationGrid:
+    """Materialized recommendations for every cell of the grid."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, pool_size: int = 8):
+        self.pool = SQLitePool(db_path, size=pool_size, setup=self._setup)
+
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> None:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(GRID_SCHEMA)
+        conn.commit()
+
+    def lookup(self, dosha: Optional[str] = None, season: Optional[str] = None,
+               time_of_day: Optional[str] = None, weather_data: Optional[Dict[str, Any]] = None,
+               top_k: int = 5, query: Optional[str] = None, health_concern: Optional[str] = None,
+               user_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Stored recommendations for a request, or None if it must be computed.
+
+        Requests with free text, a user to personalize for, more results than
+        were materialized, or parameters outside the grid are not served.
+        """
+        if query or health_concern or user_id:
+            return None
+        key = cell_key(dosha, season, time_of_day, weather_data)
+        if key is None:
+            return None
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    'SELECT recommendations, depth FROM recommendation_grid WHERE cell = ?', (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Recommendation grid unavailable: {str(e)}")
+            return None
+        if row is None or top_k > row[1]:
+            return None
+        return json.loads(row[0])[:top_k]
+
+    def build(self, service, depth: int = MATERIALIZED_TOP_K, batch_size: int = 50) -> int:
+        """
+        Recompute every cell with ``service.get_many`` and replace the table.
+
+        The new results replace the old ones in a single transaction, and
+        only if every cell was computed, so readers never see a partial grid.
+
+        Args:
+            service: RecommendationService used for the vector searches
+            depth: Recommendations stored per cell
+            batch_size: Cells per ``get_many`` call
+
+        Returns:
+            Number of cells written
+
+        Raises:
+            RuntimeError: If a cell came back empty or from the fallback search
+        """
+        cells = list(grid_cells())
+        rows = []
+        for start in range(0, len(cells), batch_size):
+            batch = cells[start:start + batch_size]
+            results = service.get_many(
+                [dict(cell, top_k=depth) for cell in batch],
+                use_grid=False
+            )
+            for cell, recommendations in zip(batch, results):
+                if not recommendations or any(rec.get('fallback') for rec in recommendations):
+                    raise RuntimeError(f"Vector search failed for cell {cell_key(**cell)}; grid not updated")
+                rows.append((cell_key(**cell), json.dumps(recommendations), depth))
+
+        built_at = datetime.utcnow().isoformat()
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute('DELETE FROM recommendation_grid')
+                conn.executemany(
+                    'INSERT INTO recommendation_grid (cell, recommendations, depth, built_at) VALUES (?, ?, ?, ?)',
+                    [row + (built_at,) for row in rows]
+                )
+        logger.info(f"Materialized recommendations for {len(rows)} cells")
+        return len(rows)
+
+
+recommendation_grid = RecommendationGrid()
@@ -10,21 +10,25 @@ This module provides personalized Ayurvedic recommendations by combining:
 
 import os
 import json
-from typing import Dict, List, Optional, Any, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Any, Union
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
 
 # Database
-from .database import get_session
-from .models import User, UserPreference, Interaction
+from sqlalchemy import JSON, literal, null, select, type_coerce, union_all
 
 # Vector store
-from pinecone.grpc import PineconeGRPC as Pinecone
-from langchain_pinecone import PineconeVectorStore
+from langchain_core.documents import Document
 
-# Embeddings
-from .helper import download_hugging_face_embeddings
+# Precomputed recommendations and labels
+from .recommendation_classifier import default_classifier
+from .recommendation_grid import RecommendationGrid, recommendation_grid, weather_descriptors
+from .collaborative_filter import CollaborativeStore, collaborative_store
+from .user_profile_cache import UserProfileCache, user_profile_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,7 +40,14 @@ load_dotenv()
 # Retrieve the Pinecone API key from environment variables
 PINECONE_API_KEY = os.environ.get('PINECONE_API_KEY')
 # Ensure the API key is available as an environment variable
-os.environ['PINECONE_API_KEY'] = PINECONE_API_KEY
+if PINECONE_API_KEY:
+    os.environ['PINECONE_API_KEY'] = PINECONE_API_KEY
+
+
+def user_db_session():
+    """The scoped session of the user database, where interactions are logged."""
+    from .database import get_db_session
+    return get_db_session('user')
 
 
 def generate_embedding_query(dosha=None, weather_data=None, query=None, health_concern=None, season=None, time_of_day=None):
@@ -77,26 +88,9 @@ def generate_embedding_query(dosha=None, weather_data=None, query=None, health_c
         query_parts.append(f"For {time_of_day}")
     
     # Process weather data if available
-    if weather_data:
-        weather_desc = []
-        if 'temperature' in weather_data:
-            temp = weather_data['temperature']
-            if temp > 30:
-                weather_desc.append("hot weather")
-            elif temp < 15:
-                weather_desc.append("cold weather")
-            else:
-                weather_desc.append("moderate temperature")
-                
-        if 'humidity' in weather_data:
-            humidity = weather_data['humidity']
-            if humidity > 70:
-                weather_desc.append("high humidity")
-            elif humidity < 30:
-                weather_desc.append("dry conditions")
-                
-        if weather_desc:
-            query_parts.append(f"Suitable for {', '.join(weather_desc)}")
+    weather_desc = weather_descriptors(weather_data)
+    if weather_desc:
+        query_parts.append(f"Suitable for {', '.join(weather_desc)}")
     
     # Combine all parts into a comprehensive query
     comprehensive_query = ". ".join(query_parts)
@@ -113,53 +107,80 @@ def classify_recommendation(content):
         
     Returns:
         str: Classification category ('food', 'lifestyle', or 'general').
+        
+    Keywords match whole words (and plurals), so "heat" is not counted as "eat".
     """
-    content_lower = content.lower()
-    
-    # Define keyword sets for each category
-    food_keywords = [
-        'food', 'diet', 'meal', 'eat', 'eating', 'nutrition', 'consume', 'dish', 'recipe',
-        'fruit', 'vegetable', 'spice', 'herb', 'grain', 'dairy', 'ghee', 'oil',
-        'breakfast', 'lunch', 'dinner', 'snack', 'drink', 'beverage', 'tea'
-    ]
-    
-    lifestyle_keywords = [
-        'exercise', 'yoga', 'meditation', 'sleep', 'routine', 'habit', 'practice',
-        'activity', 'rest', 'massage', 'bath', 'oil', 'abhyanga', 'lifestyle',
-        'morning', 'evening', 'ritual', 'cleanse', 'detox', 'breathing', 'pranayama'
-    ]
-    
-    # Count keyword occurrences
-    food_count = sum(1 for keyword in food_keywords if keyword in content_lower)
-    lifestyle_count = sum(1 for keyword in lifestyle_keywords if keyword in content_lower)
-    
-    # Determine classification based on keyword counts
-    if food_count > lifestyle_count:
-        return 'food'
-    elif lifestyle_count > food_count:
-        return 'lifestyle'
-    else:
-        return 'general'
+    return default_classifier.classify(content)
+
+
+def cached_classification(content, metadata):
+    """The label stored with the chunk at index time, computed if missing."""
+    return (metadata or {}).get('classification') or classify_recommendation(content)
+
+
+@dataclass
+class RecommendationContext:
+    """Per-request inputs for one set of recommendations."""
+    query: Optional[str] = None
+    dosha: Optional[str] = None
+    season: Optional[str] = None
+    time_of_day: Optional[str] = None
+    health_concern: Optional[str] = None
+    weather_data: Optional[Dict] = None
+    user_id: Optional[str] = None
+    top_k: int = 5
+    personalization_weight: float = 0.3
 
 
 class RecommendationService:
     """
     Service for generating personalized Ayurvedic recommendations.
+    
+    The embeddings model, Pinecone index handle and database session factory
+    are created once and shared; everything about the user and the request is
+    passed per call in a ``RecommendationContext``. Use
+    ``get_recommendation_service()`` for the process-wide instance.
     """
     
-    def __init__(self, user_id: Optional[str] = None):
+    def __init__(
+        self,
+        user_id: Optional[str] = None,
+        embeddings=None,
+        vector_store=None,
+        session_factory: Callable = user_db_session,
+        max_workers: int = 8,
+        grid: Optional[RecommendationGrid] = None,
+        collaborative: Optional[CollaborativeStore] = None,
+        profile_cache: Optional[UserProfileCache] = None
+    ):
         """Initialize the recommendation service.
         
         Args:
-            user_id: Optional user ID for personalized recommendations
+            user_id: Default user for callers that don't pass one per request
+            embeddings: Embeddings model (default: the shared HuggingFace model)
+            vector_store: Vector store to search (default: the "herbbot" index)
+            session_factory: Returns the (scoped) database session
+            max_workers: Concurrent vector searches in ``get_many``
+            grid: Precomputed recommendations for requests without free text
+            collaborative: Per-user candidates from the collaborative filter
+            profile_cache: Snapshots of user preferences and recent interactions
         """
         self.user_id = user_id
-        self.embeddings = download_hugging_face_embeddings()
-        self.vector_store = self._init_vector_store()
-        self.session = get_session()
+        if embeddings is None:
+            from .helper import get_shared_embeddings
+            embeddings = get_shared_embeddings()
+        self.embeddings = embeddings
+        self.vector_store = vector_store or self._init_vector_store()
+        self.session_factory = session_factory
+        self.grid = grid
+        self.collaborative = collaborative
+        self.profile_cache = profile_cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='recommendations')
     
     def _init_vector_store(self):
         """Initialize the Pinecone vector store."""
+        from pinecone.grpc import PineconeGRPC as Pinecone
+        from langchain_pinecone import PineconeVectorStore
         pc = Pinecone(api_key=PINECONE_API_KEY)
         index_name = "herbbot"
         return PineconeVectorStore(
@@ -168,39 +189,101 @@ class RecommendationService:
             text_key="text"
         )
     
-    def get_user_preferences(self) -> Dict[str, Any]:
-        """Get user preferences from the database."""
-        if not self.user_id:
+    def get_user_preferences(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get user preferences and recent interactions.
+        
+        Served from the profile cache when possible; otherwise loaded with a
+        single query (the user's preferences and their 10 latest interactions
+        as one UNION ALL) and cached.
+        """
+        user_id = user_id or self.user_id
+        if not user_id:
             return {}
-            
+        
+        if self.profile_cache is not None:
+            cached = self.profile_cache.get(user_id)
+            if cached is not None:
+                return cached
+        
+        from .database import UserInteraction, UserPreference
         try:
-            user = self.session.query(User).filter_by(id=self.user_id).first()
-            if not user:
-                return {}
-                
-            preferences = {pref.key: pref.value 
-                         for pref in user.preferences}
-            
-            # Get recent interactions
-            interactions = self.session.query(Interaction)\
-                .filter_by(user_id=self.user_id)\
-                .order_by(Interaction.timestamp.desc())\
+            session = self.session_factory()
+            # The interactions come first so the result columns take their types
+            recent = select(
+                literal('interaction').label('kind'),
+                UserInteraction.content.label('key'),
+                type_coerce(null(), JSON).label('value'),
+                UserInteraction.interaction_type.label('interaction_type'),
+                UserInteraction.timestamp.label('timestamp')
+            ).where(UserInteraction.user_id == user_id)\
+                .order_by(UserInteraction.timestamp.desc())\
                 .limit(10)\
-                .all()
-                
-            return {
-                'preferences': preferences,
-                'recent_interactions': [
-                    {
-                        'content': i.content[:200],
-                        'interaction_type': i.interaction_type,
-                        'timestamp': i.timestamp.isoformat()
-                    } for i in interactions
-                ]
-            }
+                .subquery()
+            preferences_query = select(
+                literal('preference'), UserPreference.key, UserPreference.value, null(), null()
+            ).where(UserPreference.user_id == user_id)
+            rows = session.execute(union_all(select(recent), preferences_query)).all()
         except Exception as e:
             logger.error(f"Error getting user preferences: {e}")
             return {}
+        
+        interactions = sorted(
+            (row for row in rows if row.kind == 'interaction'),
+            key=lambda row: row.timestamp,
+            reverse=True
+        )
+        profile = {
+            'preferences': {row.key: row.value for row in rows if row.kind == 'preference'},
+            'recent_interactions': [
+                {
+                    'content': row.key[:200],
+                    'interaction_type': row.interaction_type,
+                    'timestamp': row.timestamp.isoformat()
+                } for row in interactions
+            ]
+        }
+        if self.profile_cache is not None:
+            self.profile_cache.set(user_id, profile)
+        return profile
+    
+    def update_user_preferences(self, preferences: Dict[str, Any], user_id: Optional[str] = None) -> bool:
+        """
+        Insert or update preferences (key -> value) for a user.
+        
+        Returns:
+            True if the preferences were saved
+        """
+        user_id = user_id or self.user_id
+        if not user_id:
+            return False
+        
+        from .database import UserPreference
+        session = self.session_factory()
+        try:
+            existing = {
+                pref.key: pref for pref in session.query(UserPreference).filter(
+                    UserPreference.user_id == user_id,
+                    UserPreference.key.in_(list(preferences))
+                )
+            }
+            for key, value in preferences.items():
+                if key in existing:
+                    existing[key].value = value
+                else:
+                    session.add(UserPreference(user_id=user_id, key=key, value=value))
+            session.commit()
+        except Exception as e:
+            logger.error(f"Error updating user preferences: {e}")
+            session.rollback()
+            return False
+        finally:
+            self._invalidate_profile(user_id)
+        return True
+    
+    def _invalidate_profile(self, user_id: str) -> None:
+        if self.profile_cache is not None:
+            self.profile_cache.invalidate(user_id)
     
     def get_personalized_recommendations(
         self,
@@ -211,7 +294,8 @@ class RecommendationService:
         health_concern: Optional[str] = None,
         weather_data: Optional[Dict] = None,
         top_k: int = 5,
-        personalization_weight: float = 0.3
+        personalization_weight: float = 0.3,
+        user_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get personalized recommendations based on multiple factors.
@@ -225,103 +309,162 @@ class RecommendationService:
             weather_data: Current weather data
             top_k: Number of recommendations to return
             personalization_weight: Weight for personalization (0-1)
+            user_id: User to personalize for (default: the service's user)
             
         Returns:
             List of recommendation dictionaries with metadata
         """
-        try:
-            # Get user preferences and history
-            user_context = self.get_user_preferences()
-            
-            # Generate the base query
-            base_query = generate_embedding_query(
-                dosha=dosha,
-                weather_data=weather_data,
-                query=query,
-                health_concern=health_concern,
-                season=season,
-                time_of_day=time_of_day
-            )
-            
-            # Add personalization context
-            personalized_query = self._add_personalization_context(
-                base_query, 
-                user_context
-            )
-            
-            # Get embeddings for both queries
-            base_embedding = self.embeddings.embed_query(base_query)
-            personalized_embedding = self.embeddings.embed_query(personalized_query)
+        return self.get_many([RecommendationContext(
+            query=query,
+            dosha=dosha,
+            season=season,
+            time_of_day=time_of_day,
+            health_concern=health_concern,
+            weather_data=weather_data,
+            user_id=user_id or self.user_id,
+            top_k=top_k,
+            personalization_weight=personalization_weight
+        )])[0]
+    
+    def get_many(
+        self,
+        contexts: List[Union[RecommendationContext, Dict[str, Any]]],
+        use_grid: bool = True
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Get recommendations for a batch of requests.
+        
+        All query texts in the batch are embedded in one model call (identical
+        texts once), and the vector searches run concurrently, so a request
+        costs about one vector round trip. Personalization adds no searches:
+        the user's collaborative-filtering candidates are looked up in memory
+        and fused with the search results by score. Requests without a query
+        or health concern, for users without candidates, are answered from
+        the precomputed grid when possible.
+        
+        Args:
+            contexts: RecommendationContext objects or dicts of their fields
+            use_grid: Look requests up in the grid (off when building it)
             
-            # Get more results than needed for diversity
-            base_results = self.vector_store.similarity_search_by_vector(
-                embedding=base_embedding,
-                k=top_k * 3  # Get more for diversity
+        Returns:
+            One recommendation list per context, in the same order
+        """
+        contexts = [
+            context if isinstance(context, RecommendationContext) else RecommendationContext(**context)
+            for context in contexts
+        ]
+        if not contexts:
+            return []
+        
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(contexts)
+        if use_grid and self.grid is not None:
+            for i, c in enumerate(contexts):
+                results[i] = self.grid.lookup(
+                    dosha=c.dosha,
+                    season=c.season,
+                    time_of_day=c.time_of_day,
+                    weather_data=c.weather_data,
+                    top_k=c.top_k,
+                    query=c.query,
+                    health_concern=c.health_concern,
+                    # Users without collaborative candidates get the base ranking
+                    user_id=c.user_id if self._has_candidates(c.user_id) else None
+                )
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            computed = self._compute([contexts[i] for i in misses])
+            for i, recommendations in zip(misses, computed):
+                results[i] = recommendations
+        return results
+    
+    def _has_candidates(self, user_id: Optional[str]) -> bool:
+        return self.collaborative is not None and self.collaborative.model.has_user(user_id)
+    
+    def _compute(self, contexts: List[RecommendationContext]) -> List[List[Dict[str, Any]]]:
+        """Embed and search for a batch of requests."""
+        base_queries = [
+            generate_embedding_query(
+                dosha=c.dosha,
+                weather_data=c.weather_data,
+                query=c.query,
+                health_concern=c.health_concern,
+                season=c.season,
+                time_of_day=c.time_of_day
             )
+            for c in contexts
+        ]
+        
+        try:
+            # Embed every distinct query text in one batch
+            texts = list(dict.fromkeys(base_queries))
+            vectors = dict(zip(texts, self.embeddings.embed_documents(texts)))
             
-            personal_results = self.vector_store.similarity_search_by_vector(
-                embedding=personalized_embedding,
-                k=top_k * 2
-            )
+            # Get more results than needed for diversity. Each distinct text
+            # is searched once, at the largest k any request needs.
+            depth: Dict[str, int] = {}
+            for base_query, c in zip(base_queries, contexts):
+                depth[base_query] = max(depth.get(base_query, 0), c.top_k * 3)
+            futures = {
+                text: self._executor.submit(self._search, vectors[text], k)
+                for text, k in depth.items()
+            }
+            searches = {text: future.result() for text, future in futures.items()}
+        except Exception as e:
+            logger.error(f"Error computing recommendations: {e}")
+            # Fallback to non-personalized recommendations
+            return [self._get_fallback_recommendations(q, c.top_k) for q, c in zip(base_queries, contexts)]
+        
+        results = []
+        for base_query, c in zip(base_queries, contexts):
+            base_results = searches[base_query][:c.top_k * 3]
+            personal_results = self._collaborative_candidates(c.user_id, c.top_k * 2)
             
             # Combine and rank results
             recommendations = self._rank_recommendations(
                 base_results, 
                 personal_results,
-                personalization_weight
+                c.personalization_weight
             )
             
             # Add personalization metadata
             for rec in recommendations:
-                rec['personalized'] = rec.get('source', '') in [
-                    r.metadata.get('source') for r in personal_results[:top_k]]
-            
-            return recommendations[:top_k]
+                rec['personalized'] = rec['metadata']['recommendation_source'] != 'base'
             
-        except Exception as e:
-            logger.error(f"Error in get_personalized_recommendations: {e}")
-            # Fallback to non-personalized recommendations
-            return self._get_fallback_recommendations(
-                base_query, 
-                top_k
-            )
+            results.append(recommendations[:c.top_k])
+        return results
     
-    def _add_personalization_context(
-        self, 
-        base_query: str, 
-        user_context: Dict[str, Any]
-    ) -> str:
-        """Enhance the query with personalization context."""
-        if not user_context or not user_context.get('preferences'):
-            return base_query
-            
-        # Add preferences to query
-        prefs = user_context['preferences']
-        personal_context = []
-        
-        if prefs.get('dietary_restrictions'):
-            personal_context.append(f"Dietary restrictions: {prefs['dietary_restrictions']}")
-            
-        if prefs.get('health_goals'):
-            personal_context.append(f"Health goals: {prefs['health_goals']}")
-            
-        # Add recent interactions
-        if user_context.get('recent_interactions'):
-            recent_topics = set()
-            for interaction in user_context['recent_interactions']:
-                # Simple topic extraction (in a real app, use NLP)
-                words = interaction['content'].lower().split()[:10]
-                recent_topics.update(words)
-            
-            if recent_topics:
-                personal_context.append(
-                    f"Recently interested in: {', '.join(recent_topics)}"
-                )
+    def _collaborative_candidates(self, user_id: Optional[str], k: int) -> List[Any]:
+        """
+        ``(document, score)`` pairs the collaborative filter precomputed for
+        the user, scaled so the best candidate scores 1.
+        """
+        if self.collaborative is None or not user_id:
+            return []
+        return [
+            (Document(page_content=content, metadata=metadata), score)
+            for content, metadata, score in self.collaborative.model.candidates_for(user_id, k)
+        ]
+    
+    def _search(self, vector: List[float], k: int) -> List[Any]:
+        """
+        Vector search returning ``(document, similarity)`` pairs, best first.
         
-        if not personal_context:
-            return base_query
-            
-        return f"{base_query}. Personal context: {'; '.join(personal_context)}"
+        Stores without scored search get a rank-based stand-in score.
+        """
+        search_with_score = getattr(self.vector_store, 'similarity_search_by_vector_with_score', None)
+        if search_with_score is not None:
+            try:
+                return search_with_score(embedding=vector, k=k)
+            except NotImplementedError:
+                pass
+        docs = self.vector_store.similarity_search_by_vector(embedding=vector, k=k)
+        return [(doc, 1.0 - (i * 0.1)) for i, doc in enumerate(docs)]
+    
+    @staticmethod
+    def _doc_key(doc) -> Any:
+        """Identity of a document across separate searches."""
+        metadata = getattr(doc, 'metadata', {}) or {}
+        return metadata.get('id') or (metadata.get('source'), getattr(doc, 'page_content', str(doc)))
     
     def _rank_recommendations(
         self, 
@@ -329,29 +472,33 @@ class RecommendationService:
         personal_results: List[Any],
         personalization_weight: float
     ) -> List[Dict[str, Any]]:
-        """Rank recommendations by combining base and personalized results."""
+        """
+        Rank recommendations by combining base and personalized results.
+        
+        Both lists hold ``(document, similarity)`` pairs. A document's score is
+        its base similarity plus ``personalization_weight`` times its
+        personalized similarity (a missing side contributes nothing).
+        """
         # Create a scoring dictionary
         scores = {}
         
-        # Score base results (higher score = better)
-        for i, doc in enumerate(base_results):
-            doc_id = doc.metadata.get('id') or id(doc)
-            scores[doc_id] = {
+        for doc, similarity in base_results:
+            scores[self._doc_key(doc)] = {
                 'doc': doc,
-                'score': 1.0 - (i * 0.1),  # Linear decay
+                'score': float(similarity),
                 'source': 'base'
             }
         
         # Boost personal results
-        for i, doc in enumerate(personal_results):
-            doc_id = doc.metadata.get('id') or id(doc)
+        for doc, similarity in personal_results:
+            doc_id = self._doc_key(doc)
             if doc_id in scores:
-                scores[doc_id]['score'] += personalization_weight * (1.0 - (i * 0.1))
+                scores[doc_id]['score'] += personalization_weight * float(similarity)
                 scores[doc_id]['source'] = 'both'
             else:
                 scores[doc_id] = {
                     'doc': doc,
-                    'score': personalization_weight * (1.0 - (i * 0.1)),
+                    'score': personalization_weight * float(similarity),
                     'source': 'personal'
                 }
         
@@ -373,7 +520,7 @@ class RecommendationService:
                 'content': content,
                 'source': metadata.get('source', 'Unknown'),
                 'relevance_score': item['score'],
-                'classification': classify_recommendation(content),
+                'classification': cached_classification(content, metadata),
                 'metadata': {
                     'dosha': metadata.get('dosha', ''),
                     'category': metadata.get('category', ''),
@@ -401,7 +548,7 @@ class RecommendationService:
                 'content': doc.page_content,
                 'source': doc.metadata.get('source', 'Unknown'),
                 'relevance_score': 1.0 - (i * 0.1),
-                'classification': classify_recommendation(doc.page_content),
+                'classification': cached_classification(doc.page_content, doc.metadata),
                 'metadata': doc.metadata,
                 'fallback': True
             } for i, doc in enumerate(results)]
@@ -414,25 +561,53 @@ class RecommendationService:
         self, 
         content: str, 
         interaction_type: str,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        user_id: Optional[str] = None
     ) -> None:
-        """Log a user interaction for future personalization."""
-        if not self.user_id:
+        """
+        Log a user interaction for future personalization.
+        
+        Include the document's index ``id`` in ``metadata`` so the
+        collaborative filter can match it with search results.
+        """
+        user_id = user_id or self.user_id
+        if not user_id:
             return
             
+        from .database import UserInteraction
+        session = self.session_factory()
         try:
-            interaction = Interaction(
-                user_id=self.user_id,
+            interaction = UserInteraction(
+                user_id=user_id,
                 content=content[:1000],  # Limit size
                 interaction_type=interaction_type,
-                metadata=metadata or {},
+                interaction_metadata=metadata or {},
                 timestamp=datetime.utcnow()
             )
-            self.session.add(interaction)
-            self.session.commit()
+            session.add(interaction)
+            session.commit()
         except Exception as e:
             logger.error(f"Error logging interaction: {e}")
-            self.session.rollback()
+            session.rollback()
+        finally:
+            self._invalidate_profile(user_id)
+
+
+_service: Optional[RecommendationService] = None
+_service_lock = threading.Lock()
+
+
+def get_recommendation_service() -> RecommendationService:
+    """The process-wide RecommendationService, created on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RecommendationService(
+                grid=recommendation_grid,
+                collaborative=collaborative_store,
+                profile_cache=user_profile_cache
+            )
+        return _service
 
 
 # For backward compatibility
@@ -446,10 +621,9 @@ def get_recommendations(
     top_k=5
 ):
     """
-    Wrapper for backward compatibility.
+    Wrapper for backward compatibility; uses the shared service.
     """
-    service = RecommendationService()
-    return service.get_personalized_recommendations(
+    return get_recommendation_service().get_personalized_recommendations(
         query=query,
         dosha=dosha,
         season=season,
@@ -0,0 +1,81 @@
+"""
+SQLite Connection Pool
+
+Keeps open connections to one database file for reuse across requests, so
+request handlers don't pay for ``sqlite3.connect`` and schema setup each
+time. Schema setup runs once, on the first connection the pool opens.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SQLitePool:
+    """Bounded pool of idle SQLite connections.
+
+    Connections are created on demand; at most ``size`` idle connections are
+    kept and extra ones are closed when returned.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = 8,
+        setup: Optional[Callable[[sqlite3.Connection], None]] = None,
+        timeout: float = 30.0
+    ):
+        """
+        Args:
+            db_path: Database file
+            size: Idle connections kept for reuse
+            setup: Called with the first connection to create the schema
+            timeout: Seconds to wait for a database lock
+        """
+        self.db_path = db_path
+        self.setup = setup
+        self.timeout = timeout
+        self._idle: 'queue.Queue[sqlite3.Connection]' = queue.Queue(maxsize=size)
+        self._setup_lock = threading.Lock()
+        self._ready = setup is None
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        if not self._ready:
+            with self._setup_lock:
+                if not self._ready:
+                    self.setup(conn)
+                    self._ready = True
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; uncommitted changes are rolled back on return."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
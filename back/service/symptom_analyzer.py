@@ -6,67 +6,133 @@ dosha imbalances based on Ayurvedic principles.
 """
 from typing import Dict, List, Optional
 from enum import Enum
+from functools import lru_cache
+
+from .symptom_matcher import SymptomMatcher
 
 class DoshaType(str, Enum):
     VATA = "Vata"
     PITTA = "Pitta"
     KAPHA = "Kapha"
 
+SYMPTOM_DOSHAS = {
+    # Physical symptoms
+    "dry skin": DoshaType.VATA,
+    "dry hair": DoshaType.VATA,
+    "constipation": DoshaType.VATA,
+    "gas": DoshaType.VATA,
+    "bloating": DoshaType.VATA,
+    "joint pain": DoshaType.VATA,
+    "insomnia": DoshaType.VATA,
+    "irregular appetite": DoshaType.VATA,
+    "weight loss": DoshaType.VATA,
+    "cold hands and feet": DoshaType.VATA,
+    "fatigue": DoshaType.VATA,
+    "skin rashes": DoshaType.PITTA,
+    "acne": DoshaType.PITTA,
+    "heartburn": DoshaType.PITTA,
+    "acid reflux": DoshaType.PITTA,
+    "excessive body heat": DoshaType.PITTA,
+    "inflammation": DoshaType.PITTA,
+    "excessive sweating": DoshaType.PITTA,
+    "loose stools": DoshaType.PITTA,
+    "bad breath": DoshaType.PITTA,
+    "excessive thirst": DoshaType.PITTA,
+    "congestion": DoshaType.KAPHA,
+    "mucus": DoshaType.KAPHA,
+    "weight gain": DoshaType.KAPHA,
+    "water retention": DoshaType.KAPHA,
+    "lethargy": DoshaType.KAPHA,
+    "slow digestion": DoshaType.KAPHA,
+    "allergies": DoshaType.KAPHA,
+    "sinus congestion": DoshaType.KAPHA,
+    "excessive sleep": DoshaType.KAPHA,
+    "slow metabolism": DoshaType.KAPHA,
+    
+    # Mental/Emotional symptoms
+    "anxiety": DoshaType.VATA,
+    "worry": DoshaType.VATA,
+    "fear": DoshaType.VATA,
+    "restlessness": DoshaType.VATA,
+    "irritability": DoshaType.PITTA,
+    "anger": DoshaType.PITTA,
+    "impatience": DoshaType.PITTA,
+    "jealousy": DoshaType.PITTA,
+    "attachment": DoshaType.KAPHA,
+    "greed": DoshaType.KAPHA,
+    "possessiveness": DoshaType.KAPHA,
+    "depression": DoshaType.KAPHA,
+}
+
+# Other ways users describe the symptoms above
+SYMPTOM_SYNONYMS = {
+    "dry skin": ["flaky skin", "rough skin", "cracked skin", "scaly skin"],
+    "dry hair": ["brittle hair", "frizzy hair"],
+    "constipation": ["hard stools", "irregular bowel movements", "difficulty passing stool"],
+    "gas": ["flatulence", "gassiness", "burping", "belching"],
+    "bloating": ["bloated", "distended stomach", "abdominal distension"],
+    "joint pain": ["aching joints", "stiff joints", "arthritis", "cracking joints"],
+    "insomnia": ["can't sleep", "cannot sleep", "trouble sleeping", "sleeplessness", "poor sleep", "waking at night"],
+    "irregular appetite": ["variable appetite", "forgetting to eat"],
+    "weight loss": ["losing weight", "underweight"],
+    "cold hands and feet": ["cold extremities", "cold hands", "cold feet", "poor circulation"],
+    "fatigue": ["tiredness", "exhaustion", "low energy", "tired all the time"],
+    "skin rashes": ["rash", "hives", "eczema", "red skin", "itchy skin"],
+    "acne": ["pimples", "breakouts"],
+    "heartburn": ["burning in the chest", "indigestion", "hyperacidity"],
+    "acid reflux": ["acidity", "gerd", "sour burps", "regurgitation"],
+    "excessive body heat": ["feeling hot", "overheating", "hot flashes", "hot flushes"],
+    "inflammation": ["swelling", "redness"],
+    "excessive sweating": ["sweating", "sweaty", "perspiration", "night sweats"],
+    "loose stools": ["diarrhea", "diarrhoea", "frequent bowel movements"],
+    "bad breath": ["halitosis"],
+    "excessive thirst": ["always thirsty", "dehydrated"],
+    "congestion": ["stuffy nose", "blocked nose", "chest congestion"],
+    "mucus": ["phlegm", "catarrh", "runny nose"],
+    "weight gain": ["gaining weight", "overweight", "obesity"],
+    "water retention": ["puffiness", "swollen ankles", "edema", "oedema"],
+    "lethargy": ["sluggishness", "sluggish", "heaviness", "lack of motivation"],
+    "slow digestion": ["heavy after meals", "sluggish digestion", "feeling full for long"],
+    "allergies": ["hay fever", "allergy", "seasonal allergies"],
+    "sinus congestion": ["sinusitis", "blocked sinuses", "sinus pressure"],
+    "excessive sleep": ["oversleeping", "sleeping too much", "drowsiness"],
+    "slow metabolism": ["sluggish metabolism", "hypothyroidism"],
+    "anxiety": ["anxious", "nervousness", "nervous", "panic attacks"],
+    "worry": ["worrying", "overthinking", "racing thoughts"],
+    "fear": ["fearful", "scared"],
+    "restlessness": ["restless", "can't sit still", "fidgety"],
+    "irritability": ["irritable", "short temper", "easily annoyed"],
+    "anger": ["angry", "rage", "frustration"],
+    "impatience": ["impatient"],
+    "jealousy": ["jealous", "envy"],
+    "attachment": ["clinginess", "clingy"],
+    "greed": ["greedy", "overeating", "emotional eating"],
+    "possessiveness": ["possessive"],
+    "depression": ["depressed", "low mood", "sadness", "hopelessness"],
+}
+
+
+@lru_cache(maxsize=None)
+def default_symptom_matcher() -> SymptomMatcher:
+    """Matcher over the built-in symptoms and synonyms, built once per process."""
+    return SymptomMatcher(SYMPTOM_DOSHAS, SYMPTOM_SYNONYMS)
+
+
 class SymptomAnalyzer:
     """
     A tool for analyzing symptoms and suggesting potential dosha imbalances.
     """
     
-    def __init__(self):
-        """Initialize the symptom analyzer with symptom-dosha mappings."""
-        self.symptom_mapping = {
-            # Physical symptoms
-            "dry skin": DoshaType.VATA,
-            "dry hair": DoshaType.VATA,
-            "constipation": DoshaType.VATA,
-            "gas": DoshaType.VATA,
-            "bloating": DoshaType.VATA,
-            "joint pain": DoshaType.VATA,
-            "insomnia": DoshaType.VATA,
-            "irregular appetite": DoshaType.VATA,
-            "weight loss": DoshaType.VATA,
-            "cold hands and feet": DoshaType.VATA,
-            "fatigue": DoshaType.VATA,
-            "skin rashes": DoshaType.PITTA,
-            "acne": DoshaType.PITTA,
-            "heartburn": DoshaType.PITTA,
-            "acid reflux": DoshaType.PITTA,
-            "excessive body heat": DoshaType.PITTA,
-            "inflammation": DoshaType.PITTA,
-            "excessive sweating": DoshaType.PITTA,
-            "loose stools": DoshaType.PITTA,
-            "bad breath": DoshaType.PITTA,
-            "excessive thirst": DoshaType.PITTA,
-            "congestion": DoshaType.KAPHA,
-            "mucus": DoshaType.KAPHA,
-            "weight gain": DoshaType.KAPHA,
-            "water retention": DoshaType.KAPHA,
-            "lethargy": DoshaType.KAPHA,
-            "slow digestion": DoshaType.KAPHA,
-            "allergies": DoshaType.KAPHA,
-            "sinus congestion": DoshaType.KAPHA,
-            "excessive sleep": DoshaType.KAPHA,
-            "slow metabolism": DoshaType.KAPHA,
-            
-            # Mental/Emotional symptoms
-            "anxiety": DoshaType.VATA,
-            "worry": DoshaType.VATA,
-            "fear": DoshaType.VATA,
-            "restlessness": DoshaType.VATA,
-            "irritability": DoshaType.PITTA,
-            "anger": DoshaType.PITTA,
-            "impatience": DoshaType.PITTA,
-            "jealousy": DoshaType.PITTA,
-            "attachment": DoshaType.KAPHA,
-            "greed": DoshaType.KAPHA,
-            "possessiveness": DoshaType.KAPHA,
-            "depression": DoshaType.KAPHA,
-        }
+    def __init__(self, matcher: Optional[SymptomMatcher] = None):
+        """
+        Initialize the symptom analyzer with symptom-dosha mappings.
+        
+        Args:
+            matcher: Matcher resolving free-text symptoms to known ones;
+                defaults to the shared matcher over the built-in symptoms
+        """
+        self.symptom_mapping = SYMPTOM_DOSHAS
+        self.matcher = matcher or default_symptom_matcher()
         
         self.dosha_descriptions = {
             DoshaType.VATA: {
@@ -126,12 +192,21 @@ class SymptomAnalyzer:
         # Score each symptom
         matched_symptoms = {dosha: [] for dosha in DoshaType}
         
+        symptom_matches = []
+        
         for symptom in symptoms:
-            symptom_lower = symptom.lower()
-            if symptom_lower in self.symptom_mapping:
-                dosha = self.symptom_mapping[symptom_lower]
-                dosha_scores[dosha] += 1
-                matched_symptoms[dosha].append(symptom)
+            match = self.matcher.best_match(symptom)
+            if match is None or match.symptom not in self.symptom_mapping:
+                continue
+            dosha = self.symptom_mapping[match.symptom]
+            dosha_scores[dosha] += 1
+            matched_symptoms[dosha].append(symptom)
+            symptom_matches.append({
+                "input": symptom,
+                "symptom": match.symptom,
+                "score": match.score,
+                "method": match.method
+            })
         
         # Calculate total score and confidence
         total_score = sum(dosha_scores.values())
@@ -143,7 +218,8 @@ class SymptomAnalyzer:
                 "confidence": 0,
                 "recommendations": ["No specific dosha imbalance detected based on the provided symptoms."],
                 "details": {},
-                "matched_symptoms": {}
+                "matched_symptoms": {},
+                "symptom_matches": []
             }
         
         # Normalize scores
@@ -172,7 +248,8 @@ class SymptomAnalyzer:
             "confidence": normalized_scores[primary_dosha],
             "recommendations": [],
             "details": {},
-            "matched_symptoms": matched_symptoms
+            "matched_symptoms": matched_symptoms,
+            "symptom_matches": symptom_matches
         }
         
         # Add recommendations and details for primary dosha
@@ -200,3 +277,6 @@ class SymptomAnalyzer:
             }
         
         return response
+
+# Create a default instance for easy importing
+symptom_analyzer = SymptomAnalyzer()
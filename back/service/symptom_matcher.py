@@ -0,0 +1,196 @@
+"""
+Symptom Matcher
+
+Maps free-text symptom descriptions ("dry, flaky skin", "acidity", "insomia")
+to known symptoms:
+1. Exact lookup of the normalized text among symptom names and synonyms
+2. Fuzzy lookup through an inverted index of character trigrams, scored by
+   how much of the phrase the text covers (Dice coefficient and containment).
+   A fuzzy match also needs every distinguishing word of the phrase in the
+   text (allowing typos, word endings and split compounds), so "oily skin"
+   doesn't match "dry skin" on the shared "skin"
+3. Optionally, nearest symptom phrase by embedding similarity when nothing
+   matched lexically
+
+The index is built once; lexical lookups touch only the postings of the
+text's trigrams and take tens of microseconds. The embedding fallback calls the
+embedding model and is only reached for texts with no lexical match.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+# Words that don't distinguish one symptom phrase from another
+_STOPWORDS = frozenset({'a', 'after', 'all', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'the', 'to', 'too', 'with'})
+
+# Lowest similarity at which a misspelled word stands for a phrase word
+MIN_WORD_SIMILARITY = 0.8
+
+
+def normalize_symptom(text: str) -> str:
+    """Lowercase with punctuation and repeated whitespace collapsed to single spaces."""
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+def _trigrams(normalized: str) -> set:
+    padded = f' {normalized} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _key_words(normalized: str) -> Tuple[str, ...]:
+    return tuple(word for word in normalized.split() if word not in _STOPWORDS)
+
+
+def _has_word(word: str, words: Sequence[str]) -> bool:
+    """Whether ``words`` contain ``word``, a longer form of it or a misspelling of it."""
+    # Adjacent pairs cover compounds written as two words ("heart burn")
+    candidates = (*words, *(a + b for a, b in zip(words, words[1:])))
+    if any(candidate == word or (len(word) >= 3 and candidate.startswith(word)) for candidate in candidates):
+        return True
+    if len(word) < 4:
+        return False
+    for candidate in candidates:
+        matcher = SequenceMatcher(None, word, candidate)
+        # The cheap upper bounds rule out most candidates before ratio()
+        if (matcher.real_quick_ratio() >= MIN_WORD_SIMILARITY and matcher.quick_ratio() >= MIN_WORD_SIMILARITY
+                and matcher.ratio() >= MIN_WORD_SIMILARITY):
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class SymptomMatch:
+    """A known symptom matched for a piece of text."""
+    symptom: str   # canonical symptom name
+    phrase: str    # symptom name or synonym that matched
+    score: float   # 1.0 for exact matches
+    method: str    # exact, synonym, fuzzy or embedding
+
+
+class SymptomMatcher:
+    """Indexed exact, fuzzy and embedding lookup over symptom phrases."""
+
+    def __init__(self, symptoms: Iterable[str], synonyms: Optional[Dict[str, Iterable[str]]] = None,
+                 min_score: float = 0.55, embeddings=None, embedding_min_score: float = 0.8):
+        """
+        Args:
+            symptoms: Canonical symptom names
+            synonyms: Other phrasings per canonical symptom
+            min_score: Lowest fuzzy score reported as a match (fuzzy matches
+                also need every distinguishing word of the phrase in the text)
+            embeddings: Optional model with ``embed_query``/``embed_documents``
+                for the fallback
+            embedding_min_score: Lowest cosine similarity reported by the fallback
+        """
+        self.min_score = min_score
+        self.embedding_min_score = embedding_min_score
+        self._embeddings = embeddings
+        self._phrase_vectors: Optional[np.ndarray] = None
+
+        self.phrases: List[str] = []
+        self.phrase_symptoms: List[str] = []
+        self._exact: Dict[str, int] = {}
+        for symptom in symptoms:
+            self._add(symptom, symptom)
+        for symptom, phrases in (synonyms or {}).items():
+            for phrase in phrases:
+                self._add(phrase, symptom)
+
+        self._phrase_words = [_key_words(phrase) for phrase in self.phrases]
+        self._gram_counts: List[int] = []
+        self._index: Dict[str, List[int]] = {}
+        for i, phrase in enumerate(self.phrases):
+            grams = _trigrams(phrase)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._index.setdefault(gram, []).append(i)
+
+    def _add(self, phrase: str, symptom: str) -> None:
+        normalized = normalize_symptom(phrase)
+        if normalized and normalized not in self._exact:
+            self._exact[normalized] = len(self.phrases)
+            self.phrases.append(normalized)
+            self.phrase_symptoms.append(symptom)
+
+    def set_embeddings(self, embeddings) -> None:
+        """Enable the embedding fallback; phrases are embedded on first use."""
+        self._embeddings = embeddings
+        self._phrase_vectors = None
+
+    def match(self, text: str, limit: int = 3) -> List[SymptomMatch]:
+        """Known symptoms for ``text``, best first, at most one match per symptom."""
+        normalized = normalize_symptom(text)
+        if not normalized:
+            return []
+
+        i = self._exact.get(normalized)
+        if i is not None:
+            symptom = self.phrase_symptoms[i]
+            method = 'exact' if normalize_symptom(symptom) == normalized else 'synonym'
+            return [SymptomMatch(symptom, self.phrases[i], 1.0, method)]
+
+        matches = self._fuzzy(normalized, limit)
+        if not matches and self._embeddings is not None:
+            matches = self._nearest(normalized, limit)
+        return matches
+
+    def best_match(self, text: str) -> Optional[SymptomMatch]:
+        matches = self.match(text, limit=1)
+        return matches[0] if matches else None
+
+    def _fuzzy(self, normalized: str, limit: int) -> List[SymptomMatch]:
+        grams = _trigrams(normalized)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self._index.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        words = normalized.split()
+        best: Dict[str, SymptomMatch] = {}
+        for i, count in shared.items():
+            phrase_grams = self._gram_counts[i]
+            dice = 2 * count / (len(grams) + phrase_grams)
+            containment = count / phrase_grams
+            score = (dice + containment) / 2
+            if score < self.min_score:
+                continue
+            if not all(_has_word(word, words) for word in self._phrase_words[i]):
+                continue
+            symptom = self.phrase_symptoms[i]
+            if symptom not in best or score > best[symptom].score:
+                best[symptom] = SymptomMatch(symptom, self.phrases[i], round(score, 4), 'fuzzy')
+        return sorted(best.values(), key=lambda m: (-m.score, m.symptom))[:limit]
+
+    def _nearest(self, normalized: str, limit: int) -> List[SymptomMatch]:
+        try:
+            if self._phrase_vectors is None:
+                self._phrase_vectors = self._unit_rows(self._embeddings.embed_documents(self.phrases))
+            query = self._unit_rows([self._embeddings.embed_query(normalized)])[0]
+        except Exception as e:
+            logger.warning(f"Symptom embedding lookup failed: {str(e)}")
+            return []
+
+        similarities = self._phrase_vectors @ query
+        best: Dict[str, SymptomMatch] = {}
+        for i in np.argsort(-similarities, kind='stable'):
+            score = float(similarities[i])
+            if score < self.embedding_min_score or len(best) >= limit:
+                break
+            symptom = self.phrase_symptoms[i]
+            if symptom not in best:
+                best[symptom] = SymptomMatch(symptom, self.phrases[i], round(score, 4), 'embedding')
+        return list(best.values())
+
+    @staticmethod
+    def _unit_rows(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
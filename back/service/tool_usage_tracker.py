@@ -3,16 +3,25 @@ Tool Usage Tracker
 
 This module provides functionality to track and analyze the usage of tools in the agent service.
 It records metrics such as invocation counts, success rates, and response times.
+
+Memory stays flat regardless of how many users are seen: per-user and
+per-article state lives in capped LRU maps, unique users are counted with
+HyperLogLog sketches, and raw events are written to SQLite (or Redis) in
+batches rather than by rewriting a JSON file.
 """
 
 import json
 import logging
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Set, Tuple, Union
 
+from .usage_store import (
+    HyperLogLog, ShardedLRU, UsageEventWriter, RedisUsageBackend, get_event_writer
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,66 +31,70 @@ class ToolUsageTracker:
     Tracks and analyzes the usage of tools in the agent service.
     
     This class provides methods to record tool invocations, track metrics,
-    and generate usage statistics. It can store data in memory and optionally
-    persist it to disk.
+    and generate usage statistics. Aggregates are kept in bounded memory and
+    raw events are optionally persisted in batches.
     """
     
-    def __init__(self, storage_path: Optional[str] = None):
+    def __init__(
+        self,
+        storage_path: Optional[str] = None,
+        redis_client=None,
+        max_users: int = 10000,
+        max_articles: int = 5000,
+        shards: int = 16,
+        batch_size: int = 500,
+        flush_interval: float = 5.0
+    ):
         """
         Initialize the ToolUsageTracker with enhanced metrics.
         
         Args:
-            storage_path: Optional path to a JSON file for persisting usage data.
-                         If not provided, data will only be stored in memory.
+            storage_path: Optional path to a SQLite database for usage events.
+                         Legacy ``.json`` paths map to ``tool_usage.db`` in the
+                         same directory so per-user trackers share one database.
+            redis_client: Optional Redis client; events go to a Redis stream
+                         instead of SQLite when given.
+            max_users: Maximum number of users kept in memory (LRU)
+            max_articles: Maximum number of articles kept in memory (LRU)
+            shards: Number of independently locked LRU shards
+            batch_size: Events buffered before a write is forced
+            flush_interval: Seconds between background flushes
         """
         self.storage_path = Path(storage_path) if storage_path else None
-        self.usage_data = self._load_usage_data() if self.storage_path else {}
+        if self.storage_path and self.storage_path.suffix == '.json':
+            self.storage_path = self.storage_path.with_name('tool_usage.db')
         self.current_session = str(int(time.time()))
         
-        # Initialize metrics tracking
+        # Batched event persistence
+        self.event_writer: Optional[UsageEventWriter] = None
+        if redis_client is not None:
+            self.event_writer = UsageEventWriter(
+                RedisUsageBackend(redis_client),
+                batch_size=batch_size,
+                flush_interval=flush_interval
+            )
+        elif self.storage_path:
+            self.event_writer = get_event_writer(
+                self.storage_path, batch_size=batch_size, flush_interval=flush_interval
+            )
+        
+        # Initialize metrics tracking (all bounded by the number of tools)
         self.metrics = {
             'invocations': defaultdict(int),          # Total invocations per tool
             'errors': defaultdict(int),               # Error counts per tool
-            'response_times': defaultdict(list),      # Response time history
+            'response_times': defaultdict(lambda: deque(maxlen=1000)),  # Recent response times
             'last_used': dict(),                      # Last usage timestamp
-            'user_engagement': defaultdict(set),      # Users per tool
+            'user_engagement': defaultdict(HyperLogLog),  # Approximate unique users per tool
             'concurrent_usage': defaultdict(set)      # Tools used together
         }
-        self.user_sessions = defaultdict(dict)       # User session data
-        self.article_metrics = defaultdict(dict)      # Article-specific metrics
-        self.last_tool_used = {}                     # For tracking tool sequences
-    
-    def _load_usage_data(self) -> Dict[str, Any]:
-        """
-        Load usage data from the storage file if it exists.
-        
-        Returns:
-            Dict containing the loaded usage data or an empty dict if the file doesn't exist.
-        """
-        if not self.storage_path or not self.storage_path.exists():
-            return {}
-            
-        try:
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning(f"Could not load usage data: {e}")
-            return {}
+        self.user_sessions = ShardedLRU(max_users, shards)       # User session data
+        self.article_metrics = ShardedLRU(max_articles, shards)  # Article-specific metrics
     
-    def _save_usage_data(self) -> None:
-        """Save the current usage data to the storage file if a path is configured."""
-        if not self.storage_path:
-            return
-            
-        try:
-            # Ensure the directory exists
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Write the data
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.usage_data, f, indent=2, default=str)
-        except IOError as e:
-            logger.error(f"Could not save usage data: {e}")
+    def flush(self) -> int:
+        """Write buffered usage events now. Returns the number written."""
+        if self.event_writer is None:
+            return 0
+        return self.event_writer.flush()
     
     def log_tool_use(
         self,
@@ -105,6 +118,17 @@ class ToolUsageTracker:
         """
         timestamp = datetime.utcnow()
         
+        if self.event_writer is not None:
+            self.event_writer.add({
+                'timestamp': timestamp.isoformat(),
+                'tool_name': tool_name,
+                'user_id': user_id,
+                'success': success,
+                'response_time': response_time,
+                'error': error,
+                'metadata': metadata
+            })
+        
         # Update basic metrics
         self.metrics['invocations'][tool_name] += 1
         self.metrics['last_used'][tool_name] = timestamp.isoformat()
@@ -115,63 +139,57 @@ class ToolUsageTracker:
         
         if response_time is not None:
             self.metrics['response_times'][tool_name].append(response_time)
-            # Keep only the last 1000 response times for performance
-            self.metrics['response_times'][tool_name] = self.metrics['response_times'][tool_name][-1000:]
         
         # Track user engagement
         if user_id:
             self.metrics['user_engagement'][tool_name].add(user_id)
             
-            # Initialize user session if it doesn't exist
-            if user_id not in self.user_sessions:
-                self.user_sessions[user_id] = {
-                    'first_seen': timestamp,
-                    'last_seen': timestamp,
-                    'tool_usage': defaultdict(int),
-                    'tool_sequences': [],
-                    'session_count': 0,
-                    'current_session_start': timestamp
-                }
+            # Get or create the user session (least recently seen users are evicted)
+            user_session = self.user_sessions.setdefault(user_id, lambda: {
+                'first_seen': timestamp,
+                'last_seen': timestamp,
+                'tool_usage': defaultdict(int),
+                'last_tool_used': None,
+                'session_count': 0,
+                'current_session_start': timestamp
+            })
             
             # Update user session
-            user_session = self.user_sessions[user_id]
             user_session['last_seen'] = timestamp
             user_session['tool_usage'][tool_name] += 1
             
             # Track tool sequences (what tools are used together)
-            if user_id in self.last_tool_used and self.last_tool_used[user_id] != tool_name:
-                tool_pair = tuple(sorted([self.last_tool_used[user_id], tool_name]))
-                self.metrics['concurrent_usage'][tool_name].add(tool_pair[0] if tool_pair[0] != tool_name else tool_pair[1])
+            previous_tool = user_session['last_tool_used']
+            if previous_tool and previous_tool != tool_name:
+                self.metrics['concurrent_usage'][tool_name].add(previous_tool)
             
-            self.last_tool_used[user_id] = tool_name
+            user_session['last_tool_used'] = tool_name
             
             # Track article interactions specifically
             if tool_name == 'article_recommender' and metadata and 'article_id' in metadata:
-                article_id = metadata['article_id']
-                if 'views' not in self.article_metrics[article_id]:
-                    self.article_metrics[article_id] = {
-                        'views': 0,
-                        'likes': 0,
-                        'shares': 0,
-                        'saves': 0,
-                        'avg_read_time': 0,
-                        'last_viewed': None
-                    }
+                article = self.article_metrics.setdefault(metadata['article_id'], lambda: {
+                    'views': 0,
+                    'likes': 0,
+                    'shares': 0,
+                    'saves': 0,
+                    'avg_read_time': 0,
+                    'last_viewed': None
+                })
                 
-                self.article_metrics[article_id]['views'] += 1
-                self.article_metrics[article_id]['last_viewed'] = timestamp.isoformat()
+                article['views'] += 1
+                article['last_viewed'] = timestamp.isoformat()
                 
                 if metadata.get('interaction_type') == 'like':
-                    self.article_metrics[article_id]['likes'] += 1
+                    article['likes'] += 1
                 elif metadata.get('interaction_type') == 'share':
-                    self.article_metrics[article_id]['shares'] += 1
+                    article['shares'] += 1
                 elif metadata.get('interaction_type') == 'save':
-                    self.article_metrics[article_id]['saves'] += 1
+                    article['saves'] += 1
                 
                 if 'read_time_seconds' in metadata:
-                    current_avg = self.article_metrics[article_id]['avg_read_time']
-                    total_views = self.article_metrics[article_id]['views']
-                    self.article_metrics[article_id]['avg_read_time'] = (
+                    current_avg = article['avg_read_time']
+                    total_views = article['views']
+                    article['avg_read_time'] = (
                         (current_avg * (total_views - 1) + metadata['read_time_seconds']) / total_views
                     )
     
@@ -203,7 +221,7 @@ class ToolUsageTracker:
                 'p95_response_time': (
                     sorted(response_times)[int(len(response_times) * 0.95)]
                 ) if response_times else 0,
-                'unique_users': len(self.metrics['user_engagement'][tool_name]),
+                'unique_users': self.metrics['user_engagement'][tool_name].count(),
                 'frequently_used_with': list(
                     self.metrics['concurrent_usage'][tool_name]
                 )[:10],  # Top 10 tools used with this one
@@ -216,6 +234,58 @@ class ToolUsageTracker:
             for tool in self.metrics['invocations']
         }
     
+    def record_invocation(
+        self,
+        tool_name: str,
+        duration_ms: float,
+        success: bool = True,
+        error: Optional[str] = None,
+        input_tokens: int = 0,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Record a tool invocation as reported by the agent service.
+        
+        Args:
+            tool_name: Name of the tool (or "agent" for the whole request)
+            duration_ms: Execution time in milliseconds
+            success: Whether the invocation succeeded
+            error: Error message if it failed
+            input_tokens: Approximate number of input tokens
+            metadata: Additional metadata; ``user_id`` is used for engagement
+        """
+        metadata = dict(metadata or {})
+        metadata.setdefault('input_tokens', input_tokens)
+        self.log_tool_use(
+            tool_name=tool_name,
+            user_id=metadata.get('user_id'),
+            success=success,
+            error=error or ('unknown error' if not success else None),
+            response_time=duration_ms / 1000.0,
+            metadata=metadata
+        )
+    
+    def get_stats(self, tool_name: str) -> Dict[str, Any]:
+        """
+        Get summary statistics for a tool.
+        
+        Args:
+            tool_name: Name of the tool
+            
+        Returns:
+            Dictionary with total_invocations, success_rate and avg_duration_ms
+        """
+        invocations = self.metrics['invocations'].get(tool_name, 0)
+        errors = self.metrics['errors'].get(tool_name, 0)
+        response_times = self.metrics['response_times'].get(tool_name) or []
+        return {
+            'total_invocations': invocations,
+            'success_rate': (invocations - errors) / invocations if invocations else 1.0,
+            'avg_duration_ms': (
+                sum(response_times) / len(response_times) * 1000
+            ) if response_times else 0
+        }
+    
     def get_article_metrics(self, article_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get metrics for article interactions.
@@ -228,7 +298,7 @@ class ToolUsageTracker:
         """
         if article_id:
             return self.article_metrics.get(article_id, {})
-        return dict(self.article_metrics)
+        return dict(self.article_metrics.items())
     
     def get_user_engagement(
         self, 
@@ -248,10 +318,10 @@ class ToolUsageTracker:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         
         if user_id:
-            if user_id not in self.user_sessions:
+            user_data = self.user_sessions.get(user_id)
+            if user_data is None:
                 return {}
                 
-            user_data = self.user_sessions[user_id]
             if user_data['last_seen'] < cutoff_date:
                 return {}
                 
@@ -330,7 +400,7 @@ class ToolUsageTracker:
         if user_id in self.user_sessions and exclude_viewed:
             viewed_articles = {
                 meta['article_id']
-                for tool_use in self.user_sessions[user_id].get('tool_usage', {})
+                for tool_use in self.user_sessions.get(user_id, {}).get('tool_usage', {})
                 if tool_use == 'article_recommender' and 'article_id' in tool_use.get('metadata', {})
             }
         
@@ -364,7 +434,7 @@ class ToolUsageTracker:
     
     def export_usage_data(self, output_format: str = 'json') -> Union[str, Dict[str, Any]]:
         """
-        Export the usage data in the specified format.
+        Export the aggregated tool metrics in the specified format.
         
         Args:
             output_format: The output format ('json' or 'dict').
@@ -375,10 +445,16 @@ class ToolUsageTracker:
         Raises:
             ValueError: If an unsupported format is specified.
         """
+        usage_data = {
+            'session': self.current_session,
+            'tools': self.get_tool_metrics(),
+            'tracked_users': len(self.user_sessions),
+            'tracked_articles': len(self.article_metrics)
+        }
         if output_format == 'json':
-            return json.dumps(self.usage_data, indent=2)
+            return json.dumps(usage_data, indent=2, default=str)
         elif output_format == 'dict':
-            return self.usage_data.copy()
+            return usage_data
         else:
             raise ValueError(f"Unsupported output format: {output_format}")
 
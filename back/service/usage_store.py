@@ -0,0 +1,302 @@
+"""
+Usage Tracking Storage
+
+This module provides the bounded in-memory structures and batched persistence
+used by ``ToolUsageTracker``:
+1. HyperLogLog sketches for approximate unique-user counts in fixed memory
+2. A sharded LRU map that caps per-user and per-article state
+3. An event writer that buffers usage events and flushes them in batches to
+   SQLite or Redis instead of rewriting a JSON file per call
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash (Python's ``hash`` is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality sketch.
+
+    Uses ``2 ** precision`` one-byte registers; the default precision of 12
+    takes 4 KB and has a standard error of about 1.6%.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add(self, value: Any) -> None:
+        """Add a value to the sketch."""
+        h = _hash64(str(value))
+        index = h >> (64 - self.precision)
+        remainder = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """Merge another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> int:
+        """Estimated number of distinct values added."""
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small-range correction (linear counting)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+class ShardedLRU:
+    """
+    Mapping capped at ``capacity`` entries, split into independently locked shards.
+
+    Each shard evicts its least recently used entry when full, so the total
+    number of entries never exceeds ``capacity`` no matter how many keys are
+    seen. Reads via ``get``/``[]`` refresh recency.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        shards: int = 16,
+        on_evict: Optional[Callable[[Any, Any], None]] = None
+    ):
+        self.shard_count = max(1, shards)
+        self.shard_capacity = max(1, capacity // self.shard_count)
+        self.on_evict = on_evict
+        self._shards: List[OrderedDict] = [OrderedDict() for _ in range(self.shard_count)]
+        self._locks = [threading.Lock() for _ in range(self.shard_count)]
+
+    def _shard(self, key: Any) -> int:
+        return _hash64(str(key)) % self.shard_count
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        index = self._shard(key)
+        with self._locks[index]:
+            shard = self._shards[index]
+            if key not in shard:
+                return default
+            shard.move_to_end(key)
+            return shard[key]
+
+    def setdefault(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """Return the value for ``key``, inserting ``factory()`` if missing."""
+        index = self._shard(key)
+        evicted = None
+        with self._locks[index]:
+            shard = self._shards[index]
+            if key in shard:
+                shard.move_to_end(key)
+                return shard[key]
+            value = shard[key] = factory()
+            if len(shard) > self.shard_capacity:
+                evicted = shard.popitem(last=False)
+        if evicted is not None and self.on_evict:
+            self.on_evict(*evicted)
+        return value
+
+    def __getitem__(self, key: Any) -> Any:
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        index = self._shard(key)
+        with self._locks[index]:
+            return key in self._shards[index]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        """Snapshot of all entries (does not refresh recency)."""
+        for index, shard in enumerate(self._shards):
+            with self._locks[index]:
+                entries = list(shard.items())
+            yield from entries
+
+    def keys(self) -> Iterator[Any]:
+        for key, _ in self.items():
+            yield key
+
+
+# ---------------------------------------------------------------------------
+# Batched event persistence
+# ---------------------------------------------------------------------------
+
+class SQLiteUsageBackend:
+    """Appends usage events to a SQLite table."""
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS tool_usage_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                tool_name TEXT NOT NULL,
+                user_id TEXT,
+                success INTEGER NOT NULL,
+                response_time REAL,
+                error TEXT,
+                metadata TEXT
+            )
+            ''')
+            conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tool_usage_events_tool_time
+            ON tool_usage_events (tool_name, timestamp)
+            ''')
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany('''
+            INSERT INTO tool_usage_events
+                (timestamp, tool_name, user_id, success, response_time, error, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    event['timestamp'], event['tool_name'], event.get('user_id'),
+                    int(event.get('success', True)), event.get('response_time'),
+                    event.get('error'), json.dumps(event.get('metadata') or {}, default=str)
+                )
+                for event in events
+            ])
+        conn.close()
+
+
+class RedisUsageBackend:
+    """Appends usage events to a capped Redis stream."""
+
+    def __init__(self, redis_client, stream_key: str = 'tool_usage_events', max_length: int = 1000000):
+        self.redis = redis_client
+        self.stream_key = stream_key
+        self.max_length = max_length
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for event in events:
+            fields = {
+                key: json.dumps(value, default=str) if isinstance(value, (dict, list)) else str(value)
+                for key, value in event.items() if value is not None
+            }
+            pipe.xadd(self.stream_key, fields, maxlen=self.max_length, approximate=True)
+        pipe.execute()
+
+
+class UsageEventWriter:
+    """
+    Buffers usage events and writes them to a backend in batches.
+
+    A batch is written when ``batch_size`` events are buffered or every
+    ``flush_interval`` seconds from a background thread, whichever comes
+    first. Events still buffered at interpreter exit are flushed.
+    """
+
+    def __init__(self, backend, batch_size: int = 500, flush_interval: float = 5.0, max_buffer: int = 50000):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if flush_interval:
+            self._thread = threading.Thread(target=self._run, name='usage-event-writer', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Buffer an event, writing a batch if the buffer is full."""
+        with self._lock:
+            self._buffer.append(event)
+            if len(self._buffer) > self.max_buffer:
+                # The backend is falling behind; drop the oldest events
+                del self._buffer[:len(self._buffer) - self.max_buffer]
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered events. Returns the number written."""
+        with self._write_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return 0
+            try:
+                self.backend.write(events)
+            except Exception as e:
+                logger.error(f"Could not persist {len(events)} usage events: {str(e)}")
+                with self._lock:
+                    self._buffer[:0] = events
+                return 0
+            return len(events)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background thread and flush remaining events."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+_writers: Dict[str, UsageEventWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_event_writer(db_path: Union[str, Path], **kwargs) -> UsageEventWriter:
+    """Get the shared SQLite event writer for a database path."""
+    key = str(Path(db_path).resolve())
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = UsageEventWriter(SQLiteUsageBackend(db_path), **kwargs)
+        return _writers[key]
@@ -0,0 +1,119 @@
+"""
+User Profile Cache
+
+Short-lived snapshots of a user's preferences and recent interactions, so
+repeated requests for the same user don't query the user database each
+time:
+1. Snapshots are kept in process memory (LRU, bounded), or in Redis when
+   several workers should share them
+2. Entries expire after ``ttl`` seconds, which bounds staleness from writes
+   made by other processes
+3. Writers invalidate the user's entry (``log_interaction`` and preference
+   updates), so a process sees its own writes immediately
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Profile = Dict[str, Any]
+
+
+class MemoryProfileStore:
+    """Snapshots in process memory, least recently used evicted first."""
+
+    def __init__(self, max_users: int = 10000):
+        self.max_users = max_users
+        self._entries: 'OrderedDict[str, Tuple[float, Profile]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Profile]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, profile = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return profile
+
+    def set(self, user_id: str, profile: Profile, ttl: float) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, profile)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+class RedisProfileStore:
+    """Snapshots as JSON strings with a Redis expiry, shared by all workers."""
+
+    def __init__(self, redis_client, prefix: str = 'user_profile:'):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def get(self, user_id: str) -> Optional[Profile]:
+        value = self.redis.get(self.prefix + user_id)
+        return json.loads(value) if value is not None else None
+
+    def set(self, user_id: str, profile: Profile, ttl: float) -> None:
+        self.redis.set(self.prefix + user_id, json.dumps(profile), ex=max(1, int(ttl)))
+
+    def delete(self, user_id: str) -> None:
+        self.redis.delete(self.prefix + user_id)
+
+
+class UserProfileCache:
+    """Per-user profile snapshots with a TTL and explicit invalidation."""
+
+    def __init__(self, ttl: float = 60.0, store=None):
+        self.ttl = ttl
+        self.store = store or MemoryProfileStore()
+
+    def init_app(self, redis_client=None, ttl: Optional[float] = None) -> None:
+        """
+        Configure the cache.
+
+        Args:
+            redis_client: Share snapshots through Redis instead of process memory
+            ttl: Seconds a snapshot is served
+        """
+        if redis_client is not None:
+            self.store = RedisProfileStore(redis_client)
+        if ttl is not None:
+            self.ttl = ttl
+
+    def get(self, user_id: str) -> Optional[Profile]:
+        try:
+            return self.store.get(str(user_id))
+        except Exception as e:
+            logger.warning(f"Profile cache read failed for user {user_id}: {str(e)}")
+            return None
+
+    def set(self, user_id: str, profile: Profile) -> None:
+        if not self.ttl:
+            return
+        try:
+            self.store.set(str(user_id), profile, self.ttl)
+        except Exception as e:
+            logger.warning(f"Profile cache write failed for user {user_id}: {str(e)}")
+
+    def invalidate(self, user_id: str) -> None:
+        try:
+            self.store.delete(str(user_id))
+        except Exception as e:
+            logger.warning(f"Profile cache invalidation failed for user {user_id}: {str(e)}")
+
+
+user_profile_cache = UserProfileCache()
@@ -0,0 +1,196 @@
+"""
+Weather Cache
+
+Caches weather lookups so users in the same place share one upstream call:
+1. Keys are a normalized city/country pair, or a latitude/longitude bucket
+   (0.1 degree, about 11 km) for coordinate lookups
+2. Entries are fresh for ``ttl`` seconds (10 minutes by default)
+3. Concurrent misses for the same key wait for a single upstream call
+4. For ``stale_ttl`` seconds after expiry an entry is still served while one
+   background call refreshes it
+
+Entries are kept in process memory, or in Redis when several workers should
+share them; coalescing is per process. Failed calls are not cached.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Weather = Dict[str, Any]
+Entry = Tuple[float, Weather]  # (fetched_at wall-clock time, weather data)
+
+
+def city_key(city: str, country: Optional[str] = None) -> str:
+    """Cache key for a city, ignoring case, spacing and punctuation around names."""
+    name = ' '.join(city.lower().replace(',', ' ').split())
+    return f"city:{name}|{(country or '').strip().upper()}"
+
+
+def coordinate_key(lat: float, lon: float, precision: int = 1) -> str:
+    """Cache key for the lat/lon bucket containing a point."""
+    return f"geo:{round(float(lat), precision):.{precision}f},{round(float(lon), precision):.{precision}f}"
+
+
+class MemoryWeatherStore:
+    """Entries in process memory, least recently used evicted first."""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Entry, expire: float) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisWeatherStore:
+    """Entries as JSON strings with a Redis expiry, shared by all workers."""
+
+    def __init__(self, redis_client, prefix: str = 'weather:'):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Entry]:
+        value = self.redis.get(self.prefix + key)
+        if value is None:
+            return None
+        fetched_at, weather = json.loads(value)
+        return fetched_at, weather
+
+    def set(self, key: str, entry: Entry, expire: float) -> None:
+        self.redis.set(self.prefix + key, json.dumps(entry), ex=max(1, int(expire)))
+
+
+class _Flight:
+    """An upstream call in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Weather] = None
+        self.error: Optional[BaseException] = None
+
+
+class WeatherCache:
+    """TTL cache with single-flight misses and stale-while-revalidate."""
+
+    def __init__(self, ttl: float = 600.0, stale_ttl: float = 3600.0, store=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.store = store or MemoryWeatherStore()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, redis_client=None, ttl: Optional[float] = None, stale_ttl: Optional[float] = None) -> None:
+        """
+        Configure the cache.
+
+        Args:
+            redis_client: Share entries through Redis instead of process memory
+            ttl: Seconds an entry is fresh
+            stale_ttl: Seconds after expiry an entry is still served while refreshing
+        """
+        if redis_client is not None:
+            self.store = RedisWeatherStore(redis_client)
+        if ttl is not None:
+            self.ttl = ttl
+        if stale_ttl is not None:
+            self.stale_ttl = stale_ttl
+
+    def get(self, key: str, fetch: Callable[[], Weather]) -> Weather:
+        """
+        The weather for ``key``, calling ``fetch`` only when the entry is
+        missing or expired.
+
+        Raises:
+            Whatever ``fetch`` raises when there is no entry to serve
+        """
+        entry = self._read(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self._refresh(key, fetch)
+                return entry[1]
+        return self._fetch_once(key, fetch)
+
+    def _read(self, key: str) -> Optional[Entry]:
+        try:
+            return self.store.get(key)
+        except Exception as e:
+            logger.warning(f"Weather cache read failed for {key}: {str(e)}")
+            return None
+
+    def _write(self, key: str, weather: Weather) -> None:
+        if not self.ttl:
+            return
+        try:
+            self.store.set(key, (time.time(), weather), self.ttl + self.stale_ttl)
+        except Exception as e:
+            logger.warning(f"Weather cache write failed for {key}: {str(e)}")
+
+    def _join(self, key: str) -> Tuple[_Flight, bool]:
+        """The call in progress for ``key``, or a new one led by the caller."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _lead(self, key: str, flight: _Flight, fetch: Callable[[], Weather]) -> Weather:
+        try:
+            flight.result = fetch()
+            self._write(key, flight.result)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _fetch_once(self, key: str, fetch: Callable[[], Weather]) -> Weather:
+        """Call ``fetch``, or wait for the call already in progress for ``key``."""
+        flight, leader = self._join(key)
+        if leader:
+            return self._lead(key, flight, fetch)
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _refresh(self, key: str, fetch: Callable[[], Weather]) -> None:
+        """Refetch ``key`` in the background unless a call is already in progress."""
+        flight, leader = self._join(key)
+        if not leader:
+            return
+
+        def run():
+            try:
+                self._lead(key, flight, fetch)
+            except Exception as e:
+                logger.warning(f"Weather refresh failed for {key}, serving stale data: {str(e)}")
+
+        threading.Thread(target=run, name='weather-refresh', daemon=True).start()
+
+
+weather_cache = WeatherCache()
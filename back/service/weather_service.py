@@ -2,12 +2,21 @@
 Weather Service Module
 
 This module provides functionality to fetch real-time weather data
-from the OpenWeatherMap API.
+from the OpenWeatherMap API. Lookups are cached by location (see
+``weather_cache``), so users in the same city share one API call.
 """
 import os
 import requests
 from typing import Dict, Any, Optional
 
+from .weather_cache import city_key, coordinate_key, weather_cache
+
+DEFAULT_BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+REQUEST_TIMEOUT = float(os.environ.get('OPENWEATHERMAP_TIMEOUT', 5))
+
+# Reuses connections to the API across requests
+_session = requests.Session()
+
 
 def get_weather_data(city: str, country: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -34,28 +43,66 @@ def get_weather_data(city: str, country: Optional[str] = None) -> Dict[str, Any]
     if not city or not isinstance(city, str):
         raise ValueError("City name must be a non-empty string")
     
+    location_query = city
+    if country:
+        location_query = f"{city},{country}"
+    
+    weather = weather_cache.get(
+        city_key(city, country),
+        lambda: _fetch_weather({'q': location_query}, f"City '{city}'")
+    )
+    return dict(weather, city=city)
+
+
+def get_weather_by_coordinates(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Fetches real-time weather data for a latitude/longitude.
+    
+    Nearby points share a cache entry (0.1 degree buckets), and the API is
+    queried at the bucket's center.
+    
+    Args:
+        lat (float): Latitude in degrees
+        lon (float): Longitude in degrees
+        
+    Returns:
+        Dict[str, Any]: The same fields as ``get_weather_data``, with 'city'
+            set to the name the API reports for the location
+            
+    Raises:
+        ValueError: If the coordinates are out of range
+        ConnectionError: If there's a network issue connecting to the API
+        Exception: For other errors (invalid API key, rate limiting, etc.)
+    """
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("Latitude must be within [-90, 90] and longitude within [-180, 180]")
+    
+    lat, lon = round(lat, 1), round(lon, 1)
+    return weather_cache.get(
+        coordinate_key(lat, lon),
+        lambda: _fetch_weather({'lat': lat, 'lon': lon}, f"Location ({lat}, {lon})")
+    )
+
+
+def _fetch_weather(query: Dict[str, Any], label: str) -> Dict[str, Any]:
+    """Call the API for ``query`` (q, or lat and lon) and structure the response."""
     # Get API key from environment variables
     api_key = os.environ.get('OPENWEATHERMAP_API_KEY')
     if not api_key:
         raise Exception("OpenWeatherMap API key not found in environment variables")
     
     # Build the API request URL
-    base_url = "https://api.openweathermap.org/data/2.5/weather"
+    base_url = os.environ.get('OPENWEATHERMAP_BASE_URL', DEFAULT_BASE_URL)
     
-    # Add country to the query if provided
-    location_query = city
-    if country:
-        location_query = f"{city},{country}"
-        
-    params = {
-        'q': location_query,
-        'appid': api_key,
-        'units': 'metric'  # Get temperature in Celsius
-    }
+    params = dict(
+        query,
+        appid=api_key,
+        units='metric'  # Get temperature in Celsius
+    )
     
     try:
         # Send the GET request to the API
-        response = requests.get(base_url, params=params)
+        response = _session.get(base_url, params=params, timeout=REQUEST_TIMEOUT)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -65,7 +112,7 @@ def get_weather_data(city: str, country: Optional[str] = None) -> Dict[str, Any]
         
         # Extract and structure the relevant weather information
         result = {
-            'city': city,
+            'city': weather_data.get('name', ''),
             'temperature': weather_data['main']['temp'],
             'humidity': weather_data['main']['humidity'],
             'pressure': weather_data['main']['pressure'],
@@ -87,7 +134,7 @@ def get_weather_data(city: str, country: Optional[str] = None) -> Dict[str, Any]
         if response.status_code == 401:
             raise Exception("Invalid API key or unauthorized access")
         elif response.status_code == 404:
-            raise ValueError(f"City '{city}' not found")
+            raise ValueError(f"{label} not found")
         elif response.status_code == 429:
             raise Exception("API rate limit exceeded")
         else:
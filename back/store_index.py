@@ -7,16 +7,23 @@ This enables semantic search capabilities for the Ayurveda application.
 """
 
 from service.helper import load_pdf_file, text_split, download_hugging_face_embeddings
+from service.recommendation_classifier import CentroidClassifier, RecommendationClassifier
+from service.recommendation_grid import recommendation_grid
+from service.recommendation_service import RecommendationService
 from pinecone.grpc import PineconeGRPC as Pinecone
 from pinecone import ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from dotenv import load_dotenv
+import hashlib
 import os
 
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Vectors sent to Pinecone per upsert request
+UPSERT_BATCH_SIZE = 100
+
 # Get Pinecone API key from environment variables
 PINECONE_API_KEY=os.environ.get('PINECONE_API_KEY')
 os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
@@ -54,13 +61,31 @@ pc.create_index(
     ) 
 ) 
 
-# Step 6: Convert text chunks to embeddings and store them in Pinecone
-# This creates a searchable vector database of our Ayurvedic knowledge
-docsearch = PineconeVectorStore.from_documents(
-    documents=text_chunks,  # The text chunks to be embedded
-    index_name=index_name,  # The name of our Pinecone index
-    embedding=embeddings,   # The embedding model to use
-)
+# Step 6: Embed the chunks once and store them in Pinecone. The same vectors
+# label each chunk (keywords, with category centroids deciding chunks the
+# keywords leave undecided); the label is kept in the chunk metadata so the
+# API never classifies at request time
+texts = [chunk.page_content for chunk in text_chunks]
+vectors = embeddings.embed_documents(texts)
+classifier = RecommendationClassifier(centroids=CentroidClassifier.from_keywords(embeddings.embed_documents))
+labels = classifier.classify_many(texts, vectors)
+
+index = pc.Index(index_name)
+records = []
+for chunk, vector, label in zip(text_chunks, vectors, labels):
+    key = f"{chunk.metadata.get('source')}:{chunk.metadata.get('page')}:{chunk.page_content}"
+    chunk_id = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    metadata = dict(chunk.metadata, text=chunk.page_content, classification=label, id=chunk_id)
+    records.append((chunk_id, vector, metadata))
+for start in range(0, len(records), UPSERT_BATCH_SIZE):
+    index.upsert(vectors=records[start:start + UPSERT_BATCH_SIZE])
+
+docsearch = PineconeVectorStore(index=index, embedding=embeddings, text_key="text")
 
 # The index is now populated with vector embeddings of Ayurvedic knowledge
 # and ready to be queried by the application for semantic search capabilities
+
+# Step 7: Precompute recommendations for requests without free text
+# (dosha x season x time of day x weather), so the API can serve them
+# without searching the index
+recommendation_grid.build(RecommendationService(embeddings=embeddings, vector_store=docsearch))
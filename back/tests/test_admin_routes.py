@@ -0,0 +1,76 @@
+"""
+Tests for the admin profiling routes, served through create_app.
+"""
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fakes import FakeChatModel, FakeRetriever
+from benchmarks.stubbed_agent import stubbed_externals
+
+
+def load_app():
+    """Import the app module with the testing config and external services stubbed."""
+    if 'app' not in sys.modules:
+        with stubbed_externals(FakeChatModel(), FakeRetriever(documents=[])), \
+                mock.patch.dict(os.environ, {'FLASK_ENV': 'testing'}), \
+                mock.patch('eventlet.monkey_patch'):
+            import app  # noqa: F401
+    return sys.modules['app'].app
+
+
+class TestAdminRoutes(unittest.TestCase):
+    """Test cases for /api/admin."""
+
+    @classmethod
+    def setUpClass(cls):
+        from extensions import db
+        from models.user import User
+        from utils.tokens import generate_token
+
+        cls.app = load_app()
+        with cls.app.app_context():
+            admin = User(username='admin', email='admin@example.com', is_admin=True)
+            member = User(username='member', email='member@example.com')
+            for user in (admin, member):
+                user.password = 'secret'
+                db.session.add(user)
+            db.session.commit()
+            cls.admin_token = generate_token(admin.id)
+            cls.member_token = generate_token(member.id)
+
+    def setUp(self):
+        self.client = self.app.test_client()
+
+    def post_profile(self, token, **body):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        return self.client.post('/api/admin/profile', json=body, headers=headers)
+
+    def test_admin_captures_profile(self):
+        response = self.post_profile(self.admin_token, seconds=0.05, interval=0.005)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+        self.assertIn('attachment; filename=profile-', response.headers['Content-Disposition'])
+
+    def test_requires_admin_token(self):
+        self.assertEqual(self.post_profile(None, seconds=0.05).status_code, 401)
+        self.assertEqual(self.post_profile(self.member_token, seconds=0.05).status_code, 403)
+
+    def test_rejects_invalid_duration(self):
+        response = self.post_profile(self.admin_token, seconds=0)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['status'], 'error')
+
+    def test_continuous_profile_requires_sampler(self):
+        response = self.client.get(
+            '/api/admin/profile/continuous', headers={'Authorization': f'Bearer {self.admin_token}'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
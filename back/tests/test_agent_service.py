@@ -0,0 +1,94 @@
+"""
+Tests for AgentService with its external services stubbed.
+"""
+import importlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fakes import FakeChatModel, FakeRetriever, load_corpus
+from benchmarks.stubbed_agent import stubbed_externals
+
+
+def build_agent(llm, article_db_path, user_id='test-user'):
+    """Import service.agent_service with stubbed externals and build an agent around ``llm``."""
+    with stubbed_externals(llm, FakeRetriever.from_corpus(load_corpus())):
+        module = importlib.import_module('service.agent_service')
+        with mock.patch.object(module, 'ChatOpenAI', lambda *args, **kwargs: llm), \
+                mock.patch('service.article_service.DEFAULT_DB_PATH', article_db_path):
+            return module.AgentService(user_id=user_id)
+
+
+class TestAgentService(unittest.TestCase):
+    """AgentService.invoke runs the executor, its tools and its memory."""
+
+    def setUp(self):
+        # The agent keeps conversations and tool usage under ./data
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.llm = FakeChatModel()
+        self.agent = build_agent(self.llm, os.path.join(self.tmpdir.name, 'ayurveda.db'))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def test_invoke_runs_a_tool_and_reports_it(self):
+        result = self.agent.invoke({'message': 'Which herbs help digestion?'})
+
+        self.assertNotIn('error', result)
+        self.assertTrue(result['response'])
+        self.assertEqual([call['tool'] for call in result['metadata']['tool_calls']], ['vector_store_search'])
+        self.assertEqual(result['metadata']['tool_results'][0]['tool'], 'vector_store_search')
+        self.assertEqual(result['metrics']['tool_usage'], {'vector_store_search': 1})
+        self.assertEqual(self.agent.metrics['total_tool_calls'], 1)
+
+    def test_article_recommender_tool_searches_published_articles(self):
+        manager = self.agent.article_agent.article_manager
+        ids = manager.save_articles([
+            {'title': 'Ashwagandha for sleep', 'url': 'http://example.com/1',
+             'description': 'An adaptogen', 'content': 'Ashwagandha calms vata before bed'},
+            {'title': 'Triphala basics', 'url': 'http://example.com/2',
+             'description': 'Digestion', 'content': 'Triphala supports digestion'},
+            {'title': 'Ashwagandha draft', 'url': 'http://example.com/3',
+             'description': 'Unpublished', 'content': 'Ashwagandha notes'},
+        ])
+        manager.publish_article(ids[0])
+        manager.publish_article(ids[1])
+        tool = next(tool for tool in self.agent.tools if tool.name == 'article_recommender')
+
+        result = json.loads(tool.run(json.dumps({'query': 'ashwagandha', 'categories': ['sleep']})))
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual([article['id'] for article in result['articles']], [ids[0]])
+
+        # Plain text is taken as the query; no words at all lists the latest articles
+        result = json.loads(tool.run('triphala'))
+        self.assertEqual([article['id'] for article in result['articles']], [ids[1]])
+        result = json.loads(tool.run(json.dumps({'max_results': 5})))
+        self.assertEqual(sorted(article['id'] for article in result['articles']), sorted(ids[:2]))
+
+    def test_invoke_saves_the_exchange_to_memory(self):
+        self.agent.invoke({'message': 'Which herbs help digestion?'})
+        result = self.agent.invoke({'message': 'What should I eat in winter?'})
+
+        self.assertNotIn('error', result)
+        history = self.agent.memory.get_messages()
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history[0].content, 'Which herbs help digestion?')
+        self.assertGreater(self.agent.metrics['total_time'], 0)
+
+    def test_conversation_summary_covers_user_and_assistant_messages(self):
+        self.agent.invoke({'message': 'Which herbs help digestion?'})
+
+        self.assertIsInstance(self.agent._generate_conversation_summary(), str)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests for the rolling-window alert engine.
+"""
+import unittest
+
+from back.service.alert_engine import (
+    AlertEngine, AlertRule, RollingWindow, StreamRegistry, parse_duration
+)
+
+
+class TestRollingWindow(unittest.TestCase):
+    """Test cases for RollingWindow."""
+
+    def test_samples_expire(self):
+        """Totals drop old buckets as time advances."""
+        window = RollingWindow(60, step=10)
+        for t in range(0, 60, 10):
+            window.add(1.0, error=(t == 0), now=1000 + t)
+        self.assertEqual(window.count, 6)
+        self.assertAlmostEqual(window.aggregate('error_rate'), 1 / 6)
+
+        window.advance(1000 + 65)
+        self.assertEqual(window.count, 5)
+        self.assertEqual(window.errors, 0)
+
+        window.advance(1000 + 1000)
+        self.assertEqual(window.count, 0)
+        self.assertEqual(sum(window.histogram), 0)
+
+    def test_percentile_accuracy(self):
+        """Histogram percentiles are within the bin width of the exact value."""
+        window = RollingWindow(300, step=10)
+        for i in range(1, 1001):
+            window.add(i / 100.0, now=5000)
+        self.assertAlmostEqual(window.percentile(99), 9.9, delta=9.9 * 0.1)
+        self.assertAlmostEqual(window.aggregate('mean'), 5.005)
+
+
+class TestAlertRule(unittest.TestCase):
+    """Test cases for rule parsing."""
+
+    def test_parse_expressions(self):
+        rule = AlertRule.parse('slow', 'p99(latency:*) over 5m > 5s')
+        self.assertEqual((rule.aggregation, rule.series, rule.window, rule.threshold),
+                         ('p99', 'latency:*', 300, 5))
+
+        rule = AlertRule.parse('errors', 'error_rate(latency:tool:*) over 1m > 5%')
+        self.assertEqual(rule.window, 60)
+        self.assertAlmostEqual(rule.threshold, 0.05)
+        self.assertEqual(parse_duration('250ms'), 0.25)
+
+        with self.assertRaises(ValueError):
+            AlertRule.parse('bad', 'p99 latency > 5')
+
+
+class TestAlertEngine(unittest.TestCase):
+    """Test cases for AlertEngine."""
+
+    def setUp(self):
+        self.events = []
+        self.registry = StreamRegistry(step=10)
+        self.engine = AlertEngine(
+            self.registry,
+            rules=[AlertRule.parse('errors', 'error_rate(latency:*) over 1m > 5%',
+                                   clear_threshold=0.02, for_count=2, min_samples=10)],
+            sinks=[self.events.append]
+        )
+
+    def _traffic(self, series, now, errors, total=20):
+        for i in range(total):
+            self.registry.observe(series, 0.1, error=i < errors, now=now)
+
+    def test_fires_once_per_series_and_resolves(self):
+        """Alerts need consecutive breaches, are deduplicated and resolve."""
+        now = 10000
+        self._traffic('latency:tool:weather', now, errors=5)
+        self._traffic('latency:tool:dosha', now, errors=0)
+
+        self.assertEqual(self.engine.evaluate(now), [])  # first breach: pending
+        fired = self.engine.evaluate(now + 1)
+        self.assertEqual([e['series'] for e in fired], ['latency:tool:weather'])
+        self.assertEqual(fired[0]['type'], 'fired')
+        self.assertEqual(self.engine.evaluate(now + 2), [])  # deduplicated
+
+        # After the window passes with clean traffic the alert resolves
+        later = now + 120
+        self._traffic('latency:tool:weather', later, errors=0)
+        resolved = self.engine.evaluate(later)
+        self.assertEqual(resolved[0]['type'], 'resolved')
+        self.assertEqual(len(self.events), 2)
+        self.assertEqual(self.engine.get_firing(), [])
+
+    def test_hysteresis_holds_state(self):
+        """A value between the clear and fire thresholds keeps the alert firing."""
+        now = 20000
+        self._traffic('latency:api', now, errors=4)  # 20%
+        self.engine.evaluate(now)
+        self.engine.evaluate(now + 1)
+
+        later = now + 120
+        self._traffic('latency:api', later, errors=1, total=25)  # 4%: below 5%, above 2%
+        self.assertEqual(self.engine.evaluate(later), [])
+        self.assertEqual(self.engine.get_firing(), [('errors', 'latency:api')])
+
+    def test_schedule_uses_scheduler(self):
+        """The engine registers a single interval job."""
+        calls = []
+
+        class Scheduler:
+            def add_job(self, **kwargs):
+                calls.append(kwargs)
+
+        self.engine.schedule(Scheduler(), seconds=10)
+        self.assertEqual(calls[0]['trigger'], 'interval')
+        self.assertEqual(calls[0]['seconds'], 10)
+        self.assertEqual(calls[0]['func'], self.engine.evaluate)
+
+
+if __name__ == "__main__":
+    unittest.main()
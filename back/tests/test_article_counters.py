@@ -0,0 +1,88 @@
+"""
+Tests for write-behind article counters.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from back.service.article_counters import ArticleCounters, SQLiteCounterBackend
+from back.service.article_store import ArticleStore
+
+
+class FailingBackend:
+    def write(self, deltas):
+        raise sqlite3.OperationalError('database is locked')
+
+
+class TestArticleCounters(unittest.TestCase):
+    """Test cases for ArticleCounters."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'ayurveda.db')
+        self.db = sqlite3.connect(self.db_path)
+        self.ids = ArticleStore(self.db).save_articles([
+            {'title': 'One', 'url': 'u1', 'content': 'Ayurveda'},
+            {'title': 'Two', 'url': 'u2', 'content': 'Triphala'},
+        ])
+        self.counters = ArticleCounters(self.db_path, flush_interval=0)
+
+    def tearDown(self):
+        self.counters.close()
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def _stored(self, article_id):
+        return self.db.execute(
+            'SELECT view_count, like_count, share_count FROM article_metrics WHERE article_id = ?', (article_id,)
+        ).fetchall()
+
+    def test_increments_are_summed_into_one_flush(self):
+        threads = [
+            threading.Thread(target=lambda: [self.counters.increment(self.ids[0], 'view_count') for _ in range(250)])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.counters.increment(self.ids[1], 'like_count', 2)
+
+        self.assertEqual(self._stored(self.ids[0]), [(0, 0, 0)])
+        self.assertEqual(self.counters.flush(), 2)
+        self.assertEqual(self._stored(self.ids[0]), [(1000, 0, 0)])
+        self.assertEqual(self._stored(self.ids[1]), [(0, 2, 0)])
+        self.assertEqual(self.counters.pending(self.ids[0]), {})
+
+    def test_reads_merge_pending_deltas(self):
+        self.counters.increment(self.ids[0], 'share_count')
+        rows = self.counters.merge([{'id': self.ids[0], 'share_count': 4}, {'id': self.ids[1], 'share_count': None}])
+        self.assertEqual([row['share_count'] for row in rows], [5, None])
+
+    def test_failed_flush_keeps_deltas(self):
+        counters = ArticleCounters(backend=FailingBackend(), flush_interval=0)
+        counters.increment(self.ids[0], 'view_count')
+        self.assertEqual(counters.flush(), 0)
+        counters.increment(self.ids[0], 'view_count')
+        self.assertEqual(counters.pending(self.ids[0]), {'view_count': 2})
+
+        counters.backend = SQLiteCounterBackend(self.db_path)
+        self.assertEqual(counters.flush(), 1)
+        self.assertEqual(self._stored(self.ids[0]), [(2, 0, 0)])
+
+    def test_missing_metrics_row_is_created(self):
+        self.db.execute('DELETE FROM article_metrics')
+        self.db.commit()
+        self.counters.increment(self.ids[0], 'like_count')
+        self.counters.flush()
+        self.assertEqual(self._stored(self.ids[0]), [(0, 1, 0)])
+
+    def test_unknown_counter(self):
+        with self.assertRaises(ValueError):
+            self.counters.increment(self.ids[0], 'bookmark_count')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests for the async article crawler against a local HTTP stand-in.
+"""
+import asyncio
+import time
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from back.service.article_crawler import ArticleCrawler, ValidatorCache, extract_main_text
+
+PAGE_DELAY = 0.2
+ARTICLE_COUNT = 50
+
+
+class StandInServer:
+    """Local server imitating NewsAPI, Google Custom Search and article pages."""
+
+    def __init__(self):
+        self.hits = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        app = web.Application()
+        app.router.add_get('/newsapi', self.newsapi)
+        app.router.add_get('/search', self.search)
+        app.router.add_get('/article/{n}', self.article)
+        app.router.add_get('/flaky', self.flaky)
+        app.router.add_get('/big', self.big)
+        app.router.add_get('/file.pdf', self.pdf)
+        self.server = TestServer(app)
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+    def _hit(self, key):
+        self.hits[key] = self.hits.get(key, 0) + 1
+        return self.hits[key]
+
+    async def newsapi(self, request):
+        return web.json_response({'articles': [{
+            'title': 'Ayurveda news', 'url': 'http://news/1', 'source': {'name': 'News'},
+            'description': 'Herbs', 'content': 'Ayurveda herbs', 'author': None
+        }]})
+
+    async def search(self, request):
+        start = int(request.query['start'])
+        num = int(request.query['num'])
+        return web.json_response({'items': [
+            {'title': f'Article {n}', 'link': self.url(f'/article/{n}'), 'displayLink': 'local',
+             'snippet': 'Ayurveda'}
+            for n in range(start, start + num)
+        ]})
+
+    async def article(self, request):
+        self._hit(request.path)
+        etag = f'"{request.match_info["n"]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(PAGE_DELAY)
+        finally:
+            self.in_flight -= 1
+        return web.Response(
+            text=f"<html><nav>menu</nav><article><p>Ayurveda page {request.match_info['n']}</p></article></html>",
+            content_type='text/html',
+            headers={'ETag': etag}
+        )
+
+    async def flaky(self, request):
+        if self._hit('flaky') < 3:
+            return web.Response(status=503, headers={'Retry-After': '0'})
+        return web.Response(text='ok')
+
+
+    async def big(self, request):
+        return web.Response(text='<html><article><p>' + 'a' * 100000 + '</p></article></html>',
+                            content_type='text/html')
+
+    async def pdf(self, request):
+        return web.Response(body=b'%PDF-1.4', content_type='application/pdf')
+
+
+class TestArticleCrawler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for ArticleCrawler."""
+
+    async def asyncSetUp(self):
+        self.stand_in = StandInServer()
+        await self.stand_in.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.stand_in.server.close()
+
+    def _crawler(self, **kwargs):
+        return ArticleCrawler(
+            news_api_url=self.stand_in.url('/newsapi'),
+            search_url=self.stand_in.url('/search'),
+            backoff=0.01,
+            **kwargs
+        )
+
+    async def test_discovers_fifty_articles_concurrently(self):
+        """Fifty slow pages are fetched in parallel within the host limit."""
+        started = time.perf_counter()
+        async with self._crawler(per_host_concurrency=10) as crawler:
+            articles = await crawler.discover('Ayurveda', search_results=ARTICLE_COUNT)
+        elapsed = time.perf_counter() - started
+
+        scraped = [a for a in articles if a['source'] == 'local']
+        self.assertEqual(len(scraped), ARTICLE_COUNT)
+        self.assertTrue(all(a['content'].startswith('Ayurveda page') for a in scraped))
+        self.assertEqual(len(articles), ARTICLE_COUNT + 1)
+        self.assertLessEqual(self.stand_in.max_in_flight, 10)
+        # Serial fetching would take ARTICLE_COUNT * PAGE_DELAY = 10s
+        self.assertLess(elapsed, ARTICLE_COUNT * PAGE_DELAY / 3)
+
+    async def test_conditional_get_uses_cache(self):
+        """A second crawl revalidates with If-None-Match and reuses the body."""
+        cache = ValidatorCache()
+        url = self.stand_in.url('/article/7')
+        async with self._crawler(cache=cache) as crawler:
+            first = await crawler.fetch(url)
+            second = await crawler.fetch(url)
+
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.status, 304)
+        self.assertEqual(second.text, first.text)
+
+    async def test_retries_with_backoff(self):
+        """Retryable statuses are retried until success."""
+        async with self._crawler(retries=3) as crawler:
+            result = await crawler.fetch(self.stand_in.url('/flaky'))
+        self.assertTrue(result.ok)
+        self.assertEqual(self.stand_in.hits['flaky'], 3)
+
+    async def test_gives_up_after_retries(self):
+        """Persistent failures are reported instead of raised."""
+        async with self._crawler(retries=1) as crawler:
+            result = await crawler.fetch(self.stand_in.url('/flaky'))
+        self.assertFalse(result.ok)
+        self.assertEqual(result.error, 'HTTP 503')
+
+    async def test_page_reads_are_capped(self):
+        async with self._crawler() as crawler:
+            result = await crawler.fetch(self.stand_in.url('/big'), max_bytes=1000)
+            text = await crawler.scrape(self.stand_in.url('/big'))
+        self.assertTrue(result.ok)
+        self.assertEqual(len(result.text), 1000)
+        self.assertGreater(len(text), 1000)
+
+    async def test_scrape_skips_non_html(self):
+        async with self._crawler() as crawler:
+            result = await crawler.fetch(self.stand_in.url('/file.pdf'), max_bytes=1000)
+            text = await crawler.scrape(self.stand_in.url('/file.pdf'))
+        self.assertFalse(result.ok)
+        self.assertEqual(text, '')
+
+
+class TestExtractMainText(unittest.TestCase):
+    """Test cases for extract_main_text."""
+
+    def test_prefers_article_element(self):
+        html = "<nav>skip</nav><article><h1>Title</h1><p>Body</p></article><footer>x</footer>"
+        self.assertEqual(extract_main_text(html), 'Title Body')
+
+
+if __name__ == "__main__":
+    unittest.main()
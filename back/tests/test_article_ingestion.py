@@ -0,0 +1,115 @@
+"""
+Tests for background article ingestion jobs.
+"""
+import os
+import tempfile
+import unittest
+
+from back.service.article_ingestion import (
+    ArticleIngestionService, IngestionStore, run_ingestion_job,
+    JOB_FINISHED, JOB_FAILED, JOB_QUEUED
+)
+
+
+class FakePipeline:
+    """Saves articles in memory; relevant when 'Ayurveda' is in the title."""
+
+    def __init__(self):
+        self.saved = []
+
+    def is_relevant(self, article):
+        return 'Ayurveda' in article['title']
+
+    def save(self, article):
+        self.saved.append(article['url'])
+        return len(self.saved)
+
+
+class FakeCrawl:
+    """Returns a fixed result list, honouring the skip predicate."""
+
+    def __init__(self, urls):
+        self.urls = urls
+        self.calls = 0
+
+    def __call__(self, query, cache=None, skip=None, search_results=10):
+        self.calls += 1
+        return [
+            {'url': url, 'title': f"Ayurveda {url}" if 'herb' in url else url}
+            for url in self.urls if not (skip and skip(url))
+        ]
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.jobs = []
+
+    def add_job(self, **kwargs):
+        self.jobs.append(kwargs)
+
+
+class TestArticleIngestion(unittest.TestCase):
+    """Test cases for ingestion jobs."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'articles.db')
+        self.store = IngestionStore(self.db_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_job_records_results_and_skips_known_urls(self):
+        """A second run only processes URLs not fetched before."""
+        crawl = FakeCrawl(['http://a/herb1', 'http://a/news', 'http://a/herb2'])
+        pipeline = FakePipeline()
+
+        job, _ = self.store.create_job('Ayurveda')
+        result = run_ingestion_job(job['id'], self.db_path, pipeline=pipeline, crawl=crawl)
+        self.assertEqual(result['status'], JOB_FINISHED)
+        self.assertEqual((result['discovered'], result['saved'], result['skipped']), (3, 2, 1))
+        self.assertEqual(result['article_ids'], [1, 2])
+
+        crawl.urls.append('http://a/herb3')
+        job, _ = self.store.create_job('Ayurveda')
+        result = run_ingestion_job(job['id'], self.db_path, pipeline=pipeline, crawl=crawl)
+        self.assertEqual(result['discovered'], 1)
+        self.assertEqual(pipeline.saved[-1], 'http://a/herb3')
+
+    def test_failure_is_recorded(self):
+        """Crawl errors mark the job as failed instead of raising."""
+        def broken(*args, **kwargs):
+            raise RuntimeError("search API down")
+
+        job, _ = self.store.create_job('Ayurveda')
+        result = run_ingestion_job(job['id'], self.db_path, pipeline=FakePipeline(), crawl=broken)
+        self.assertEqual(result['status'], JOB_FAILED)
+        self.assertIn('search API down', result['error'])
+
+    def test_enqueue_dispatches_once_per_pending_query(self):
+        """Enqueue is cheap, schedules one job and reuses a pending one."""
+        scheduler = FakeScheduler()
+        service = ArticleIngestionService(self.db_path)
+        service.init_app(scheduler=scheduler)
+
+        first = service.enqueue('Ayurveda')
+        second = service.enqueue('Ayurveda')
+        self.assertEqual(first['status'], JOB_QUEUED)
+        self.assertEqual(first['id'], second['id'])
+        self.assertEqual(len(scheduler.jobs), 1)
+        self.assertEqual(scheduler.jobs[0]['trigger'], 'date')
+        self.assertEqual(scheduler.jobs[0]['args'], [first['id'], self.db_path])
+        self.assertEqual(service.get_job(first['id'])['query'], 'Ayurveda')
+
+    def test_periodic_schedule(self):
+        """init_app registers an interval job per query."""
+        scheduler = FakeScheduler()
+        ArticleIngestionService(self.db_path).init_app(
+            scheduler=scheduler, interval_hours=6, queries=['Ayurveda', 'dosha diet']
+        )
+        self.assertEqual([job['args'] for job in scheduler.jobs], [['Ayurveda'], ['dosha diet']])
+        self.assertTrue(all(job['trigger'] == 'interval' and job['hours'] == 6 for job in scheduler.jobs))
+
+
+if __name__ == "__main__":
+    unittest.main()
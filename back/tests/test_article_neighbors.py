@@ -0,0 +1,108 @@
+"""
+Tests for precomputed related-article lists.
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from back.service.article_neighbors import ArticleNeighborIndex
+from back.service.article_store import ArticleStore
+
+TOPICS = ['sleep', 'digestion', 'skin', 'stress']
+
+
+def fake_embed(texts):
+    """Embeds text as topic counts plus a small per-text offset."""
+    vectors = []
+    for text in texts:
+        words = text.lower().split()
+        vector = [words.count(topic) for topic in TOPICS]
+        vector.append(0.01 * len(text))
+        vectors.append(vector)
+    return vectors
+
+
+class TestArticleNeighborIndex(unittest.TestCase):
+    """Test cases for ArticleNeighborIndex."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = sqlite3.connect(os.path.join(self.tmpdir.name, 'ayurveda.db'))
+        self.store = ArticleStore(self.db)
+        self.calls = []
+
+        def embed(texts):
+            self.calls.append(len(texts))
+            return fake_embed(texts)
+
+        self.index = ArticleNeighborIndex(self.db, embed, top_n=2, block_size=2, embed_batch_size=3)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def _add(self, *specs):
+        ids = self.store.save_articles([
+            {'title': title, 'url': f'u-{title}', 'content': content} for title, content in specs
+        ])
+        self.db.execute('UPDATE articles SET is_published = 1')
+        self.db.commit()
+        return ids
+
+    def _related_titles(self, article_id):
+        return [a['title'] for a in self.index.related(article_id)]
+
+    def test_full_refresh_matches_brute_force(self):
+        """Blocked top-N equals the exact ranking over all pairs."""
+        ids = self._add(
+            ('a', 'sleep sleep stress'), ('b', 'sleep stress'), ('c', 'digestion digestion'),
+            ('d', 'digestion skin'), ('e', 'skin skin sleep'),
+        )
+        result = self.index.refresh()
+        self.assertEqual(result, {'embedded': 5, 'updated': 5})
+        self.assertEqual(self.calls, [3, 2])
+
+        vectors = np.asarray(fake_embed(['a\n\nsleep sleep stress', 'b\n\nsleep stress',
+                                         'c\n\ndigestion digestion', 'd\n\ndigestion skin',
+                                         'e\n\nskin skin sleep']), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        sims = vectors @ vectors.T
+        np.fill_diagonal(sims, -np.inf)
+        for row, article_id in enumerate(ids):
+            expected = [ids[j] for j in np.argsort(-sims[row])[:2]]
+            self.assertEqual([a['id'] for a in self.index.related(article_id)], expected)
+
+    def test_incremental_refresh_merges_new_articles(self):
+        """New articles get lists and enter existing lists only where they rank."""
+        a, b, c = self._add(('a', 'sleep'), ('b', 'sleep stress'), ('c', 'digestion'))
+        self.index.refresh()
+
+        d, = self._add(('d', 'digestion digestion skin'))
+        result = self.index.refresh()
+        self.assertEqual(result['embedded'], 1)
+        self.assertEqual(self.calls, [3, 1])
+        self.assertEqual(self._related_titles(d)[0], 'c')
+        self.assertEqual(self._related_titles(c)[0], 'd')
+
+        # Incremental result equals a full recomputation
+        incremental = {i: self._related_titles(i) for i in (a, b, c, d)}
+        self.index.refresh(full=True)
+        self.assertEqual({i: self._related_titles(i) for i in (a, b, c, d)}, incremental)
+
+    def test_lookup_hides_unpublished_and_needs_no_model(self):
+        a, b, c = self._add(('a', 'sleep'), ('b', 'sleep stress'), ('c', 'skin'))
+        self.index.refresh()
+        self.db.execute('UPDATE articles SET is_published = 0 WHERE id = ?', (b,))
+        self.db.commit()
+
+        lookup = ArticleNeighborIndex(self.db)
+        self.assertEqual([r['title'] for r in lookup.related(a)], ['c'])
+        with self.assertRaises(ValueError):
+            lookup.refresh()
+
+
+if __name__ == "__main__":
+    unittest.main()
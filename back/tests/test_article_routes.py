@@ -0,0 +1,80 @@
+"""
+Tests for the article routes.
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routes import article_routes
+from service.article_counters import ArticleCounters
+from service.article_store import ArticleStore
+from service.sqlite_pool import SQLitePool
+
+
+class TestArticleRoutes(unittest.TestCase):
+    """Article routes over a pooled test database."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.pool = SQLitePool(os.path.join(self.tmpdir.name, 'ayurveda.db'), setup=article_routes._setup_schema)
+        with self.pool.connection() as conn:
+            self.ids = ArticleStore(conn, setup=False).save_articles([
+                {'title': f'Ashwagandha and sleep {i}', 'url': f'http://example.com/{i}',
+                 'description': 'Ashwagandha calms vata', 'content': f'Ashwagandha sleep ritual {i}'}
+                for i in range(3)
+            ])
+            conn.execute('UPDATE articles SET is_published = 1')
+            conn.commit()
+
+        self.app = Flask(__name__)
+        self.app.register_blueprint(article_routes.article_bp)
+        self.client = self.app.test_client()
+        # Views counted here must not reach the app's counters database
+        for name, value in (('db_pool', self.pool), ('article_counters', ArticleCounters())):
+            patcher = mock.patch.object(article_routes, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmpdir.cleanup()
+
+    def test_article_comes_with_keyword_related_articles(self):
+        response = self.client.get(f'/api/articles/{self.ids[0]}')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['article']['id'], self.ids[0])
+        self.assertEqual(sorted(article['id'] for article in body['recommendations']), sorted(self.ids[1:]))
+
+    def test_request_runs_no_schema_statements(self):
+        statements = []
+        with self.pool.connection() as conn:
+            conn.set_trace_callback(statements.append)
+
+        self.client.get(f'/api/articles/{self.ids[0]}')
+
+        self.assertTrue(statements)
+        self.assertFalse([sql for sql in statements if sql.lstrip().upper().startswith('CREATE')])
+
+    def test_missing_article_is_404(self):
+        self.assertEqual(self.client.get('/api/articles/999').status_code, 404)
+
+    def test_search_total_counts_every_match_unless_capped(self):
+        body = self.client.get('/api/articles?search=ashwagandha&limit=2').get_json()
+        self.assertEqual((body['count'], body['total']), (2, 3))
+
+        self.app.config['ARTICLE_SEARCH_CANDIDATES'] = 1
+        body = self.client.get('/api/articles?search=ashwagandha&limit=2').get_json()
+        self.assertEqual((body['count'], body['total']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
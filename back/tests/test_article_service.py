@@ -0,0 +1,79 @@
+"""
+Tests for the article manager and agent.
+"""
+import importlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fakes import FakeChatModel, FakeRetriever
+from benchmarks.stubbed_agent import stubbed_externals
+
+
+def load_article_service():
+    """Import service.article_service without Pinecone or the embedding model."""
+    with stubbed_externals(FakeChatModel(), FakeRetriever(documents=[])):
+        return importlib.import_module('service.article_service')
+
+
+class TestArticleService(unittest.TestCase):
+    """ArticleManager's database and ArticleAgent's interaction log."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.article_service = load_article_service()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'data', 'ayurveda.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _tables(self, db):
+        return {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    def test_manager_defaults_to_the_sqlite_article_database(self):
+        with mock.patch.object(self.article_service, 'DEFAULT_DB_PATH', self.db_path):
+            manager = self.article_service.ArticleManager()
+
+        self.assertIsInstance(manager.db, sqlite3.Connection)
+        self.assertTrue(os.path.exists(self.db_path))
+        self.assertTrue({'articles', 'article_interactions'} <= self._tables(manager.db))
+        manager.db.close()
+
+    def test_interactions_are_recorded_per_user(self):
+        db = sqlite3.connect(os.path.join(self.tmpdir.name, 'articles.db'))
+        agent = self.article_service.ArticleAgent(self.article_service.ArticleManager(db))
+
+        self.assertTrue(agent.log_article_interaction('u1', '7', 'view'))
+        self.assertTrue(agent.log_article_interaction('u1', '7', 'save', {'source': 'dashboard'}))
+        self.assertTrue(agent.log_article_interaction('u2', '7', 'like'))
+
+        rows = db.execute('''
+            SELECT user_id, article_id, interaction_type, metadata
+            FROM article_interactions WHERE user_id = ? ORDER BY id
+        ''', ('u1',)).fetchall()
+        self.assertEqual(
+            [(user, article, kind, json.loads(metadata)) for user, article, kind, metadata in rows],
+            [('u1', 7, 'view', {}), ('u1', 7, 'save', {'source': 'dashboard'})]
+        )
+        db.close()
+
+    def test_invalid_article_id_is_not_recorded(self):
+        db = sqlite3.connect(':memory:')
+        agent = self.article_service.ArticleAgent(self.article_service.ArticleManager(db))
+
+        self.assertFalse(agent.log_article_interaction('u1', 'not-an-id', 'view'))
+        self.assertEqual(db.execute('SELECT COUNT(*) FROM article_interactions').fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
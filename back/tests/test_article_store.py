@@ -0,0 +1,281 @@
+"""
+Tests for bulk article upserts and full-text search.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from back.service.article_store import (
+    ArticleStore, MAX_ROWS_PER_STATEMENT, build_match_query, encode_cursor
+)
+from back.service.keyword_extractor import KeywordExtractor
+
+
+def make_articles(count, prefix='http://example.com/a'):
+    return [
+        {'title': f'Ayurveda article {i}', 'url': f'{prefix}{i}', 'source': 'Example',
+         'description': 'Herbs for vata balance', 'content': f'Ashwagandha triphala turmeric {i}'}
+        for i in range(count)
+    ]
+
+
+class TestArticleStore(unittest.TestCase):
+    """Test cases for ArticleStore."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = sqlite3.connect(os.path.join(self.tmpdir.name, 'ayurveda.db'))
+        self.store = ArticleStore(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def _count(self, table):
+        return self.db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def test_wal_enabled(self):
+        self.assertEqual(self.db.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+    def test_existing_and_duplicate_urls_keep_their_id(self):
+        """IDs come back in input order; known URLs are not re-inserted."""
+        first_id = self.store.save_article(make_articles(1)[0])
+        batch = make_articles(3) + [make_articles(2)[1], {'title': 'no url'}]
+        ids = self.store.save_articles(batch)
+
+        self.assertEqual(ids[0], first_id)
+        self.assertEqual(ids[1], ids[3])
+        self.assertIsNone(ids[4])
+        self.assertEqual(len(set(ids[:3])), 3)
+        self.assertEqual(self._count('articles'), 3)
+        self.assertEqual(self._count('article_metrics'), 3)
+        keywords = self.db.execute(
+            'SELECT COUNT(*) FROM article_keywords WHERE article_id = ?', (ids[2],)
+        ).fetchone()[0]
+        self.assertEqual(keywords, 5)
+
+    def test_failed_batch_rolls_back(self):
+        """A failure part-way through leaves no partial rows behind."""
+        class BrokenExtractor(KeywordExtractor):
+            def extract_tokens(self, token_lists, num_keywords=5, update=True):
+                self.add_documents(token_lists)
+                raise RuntimeError('extractor failed')
+
+        store = ArticleStore(self.db, keyword_extractor=BrokenExtractor(self.db))
+        with self.assertRaises(RuntimeError):
+            store.save_articles(make_articles(3))
+        self.assertEqual(self._count('articles'), 0)
+        self.assertEqual(self._count('keyword_document_frequency'), 0)
+        self.assertEqual(store.keyword_extractor.document_count(), 0)
+
+    def test_thousand_articles_in_one_batch(self):
+        """1,000 articles span several statements and stay under a second."""
+        articles = make_articles(1000)
+        self.assertGreater(len(articles), MAX_ROWS_PER_STATEMENT)
+
+        started = time.perf_counter()
+        ids = self.store.save_articles(articles)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(set(ids)), 1000)
+        self.assertEqual(self._count('article_metrics'), 1000)
+        self.assertLess(elapsed, 1.0)
+
+
+class TestArticleSearch(unittest.TestCase):
+    """Test cases for the FTS5 article index."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'ayurveda.db')
+        self.db = sqlite3.connect(self.db_path)
+        self.store = ArticleStore(self.db)
+        self.ids = self.store.save_articles([
+            {'title': 'Ashwagandha for sleep', 'url': 'u1', 'description': 'An adaptogen',
+             'content': 'Ashwagandha root calms vata.'},
+            {'title': 'Seasonal diet', 'url': 'u2', 'description': 'Eating for the seasons',
+             'content': 'Warm foods, ginger tea and a little ashwagandha in winter.'},
+            {'title': 'Triphala basics', 'url': 'u3', 'description': 'Digestive support',
+             'content': 'Triphala supports agni and regular digestion.'},
+        ])
+        self.db.execute('UPDATE articles SET is_published = 1')
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def _urls(self, results):
+        return [r['url'] for r in results]
+
+    def test_ranked_search_with_snippets(self):
+        """Title matches outrank body matches and matched terms are highlighted."""
+        results = self.store.search('ashwagandha')
+        self.assertEqual(self._urls(results), ['u1', 'u2'])
+        self.assertIn('<b>Ashwagandha</b>', results[0]['snippet'])
+        self.assertEqual(self.store.count('ashwagandha'), 2)
+        # Porter stemming matches other word forms
+        self.assertEqual(self._urls(self.store.search('digest')), ['u3'])
+
+    def test_prefix_queries(self):
+        self.assertEqual(self._urls(self.store.search('trip*')), ['u3'])
+        self.assertEqual(self._urls(self.store.search('triphala ag', prefix=True)), ['u3'])
+        self.assertEqual(self.store.search('trip'), [])
+
+    def test_user_syntax_is_quoted(self):
+        """FTS5 operators and punctuation in input don't raise."""
+        self.assertEqual(build_match_query('ginger" OR (tea'), '"ginger" AND "OR" AND "tea"')
+        self.assertEqual(self._urls(self.store.search('ginger" (tea')), ['u2'])
+        self.assertEqual(self.store.search('-- ;'), [])
+
+    def test_triggers_keep_index_in_sync(self):
+        self.db.execute("UPDATE articles SET title = 'Brahmi for focus' WHERE url = 'u1'")
+        self.db.execute("DELETE FROM articles WHERE url = 'u3'")
+        self.db.commit()
+        self.assertEqual(self._urls(self.store.search('brahmi')), ['u1'])
+        self.assertEqual(self.store.search('triphala'), [])
+        self.assertEqual(self.store.search('sleep'), [])
+
+    def test_unpublished_articles_are_hidden(self):
+        self.db.execute("UPDATE articles SET is_published = 0 WHERE url = 'u2'")
+        self.db.commit()
+        self.assertEqual(self._urls(self.store.search('ginger')), [])
+        self.assertEqual(self._urls(self.store.search('ginger', published_only=False)), ['u2'])
+
+    def test_related_articles(self):
+        """Related articles share keywords and exclude the article itself."""
+        related = self.store.related_articles(self.ids[0])
+        self.assertEqual(self._urls(related), ['u2'])
+
+    def test_incremental_rebuild_indexes_existing_rows(self):
+        """Rows written before the index existed are indexed in batches."""
+        for name in ('insert', 'delete', 'update'):
+            self.db.execute(f'DROP TRIGGER articles_fts_{name}')
+        self.db.execute('DROP TABLE articles_fts')
+        self.db.execute("INSERT INTO articles (title, url, content) VALUES ('Neem oil', 'u4', 'For skin')")
+        self.db.commit()
+
+        store = ArticleStore(self.db)
+        self.assertEqual(store.search('neem', published_only=False), [])
+        self.assertEqual(store.rebuild_search_index(batch_size=2), 4)
+        self.assertEqual(store.rebuild_search_index(), 0)
+        self.assertEqual(self._urls(store.search('neem', published_only=False)), ['u4'])
+        self.assertEqual(store.rebuild_search_index(full=True), 4)
+        self.assertEqual(self._urls(store.search('ashwagandha')), ['u1', 'u2'])
+
+    def _publish_many(self, count):
+        """Publish ``count`` matches for "ashwagandha" newer than u1 and u2."""
+        self.store.save_articles([
+            {'title': 'Ashwagandha ' * (i % 3 + 1), 'url': f'p{i}', 'content': 'Ashwagandha ' + 'filler ' * 40}
+            for i in range(count)
+        ])
+        self.db.execute('UPDATE articles SET is_published = 1')
+        self.db.commit()
+
+    def test_every_match_is_ranked_and_counted(self):
+        self._publish_many(250)
+        ranked = self._urls(self.store.search('ashwagandha', limit=1000))
+        pages = [self._urls(self.store.search('ashwagandha', limit=30, offset=offset))
+                 for offset in range(0, 270, 30)]
+
+        self.assertEqual(len(ranked), 252)
+        self.assertIn('u1', ranked)
+        self.assertEqual([url for page in pages for url in page], ranked)
+        self.assertEqual(self.store.count('ashwagandha'), 252)
+        self.assertEqual(self.store.count('ashwagandha', cap=100), 100)
+
+    def test_candidates_are_taken_after_filters(self):
+        """Older published matches are found behind many newer unpublished ones."""
+        self.store.save_articles([
+            {'title': f'Ashwagandha draft {i}', 'url': f'd{i}', 'content': 'Ashwagandha'}
+            for i in range(30)
+        ])
+        self.assertEqual(self._urls(self.store.search('ashwagandha', candidates=20)), ['u1', 'u2'])
+        self.assertEqual(self.store.count('ashwagandha', cap=20), 2)
+
+    def test_pages_rank_the_same_candidates(self):
+        self._publish_many(50)
+        ranked = self._urls(self.store.search('ashwagandha', limit=100, candidates=20))
+        pages = [self._urls(self.store.search('ashwagandha', limit=7, offset=offset, candidates=20))
+                 for offset in range(0, 28, 7)]
+
+        self.assertEqual(len(ranked), 20)
+        self.assertNotIn('u1', ranked)
+        self.assertEqual([url for page in pages for url in page], ranked)
+
+    def test_reopening_writes_nothing(self):
+        changes = self.db.total_changes
+        ArticleStore(self.db, setup=True)
+        self.assertEqual(self.db.total_changes, changes)
+        self.assertFalse(self.db.in_transaction)
+
+
+class TestArticleListing(unittest.TestCase):
+    """Test cases for keyset-paginated listings and the published counter."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = sqlite3.connect(os.path.join(self.tmpdir.name, 'ayurveda.db'))
+        self.store = ArticleStore(self.db, detect_near_duplicates=False)
+        with self.db:
+            # Repeated and missing dates exercise the id tie-break; ids 1, 5, 9, ... are unpublished
+            self.db.executemany(
+                'INSERT INTO articles (title, url, published_at, is_published) VALUES (?, ?, ?, ?)',
+                [(f'a{i}', f'u{i}', None if i % 7 == 0 else f'2024-05-{i % 5 + 1:02d}', int(i % 4 != 0))
+                 for i in range(60)]
+            )
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def _all_pages(self, **kwargs):
+        pages, cursor = [], None
+        while True:
+            articles, cursor = self.store.list_published(limit=7, cursor=cursor, **kwargs)
+            pages.append(articles)
+            if cursor is None:
+                return pages
+
+    def test_pages_match_offset_order(self):
+        expected = [row[0] for row in self.db.execute(
+            "SELECT id FROM articles WHERE is_published = 1 ORDER BY IFNULL(published_at, '') DESC, id DESC"
+        )]
+        pages = self._all_pages()
+        self.assertEqual([a['id'] for page in pages for a in page], expected)
+        self.assertTrue(all(len(page) == 7 for page in pages[:-1]))
+
+    def test_ascending_by_id(self):
+        ids = [a['id'] for page in self._all_pages(sort='id', descending=False) for a in page]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 45)
+
+    def test_cursor_for_another_sort_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.store.list_published(cursor=encode_cursor('id', 5, 5))
+        with self.assertRaises(ValueError):
+            self.store.list_published(cursor='not-a-cursor')
+
+    def test_published_count_follows_inserts_and_publishing(self):
+        self.assertEqual(self.store.published_count(), 45)
+        with self.db:
+            self.db.execute("INSERT INTO articles (title, url, is_published) VALUES ('n', 'new', 1)")
+        self.assertEqual(self.store.published_count(), 46)
+        with self.db:
+            self.db.execute('UPDATE articles SET is_published = 1 WHERE id IN (5, 6)')
+        self.assertEqual(self.store.published_count(), 47)
+        with self.db:
+            self.db.execute('UPDATE articles SET is_published = 0 WHERE id = 2')
+            self.db.execute('DELETE FROM articles WHERE id = 3')
+        self.assertEqual(self.store.published_count(), 45)
+
+    def test_counter_is_seeded_for_existing_databases(self):
+        self.db.execute('DROP TABLE article_counts')
+        ArticleStore(self.db, detect_near_duplicates=False)
+        self.assertEqual(self.store.published_count(), 45)
+
+
+if __name__ == "__main__":
+    unittest.main()
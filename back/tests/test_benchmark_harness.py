@@ -0,0 +1,122 @@
+"""
+Tests for the RAG vs Agent benchmark harness.
+"""
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fakes import load_corpus
+from benchmarks.rag_vs_agent import (
+    AgentTarget, build_targets, run_benchmark, build_report, format_report, percentile
+)
+
+
+class _StubAgent:
+    """Answers with AgentService.invoke's result shape; fails on one question."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+
+    def invoke(self, input_data):
+        message = input_data["message"]
+        if message == self.fail_on:
+            return {"response": "I'm sorry", "error": "executor failed", "metrics": {"error": True}}
+        tools = {'vector_store_search': 1}
+        if 'dosha' in message.lower():
+            tools['dosha'] = 1
+        return {
+            "response": f"About {message}",
+            "metrics": {"tool_usage": tools, "token_usage": {"total_tokens": len(message.split())}},
+        }
+
+
+class _RecordingMetrics:
+    """Collects track_comparison calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def track_comparison(self, rag_time, agent_time, rag_tools, agent_tools):
+        self.calls.append((rag_time, agent_time, rag_tools, agent_tools))
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Test cases for the benchmark harness."""
+
+    def setUp(self):
+        """Build zero-latency targets over a few corpus questions."""
+        self.corpus = load_corpus()
+        self.questions = self.corpus['questions'][:4]
+        self.targets = build_targets(self.corpus, agent_service=_StubAgent())
+
+    def test_percentile_interpolates(self):
+        """Percentiles interpolate between closest ranks."""
+        values = [1.0, 2.0, 3.0, 4.0]
+        self.assertEqual(percentile(values, 0), 1.0)
+        self.assertEqual(percentile(values, 100), 4.0)
+        self.assertAlmostEqual(percentile(values, 50), 2.5)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_report_shape(self):
+        """Both implementations are measured and compared."""
+        results = run_benchmark(self.questions, self.targets, repeat=2)
+        report = build_report(results)
+
+        for name in ('rag', 'agent'):
+            summary = report['implementations'][name]
+            self.assertEqual(summary['requests'], 8)
+            self.assertEqual(summary['errors'], 0)
+            self.assertGreater(summary['tokens']['mean'], 0)
+            self.assertIn('p95', summary['latency_ms'])
+
+        self.assertEqual(report['implementations']['rag']['tool_calls']['mean'], 1.0)
+        self.assertIn('comparison', report)
+        self.assertIn('| metric | rag | agent |', format_report(report))
+
+    def test_fakes_are_deterministic(self):
+        """Repeated runs produce identical tool and token counts."""
+        first = run_benchmark(self.questions, self.targets)
+        second = run_benchmark(self.questions, self.targets)
+        for name in ('rag', 'agent'):
+            self.assertEqual(
+                [(s.tool_usage, s.tokens) for s in first[name].samples],
+                [(s.tool_usage, s.tokens) for s in second[name].samples]
+            )
+
+    def test_records_comparisons(self):
+        """Each question pair is fed to track_comparison."""
+        metrics = _RecordingMetrics()
+        run_benchmark(self.questions, self.targets, record_to=metrics)
+        self.assertEqual(len(metrics.calls), len(self.questions))
+        self.assertEqual(metrics.calls[0][2], {'vector_store_search': 1})
+
+    def test_agent_error_results_count_as_errors(self):
+        """AgentService returns failures instead of raising; they are not timed as successes."""
+        targets = build_targets(self.corpus, agent_service=_StubAgent(fail_on=self.questions[0]))
+        metrics = _RecordingMetrics()
+        results = run_benchmark(self.questions, targets, record_to=metrics)
+        self.assertEqual(results['agent'].samples[0].error, 'executor failed')
+        self.assertEqual(build_report(results)['implementations']['agent']['errors'], 1)
+        self.assertEqual(len(metrics.calls), len(self.questions) - 1)
+
+    def test_agent_tokens_fall_back_to_llm_callbacks(self):
+        """Without token_usage in the result, tokens come from the LLM counter."""
+        class Counter:
+            total_tokens = 0
+
+        class CountingAgent:
+            def invoke(self, input_data):
+                counter.total_tokens += 7
+                return {"response": "ok", "metrics": {"tool_usage": {}}}
+
+        counter = Counter()
+        sample = AgentTarget(CountingAgent(), counter).run("question")
+        self.assertEqual(sample.tokens, 7)
+        self.assertIsNone(sample.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Tests for item-item collaborative filtering.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+
+from back.service.collaborative_filter import (
+    CollaborativeFilter, CollaborativeModel, CollaborativeStore, interaction_item_id, read_interactions
+)
+
+
+def interaction(user_id, item, interaction_type='view'):
+    return {
+        'user_id': user_id,
+        'content': f'About {item}',
+        'interaction_type': interaction_type,
+        'metadata': {'id': item, 'source': 'book.pdf'},
+    }
+
+
+INTERACTIONS = [
+    # Triphala and ashwagandha are read together; neem goes with turmeric
+    interaction('u1', 'triphala'), interaction('u1', 'ashwagandha', 'save'),
+    interaction('u2', 'triphala'), interaction('u2', 'ashwagandha'),
+    interaction('u3', 'triphala'),
+    interaction('u4', 'neem'), interaction('u4', 'turmeric', 'like'),
+    interaction('u5', 'neem'),
+    interaction('u5', 'unknown-item', 'dismiss'),
+]
+
+
+class TestCollaborativeFilter(unittest.TestCase):
+    """Test cases for CollaborativeFilter.fit."""
+
+    def setUp(self):
+        self.model = CollaborativeFilter().fit(INTERACTIONS)
+
+    def test_item_neighbors(self):
+        self.assertEqual([item for item, _ in self.model.similar_items('triphala')], ['ashwagandha'])
+        self.assertEqual([item for item, _ in self.model.similar_items('neem')], ['turmeric'])
+        self.assertNotIn('unknown-item', self.model.items)
+
+    def test_user_candidates_exclude_seen_items(self):
+        self.assertEqual(self.model.candidates['u3'], [('ashwagandha', 1.0)])
+        self.assertEqual(self.model.candidates['u5'], [('turmeric', 1.0)])
+        self.assertFalse(self.model.has_user('u1'))
+
+        content, metadata, score = self.model.candidates_for('u3', 5)[0]
+        self.assertEqual((content, metadata['id'], metadata['source'], score),
+                         ('About ashwagandha', 'ashwagandha', 'book.pdf', 1.0))
+        self.assertEqual(self.model.candidates_for(None, 5), [])
+
+    def test_no_interactions(self):
+        model = CollaborativeFilter().fit([])
+        self.assertEqual(model.candidates_for('u1', 5), [])
+
+    def test_item_id_falls_back_to_content_hash(self):
+        self.assertEqual(interaction_item_id('text', {'id': 'doc-1'}), 'doc-1')
+        self.assertEqual(interaction_item_id('text', {}), interaction_item_id('text'))
+        self.assertNotEqual(interaction_item_id('text'), interaction_item_id('other text'))
+
+
+class TestCollaborativeStore(unittest.TestCase):
+    """Test cases for saving, loading and reloading the model."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'ayurveda.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        model = CollaborativeFilter().fit(INTERACTIONS)
+        db = sqlite3.connect(self.db_path)
+        model.save(db)
+        loaded = CollaborativeModel.load(db)
+        db.close()
+        self.assertEqual(loaded.candidates, model.candidates)
+        self.assertEqual(loaded.neighbors, model.neighbors)
+        self.assertEqual(loaded.items, model.items)
+
+    def test_reloads_after_rebuild_elsewhere(self):
+        store = CollaborativeStore(self.db_path, reload_interval=0)
+        self.assertEqual(store.model.candidates, {})
+
+        CollaborativeStore(self.db_path).rebuild(INTERACTIONS)
+        self.assertEqual(store.model.candidates['u3'], [('ashwagandha', 1.0)])
+
+    def test_reload_checks_run_no_schema_statements(self):
+        statements = []
+        connect = sqlite3.connect
+
+        def traced_connect(*args, **kwargs):
+            db = connect(*args, **kwargs)
+            db.set_trace_callback(statements.append)
+            return db
+
+        store = CollaborativeStore(self.db_path, reload_interval=0)
+        with mock.patch('sqlite3.connect', traced_connect):
+            self.assertEqual(store.model.candidates, {})
+            CollaborativeStore(self.db_path).rebuild(INTERACTIONS)
+            del statements[:]
+            self.assertEqual(store.model.candidates['u3'], [('ashwagandha', 1.0)])
+            self.assertEqual(store.model.candidates['u3'], [('ashwagandha', 1.0)])
+
+        self.assertTrue(statements)
+        self.assertFalse([sql for sql in statements if sql.lstrip().upper().startswith('CREATE')])
+
+    def test_rebuild_from_interactions_table(self):
+        """What manage.py build_collaborative_filter runs, over a SQLite user database."""
+        engine = create_engine(f"sqlite:///{os.path.join(self.tmpdir.name, 'users.db')}")
+        with engine.begin() as connection:
+            # The columns of service.database.UserInteraction
+            connection.execute(text(
+                'CREATE TABLE interactions (id INTEGER PRIMARY KEY, user_id VARCHAR NOT NULL, '
+                'content TEXT NOT NULL, interaction_type VARCHAR(50) NOT NULL, metadata JSON, timestamp DATETIME)'
+            ))
+            connection.execute(
+                text('INSERT INTO interactions (user_id, content, interaction_type, metadata) '
+                     'VALUES (:user_id, :content, :interaction_type, :metadata)'),
+                [dict(row, metadata=json.dumps(row['metadata'])) for row in INTERACTIONS]
+            )
+
+        with engine.connect() as connection:
+            self.assertEqual(list(read_interactions(connection, batch_size=2)), INTERACTIONS)
+            model = CollaborativeStore(self.db_path).rebuild(read_interactions(connection))
+        engine.dispose()
+        self.assertEqual(model.candidates['u3'], [('ashwagandha', 1.0)])
+        self.assertEqual(CollaborativeStore(self.db_path).model.candidates, model.candidates)
+
+
+if __name__ == "__main__":
+    unittest.main()
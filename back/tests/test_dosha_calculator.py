@@ -69,6 +69,40 @@ class TestDoshaCalculator(unittest.TestCase):
         self.assertEqual(result["primary_dosha"], "Unknown")
         self.assertEqual(result["confidence"], 0.0)
     
+    def test_calculate_many_matches_calculate_dosha(self):
+        """Batch results agree with scoring each set of responses on its own."""
+        cohort = [
+            {"body_frame": "thin", "skin_type": "dry", "energy_level": "variable"},
+            {"body_frame": "medium", "skin_type": "sensitive", "energy_level": "steady"},
+            {"body_frame": "large", "skin_type": "not-an-option"},
+            {},
+            {question.id: next(iter(question.weights)) for question in self.calculator.questions},
+        ]
+        batch = self.calculator.calculate_many(cohort)
+        self.assertEqual(len(batch), len(cohort))
+        for i, responses in enumerate(cohort):
+            expected = self.calculator.calculate_dosha(responses)
+            result = batch.result(i)
+            for key in ("primary_dosha", "secondary_dosha", "scores"):
+                self.assertEqual(result[key], expected[key])
+            self.assertAlmostEqual(result["confidence"], expected["confidence"])
+    
+    def test_calculate_many_category_scores(self):
+        """Category scores add up to the overall scores."""
+        responses = {"body_frame": "thin", "skin_type": "dry"}
+        batch = self.calculator.calculate_many([responses])
+        physical = batch.category_scores[0, self.calculator.questionnaire.categories.index("physical")]
+        self.assertEqual(physical.tolist(), [6, 1, 0])
+        self.assertEqual(batch.category_scores[0].sum(axis=0).tolist(), batch.scores[0].tolist())
+    
+    def test_calculate_many_accepts_encoded_responses(self):
+        table = self.calculator.scoring_table
+        codes = table.encode([{"body_frame": "large"}, {"body_frame": "bogus"}])
+        self.assertEqual(codes[1].tolist(), [table.missing] * len(table.question_ids))
+        batch = self.calculator.calculate_many(codes)
+        self.assertEqual(batch.result(0)["primary_dosha"], "Kapha")
+        self.assertEqual(batch.result(1)["primary_dosha"], "Unknown")
+    
     def test_get_questionnaire(self):
         """Test that the questionnaire is returned in the correct format."""
         questionnaire = self.calculator.get_questionnaire()
@@ -0,0 +1,91 @@
+"""
+Tests for the shared dosha questionnaire.
+"""
+import itertools
+import json
+import unittest
+
+from back.service.dosha_calculator import DoshaCalculator, dosha_calculator
+from back.service.dosha_questionnaire import (
+    DEFAULT_QUESTIONNAIRE_PATH, SCHEMA_VERSION, Questionnaire, load_questionnaire
+)
+from back.service.dosha_service import determine_dosha
+
+
+def minimal_questionnaire(**overrides):
+    data = {
+        'schema_version': SCHEMA_VERSION,
+        'doshas': ['vata', 'pitta', 'kapha'],
+        'categories': ['physical'],
+        'questions': [{
+            'id': 'body_frame',
+            'text': 'Body frame?',
+            'category': 'physical',
+            'options': [
+                {'value': 'thin', 'text': 'Thin', 'weights': {'vata': 3, 'pitta': 1}},
+                {'value': 'large', 'text': 'Large', 'weights': {'kapha': 3}},
+            ],
+        }],
+    }
+    data.update(overrides)
+    return data
+
+
+class TestQuestionnaire(unittest.TestCase):
+    """Test cases for loading and scoring the questionnaire."""
+
+    def test_default_file_loads_once(self):
+        questionnaire = load_questionnaire()
+        self.assertEqual(len(questionnaire.questions), 12)
+        self.assertIs(load_questionnaire(DEFAULT_QUESTIONNAIRE_PATH), questionnaire)
+        self.assertIs(DoshaCalculator().questionnaire, questionnaire)
+        self.assertIs(DoshaCalculator().scoring_table, questionnaire.scoring_table)
+
+    def test_score_adds_option_vectors(self):
+        questionnaire = Questionnaire.from_dict(minimal_questionnaire())
+        scores, category_scores = questionnaire.score({'body_frame': 'thin', 'unknown': 'thin'})
+        self.assertEqual(scores.tolist(), [3, 1, 0])
+        self.assertEqual(category_scores.tolist(), [[3, 1, 0]])
+        self.assertEqual(questionnaire.score({'body_frame': 'medium'})[0].tolist(), [0, 0, 0])
+
+    def test_rejects_unsupported_schema_version(self):
+        with self.assertRaises(ValueError):
+            Questionnaire.from_dict(minimal_questionnaire(schema_version=SCHEMA_VERSION + 1))
+
+    def test_rejects_malformed_questions(self):
+        data = minimal_questionnaire()
+        data['questions'][0]['category'] = 'spiritual'
+        with self.assertRaises(ValueError):
+            Questionnaire.from_dict(data)
+
+        data = minimal_questionnaire()
+        data['questions'][0]['options'][0]['weights'] = {'ether': 1}
+        with self.assertRaises(ValueError):
+            Questionnaire.from_dict(data)
+
+        data = minimal_questionnaire()
+        data['questions'].append(json.loads(json.dumps(data['questions'][0])))
+        with self.assertRaises(ValueError):
+            Questionnaire.from_dict(data)
+
+    def test_entry_points_agree(self):
+        """determine_dosha, calculate_dosha and calculate_many pick the same dosha and confidence margin."""
+        questions = load_questionnaire().questions[:4]
+        responses = [
+            {q.id: option for q, option in zip(questions, options)}
+            for options in itertools.product(*(list(q.weights) for q in questions))
+        ]
+        batch = dosha_calculator.calculate_many(responses)
+        for i, response in enumerate(responses):
+            result = dosha_calculator.calculate_dosha(response)
+            legacy = determine_dosha(response)
+            self.assertEqual(legacy['dosha'], result['primary_dosha'])
+            self.assertEqual(legacy['confidence_margin'], result['confidence'])
+            self.assertAlmostEqual(legacy['confidence'], result['scores'][result['primary_dosha'].lower()], delta=0.1)
+            self.assertAlmostEqual(batch.result(i)['confidence'], result['confidence'])
+            self.assertEqual(batch.result(i)['primary_dosha'], result['primary_dosha'])
+            self.assertEqual(batch.result(i)['scores'], result['scores'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests for main-content extraction and capped page reads.
+"""
+import threading
+import time
+import unittest
+
+from back.service.html_extractor import (
+    HAS_LXML, _score_candidates, extract_main_text, extract_main_text_bs4, is_html, read_limited
+)
+
+PARAGRAPH = "Ayurveda balances the doshas, supports digestion, and guides daily routines for health."
+
+PAGE = f"""
+<html><head><script>var x = 1;</script></head><body>
+<div class="header"><ul class="menu"><li><a href="/">Home</a></li><li><a href="/a">About us</a></li></ul></div>
+<div class="site-content">
+  <div class="story-body">
+    <h1>Seasonal routines</h1>
+    <p>{PARAGRAPH}</p>
+    <div class="ad-slot"><p>Advertisement: buy herbal supplements today only</p></div>
+    <p>{PARAGRAPH}</p>
+    <p>{PARAGRAPH}</p>
+  </div>
+  <div class="comments">
+    <p>Great post, thanks for sharing, really helpful stuff.</p>
+  </div>
+</div>
+<div class="sidebar"><p>Popular: ten herbs you should know about, and more</p></div>
+</body></html>
+"""
+
+
+def sectioned_page(sections):
+    """A page whose sections are only kept once scoring reaches them."""
+    groups = ''.join(
+        '<div class="group">'
+        + ''.join(f'<div><p>{PARAGRAPH} Section {i}.</p><p>{PARAGRAPH}</p></div>' for _ in range(4))
+        + '</div>'
+        for i in range(sections)
+    )
+    return f'<html><body><div class="wrapper">{groups}</div></body></html>'
+
+
+class TestExtractMainText(unittest.TestCase):
+    """Test cases for extract_main_text."""
+
+    def test_keeps_article_and_drops_boilerplate(self):
+        text = extract_main_text(PAGE)
+        self.assertTrue(text.startswith('Seasonal routines'))
+        self.assertEqual(text.count('Ayurveda balances'), 3)
+        for noise in ('Advertisement', 'Great post', 'Popular', 'Home', 'var x'):
+            self.assertNotIn(noise, text)
+
+    def test_legacy_extractor_takes_content_wrapper(self):
+        """The BeautifulSoup fallback keeps comments under a generic content div."""
+        self.assertIn('Great post', extract_main_text_bs4(PAGE))
+
+    def test_exhausted_budget_still_returns_text(self):
+        text = extract_main_text(PAGE, time_budget=0)
+        self.assertIn('Ayurveda balances', text)
+        self.assertNotIn('Advertisement', text)
+
+    @unittest.skipUnless(HAS_LXML, "the time budget applies to the lxml extractor")
+    def test_budget_counts_only_the_extracting_thread(self):
+        """Extractions running in parallel don't use up each other's budget."""
+        import lxml.html
+
+        html = sectioned_page(600)
+        expected = extract_main_text(html, time_budget=10)
+        self.assertIn('Section 599', expected)
+        start = time.thread_time()
+        _score_candidates(lxml.html.fromstring(html), deadline=float('inf'))
+        cost = time.thread_time() - start
+
+        # Enough to parse and score the page once, but not twice
+        results = [None, None]
+        barrier = threading.Barrier(2)
+
+        def extract(i):
+            barrier.wait()
+            results[i] = extract_main_text(html, time_budget=cost * 1.5)
+
+        threads = [threading.Thread(target=extract, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [expected, expected])
+
+    def test_empty_page(self):
+        self.assertEqual(extract_main_text(''), '')
+        self.assertEqual(extract_main_text('   '), '')
+
+
+class TestPageReading(unittest.TestCase):
+    """Test cases for the byte cap and content-type filter."""
+
+    def test_read_limited_stops_at_cap(self):
+        consumed = []
+
+        def chunks():
+            for n in range(100):
+                consumed.append(n)
+                yield b'x' * 10
+
+        body, truncated = read_limited(chunks(), max_bytes=25)
+        self.assertEqual(body, b'x' * 25)
+        self.assertTrue(truncated)
+        self.assertEqual(len(consumed), 3)
+
+    def test_read_limited_small_body(self):
+        self.assertEqual(read_limited([b'ab', b'cd'], max_bytes=10), (b'abcd', False))
+
+    def test_is_html(self):
+        self.assertTrue(is_html('text/html; charset=utf-8'))
+        self.assertTrue(is_html(None))
+        self.assertFalse(is_html('application/pdf'))
+
+
+if __name__ == "__main__":
+    unittest.main()
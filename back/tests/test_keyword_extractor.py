@@ -0,0 +1,58 @@
+"""
+Tests for TF-IDF keyword extraction.
+"""
+import sqlite3
+import unittest
+
+from back.service.keyword_extractor import KeywordExtractor, extract_keywords, tokenize
+
+
+class TestKeywordExtractor(unittest.TestCase):
+    """Test cases for KeywordExtractor."""
+
+    def setUp(self):
+        self.db = sqlite3.connect(':memory:')
+        self.extractor = KeywordExtractor(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_tokenize_drops_stopwords_and_punctuation(self):
+        self.assertEqual(
+            tokenize("With that, Ashwagandha (root) helps vata -- and it's 2024!"),
+            ['ashwagandha', 'root', 'helps', 'vata']
+        )
+        self.assertEqual(extract_keywords('that that that herbs herbs', 1), [('herbs', 2)])
+
+    def test_idf_prefers_distinctive_terms(self):
+        """A term in every document ranks below one unique to the document."""
+        texts = [
+            'Ayurveda herbs and ayurveda diet for pitta',
+            'Ayurveda routine with turmeric',
+            'Ayurveda massage using sesame oil',
+        ]
+        keywords = self.extractor.extract_batch(texts, num_keywords=2)
+        self.assertEqual(self.extractor.document_count(), 3)
+        self.assertNotIn('ayurveda', [k for k, _ in keywords[1]])
+        self.assertEqual(len(keywords[2]), 2)
+
+        df = dict(self.db.execute('SELECT term, df FROM keyword_document_frequency'))
+        self.assertEqual(df['ayurveda'], 3)
+        self.assertEqual(df['turmeric'], 1)
+
+    def test_statistics_grow_incrementally(self):
+        self.extractor.extract_batch(['ginger tea', 'ginger root'])
+        self.extractor.extract_batch(['ginger honey'])
+        df = dict(self.db.execute('SELECT term, df FROM keyword_document_frequency'))
+        self.assertEqual((df['ginger'], df['honey']), (3, 1))
+        self.assertEqual(self.extractor.document_count(), 3)
+
+        # Single extraction reads the statistics without changing them
+        keywords = self.extractor.extract('ginger honey honey')
+        self.assertEqual(keywords[0][0], 'honey')
+        self.assertEqual(self.extractor.document_count(), 3)
+        self.assertEqual(self.extractor.extract(''), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
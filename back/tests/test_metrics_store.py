@@ -0,0 +1,169 @@
+"""
+Tests for the binary time-series metrics store.
+"""
+import atexit
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from back.service.metrics_store import TimeSeriesStore, RAW_RECORD, get_time_series_store, to_epoch
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+    """Test cases for TimeSeriesStore."""
+
+    def setUp(self):
+        """Create a store in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = TimeSeriesStore(self.tmpdir.name)
+        self.base = datetime(2024, 1, 1, 12, 0, 0)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def reopen(self, **kwargs):
+        """Another store over the same directory, closed after the test."""
+        store = TimeSeriesStore(self.tmpdir.name, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_raw_range_query(self):
+        """Raw queries return only the samples inside the range."""
+        for i in range(10):
+            self.store.append('latency', i, self.base + timedelta(seconds=i))
+
+        samples = self.store.query_raw(
+            'latency', self.base + timedelta(seconds=3), self.base + timedelta(seconds=6)
+        )
+        self.assertEqual([value for _, value in samples], [3.0, 4.0, 5.0, 6.0])
+
+    def test_fixed_width_records(self):
+        """Raw files hold one fixed-width record per sample."""
+        for i in range(5):
+            self.store.append('latency', i, self.base + timedelta(seconds=i))
+        path = self.store.file_path('latency', 'raw', self.base)
+        self.assertEqual(os.path.getsize(path), 5 * RAW_RECORD.size)
+
+    def test_minute_rollups(self):
+        """Samples are aggregated into minute buckets, including the open one."""
+        for i in range(120):
+            self.store.append('latency', 1.0 if i < 60 else 3.0, self.base + timedelta(seconds=i))
+
+        buckets = self.store.query('latency', self.base, self.base + timedelta(minutes=2), '1m')
+        self.assertEqual(len(buckets), 2)
+        self.assertEqual(buckets[0]['count'], 60)
+        self.assertAlmostEqual(buckets[0]['avg'], 1.0)
+        self.assertAlmostEqual(buckets[1]['avg'], 3.0)
+        self.assertEqual(buckets[1]['max'], 3.0)
+
+    def test_rollups_survive_restart(self):
+        """Flushed rollups are readable by a new store instance."""
+        for hour in range(3):
+            self.store.append('errors', 1, self.base + timedelta(hours=hour))
+        self.store.flush()
+
+        reopened = self.reopen()
+        buckets = reopened.query('errors', self.base, self.base + timedelta(hours=3), '1h')
+        self.assertEqual([b['count'] for b in buckets], [1, 1, 1])
+
+    def test_late_samples_are_merged(self):
+        """A late sample for a persisted bucket is merged on read."""
+        self.store.append('latency', 1.0, self.base)
+        self.store.append('latency', 1.0, self.base + timedelta(minutes=5))
+        self.store.append('latency', 5.0, self.base + timedelta(seconds=10))
+
+        buckets = self.store.query('latency', self.base, self.base + timedelta(seconds=59), '1m')
+        self.assertEqual(len(buckets), 1)
+        self.assertEqual(buckets[0]['count'], 2)
+        self.assertEqual(buckets[0]['max'], 5.0)
+
+    def test_late_raw_samples_are_found(self):
+        """Samples older than the last record are still returned by range queries."""
+        for i in range(10):
+            self.store.append('latency', i, self.base + timedelta(seconds=10 * i))
+        self.store.append('latency', 99, self.base + timedelta(seconds=15))
+
+        samples = self.store.query_raw('latency', self.base + timedelta(seconds=12), self.base + timedelta(seconds=25))
+        self.assertEqual([value for _, value in samples], [99.0, 2.0])
+        buckets = self.store.query('latency', self.base, self.base + timedelta(seconds=59), '1m')
+        self.assertEqual(buckets[0]['count'], 7)
+        self.assertEqual(buckets[0]['max'], 99.0)
+
+    def test_interleaved_writers(self):
+        """Two stores writing the same metric out of order lose no samples."""
+        other = self.reopen(flush_interval=0)
+        for i in range(3):
+            other.append('latency', 1, self.base + timedelta(seconds=2 * i + 1))
+        for i in range(3):
+            self.store.append('latency', 1, self.base + timedelta(seconds=2 * i))
+
+        samples = self.store.query_raw('latency', self.base, self.base + timedelta(seconds=10))
+        self.assertEqual(len(samples), 6)
+        self.assertEqual([ts for ts, _ in samples], sorted(ts for ts, _ in samples))
+
+        other.flush()
+        self.store.flush()
+        buckets = self.reopen(flush_interval=0).query(
+            'latency', self.base, self.base + timedelta(seconds=59), '1m'
+        )
+        self.assertEqual(buckets[0]['count'], 6)
+
+    def test_completed_buckets_are_flushed(self):
+        """Buckets whose period has ended are persisted without an explicit flush."""
+        self.store.append('latency', 1, self.base)
+        self.store.flush_completed(now=to_epoch(self.base) + 120)
+        reopened = self.reopen(flush_interval=0)
+        self.assertEqual(len(reopened.query('latency', self.base, self.base + timedelta(minutes=1), '1m')), 1)
+        self.assertEqual(len(reopened.query('latency', self.base, self.base + timedelta(hours=1), '1h')), 0)
+
+    def test_close_stops_the_thread_and_drops_the_exit_hook(self):
+        """A closed store leaves no flush thread or exit hook behind."""
+        threads = threading.active_count()
+        with mock.patch.object(atexit, 'unregister', wraps=atexit.unregister) as unregister:
+            with TimeSeriesStore(self.tmpdir.name, flush_interval=0.01) as store:
+                self.assertEqual(threading.active_count(), threads + 1)
+                store.append('latency', 1, self.base)
+
+        self.assertEqual(threading.active_count(), threads)
+        unregister.assert_called_once_with(store._flush_at_exit)
+        self.assertEqual(len(self.reopen(flush_interval=0).query_raw('latency', self.base, self.base)), 1)
+        self.assertEqual(len(self.reopen(flush_interval=0).query('latency', self.base, self.base, '1m')), 1)
+
+    def test_stores_are_shared_per_directory(self):
+        """One store, and one flush thread, per directory until it is closed."""
+        shared = get_time_series_store(self.tmpdir.name)
+        self.addCleanup(lambda: get_time_series_store(self.tmpdir.name).close())
+
+        self.assertIs(get_time_series_store(os.path.join(self.tmpdir.name, '.')), shared)
+        shared.close()
+        self.assertIsNot(get_time_series_store(self.tmpdir.name), shared)
+
+    def test_daily_rollups_over_month(self):
+        """A 30-day query at daily resolution returns one bucket per day."""
+        for day in range(30):
+            self.store.append('requests', 2, self.base + timedelta(days=day))
+        self.store.flush()
+
+        buckets = self.store.query('requests', self.base, self.base + timedelta(days=30))
+        self.assertEqual(len(buckets), 30)
+        self.assertTrue(all(b['sum'] == 2 for b in buckets))
+
+    def test_cleanup_removes_old_files(self):
+        """Retention removes every file dated before the cutoff."""
+        old = self.base - timedelta(days=40)
+        self.store.append('latency', 1, old)
+        self.store.append('latency', 1, self.base)
+        self.store.flush()
+
+        self.store.cleanup((self.base - timedelta(days=30)).date())
+        remaining = os.listdir(self.tmpdir.name)
+        self.assertTrue(remaining)
+        self.assertTrue(all(old.strftime('%Y-%m-%d') not in name for name in remaining))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for near-duplicate article detection.
+"""
+import random
+import sqlite3
+import string
+import unittest
+
+from back.service.article_store import ArticleStore
+from back.service.keyword_extractor import tokenize
+from back.service.near_duplicates import NearDuplicateIndex, minhash, similarity
+
+random.seed(7)
+VOCABULARY = [''.join(random.choices(string.ascii_lowercase, k=random.randint(4, 9))) for _ in range(3000)]
+
+
+def press_release(words=300):
+    return ' '.join(random.choices(VOCABULARY, k=words))
+
+
+def syndicate(text):
+    """A copy with a new intro, a dropped last sentence and an outlet footer."""
+    words = text.split()
+    return ' '.join(['Wire', 'report'] + words[:-10] + ['Republished', 'with', 'permission'])
+
+
+class TestMinHash(unittest.TestCase):
+    """Test cases for signatures."""
+
+    def test_similarity_estimates(self):
+        text = press_release()
+        signature = minhash(tokenize(text))
+        self.assertGreaterEqual(similarity(signature, minhash(tokenize(syndicate(text)))), 0.85)
+        self.assertLess(similarity(signature, minhash(tokenize(press_release()))), 0.1)
+        self.assertIsNone(minhash(tokenize('Too short to fingerprint')))
+
+
+class TestNearDuplicateSaves(unittest.TestCase):
+    """Test cases for near-duplicate handling in ArticleStore."""
+
+    def setUp(self):
+        self.db = sqlite3.connect(':memory:')
+        self.store = ArticleStore(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def _count(self, table):
+        return self.db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def test_copy_under_new_url_is_skipped(self):
+        """A syndicated copy maps to the stored article and its URL becomes an alias."""
+        text = press_release()
+        original, = self.store.save_articles([{'title': 'Herbs', 'url': 'http://news/1', 'content': text}])
+        copy, unrelated = self.store.save_articles([
+            {'title': 'Herbs', 'url': 'http://cse/2', 'content': syndicate(text)},
+            {'title': 'Diet', 'url': 'http://cse/3', 'content': press_release()},
+        ])
+
+        self.assertEqual(copy, original)
+        self.assertNotEqual(unrelated, original)
+        self.assertEqual(self._count('articles'), 2)
+        self.assertEqual(self._count('article_metrics'), 2)
+
+        # The alias resolves without fingerprinting again
+        self.assertEqual(self.store.save_article({'url': 'http://cse/2', 'title': 'x'}), original)
+
+    def test_copies_within_a_batch(self):
+        text = press_release()
+        ids = self.store.save_articles([
+            {'title': 'A', 'url': 'u1', 'content': text},
+            {'title': 'A', 'url': 'u2', 'content': syndicate(text)},
+        ])
+        self.assertEqual(ids[0], ids[1])
+        self.assertEqual(self._count('articles'), 1)
+        self.assertEqual(self.store.near_duplicates.aliases_for(['u2']), {'u2': ids[0]})
+
+    def test_short_articles_are_not_deduplicated(self):
+        ids = self.store.save_articles([
+            {'title': 'Ginger tea', 'url': 'u1'}, {'title': 'Ginger tea', 'url': 'u2'}
+        ])
+        self.assertNotEqual(ids[0], ids[1])
+
+    def test_backfill_signs_existing_articles(self):
+        store = ArticleStore(self.db, detect_near_duplicates=False)
+        text = press_release()
+        store.save_articles([{'title': 'A', 'url': 'u1', 'content': text}, {'title': 'B', 'url': 'u2'}])
+
+        index = NearDuplicateIndex(self.db)
+        self.assertEqual(index.backfill(batch_size=1), 1)
+        self.assertEqual(index.backfill(), 0)
+        self.assertEqual(self.store.save_article({'title': 'A', 'url': 'u3', 'content': syndicate(text)}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
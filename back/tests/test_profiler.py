@@ -0,0 +1,133 @@
+"""
+Tests for the sampling profiler.
+"""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import unittest
+from collections import Counter
+
+from back.service.profiler import (
+    capture, to_collapsed, ContinuousProfiler, ProfilerBusyError, _capture_lock,
+    BUCKET_SECONDS
+)
+
+
+BACK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Runs in a subprocess so monkey-patching doesn't leak into the other tests.
+# The busy greenlet never yields, like a CPU-bound request handler.
+EVENTLET_SCRIPT = textwrap.dedent("""
+    import eventlet
+    eventlet.monkey_patch()
+
+    import json
+    import time
+    from service.profiler import capture, continuous_profiler, to_collapsed
+
+    def busy_greenlet_for_profiler_test(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+
+    # spawn() only schedules the greenlet; it runs once capture() yields
+    eventlet.spawn(busy_greenlet_for_profiler_test, 0.5)
+    counter, passes = capture(0.2, interval=0.005)
+
+    continuous_profiler.start(interval=0.01)
+    eventlet.spawn(busy_greenlet_for_profiler_test, 0.3)
+    time.sleep(0.4)
+    continuous_profiler.stop()
+
+    print(json.dumps({
+        'passes': passes,
+        'capture': to_collapsed(counter),
+        'continuous': to_collapsed(continuous_profiler.snapshot()),
+    }))
+""")
+
+
+def busy_loop_for_profiler_test(stop):
+    """Burn CPU until ``stop`` is set."""
+    total = 0
+    while not stop.is_set():
+        total += sum(range(1000))
+    return total
+
+
+class TestCapture(unittest.TestCase):
+    """Test cases for on-demand capture."""
+
+    def test_capture_sees_busy_thread(self):
+        """A CPU-bound thread shows up in the collapsed output."""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop_for_profiler_test, args=(stop,))
+        worker.start()
+        try:
+            counter, passes = capture(0.2, interval=0.005)
+        finally:
+            stop.set()
+            worker.join()
+
+        self.assertGreater(passes, 1)
+        output = to_collapsed(counter)
+        self.assertIn('busy_loop_for_profiler_test (test_profiler.py:', output)
+        for line in output.splitlines():
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack)
+            self.assertGreater(int(count), 0)
+
+    def test_capture_sees_busy_greenlet_under_eventlet(self):
+        """Under monkey-patching, a running greenlet is sampled but the capture itself is not."""
+        result = subprocess.run(
+            [sys.executable, '-c', EVENTLET_SCRIPT],
+            cwd=BACK_DIR, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        profile = json.loads(result.stdout.splitlines()[-1])
+
+        self.assertGreater(profile['passes'], 1)
+        self.assertIn('busy_greenlet_for_profiler_test (<string>:', profile['capture'])
+        self.assertNotIn('_sample_for (profiler.py:', profile['capture'])
+        self.assertIn('busy_greenlet_for_profiler_test (<string>:', profile['continuous'])
+        self.assertNotIn('_run (profiler.py:', profile['continuous'])
+
+    def test_capture_is_exclusive(self):
+        """Concurrent captures are rejected."""
+        with _capture_lock:
+            with self.assertRaises(ProfilerBusyError):
+                capture(0.01)
+
+
+class TestContinuousProfiler(unittest.TestCase):
+    """Test cases for the always-on sampler."""
+
+    def test_ring_buffer_keeps_recent_buckets(self):
+        """Only the newest buckets are kept and snapshots respect the window."""
+        profiler = ContinuousProfiler(retention_buckets=3)
+        base = 1_700_000_000 // BUCKET_SECONDS * BUCKET_SECONDS
+        for minute in range(5):
+            profiler.record(Counter({f'stack{minute}': 1}), now=base + minute * BUCKET_SECONDS)
+            profiler.record(Counter({f'stack{minute}': 1}), now=base + minute * BUCKET_SECONDS + 30)
+
+        now = base + 4 * BUCKET_SECONDS + 45
+        self.assertEqual(set(profiler.snapshot(now=now)), {'stack2', 'stack3', 'stack4'})
+        # Buckets overlapping the window are included
+        self.assertEqual(set(profiler.snapshot(minutes=1, now=now)), {'stack3', 'stack4'})
+
+    def test_start_and_stop(self):
+        """The background sampler collects samples while running."""
+        profiler = ContinuousProfiler(interval=0.01)
+        profiler.start()
+        time.sleep(0.1)
+        profiler.stop()
+        self.assertFalse(profiler.running)
+        self.assertTrue(profiler.buckets)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Tests for the recommendation classifier.
+"""
+import unittest
+
+from back.service.recommendation_classifier import (
+    CentroidClassifier, KeywordClassifier, RecommendationClassifier
+)
+
+
+class TestKeywordClassifier(unittest.TestCase):
+    """Test cases for KeywordClassifier."""
+
+    def setUp(self):
+        self.classifier = KeywordClassifier()
+
+    def test_categories(self):
+        self.assertEqual(self.classifier.classify('Favor warm meals and ginger tea with lunch.'), 'food')
+        self.assertEqual(self.classifier.classify('Practice yoga and meditation every morning.'), 'lifestyle')
+        self.assertEqual(self.classifier.classify('Pitta governs transformation.'), 'general')
+
+    def test_whole_words_only(self):
+        """'eat' inside 'heat' and 'great', 'tea' inside 'steady', 'rest' inside 'restore' don't count."""
+        self.assertEqual(self.classifier.scores('Great heat needs a steady mind to restore balance.'),
+                         {'food': 0, 'lifestyle': 0})
+
+    def test_plurals_and_case(self):
+        self.assertEqual(self.classifier.scores('HERBS, spices and Dishes'), {'food': 3, 'lifestyle': 0})
+
+    def test_keywords_counted_once(self):
+        """Repeated keywords count once; 'oil' belongs to both categories."""
+        self.assertEqual(self.classifier.scores('oil, oil, diet and diet'), {'food': 2, 'lifestyle': 1})
+
+    def test_tie_is_general(self):
+        self.assertEqual(self.classifier.classify('A meal before sleep.'), 'general')
+
+
+class TestRecommendationClassifier(unittest.TestCase):
+    """Test cases for centroid classification of undecided documents."""
+
+    def test_centroids_decide_undecided_documents(self):
+        centroids = CentroidClassifier({'food': [1.0, 0.0], 'lifestyle': [0.0, 1.0]})
+        classifier = RecommendationClassifier(centroids=centroids)
+        texts = ['Kitchari with ghee.', 'Pitta governs transformation.', 'Vata is cold and dry.']
+        vectors = [[0.0, 1.0], [0.9, 0.1], [0.5, 0.5]]
+        self.assertEqual(classifier.classify_many(texts, vectors), ['food', 'food', 'general'])
+        self.assertEqual(classifier.classify_many(texts), ['food', 'general', 'general'])
+
+    def test_from_keywords_embeds_each_category(self):
+        calls = []
+
+        def embed(texts):
+            calls.append(texts)
+            return [[1.0, 0.0], [0.0, 1.0]]
+
+        centroids = CentroidClassifier.from_keywords(embed)
+        self.assertEqual(len(calls[0]), 2)
+        self.assertIn('ghee', calls[0][0])
+        self.assertEqual(centroids.classify_vectors([[0.2, 3.0]]), ['lifestyle'])
+
+
+if __name__ == "__main__":
+    unittest.main()
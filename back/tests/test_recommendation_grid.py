@@ -0,0 +1,99 @@
+"""
+Tests for the precomputed recommendation grid.
+"""
+import os
+import tempfile
+import unittest
+
+from back.service.recommendation_grid import RecommendationGrid, cell_key, grid_cells, normalize_dosha
+
+
+class FakeService:
+    """Returns one recommendation naming the cell it was computed for."""
+
+    def __init__(self, fail_on=None):
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def get_many(self, contexts, use_grid=True):
+        assert not use_grid
+        self.calls += 1
+        results = []
+        for context in contexts:
+            key = cell_key(context['dosha'], context['season'], context['time_of_day'], context['weather_data'])
+            recommendation = {'content': key, 'classification': 'general'}
+            if key == self.fail_on:
+                recommendation['fallback'] = True
+            results.append([recommendation] * context['top_k'])
+        return results
+
+
+class TestCellKey(unittest.TestCase):
+    """Test cases for mapping requests to grid cells."""
+
+    def test_normalizes_spelling(self):
+        self.assertEqual(normalize_dosha('pitta/VATA'), 'Vata-Pitta')
+        self.assertEqual(normalize_dosha('kapha and vata'), 'Vata-Kapha')
+        self.assertIsNone(normalize_dosha('Unknown'))
+        self.assertEqual(
+            cell_key('vata-pitta', 'winter', 'MORNING', {'temperature': 5, 'humidity': 20}),
+            'Vata-Pitta|Winter|Morning|cold weather, dry conditions'
+        )
+
+    def test_weather_buckets(self):
+        self.assertEqual(cell_key('kapha', weather_data={'temperature': 22, 'humidity': 50}),
+                         'Kapha|||moderate temperature')
+        self.assertEqual(cell_key('kapha', weather_data={}), cell_key('kapha'))
+
+    def test_outside_grid(self):
+        self.assertIsNone(cell_key('vata', season='dry season'))
+        self.assertIsNone(cell_key('vata', time_of_day='noon'))
+
+    def test_grid_covers_distinct_cells(self):
+        keys = [cell_key(**cell) for cell in grid_cells()]
+        self.assertEqual(len(keys), 7 * 6 * 5 * 10)
+        self.assertEqual(len(set(keys)), len(keys))
+
+
+class TestRecommendationGrid(unittest.TestCase):
+    """Test cases for building and reading the grid."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.grid = RecommendationGrid(os.path.join(self.tmpdir.name, 'ayurveda.db'))
+
+    def tearDown(self):
+        self.grid.pool.close()
+        self.tmpdir.cleanup()
+
+    def test_lookup_before_build(self):
+        self.assertIsNone(self.grid.lookup(dosha='vata'))
+
+    def test_build_and_lookup(self):
+        service = FakeService()
+        self.assertEqual(self.grid.build(service, depth=3, batch_size=500), 2100)
+        self.assertEqual(service.calls, 5)
+
+        recommendations = self.grid.lookup(dosha='Pitta', season='summer',
+                                           weather_data={'temperature': 38, 'humidity': 75}, top_k=2)
+        self.assertEqual(recommendations, [{'content': 'Pitta|Summer||hot weather, high humidity',
+                                            'classification': 'general'}] * 2)
+
+    def test_requests_not_served_from_grid(self):
+        self.grid.build(FakeService(), depth=3, batch_size=500)
+        self.assertIsNone(self.grid.lookup(dosha='vata', query='sleep'))
+        self.assertIsNone(self.grid.lookup(dosha='vata', health_concern='insomnia'))
+        self.assertIsNone(self.grid.lookup(dosha='vata', user_id='u1'))
+        self.assertIsNone(self.grid.lookup(dosha='vata', top_k=4))
+        self.assertIsNone(self.grid.lookup(dosha='Unknown'))
+
+    def test_failed_build_keeps_previous_grid(self):
+        self.grid.build(FakeService(), depth=3, batch_size=500)
+        with self.assertRaises(RuntimeError):
+            self.grid.build(FakeService(fail_on='Kapha|Winter|Night|'), depth=5, batch_size=500)
+        self.assertEqual(len(self.grid.lookup(dosha='vata', top_k=3)), 3)
+        self.assertIsNone(self.grid.lookup(dosha='vata', top_k=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
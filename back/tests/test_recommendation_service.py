@@ -0,0 +1,241 @@
+"""
+Tests for batched recommendation requests.
+"""
+import unittest
+from types import SimpleNamespace
+
+from langchain_core.documents import Document
+
+from back.service.collaborative_filter import CollaborativeModel
+from back.service.recommendation_service import (
+    RecommendationContext, RecommendationService, generate_embedding_query
+)
+
+
+class FakeEmbeddings:
+    """Embeds a text as (length, 1); records every call."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.document_calls = []
+        self.query_calls = []
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding service unavailable")
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return [float(len(text)), 1.0]
+
+
+class FakeVectorStore:
+    """Returns ``k`` documents named after the searched vector, best first."""
+
+    def __init__(self):
+        self.searches = []
+
+    def similarity_search_by_vector_with_score(self, embedding, k):
+        self.searches.append((tuple(embedding), k))
+        return [
+            (Document(page_content=f"doc {i} for {embedding[0]:g}", metadata={'id': f"{embedding[0]:g}-{i}"}),
+             1.0 - i * 0.05)
+            for i in range(k)
+        ]
+
+    def similarity_search_by_vector(self, embedding, k):
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+
+class FakeGrid:
+    """Serves only requests for the kapha dosha."""
+
+    def __init__(self):
+        self.lookups = 0
+
+    def lookup(self, dosha=None, top_k=5, **kwargs):
+        self.lookups += 1
+        if dosha == 'kapha' and not kwargs.get('query'):
+            return [{'content': 'grid', 'classification': 'general'}] * top_k
+        return None
+
+
+class TestGetMany(unittest.TestCase):
+    """Test cases for RecommendationService.get_many."""
+
+    def setUp(self):
+        self.embeddings = FakeEmbeddings()
+        self.store = FakeVectorStore()
+        self.service = self.make_service()
+
+    def tearDown(self):
+        self.service._executor.shutdown()
+
+    def make_service(self, **kwargs):
+        kwargs.setdefault('embeddings', self.embeddings)
+        kwargs.setdefault('vector_store', self.store)
+        return RecommendationService(session_factory=None, **kwargs)
+
+    def test_results_follow_request_order(self):
+        results = self.service.get_many([
+            RecommendationContext(query='sleep', dosha='vata', top_k=2),
+            {'query': 'digestion', 'dosha': 'pitta', 'top_k': 4},
+        ])
+        self.assertEqual([len(r) for r in results], [2, 4])
+        sleep = len(generate_embedding_query(query='sleep', dosha='vata'))
+        self.assertEqual(results[0][0]['content'], f"doc 0 for {sleep}")
+        self.assertEqual(results[0][0]['metadata']['recommendation_source'], 'base')
+        self.assertFalse(results[0][0]['personalized'])
+        self.assertEqual(self.service.get_many([]), [])
+
+    def test_identical_queries_are_embedded_and_searched_once(self):
+        results = self.service.get_many([
+            {'query': 'sleep', 'dosha': 'vata', 'top_k': 2},
+            {'query': 'sleep', 'dosha': 'vata', 'top_k': 5},
+            {'query': 'stress', 'dosha': 'vata', 'top_k': 1},
+        ])
+        self.assertEqual(len(self.embeddings.document_calls), 1)
+        self.assertEqual(len(self.embeddings.document_calls[0]), 2)
+        # The shared text is searched once, deep enough for the larger request
+        self.assertEqual(sorted(k for _, k in self.store.searches), [3, 15])
+        self.assertEqual([len(r) for r in results], [2, 5, 1])
+        self.assertEqual(results[0], results[1][:2])
+
+    def test_grid_hits_skip_the_search(self):
+        grid = FakeGrid()
+        self.service = self.make_service(grid=grid)
+        results = self.service.get_many([
+            {'dosha': 'kapha', 'season': 'winter', 'top_k': 3},
+            {'dosha': 'vata', 'season': 'winter', 'top_k': 3},
+        ])
+        self.assertEqual(grid.lookups, 2)
+        self.assertEqual(results[0], [{'content': 'grid', 'classification': 'general'}] * 3)
+        self.assertNotEqual(results[1][0]['content'], 'grid')
+        self.assertEqual(len(self.store.searches), 1)
+
+        self.service.get_many([{'dosha': 'kapha', 'top_k': 3}], use_grid=False)
+        self.assertEqual(grid.lookups, 2)
+
+    def test_collaborative_candidates_are_fused(self):
+        text = generate_embedding_query(query='sleep', dosha='vata')
+        shared_id, shared_content = f"{len(text)}-1", f"doc 1 for {len(text)}"
+        model = CollaborativeModel(
+            candidates={'u1': [(shared_id, 1.0), ('other', 0.6)]},
+            neighbors={},
+            items={shared_id: (shared_content, {'id': shared_id}), 'other': ('saved tea', {'id': 'other'})}
+        )
+        self.service = self.make_service(collaborative=SimpleNamespace(model=model))
+        results = self.service.get_many([
+            {'query': 'sleep', 'dosha': 'vata', 'top_k': 3, 'user_id': 'u1', 'personalization_weight': 2.0}
+        ])[0]
+        self.assertEqual(len(self.store.searches), 1)
+        self.assertEqual(results[0]['content'], shared_content)
+        self.assertEqual(results[0]['metadata']['recommendation_source'], 'both')
+        self.assertAlmostEqual(results[0]['relevance_score'], 0.95 + 2.0)
+        self.assertEqual(results[1]['content'], 'saved tea')
+        self.assertEqual(results[1]['metadata']['recommendation_source'], 'personal')
+        self.assertAlmostEqual(results[1]['relevance_score'], 1.2)
+        self.assertEqual([r['personalized'] for r in results], [True, True, False])
+
+    def test_embedding_failure_falls_back_per_request(self):
+        self.embeddings.fail = True
+        results = self.service.get_many([
+            {'query': 'sleep', 'dosha': 'vata', 'top_k': 2},
+            {'query': 'stress', 'dosha': 'pitta', 'top_k': 3},
+        ])
+        self.assertEqual([len(r) for r in results], [2, 3])
+        self.assertTrue(all(r['fallback'] for batch in results for r in batch))
+        self.assertEqual(len(self.embeddings.query_calls), 2)
+
+
+class UnscoredVectorStore:
+    """A store whose scored search is missing or not implemented."""
+
+    def __init__(self, docs, scored_raises=False):
+        self.docs = docs
+        if scored_raises:
+            self.similarity_search_by_vector_with_score = self._not_implemented
+
+    def _not_implemented(self, embedding, k):
+        raise NotImplementedError
+
+    def similarity_search_by_vector(self, embedding, k):
+        return self.docs[:k]
+
+
+class TestRanking(unittest.TestCase):
+    """Test cases for searching and fusing scored results."""
+
+    def setUp(self):
+        self.service = RecommendationService(
+            embeddings=FakeEmbeddings(), vector_store=FakeVectorStore(), session_factory=None
+        )
+
+    def tearDown(self):
+        self.service._executor.shutdown()
+
+    def test_search_returns_store_scores(self):
+        results = self.service._search([7.0, 1.0], 3)
+        self.assertEqual([score for _, score in results], [1.0, 0.95, 0.9])
+        self.assertEqual(results[0][0].page_content, "doc 0 for 7")
+
+    def test_search_without_scores_ranks_by_position(self):
+        docs = [Document(page_content=f"doc {i}") for i in range(3)]
+        for store in (UnscoredVectorStore(docs), UnscoredVectorStore(docs, scored_raises=True)):
+            self.service.vector_store = store
+            results = self.service._search([1.0], 3)
+            self.assertEqual([doc for doc, _ in results], docs)
+            self.assertEqual([round(score, 2) for _, score in results], [1.0, 0.9, 0.8])
+
+    def test_doc_key_prefers_index_id(self):
+        key = RecommendationService._doc_key
+        self.assertEqual(key(Document(page_content="a", metadata={'id': 'x1', 'source': 's'})), 'x1')
+        self.assertEqual(key(Document(page_content="a", metadata={'source': 's'})), ('s', "a"))
+        self.assertEqual(key(Document(page_content="a")), (None, "a"))
+        self.assertNotEqual(
+            key(Document(page_content="a", metadata={'source': 's'})),
+            key(Document(page_content="a", metadata={'source': 't'}))
+        )
+
+    def test_overlap_by_id_adds_weighted_scores(self):
+        base = [
+            (Document(page_content="ginger tea", metadata={'id': 'g'}), 0.8),
+            (Document(page_content="warm milk", metadata={'id': 'm'}), 0.7),
+        ]
+        # Same document with different text from another search
+        personal = [(Document(page_content="ginger tea (saved)", metadata={'id': 'g'}), 1.0)]
+        ranked = self.service._rank_recommendations(base, personal, 0.5)
+        self.assertEqual([r['content'] for r in ranked], ["ginger tea", "warm milk"])
+        self.assertAlmostEqual(ranked[0]['relevance_score'], 1.3)
+        self.assertEqual(ranked[0]['metadata']['recommendation_source'], 'both')
+        self.assertEqual(ranked[1]['metadata']['recommendation_source'], 'base')
+
+    def test_overlap_without_id_matches_source_and_content(self):
+        base = [(Document(page_content="oil massage", metadata={'source': 'book'}), 0.6)]
+        personal = [
+            (Document(page_content="oil massage", metadata={'source': 'book'}), 0.8),
+            (Document(page_content="oil massage", metadata={'source': 'blog'}), 0.9),
+        ]
+        ranked = self.service._rank_recommendations(base, personal, 0.5)
+        self.assertEqual(
+            [(r['source'], r['metadata']['recommendation_source']) for r in ranked],
+            [('book', 'both'), ('blog', 'personal')]
+        )
+        self.assertAlmostEqual(ranked[0]['relevance_score'], 1.0)
+        self.assertAlmostEqual(ranked[1]['relevance_score'], 0.45)
+
+    def test_unscored_results_fuse_by_rank_score(self):
+        docs = [Document(page_content=f"doc {i}", metadata={'source': 'book'}) for i in range(3)]
+        self.service.vector_store = UnscoredVectorStore(docs)
+        base = self.service._search([1.0], 3)
+        personal = [(docs[2], 1.0)]
+        ranked = self.service._rank_recommendations(base, personal, 0.3)
+        self.assertEqual([r['content'] for r in ranked], ["doc 2", "doc 0", "doc 1"])
+        self.assertAlmostEqual(ranked[0]['relevance_score'], 0.8 + 0.3)
+        self.assertEqual(ranked[0]['metadata']['recommendation_source'], 'both')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Tests for the recommendations routes.
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routes import recommendations_routes
+
+
+class TestUnifiedRecommendations(unittest.TestCase):
+    """The unified endpoint reports the dosha it determined from the quiz."""
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.register_blueprint(recommendations_routes.recommendations_bp)
+        self.client = app.test_client()
+        patcher = mock.patch.object(recommendations_routes, 'get_recommendations', return_value=[])
+        self.get_recommendations = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_dosha_result_keeps_the_percentage_confidence(self):
+        # vata 3 + 1 + 3 = 7, pitta 1 + 3 + 0 = 4, kapha 0 out of 11
+        quiz_responses = {'body_frame': 'thin', 'skin_type': 'sensitive', 'hair_type': 'dry'}
+
+        response = self.client.post('/api/unified_recommendations', json={'quiz_responses': quiz_responses})
+
+        self.assertEqual(response.status_code, 200)
+        dosha_result = response.get_json()['dosha_result']
+        self.assertEqual(dosha_result['dosha'], 'Vata')
+        self.assertEqual(dosha_result['confidence'], 63.64)
+        self.assertAlmostEqual(dosha_result['confidence_margin'], 3 / 11)
+        self.assertEqual(self.get_recommendations.call_args.kwargs['dosha'], 'Vata')
+
+
+if __name__ == '__main__':
+    unittest.main()
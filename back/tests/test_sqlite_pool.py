@@ -0,0 +1,45 @@
+"""
+Tests for the SQLite connection pool.
+"""
+import os
+import tempfile
+import unittest
+
+from back.service.sqlite_pool import SQLitePool
+
+
+class TestSQLitePool(unittest.TestCase):
+    """Test cases for SQLitePool."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.setups = []
+        self.pool = SQLitePool(os.path.join(self.tmpdir.name, 'pool.db'), size=2, setup=self._setup)
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmpdir.cleanup()
+
+    def _setup(self, conn):
+        self.setups.append(conn)
+        conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY)')
+        conn.commit()
+
+    def test_connections_are_reused_and_setup_runs_once(self):
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            with self.pool.connection() as third:
+                self.assertIsNot(second, third)
+        self.assertIs(first, second)
+        self.assertEqual(len(self.setups), 1)
+
+    def test_uncommitted_changes_are_rolled_back(self):
+        with self.pool.connection() as conn:
+            conn.execute('INSERT INTO items (id) VALUES (1)')
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM items').fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
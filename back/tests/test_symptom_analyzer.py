@@ -58,5 +58,20 @@ class TestSymptomAnalyzer(unittest.TestCase):
         self.assertEqual(result["confidence"], 0)
         self.assertEqual(len(result["recommendations"]), 1)
 
+    def test_free_text_symptoms(self):
+        """Test that misspelled and paraphrased symptoms are matched."""
+        symptoms = ["Dry, flaky skin", "insomia", "acidity"]
+        result = self.analyzer.analyze_symptoms(symptoms)
+        self.assertEqual(result["primary_dosha"], "Vata")
+        self.assertEqual(
+            [match["symptom"] for match in result["symptom_matches"]],
+            ["dry skin", "insomnia", "acid reflux"]
+        )
+        self.assertIn("acidity", result["matched_symptoms"][DoshaType.PITTA])
+    
+    def test_shared_matcher(self):
+        """Test that analyzers share one matcher."""
+        self.assertIs(SymptomAnalyzer().matcher, self.analyzer.matcher)
+
 if __name__ == "__main__":
     unittest.main()
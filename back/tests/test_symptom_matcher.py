@@ -0,0 +1,86 @@
+"""
+Tests for the indexed symptom matcher.
+"""
+import unittest
+
+from back.service.symptom_analyzer import SYMPTOM_DOSHAS, SYMPTOM_SYNONYMS
+from back.service.symptom_matcher import SymptomMatcher, normalize_symptom
+
+SYMPTOMS = ["dry skin", "heartburn", "joint pain", "insomnia"]
+SYNONYMS = {"heartburn": ["acidity"], "insomnia": ["trouble sleeping"]}
+
+
+class FakeEmbeddings:
+    """Embeds by fixed vectors; unknown text lands next to insomnia."""
+
+    VECTORS = {
+        "dry skin": [1.0, 0.0, 0.0],
+        "heartburn": [0.0, 1.0, 0.0],
+        "acidity": [0.0, 1.0, 0.0],
+        "joint pain": [0.0, 0.0, 1.0],
+        "insomnia": [1.0, 1.0, 1.0],
+        "trouble sleeping": [1.0, 1.0, 1.0],
+    }
+
+    def __init__(self):
+        self.document_calls = 0
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return [self.VECTORS[text] for text in texts]
+
+    def embed_query(self, text):
+        return [0.9, 1.0, 1.1]
+
+
+class TestSymptomMatcher(unittest.TestCase):
+    """Test cases for SymptomMatcher."""
+
+    def setUp(self):
+        self.matcher = SymptomMatcher(SYMPTOMS, SYNONYMS)
+
+    def test_exact_and_synonym(self):
+        match = self.matcher.best_match("  Joint   PAIN ")
+        self.assertEqual((match.symptom, match.score, match.method), ("joint pain", 1.0, "exact"))
+        match = self.matcher.best_match("Acidity!")
+        self.assertEqual((match.symptom, match.method), ("heartburn", "synonym"))
+
+    def test_fuzzy(self):
+        self.assertEqual(self.matcher.best_match("dry, flaky skin").symptom, "dry skin")
+        self.assertEqual(self.matcher.best_match("insomia").symptom, "insomnia")
+        self.assertEqual(self.matcher.best_match("heart burn").method, "fuzzy")
+        self.assertEqual(self.matcher.match("I get heartburn after dinner")[0].symptom, "heartburn")
+
+    def test_no_match(self):
+        self.assertEqual(self.matcher.match("headache"), [])
+        self.assertEqual(self.matcher.match(""), [])
+        self.assertIsNone(self.matcher.best_match("!!!"))
+
+    def test_fuzzy_needs_the_distinguishing_words(self):
+        """Phrases sharing only some words or letters with the text don't match."""
+        matcher = SymptomMatcher(SYMPTOM_DOSHAS, SYMPTOM_SYNONYMS)
+        matched = lambda text: [m.symptom for m in matcher.match(text)]
+        self.assertNotIn("dry skin", matched("oily skin"))
+        self.assertNotIn("excessive body heat", matched("feeling cold"))
+        self.assertNotIn("allergies", matched("fever"))
+        self.assertNotIn("insomnia", matched("poor appetite"))
+        # Typos, word endings and split compounds still match
+        self.assertEqual(matched("dryness of skin")[0], "dry skin")
+        self.assertEqual(matched("sinus congestoin")[0], "sinus congestion")
+        self.assertEqual(matched("hay fever in spring")[0], "allergies")
+
+    def test_embedding_fallback(self):
+        embeddings = FakeEmbeddings()
+        self.matcher.set_embeddings(embeddings)
+        self.assertEqual(self.matcher.match("cannot rest at night", limit=2)[0].symptom, "insomnia")
+        self.assertEqual(self.matcher.best_match("cannot rest at night").method, "embedding")
+        # Lexical matches don't reach the model, and phrases are embedded once
+        self.assertEqual(self.matcher.best_match("insomia").method, "fuzzy")
+        self.assertEqual(embeddings.document_calls, 1)
+
+    def test_normalize(self):
+        self.assertEqual(normalize_symptom("Dry,  flaky-skin "), "dry flaky skin")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the bounded ToolUsageTracker and its storage helpers.
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from back.service.tool_usage_tracker import ToolUsageTracker
+from back.service.usage_store import HyperLogLog, ShardedLRU
+
+
+class TestHyperLogLog(unittest.TestCase):
+    """Test cases for HyperLogLog."""
+
+    def test_estimate_is_close(self):
+        """Estimates stay within a few percent of the true cardinality."""
+        for n in (100, 20000):
+            sketch = HyperLogLog()
+            for i in range(n):
+                sketch.add(f"user-{i}")
+                sketch.add(f"user-{i}")  # duplicates do not count
+            self.assertAlmostEqual(sketch.count() / n, 1.0, delta=0.05)
+
+    def test_merge(self):
+        """Merged sketches count the union."""
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(1000):
+            a.add(i)
+            b.add(i + 500)
+        a.merge(b)
+        self.assertAlmostEqual(a.count() / 1500, 1.0, delta=0.05)
+
+
+class TestShardedLRU(unittest.TestCase):
+    """Test cases for ShardedLRU."""
+
+    def test_capacity_is_enforced(self):
+        """Old entries are evicted and recently used ones survive."""
+        evicted = []
+        lru = ShardedLRU(capacity=8, shards=1, on_evict=lambda k, v: evicted.append(k))
+        for i in range(8):
+            lru.setdefault(i, dict)
+        lru.get(0)  # refresh
+        lru.setdefault(8, dict)
+
+        self.assertEqual(len(lru), 8)
+        self.assertIn(0, lru)
+        self.assertNotIn(1, lru)
+        self.assertEqual(evicted, [1])
+
+
+class TestToolUsageTracker(unittest.TestCase):
+    """Test cases for ToolUsageTracker."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'usage.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _count_rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute('SELECT COUNT(*) FROM tool_usage_events').fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_memory_is_bounded(self):
+        """Per-user state stays capped no matter how many users are seen."""
+        tracker = ToolUsageTracker(max_users=100, max_articles=50, shards=4)
+        for i in range(5000):
+            tracker.log_tool_use('dosha', user_id=f"user-{i}", response_time=0.1)
+            tracker.log_article_interaction(f"user-{i}", f"article-{i}", 'view')
+
+        self.assertLessEqual(len(tracker.user_sessions), 100)
+        self.assertLessEqual(len(tracker.article_metrics), 50)
+        self.assertEqual(len(tracker.metrics['response_times']['dosha']), 1000)
+        unique = tracker.get_tool_metrics('dosha')['unique_users']
+        self.assertAlmostEqual(unique / 5000, 1.0, delta=0.05)
+
+    def test_events_are_written_in_batches(self):
+        """Events are buffered until the batch size or an explicit flush."""
+        tracker = ToolUsageTracker(storage_path=self.db_path, batch_size=10, flush_interval=0)
+        for i in range(15):
+            tracker.log_tool_use('weather', user_id='u1', success=i % 5 != 0, error='boom')
+
+        self.assertEqual(self._count_rows(), 10)
+        self.assertEqual(tracker.flush(), 5)
+        self.assertEqual(self._count_rows(), 15)
+
+    def test_legacy_json_path_maps_to_shared_database(self):
+        """Per-user JSON paths share one SQLite database in the same directory."""
+        a = ToolUsageTracker(storage_path=os.path.join(self.tmpdir.name, 'tool_usage_a.json'))
+        b = ToolUsageTracker(storage_path=os.path.join(self.tmpdir.name, 'tool_usage_b.json'))
+        self.assertEqual(a.storage_path.name, 'tool_usage.db')
+        self.assertIs(a.event_writer, b.event_writer)
+
+    def test_user_engagement_and_sequences(self):
+        """User sessions and tool co-usage are still reported."""
+        tracker = ToolUsageTracker()
+        tracker.log_tool_use('weather', user_id='u1')
+        tracker.log_tool_use('dosha', user_id='u1')
+
+        engagement = tracker.get_user_engagement('u1')
+        self.assertEqual(engagement['tool_usage'], {'weather': 1, 'dosha': 1})
+        self.assertEqual(tracker.get_tool_metrics('dosha')['frequently_used_with'], ['weather'])
+
+    def test_record_invocation_stats(self):
+        """Agent-style invocations feed get_stats."""
+        tracker = ToolUsageTracker()
+        tracker.record_invocation('agent', duration_ms=100, metadata={'user_id': 'u1'})
+        tracker.record_invocation('agent', duration_ms=300, success=False, error='timeout')
+
+        stats = tracker.get_stats('agent')
+        self.assertEqual(stats['total_invocations'], 2)
+        self.assertEqual(stats['success_rate'], 0.5)
+        self.assertAlmostEqual(stats['avg_duration_ms'], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""
+Tests for the User model.
+"""
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import extensions  # noqa: F401  (registers the models the way the app does)
+from models.user import User
+
+
+class TestUserModel(unittest.TestCase):
+    """The model imports from the top-level package and keeps its defaults."""
+
+    def test_password_is_hashed_and_verified(self):
+        user = User(username="asha", email="Asha@Example.com")
+        user.password = "correct horse"
+
+        self.assertNotEqual(user.password_hash, "correct horse")
+        self.assertTrue(user.verify_password("correct horse"))
+        self.assertFalse(user.verify_password("wrong"))
+        with self.assertRaises(AttributeError):
+            user.password
+
+    def test_email_is_lowercased_and_flags_default(self):
+        user = User(username="asha", email="Asha@Example.com")
+
+        self.assertEqual(user.email, "asha@example.com")
+        self.assertFalse(user.is_admin)
+        self.assertTrue(user.is_active)
+        self.assertEqual(user.login_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Tests for the user profile snapshot cache.
+"""
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from service.database import UserInteraction, UserPreference
+from service.recommendation_service import RecommendationService
+from service.user_profile_cache import MemoryProfileStore, UserProfileCache
+
+PROFILE = {'preferences': {'health_goals': 'sleep'}, 'recent_interactions': []}
+
+
+class BrokenStore:
+    def get(self, user_id):
+        raise ConnectionError('redis down')
+
+    def set(self, user_id, profile, ttl):
+        raise ConnectionError('redis down')
+
+    def delete(self, user_id):
+        raise ConnectionError('redis down')
+
+
+class TestUserProfileCache(unittest.TestCase):
+    """Test cases for UserProfileCache."""
+
+    def test_get_set_invalidate(self):
+        cache = UserProfileCache(ttl=60)
+        self.assertIsNone(cache.get('u1'))
+        cache.set('u1', PROFILE)
+        self.assertEqual(cache.get('u1'), PROFILE)
+        cache.invalidate('u1')
+        self.assertIsNone(cache.get('u1'))
+
+    def test_entries_expire(self):
+        cache = UserProfileCache(ttl=60)
+        with patch('service.user_profile_cache.time.monotonic', return_value=1000.0):
+            cache.set('u1', PROFILE)
+        with patch('service.user_profile_cache.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache.get('u1'), PROFILE)
+        with patch('service.user_profile_cache.time.monotonic', return_value=1060.0):
+            self.assertIsNone(cache.get('u1'))
+
+    def test_zero_ttl_disables(self):
+        cache = UserProfileCache(ttl=0)
+        cache.set('u1', PROFILE)
+        self.assertIsNone(cache.get('u1'))
+
+    def test_least_recently_used_evicted(self):
+        cache = UserProfileCache(ttl=60, store=MemoryProfileStore(max_users=2))
+        cache.set('u1', PROFILE)
+        cache.set('u2', PROFILE)
+        cache.get('u1')
+        cache.set('u3', PROFILE)
+        self.assertIsNotNone(cache.get('u1'))
+        self.assertIsNone(cache.get('u2'))
+
+    def test_store_errors_are_misses(self):
+        cache = UserProfileCache(ttl=60, store=BrokenStore())
+        cache.set('u1', PROFILE)
+        cache.invalidate('u1')
+        self.assertIsNone(cache.get('u1'))
+
+
+class TestUserProfiles(unittest.TestCase):
+    """RecommendationService.get_user_preferences over the user database tables."""
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        UserInteraction.__table__.create(self.engine)
+        UserPreference.__table__.create(self.engine)
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+        self.session_factory = scoped_session(sessionmaker(bind=self.engine))
+        self.service = RecommendationService(
+            embeddings=object(), vector_store=object(), session_factory=self.session_factory,
+            profile_cache=UserProfileCache(ttl=60)
+        )
+
+    def tearDown(self):
+        self.session_factory.remove()
+        self.engine.dispose()
+
+    def _selects(self):
+        return [sql for sql in self.statements if sql.lstrip().upper().startswith('SELECT')]
+
+    def test_profile_is_one_query_then_served_from_cache(self):
+        self.service.log_interaction('About triphala', 'view', {'id': 'triphala'}, user_id='u1')
+        self.service.update_user_preferences({'diet': 'vegetarian'}, user_id='u1')
+        self.statements.clear()
+
+        profile = self.service.get_user_preferences('u1')
+        self.assertEqual(len(self._selects()), 1)
+        self.assertEqual(profile['preferences'], {'diet': 'vegetarian'})
+        self.assertEqual(
+            [(i['content'], i['interaction_type']) for i in profile['recent_interactions']],
+            [('About triphala', 'view')]
+        )
+
+        self.statements.clear()
+        self.assertEqual(self.service.get_user_preferences('u1'), profile)
+        self.assertEqual(self.statements, [])
+
+    def test_writes_invalidate_the_snapshot(self):
+        self.service.log_interaction('About triphala', 'view', user_id='u1')
+        self.service.get_user_preferences('u1')
+
+        self.service.log_interaction('About neem', 'save', user_id='u1')
+        self.service.update_user_preferences({'diet': 'vegan', 'goal': 'sleep'}, user_id='u1')
+        profile = self.service.get_user_preferences('u1')
+
+        self.assertEqual([i['content'] for i in profile['recent_interactions']], ['About neem', 'About triphala'])
+        self.assertEqual(profile['preferences'], {'diet': 'vegan', 'goal': 'sleep'})
+
+        self.service.update_user_preferences({'diet': 'sattvic'}, user_id='u1')
+        self.assertEqual(self.service.get_user_preferences('u1')['preferences'], {'diet': 'sattvic', 'goal': 'sleep'})
+
+    def test_only_the_latest_interactions_are_kept(self):
+        for i in range(12):
+            self.service.log_interaction(f'Item {i}', 'view', user_id='u1')
+        self.service.log_interaction('Other user', 'view', user_id='u2')
+
+        interactions = self.service.get_user_preferences('u1')['recent_interactions']
+        self.assertEqual(len(interactions), 10)
+        self.assertNotIn('Other user', [i['content'] for i in interactions])
+        self.assertEqual(self.service.get_user_preferences(None), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the weather cache.
+"""
+import threading
+import unittest
+from unittest.mock import patch
+
+from back.service.weather_cache import WeatherCache, city_key, coordinate_key
+
+WEATHER = {'temperature': 21.5, 'humidity': 40}
+
+
+class CountingFetch:
+    """Returns WEATHER, optionally blocking until released."""
+
+    def __init__(self, block=False, error=None):
+        self.calls = 0
+        self.error = error
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return dict(WEATHER, call=self.calls)
+
+
+class TestWeatherKeys(unittest.TestCase):
+    """Test cases for cache keys."""
+
+    def test_city_key_is_normalized(self):
+        self.assertEqual(city_key('  New   York ', 'us'), city_key('new york', 'US'))
+        self.assertNotEqual(city_key('Paris', 'FR'), city_key('Paris', 'US'))
+
+    def test_coordinate_buckets(self):
+        self.assertEqual(coordinate_key(51.5072, -0.1276), coordinate_key(51.49, -0.14))
+        self.assertNotEqual(coordinate_key(51.5072, -0.1276), coordinate_key(51.61, -0.1276))
+
+
+class TestWeatherCache(unittest.TestCase):
+    """Test cases for WeatherCache."""
+
+    def test_fresh_entries_are_served(self):
+        cache, fetch = WeatherCache(ttl=600), CountingFetch()
+        self.assertEqual(cache.get('k', fetch)['call'], 1)
+        self.assertEqual(cache.get('k', fetch)['call'], 1)
+        self.assertEqual(fetch.calls, 1)
+
+    def test_concurrent_misses_share_one_call(self):
+        cache, fetch = WeatherCache(ttl=600), CountingFetch(block=True)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('k', fetch))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        fetch.started.wait(5)
+        fetch.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual(len(results), 8)
+
+    def test_stale_entry_served_while_refreshing(self):
+        cache, fetch = WeatherCache(ttl=600, stale_ttl=3600), CountingFetch()
+        with patch('back.service.weather_cache.time.time', return_value=1000.0):
+            cache.get('k', fetch)
+
+        refresh = CountingFetch(block=True)
+        with patch('back.service.weather_cache.time.time', return_value=1700.0):
+            self.assertEqual(cache.get('k', refresh)['call'], 1)
+            self.assertEqual(cache.get('k', refresh)['call'], 1)
+            refresh.started.wait(5)
+            refresh.release.set()
+            for thread in threading.enumerate():
+                if thread.name == 'weather-refresh':
+                    thread.join(5)
+            self.assertEqual(refresh.calls, 1)
+            # The refreshed entry is fresh again
+            unused = CountingFetch()
+            cache.get('k', unused)
+            self.assertEqual(unused.calls, 0)
+
+        # Past the stale window the caller waits for a new call
+        expired = CountingFetch()
+        with patch('back.service.weather_cache.time.time', return_value=1700.0 + 600 + 3600):
+            cache.get('k', expired)
+        self.assertEqual(expired.calls, 1)
+
+    def test_failures_are_not_cached(self):
+        cache = WeatherCache(ttl=600)
+        with self.assertRaises(ValueError):
+            cache.get('k', CountingFetch(error=ValueError("City 'x' not found")))
+        self.assertEqual(cache.get('k', CountingFetch())['call'], 1)
+
+    def test_zero_ttl_disables(self):
+        cache, fetch = WeatherCache(ttl=0), CountingFetch()
+        cache.get('k', fetch)
+        cache.get('k', fetch)
+        self.assertEqual(fetch.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests for the weather service against a local stand-in for the weather API.
+"""
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from back.service import weather_service
+from back.service.weather_cache import WeatherCache
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers like the current weather endpoint; 'Atlantis' is not found."""
+
+    requests = []
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        StandInHandler.requests.append(params)
+        if params.get('q', '').startswith('Atlantis'):
+            self._reply(404, {'cod': '404', 'message': 'city not found'})
+            return
+        self._reply(200, {
+            'name': params.get('q', 'Somewhere').split(',')[0],
+            'main': {'temp': 31.0, 'humidity': 55, 'pressure': 1012, 'feels_like': 33.0},
+            'weather': [{'description': 'clear sky'}],
+            'wind': {'speed': 3.5},
+            'clouds': {'all': 0},
+        })
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestWeatherService(unittest.TestCase):
+    """Test cases for cached weather lookups."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), StandInHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StandInHandler.requests = []
+        env = {
+            'OPENWEATHERMAP_API_KEY': 'test-key',
+            'OPENWEATHERMAP_BASE_URL': f'http://127.0.0.1:{self.server.server_port}/data/2.5/weather',
+        }
+        patches = [
+            patch.dict(os.environ, env),
+            patch.object(weather_service, 'weather_cache', WeatherCache(ttl=600)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_city_lookups_share_one_call(self):
+        first = weather_service.get_weather_data('Pune', 'IN')
+        second = weather_service.get_weather_data(' pune ', 'in')
+        self.assertEqual(first['temperature'], 31.0)
+        self.assertEqual(first['feels_like'], 33.0)
+        self.assertEqual((first['city'], second['city']), ('Pune', ' pune '))
+        self.assertEqual(StandInHandler.requests, [{'q': 'Pune,IN', 'appid': 'test-key', 'units': 'metric'}])
+
+    def test_coordinates_share_a_bucket(self):
+        weather_service.get_weather_by_coordinates(18.5204, 73.8567)
+        weather_service.get_weather_by_coordinates(18.49, 73.86)
+        self.assertEqual(len(StandInHandler.requests), 1)
+        self.assertEqual((StandInHandler.requests[0]['lat'], StandInHandler.requests[0]['lon']), ('18.5', '73.9'))
+        with self.assertRaises(ValueError):
+            weather_service.get_weather_by_coordinates(91, 0)
+
+    def test_not_found_is_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                weather_service.get_weather_data('Atlantis')
+        self.assertEqual(len(StandInHandler.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,7 @@ import jwt
 import datetime
 from functools import wraps
 from flask import jsonify, request, current_app
-from ..models.user import User
+from models.user import User
 
 def generate_token(user_id, expires_in=3600, token_type='access'):
     """